@@ -0,0 +1,103 @@
+"""
+alignment_cache.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module holds an on-disk (SQLite) cache of aligned hit subsequences, used by
+run_hmmalign.py (--alignment-cache) so that subsequences aligned in earlier runs or
+domains, e.g. identical orthologs, isoforms and re-runs, are not aligned again.
+
+hmmalign aligns each sequence to the profile independently, so a subsequence's aligned
+row only depends on the HMM and trimming. Entries are keyed by (subsequence MD5,
+HMM checksum, seed checksum, trim), the seed checksum tying them to the resource release
+along with the HMM. Rows are stored as residues and a state path
+(see hmm_states.nodes_to_state_path), placed back on the HMM states when read.
+"""
+
+import sqlite3
+from typing import Iterable
+from hmm_states import nodes_to_state_path, state_path_to_nodes
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS aligned_rows (
+    subseq_md5 TEXT NOT NULL,
+    hmm_checksum TEXT NOT NULL,
+    seed_checksum TEXT NOT NULL,
+    trim INTEGER NOT NULL,
+    hmm_length INTEGER NOT NULL,
+    residues TEXT NOT NULL,
+    state_path TEXT NOT NULL,
+    PRIMARY KEY (subseq_md5, hmm_checksum, seed_checksum, trim)
+)
+"""
+
+# SQLite limits the number of host parameters per statement
+QUERY_BATCH_SIZE = 500
+
+def open_alignment_cache(cache_path: str) -> sqlite3.Connection:
+    """Opens (creating if needed) the alignment cache database.
+    WAL mode and a busy timeout let parallel domains and chunks share the same cache file."""
+    connection = sqlite3.connect(cache_path, timeout=300)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(CACHE_SCHEMA)
+    connection.commit()
+    return connection
+
+def get_cached_rows(
+    connection: sqlite3.Connection, subseq_md5s: Iterable[str],
+    hmm_checksum: str, seed_checksum: str, trim: bool) -> dict[str, tuple[list[str], list[str]]]:
+    """Fetches cached aligned rows for the given subsequence digests.
+
+    Args:
+        connection: Open cache connection
+        subseq_md5s: Subsequence MD5 digests to look up
+        hmm_checksum: Checksum of the domain's HMM file
+        seed_checksum: Checksum of the domain's seed alignment file
+        trim: Whether rows were aligned with trimming
+
+    Returns:
+        dict[str, tuple[list[str], list[str]]]: {subseq_md5: (match, inserts)} for cached digests
+    """
+    unique_md5s = list(dict.fromkeys(subseq_md5s))
+    cached = {}
+    for start in range(0, len(unique_md5s), QUERY_BATCH_SIZE):
+        batch = unique_md5s[start:start + QUERY_BATCH_SIZE]
+        placeholders = ",".join("?" * len(batch))
+        rows = connection.execute(
+            "SELECT subseq_md5, hmm_length, residues, state_path FROM aligned_rows "
+            f"WHERE hmm_checksum = ? AND seed_checksum = ? AND trim = ? AND subseq_md5 IN ({placeholders})",
+            (hmm_checksum, seed_checksum, int(trim), *batch)
+        )
+        for subseq_md5, hmm_length, residues, state_path in rows:
+            cached[subseq_md5] = state_path_to_nodes(residues, 1, state_path, hmm_length)
+    return cached
+
+def store_rows(
+    connection: sqlite3.Connection, rows: dict[str, tuple[list[str], list[str]]],
+    hmm_checksum: str, seed_checksum: str, trim: bool) -> None:
+    """Stores aligned rows, {subseq_md5: (match, inserts)} as returned by get_cached_rows."""
+    entries = []
+    for subseq_md5, (match, inserts) in rows.items():
+        residues, _, state_path = nodes_to_state_path(match, inserts)
+        entries.append((subseq_md5, hmm_checksum, seed_checksum, int(trim), len(match), residues, state_path))
+    connection.executemany(
+        "INSERT OR REPLACE INTO aligned_rows "
+        "(subseq_md5, hmm_checksum, seed_checksum, trim, hmm_length, residues, state_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        entries
+    )
+    connection.commit()
@@ -0,0 +1,125 @@
+"""
+benchmark_go_mappings.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Compares target GO sets from InterProScan (go_source iprscan) with those derived from
+Pfam hits through pfam2go/interpro2go (go_source mappings), on the output dir of a
+finished run with InterProScan, and reports their agreement and the cost of each path.
+
+For every hit of every domain, both GO sets are gathered as transfer_annotations.py does
+(from the match index, or iprscan.tsv files without it). The InterProScan stage time is
+taken from iprscan_batches.json when the run used adaptive_iprscan.
+
+Usage:
+    python benchmarks/benchmark_go_mappings.py -o results/human -r resources -j agreement.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from go_mappings import load_go_mappings, compare_go_sets
+from hits_table import open_hits_table
+from iprscan_index import open_iprscan_index, load_sequence_matches
+from transfer_annotations import gather_go_terms_for_target, get_mapped_sequence_matches
+
+def parse_arguments():
+    """Parse command-line arguments for the GO mappings benchmark"""
+    parser = argparse.ArgumentParser(description="Agreement of mapping-derived GO terms with InterProScan GO terms")
+    parser.add_argument("-o", "--output-dir", help="Output dir of a finished run with InterProScan", type=str, required=True)
+    parser.add_argument("-r", "--resource-dir", help="Resource dir with pfam2go/interpro2go in mappings", type=str, required=True)
+    parser.add_argument("-d", "--domains", help="Only these domains", nargs="*", default=[])
+    parser.add_argument("-j", "--json", help="Write the report to this JSON file", type=str, default="")
+    return parser.parse_args()
+
+def load_hits(output_dir: str) -> dict:
+    """Returns {pfam_id: {seq_id: [hit dicts]}} from the hits table or hmmsearch_per_domain.json."""
+    hits_table = open_hits_table(output_dir)
+    if hits_table is not None:
+        return {pfam_id: hits_table.domain_hits(pfam_id) for pfam_id in hits_table.accessions}
+    with open(os.path.join(output_dir, "hmmsearch_per_domain.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    """Gathers GO sets through both paths and reports agreement and timings"""
+    args = parse_arguments()
+    go_mappings = load_go_mappings(args.resource_dir)
+    if go_mappings is None:
+        sys.exit(f"No pfam2go or interpro2go in {os.path.join(args.resource_dir, 'mappings')}")
+    hits_per_domain = load_hits(args.output_dir)
+    domains = args.domains or list(hits_per_domain)
+    quiet = lambda *_args, **_kwargs: None
+
+    reference, derived = {}, {}
+    iprscan_seconds = mappings_seconds = 0.0
+    for pfam_id in domains:
+        targets = {
+            seq_id: {"hit_intervals": {
+                f"{hit['ali_from']}-{hit['ali_to']}": {"hit_start": hit["ali_from"], "hit_end": hit["ali_to"]}
+                for hit in hits
+            }}
+            for seq_id, hits in hits_per_domain.get(pfam_id, {}).items()
+        }
+        interpro_conv_id = go_mappings.interpro_id(pfam_id)
+
+        start = time.perf_counter()
+        index_connection = open_iprscan_index(args.output_dir)
+        index_matches = None
+        if index_connection is not None:
+            index_matches = load_sequence_matches(index_connection, targets)
+            index_connection.close()
+        for seq_id, target in targets.items():
+            for interval_key, interval in target["hit_intervals"].items():
+                reference[f"{pfam_id}/{seq_id}/{interval_key}"] = gather_go_terms_for_target(
+                    quiet, seq_id, pfam_id, args.output_dir, interpro_conv_id, interval["hit_start"], interval["hit_end"],
+                    sequence_matches=None if index_matches is None else index_matches.get(seq_id, [])
+                )
+        iprscan_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        mapped_matches = get_mapped_sequence_matches(targets, pfam_id, args.output_dir, go_mappings)
+        for seq_id, target in targets.items():
+            for interval_key, interval in target["hit_intervals"].items():
+                derived[f"{pfam_id}/{seq_id}/{interval_key}"] = gather_go_terms_for_target(
+                    quiet, seq_id, pfam_id, args.output_dir, interpro_conv_id, interval["hit_start"], interval["hit_end"],
+                    sequence_matches=mapped_matches[seq_id]
+                )
+        mappings_seconds += time.perf_counter() - start
+
+    report = {
+        "domains": len(domains),
+        "agreement": compare_go_sets(reference, derived),
+        "go_gathering_seconds": {"iprscan": round(iprscan_seconds, 3), "mappings": round(mappings_seconds, 3)},
+    }
+    batches_json = os.path.join(args.output_dir, "iprscan_batches.json")
+    if os.path.isfile(batches_json):
+        with open(batches_json, "r", encoding="utf-8") as f:
+            report["iprscan_batch_seconds"] = round(sum(record["seconds"] for record in json.load(f)), 1)
+
+    print(json.dumps(report, indent=4))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
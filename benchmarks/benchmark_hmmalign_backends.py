@@ -0,0 +1,124 @@
+"""
+benchmark_hmmalign_backends.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Compares run_hmmalign.py's backends on the domains of a run's output dir (after
+prepare_fasta_per_domain.py): the hmmalign binary run through the shell, once per domain,
+and the in-process pyhmmer backend, with one TraceAligner shared across domains.
+Reports the time and sequences per second of each, and the fraction of alignment rows
+whose match states agree. The binary backend is skipped if hmmalign is not on PATH.
+
+Usage:
+    python benchmarks/benchmark_hmmalign_backends.py -o results/human --trim -j backends.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pyhmmer.plan7 import TraceAligner
+from hmm_states import alignment_match_states, read_hmm_match_columns
+from run_hmmalign import align_domain_in_process
+
+def parse_arguments():
+    """Parse command-line arguments for the hmmalign backends benchmark"""
+    parser = argparse.ArgumentParser(description="Throughput and agreement of the hmmalign binary and pyhmmer backends")
+    parser.add_argument("-o", "--output-dir", help="Output dir with PF*/domain_info.json files", type=str, required=True)
+    parser.add_argument("-d", "--domains", help="Only these domains", nargs="*", default=[])
+    parser.add_argument("--trim", help="Trim nonhomologous residues", action="store_true")
+    parser.add_argument("-j", "--json", help="Write the report to this JSON file", type=str, default="")
+    return parser.parse_args()
+
+def count_fasta_records(fasta_path: str) -> int:
+    with open(fasta_path, "r", encoding="utf-8") as f:
+        return sum(line.startswith(">") for line in f)
+
+def run_binary(info: dict, trim: bool, output_path: str) -> list[str]:
+    """Runs hmmalign as run_hmmalign.py's binary backend does, returning the alignment lines."""
+    command = f"hmmalign --outformat Pfam --mapali {info['seed_alignment']}"
+    if trim:
+        command += " --trim"
+    command += f" {info['hmm_file']} {info['dom_fasta']} > {output_path}"
+    subprocess.run(command, shell=True, check=True, stderr=subprocess.PIPE)
+    with open(output_path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def main():
+    """Aligns every domain with both backends and reports timings and agreement"""
+    args = parse_arguments()
+    info_paths = sorted(glob.glob(os.path.join(args.output_dir, "PF*", "domain_info.json")))
+    if args.domains:
+        info_paths = [path for path in info_paths if os.path.basename(os.path.dirname(path)) in args.domains]
+    has_binary = shutil.which("hmmalign") is not None
+
+    aligner = TraceAligner()
+    sequences = rows_compared = rows_agreeing = 0
+    seconds = {"binary": 0.0, "pyhmmer": 0.0}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for info_path in info_paths:
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            sequences += count_fasta_records(info["dom_fasta"])
+
+            start = time.perf_counter()
+            in_process_lines = align_domain_in_process(
+                info["hmm_file"], info["seed_alignment"], info["dom_fasta"], args.trim, aligner
+            )
+            seconds["pyhmmer"] += time.perf_counter() - start
+            if not has_binary:
+                continue
+
+            start = time.perf_counter()
+            binary_lines = run_binary(info, args.trim, os.path.join(tmp_dir, "hmmalign.sth"))
+            seconds["binary"] += time.perf_counter() - start
+
+            hmm_length, _ = read_hmm_match_columns(info["hmm_file"])
+            binary_states = alignment_match_states(binary_lines, hmm_length)
+            in_process_states = alignment_match_states(in_process_lines, hmm_length)
+            rows_compared += len(binary_states)
+            rows_agreeing += sum(in_process_states.get(name) == states for name, states in binary_states.items())
+
+    report = {
+        "domains": len(info_paths),
+        "sequences": sequences,
+        "seconds": {backend: round(value, 3) for backend, value in seconds.items()},
+        "sequences_per_second": {
+            backend: round(sequences / value, 1) if value else None for backend, value in seconds.items()
+        },
+    }
+    if has_binary:
+        report["match_state_agreement"] = round(rows_agreeing / rows_compared, 4) if rows_compared else 1.0
+    else:
+        report["binary_backend"] = "hmmalign not on PATH, skipped"
+
+    print(json.dumps(report, indent=4))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+benchmark_iprscan_orchestration.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Runs the InterProScan stage end to end as the executor does (seq_and_batch_prep.py, then
+run_iprscan.py per batch with a fixed number of jobs or the adaptive controller) against
+benchmarks/interproscan_standin.py, on a synthetic proteome, and reports the time spent
+preparing, scanning and splitting.
+
+Stand-in costs and failures are set with its IPRSCAN_STANDIN_* environment variables,
+exposed here as options, e.g. 2 microseconds per residue, 200 MB per run and one failing motif:
+    python benchmarks/benchmark_iprscan_orchestration.py -s 5000 -b 500 -j 4 \\
+        --seconds-per-residue 0.000002 --memory-mb 200 --fail-pattern WWWW
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import random
+import logging
+import argparse
+import subprocess
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from joblib import Parallel, delayed
+from executor import get_sequence_batches
+from iprscan_controller import IprscanController, run_adaptive
+from iprscan_index import IPRSCAN_INDEX_FILENAME
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STANDIN = os.path.join(REPO_DIR, "benchmarks", "interproscan_standin.py")
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+def parse_arguments():
+    """Parse command-line arguments for the InterProScan orchestration benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks InterProScan batching, concurrency and splitting with a stand-in")
+    parser.add_argument("-s", "--sequences", help="Number of synthetic sequences", type=int, default=2000)
+    parser.add_argument("-len", "--length", help="Mean residues per sequence", type=int, default=350)
+    parser.add_argument("-b", "--batch-size", help="Sequences per batch", type=int, default=500)
+    parser.add_argument("-bm", "--batch-mode", help="sequences or residues", type=str, default="sequences")
+    parser.add_argument("-br", "--batch-residues", help="Residues per batch in residues mode", type=int, default=200000)
+    parser.add_argument("-j", "--jobs", help="Concurrent batches", type=int, default=2)
+    parser.add_argument("-c", "--cpu-cores", help="CPU cores per batch (--cpu)", type=int, default=1)
+    parser.add_argument("-f", "--formats", help="Output formats", type=str, default="TSV")
+    parser.add_argument("--adaptive", help="Use the adaptive controller instead of fixed jobs", action="store_true")
+    parser.add_argument("--memory-budget-gb", help="Adaptive mode memory budget", type=float, default=4.0)
+    parser.add_argument("--startup-seconds", help="Stand-in time per run", type=float, default=0.0)
+    parser.add_argument("--seconds-per-residue", help="Stand-in scan time per residue", type=float, default=0.0)
+    parser.add_argument("--memory-mb", help="Stand-in memory per run", type=float, default=0.0)
+    parser.add_argument("--memory-kb-per-residue", help="Stand-in memory per residue", type=float, default=0.0)
+    parser.add_argument("--fail-pattern", help="Stand-in fails on sequences matching this regex", type=str, default="")
+    parser.add_argument("-o", "--output-dir", help="Keep outputs here instead of a temporary directory", type=str, default="")
+    parser.add_argument("--seed", help="Random seed", type=int, default=0)
+    return parser.parse_args()
+
+def write_synthetic_fasta(path: str, sequences: int, length: int, seed: int) -> None:
+    """Writes random UniProt-like protein records, wrapped at 60 columns."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(sequences):
+            sequence = "".join(rng.choices(AMINO_ACIDS, k=max(30, int(rng.expovariate(1 / length)))))
+            f.write(f">sp|Q{i:08d}|SYN{i}_HUMAN Synthetic protein {i}\n")
+            for start in range(0, len(sequence), 60):
+                f.write(sequence[start:start + 60] + "\n")
+
+def make_command(args: argparse.Namespace, output_dir: str, log_path: str):
+    """Returns a builder of run_iprscan.py batch commands, as in the executor."""
+    def command(sequence_batch: list[str], batch_idx: int) -> list:
+        return [
+            sys.executable, os.path.join(REPO_DIR, "run_iprscan.py"),
+            "-iPr", STANDIN, "-iOf", args.formats, "-iCc", str(args.cpu_cores), "-l", log_path,
+            "batch", "-sB", ",".join(sequence_batch).replace("|", "-"),
+            "-sBi", str(batch_idx), "-sPd", output_dir,
+        ]
+    return command
+
+def run_batch(cmd: list) -> None:
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def benchmark(args: argparse.Namespace, work_dir: str) -> None:
+    logger = logging.getLogger("benchmark_iprscan_orchestration")
+    logger.addHandler(logging.NullHandler())
+    os.environ.update({
+        "IPRSCAN_STANDIN_STARTUP_SECONDS": str(args.startup_seconds),
+        "IPRSCAN_STANDIN_SECONDS_PER_RESIDUE": str(args.seconds_per_residue),
+        "IPRSCAN_STANDIN_MEMORY_MB": str(args.memory_mb),
+        "IPRSCAN_STANDIN_MEMORY_KB_PER_RESIDUE": str(args.memory_kb_per_residue),
+        "IPRSCAN_STANDIN_FAIL_PATTERN": args.fail_pattern,
+    })
+    fasta = os.path.join(work_dir, "input.fasta")
+    output_dir = os.path.join(work_dir, "output")
+    log_path = os.path.join(work_dir, "benchmark.log")
+    write_synthetic_fasta(fasta, args.sequences, args.length, args.seed)
+
+    start = time.perf_counter()
+    subprocess.run([
+        sys.executable, os.path.join(REPO_DIR, "seq_and_batch_prep.py"), "-iF", fasta, "-o", output_dir,
+        "-b", str(args.batch_size), "-bm", args.batch_mode, "-br", str(args.batch_residues), "-l", log_path,
+    ], check=True)
+    prep_time = time.perf_counter() - start
+    sequence_batches = get_sequence_batches(os.path.join(output_dir, "all_sequences.json"))
+
+    command = make_command(args, output_dir, log_path)
+    start = time.perf_counter()
+    if args.adaptive:
+        controller = IprscanController(
+            memory_budget_gb=args.memory_budget_gb, cpu_cores_iprscan=args.cpu_cores,
+            batch_size=args.batch_size, number_jobs=args.jobs, min_batch_size=min(100, args.batch_size),
+        )
+        records = run_adaptive(
+            [seq_id for batch in sequence_batches for seq_id in batch], command, controller, logger, poll_interval=0.5
+        )
+        batches_run = len(records)
+    else:
+        Parallel(n_jobs=args.jobs)(
+            delayed(run_batch)(command(batch, batch_idx)) for batch_idx, batch in enumerate(sequence_batches, 1)
+        )
+        batches_run = len(sequence_batches)
+    scan_time = time.perf_counter() - start
+
+    split_files = len(glob.glob(os.path.join(output_dir, "*", "iprscan.*")))
+    quarantined = 0
+    for quarantine_path in glob.glob(os.path.join(output_dir, "batches", "*.quarantine.json")):
+        with open(quarantine_path, encoding="utf-8") as f:
+            quarantined += len(json.load(f)["quarantined"])
+
+    print(f"sequences: {args.sequences}, batches run: {batches_run}, "
+          f"mode: {'adaptive' if args.adaptive else f'{args.jobs} jobs'}, formats: {args.formats}")
+    print(f"sequence and batch preparation: {prep_time:.2f} s")
+    print(f"InterProScan stage (scan, index and split): {scan_time:.2f} s, "
+          f"{args.sequences / scan_time:.0f} sequences/s")
+    print(f"per-sequence output files: {split_files}, match index: "
+          f"{os.path.isfile(os.path.join(output_dir, IPRSCAN_INDEX_FILENAME))}, quarantined sequences: {quarantined}")
+
+def main():
+    """Runs the InterProScan stage against the stand-in and reports timings"""
+    args = parse_arguments()
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        benchmark(args, args.output_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            benchmark(args, tmp_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+benchmark_seq_and_batch_prep.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Compares the previous two-pass Bio.SeqIO sequence and batch preparation against the
+single-pass seq_and_batch_prep.prepare_sequences_and_batches on a synthetic protein FASTA.
+
+Two measurements are reported:
+    - reading only: Bio.SeqIO.parse vs utils.read_fasta_records over the whole file
+    - full preparation (--full): batch map plus one directory and FASTA per sequence,
+      which is bound by filesystem work and needs space for every sequence directory
+
+The default size is the 20M-sequence target; use -s for quicker runs, e.g.:
+    python benchmarks/benchmark_seq_and_batch_prep.py -s 200000 --full
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Bio import SeqIO
+from utils import read_fasta_records, seqrecord_yielder, make_dirs_and_write_fasta
+from seq_and_batch_prep import iter_prepared_records, prepare_sequences_and_batches
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+def parse_arguments():
+    """Parse command-line arguments for the sequence preparation benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks two-pass SeqIO vs single-pass sequence preparation")
+    parser.add_argument("-s", "--sequences", help="Number of synthetic sequences", type=int, default=20_000_000)
+    parser.add_argument("-len", "--length", help="Mean residues per sequence", type=int, default=350)
+    parser.add_argument("-b", "--batch-size", help="Sequences per batch", type=int, default=2000)
+    parser.add_argument("--full", help="Also run the full preparation, writing every sequence directory", action="store_true")
+    parser.add_argument("--seed", help="Random seed", type=int, default=0)
+    return parser.parse_args()
+
+def write_synthetic_fasta(path: str, sequences: int, length: int, seed: int) -> None:
+    """Writes random UniProt-like protein records, wrapped at 60 columns."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(sequences):
+            sequence = "".join(rng.choices(AMINO_ACIDS, k=max(10, int(rng.expovariate(1 / length)))))
+            f.write(f">sp|Q{i:08d}|SYN{i}_HUMAN Synthetic protein {i}\n")
+            for start in range(0, len(sequence), 60):
+                f.write(sequence[start:start + 60] + "\n")
+
+def two_pass_seqio(fasta: str, batch_size: int, output_dir: str) -> None:
+    """Previous implementation: one SeqIO pass for the batch map, another for the FASTA files."""
+    all_sequences, current_batch = {}, []
+    for record in seqrecord_yielder(fasta):
+        current_batch.append(record.id)
+        if len(current_batch) >= batch_size:
+            all_sequences[f"batch_{len(all_sequences) + 1}"] = current_batch
+            current_batch = []
+    if current_batch:
+        all_sequences[f"batch_{len(all_sequences) + 1}"] = current_batch
+    with open(os.path.join(output_dir, "all_sequences.json"), "w", encoding="utf-8") as f:
+        json.dump(all_sequences, f, indent=4)
+    make_dirs_and_write_fasta(seqrecord_yielder(fasta), output_dir)
+
+def timed(function, *args) -> float:
+    """Runs function(*args) and returns the elapsed seconds."""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    """Runs both preparation paths and reports timings"""
+    args = parse_arguments()
+    logger = logging.getLogger("benchmark_seq_and_batch_prep")
+    logger.addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fasta = os.path.join(tmp_dir, "input.fasta")
+        write_synthetic_fasta(fasta, args.sequences, args.length, args.seed)
+        print(f"sequences: {args.sequences}, file size: {os.path.getsize(fasta) / 1024 ** 2:.1f} MiB")
+
+        seqio_time = timed(lambda: sum(1 for _ in SeqIO.parse(fasta, "fasta")))
+        reader_time = timed(lambda: sum(1 for _ in read_fasta_records(fasta)))
+        print(f"reading, Bio.SeqIO.parse: {seqio_time:.2f} s")
+        print(f"reading, utils.read_fasta_records: {reader_time:.2f} s ({seqio_time / reader_time:.1f}x)")
+
+        if args.full:
+            old_dir, new_dir = os.path.join(tmp_dir, "old"), os.path.join(tmp_dir, "new")
+            os.makedirs(old_dir)
+            os.makedirs(new_dir)
+            old_time = timed(two_pass_seqio, fasta, args.batch_size, old_dir)
+            new_time = timed(
+                lambda: prepare_sequences_and_batches(iter_prepared_records(fasta), args.batch_size, new_dir, logger)
+            )
+            with open(os.path.join(old_dir, "all_sequences.json"), encoding="utf-8") as f1, \
+                 open(os.path.join(new_dir, "all_sequences.json"), encoding="utf-8") as f2:
+                same_batches = json.load(f1) == json.load(f2)
+            print(f"full preparation, two-pass SeqIO: {old_time:.2f} s")
+            print(f"full preparation, single pass: {new_time:.2f} s ({old_time / new_time:.1f}x)")
+            print(f"identical batch map: {same_batches}")
+
+if __name__ == "__main__":
+    main()
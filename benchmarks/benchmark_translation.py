@@ -0,0 +1,89 @@
+"""
+benchmark_translation.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Compares the per-record translation path (utils.seqrecord_yielder with is_nucleotide,
+one TextSequence at a time) against the chunked bulk path (utils.translate_fasta)
+on a synthetic nucleotide FASTA, and checks both produce the same proteins.
+
+Usage:
+    python benchmarks/benchmark_translation.py -s 20000 -len 900 -t 4
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import seqrecord_yielder, translate_fasta, read_fasta_records
+
+def parse_arguments():
+    """Parse command-line arguments for the translation benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks per-record vs bulk nucleotide translation")
+    parser.add_argument("-s", "--sequences", help="Number of synthetic sequences", type=int, default=20000)
+    parser.add_argument("-len", "--length", help="Nucleotides per sequence (rounded to codons)", type=int, default=900)
+    parser.add_argument("-t", "--threads", help="Workers for the bulk path", type=int, default=1)
+    parser.add_argument("-cs", "--chunk-size", help="Sequences per chunk for the bulk path", type=int, default=5000)
+    parser.add_argument("--seed", help="Random seed", type=int, default=0)
+    return parser.parse_args()
+
+def write_synthetic_fasta(path: str, sequences: int, length: int, seed: int) -> None:
+    """Writes random coding sequences (no stop codons in frame) to a FASTA file."""
+    rng = random.Random(seed)
+    codons = [a + b + c for a in "ACGT" for b in "ACGT" for c in "ACGT"]
+    codons = [codon for codon in codons if codon not in ("TAA", "TAG", "TGA")]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(sequences):
+            f.write(f">seq{i} synthetic\n")
+            f.write("".join(rng.choice(codons) for _ in range(length // 3)) + "\n")
+
+def main():
+    """Runs both translation paths and reports timings"""
+    args = parse_arguments()
+    logger = logging.getLogger("benchmark_translation")
+    logger.addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fasta = os.path.join(tmp_dir, "input.fasta")
+        write_synthetic_fasta(fasta, args.sequences, args.length, args.seed)
+
+        start = time.perf_counter()
+        per_record = [str(record.seq) for record in seqrecord_yielder(fasta, True, logger)]
+        per_record_time = time.perf_counter() - start
+
+        output_fasta = os.path.join(tmp_dir, "translated.fasta")
+        start = time.perf_counter()
+        translate_fasta(fasta, output_fasta, logger, args.threads, args.chunk_size)
+        bulk_time = time.perf_counter() - start
+
+        bulk = [sequence for _, sequence in read_fasta_records(output_fasta)]
+
+    print(f"sequences: {args.sequences}, nucleotides each: {args.length - args.length % 3}")
+    print(f"per-record translation: {per_record_time:.2f} s")
+    print(f"bulk translation (threads={args.threads}, chunk={args.chunk_size}): {bulk_time:.2f} s")
+    print(f"speedup: {per_record_time / bulk_time:.1f}x")
+    print(f"identical output: {per_record == bulk}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+interproscan_standin.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+Stand-in for interproscan.sh, for benchmarking and testing the orchestration around
+InterProScan (batching, concurrency, caching, bisection and output splitting) on machines
+without an InterProScan install. Pass its path as iprscan_path (run_iprscan.py -iPr).
+
+It accepts the flags run_iprscan.run_interproscan passes (-i, -b, -f, -appl, --cpu, -dp,
+-dra, -etra, -goterms, -iprlookup) and --version, and writes <base>.<format> for the
+requested formats (TSV, XML, JSON, GFF3). Matches are drawn from a small table of real
+Pfam families with their InterPro entries and GO terms, seeded by each sequence's MD5,
+so the same sequence always gets the same matches.
+
+Costs and failures are set with environment variables, inherited through run_iprscan.py:
+    IPRSCAN_STANDIN_STARTUP_SECONDS: fixed time per run, like JVM and data loading (default 0)
+    IPRSCAN_STANDIN_SECONDS_PER_RESIDUE: scan time per residue, divided by --cpu (default 0)
+    IPRSCAN_STANDIN_MEMORY_MB: memory held during the run (default 0)
+    IPRSCAN_STANDIN_MEMORY_KB_PER_RESIDUE: memory held per residue of the batch (default 0)
+    IPRSCAN_STANDIN_MATCH_RATE: fraction of sequences with matches (default 0.7)
+    IPRSCAN_STANDIN_FAIL_PATTERN: regex, the run fails if any sequence ID or sequence matches it
+    IPRSCAN_STANDIN_FAIL_RATE: probability of a run failing at random (default 0)
+    IPRSCAN_STANDIN_VERSION: version reported by --version and in outputs (default 5.72-103.0)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+from xml.sax.saxutils import escape, quoteattr
+
+# (Pfam accession, Pfam name, InterPro accession, InterPro description, GO terms)
+SIGNATURES = [
+    ("PF00069", "Protein kinase domain", "IPR000719", "Protein kinase domain",
+     ["GO:0004672", "GO:0005524", "GO:0006468"]),
+    ("PF00071", "Ras family", "IPR001806", "Small GTPase", ["GO:0003924", "GO:0005525"]),
+    ("PF00076", "RNA recognition motif", "IPR000504", "RNA recognition motif domain", ["GO:0003676"]),
+    ("PF00096", "Zinc finger, C2H2 type", "IPR013087", "Zinc finger C2H2-type", []),
+    ("PF00028", "Cadherin domain", "IPR002126", "Cadherin-like", ["GO:0005509", "GO:0007156", "GO:0016020"]),
+    ("PF00001", "7 transmembrane receptor (rhodopsin family)", "IPR000276", "G protein-coupled receptor, rhodopsin-like",
+     ["GO:0004930", "GO:0007186", "GO:0016020"]),
+    ("PF00089", "Trypsin", "IPR001254", "Serine proteases, trypsin domain", ["GO:0004252", "GO:0006508"]),
+    ("PF00400", "WD domain, G-beta repeat", "IPR001680", "WD40 repeat", ["GO:0005515"]),
+    ("PF07728", "AAA domain (dynein-related subfamily)", "IPR011704", "ATPase, dynein-related, AAA domain",
+     ["GO:0005524", "GO:0016887"]),
+]
+
+ANALYSIS_NAMES = {
+    "pfam": "Pfam", "panther": "PANTHER", "gene3d": "Gene3D", "smart": "SMART",
+    "superfamily": "SUPERFAMILY", "cdd": "CDD", "prosite": "ProSiteProfiles",
+}
+
+XML_NAMESPACE = "https://ftp.ebi.ac.uk/pub/software/unix/iprscan/5/schemas"
+
+def parse_arguments():
+    """Parse the interproscan.sh flags used by run_iprscan.py"""
+    parser = argparse.ArgumentParser(description="InterProScan stand-in for orchestration benchmarks", allow_abbrev=False)
+    parser.add_argument("-i", "--input", help="Input protein FASTA")
+    parser.add_argument("-b", "--output-file-base", help="Base path of output files")
+    # run_iprscan.py passes "-f tsv, xml", which the shell splits into several words
+    parser.add_argument("-f", "--formats", nargs="+", default=["tsv,xml,json,gff3"], help="Output formats")
+    parser.add_argument("-appl", "--applications", default="", help="Comma-separated analyses")
+    parser.add_argument("-cpu", "--cpu", type=int, default=1, help="CPU cores")
+    parser.add_argument("-dp", "--disable-precalc", action="store_true")
+    parser.add_argument("-dra", "--disable-residue-annot", action="store_true")
+    parser.add_argument("-etra", "--enable-tsv-residue-annot", action="store_true")
+    parser.add_argument("-goterms", "--goterms", action="store_true")
+    parser.add_argument("-iprlookup", "--iprlookup", action="store_true")
+    parser.add_argument("-version", "--version", action="store_true")
+    args = parser.parse_args()
+    if not args.version and not (args.input and args.output_file_base):
+        parser.error("-i and -b are required")
+    return args
+
+def read_fasta(fasta_path: str) -> list[tuple[str, str]]:
+    """Reads (ID, sequence) records, the ID being the first word of each header."""
+    records = []
+    with open(fasta_path, "r", encoding="utf-8") as f:
+        for block in f.read().split(">")[1:]:
+            header, _, sequence = block.partition("\n")
+            records.append((header.split(maxsplit=1)[0] if header.strip() else "", "".join(sequence.split()).upper()))
+    return records
+
+def make_matches(sequence: str, analyses: list[str], match_rate: float) -> list[dict]:
+    """Draws matches for a sequence, the same ones every time it's scanned."""
+    md5 = hashlib.md5(sequence.encode()).hexdigest()
+    rng = random.Random(md5)
+    if len(sequence) < 30 or rng.random() >= match_rate:
+        return []
+    matches = []
+    n_domains = rng.randint(1, min(3, len(sequence) // 30))
+    span = len(sequence) // n_domains
+    for domain in range(n_domains):
+        accession, name, ipr, ipr_description, go_terms = rng.choice(SIGNATURES)
+        start = domain * span + rng.randint(1, max(1, span // 4))
+        stop = min(len(sequence), start + rng.randint(max(10, span // 2), max(10, span - 1)))
+        for analysis in analyses:
+            if analysis == "pfam":
+                signature, description = accession, name
+            else:
+                # Other member databases get an accession of their own for the same entry
+                signature, description = f"{ANALYSIS_NAMES.get(analysis, analysis)}:{ipr[3:]}", ipr_description
+            matches.append({
+                "analysis": ANALYSIS_NAMES.get(analysis, analysis), "signature": signature,
+                "description": description, "start": start, "stop": stop,
+                "evalue": f"{10 ** -rng.uniform(5, 60):.1E}", "ipr": ipr,
+                "ipr_description": ipr_description, "go_terms": go_terms,
+            })
+    return matches
+
+def write_tsv(path: str, results: list[tuple], goterms: bool, iprlookup: bool) -> None:
+    date = time.strftime("%d-%m-%Y")
+    with open(path, "w", encoding="utf-8") as f:
+        for seq_id, sequence, md5, matches in results:
+            for match in matches:
+                go_column = "|".join(f"{go_term}(InterPro)" for go_term in match["go_terms"]) or "-"
+                f.write("\t".join([
+                    seq_id, md5, str(len(sequence)), match["analysis"], match["signature"],
+                    match["description"], str(match["start"]), str(match["stop"]), match["evalue"],
+                    "T", date, match["ipr"] if iprlookup else "-",
+                    match["ipr_description"] if iprlookup else "-", go_column if goterms else "-", "-",
+                ]) + "\n")
+
+def write_json(path: str, results: list[tuple], version: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"interproscan-version": version, "results": [
+            {
+                "sequence": sequence, "md5": md5,
+                "matches": [{
+                    "signature": {
+                        "accession": match["signature"], "description": match["description"],
+                        "signatureLibraryRelease": {"library": match["analysis"].upper()},
+                        "entry": {
+                            "accession": match["ipr"], "description": match["ipr_description"],
+                            "goXRefs": [{"id": go_term, "databaseName": "GO"} for go_term in match["go_terms"]],
+                        },
+                    },
+                    "locations": [{"start": match["start"], "end": match["stop"], "evalue": float(match["evalue"])}],
+                } for match in matches],
+                "xref": [{"name": seq_id, "id": seq_id}],
+            }
+            for seq_id, sequence, md5, matches in results
+        ]}, f)
+
+def write_xml(path: str, results: list[tuple], version: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<protein-matches xmlns="{XML_NAMESPACE}" interproscan-version={quoteattr(version)}>\n')
+        for seq_id, sequence, md5, matches in results:
+            f.write(f'<protein><sequence md5="{md5}">{sequence}</sequence><xref id={quoteattr(seq_id)}/><matches>')
+            for match in matches:
+                go_xrefs = "".join(f'<go-xref db="GO" id="{go_term}"/>' for go_term in match["go_terms"])
+                f.write(
+                    f'<hmmer3-match evalue="{match["evalue"]}">'
+                    f'<signature ac="{match["signature"]}" desc={quoteattr(match["description"])}>'
+                    f'<entry ac="{match["ipr"]}" desc={quoteattr(match["ipr_description"])}>{go_xrefs}</entry>'
+                    f'<signature-library-release library="{escape(match["analysis"].upper())}"/></signature>'
+                    f'<locations><hmmer3-location start="{match["start"]}" end="{match["stop"]}"/></locations>'
+                    f'</hmmer3-match>'
+                )
+            f.write("</matches></protein>\n")
+        f.write("</protein-matches>\n")
+
+def write_gff3(path: str, results: list[tuple], version: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"##gff-version 3\n##interproscan-version {version}\n")
+        for seq_id, sequence, md5, matches in results:
+            f.write(f"##sequence-region {seq_id} 1 {len(sequence)}\n")
+            f.write(f"{seq_id}\t.\tpolypeptide\t1\t{len(sequence)}\t.\t+\t.\tID={seq_id};md5={md5}\n")
+            for match in matches:
+                ontology = ",".join(f'"{go_term}"' for go_term in match["go_terms"])
+                f.write(
+                    f"{seq_id}\t{match['analysis']}\tprotein_match\t{match['start']}\t{match['stop']}\t"
+                    f"{match['evalue']}\t+\t.\tName={match['signature']};Target={seq_id} {match['start']} "
+                    f"{match['stop']};Dbxref=\"InterPro:{match['ipr']}\""
+                    + (f";Ontology_term={ontology}" if ontology else "") + "\n"
+                )
+        f.write("##FASTA\n")
+        for seq_id, sequence, _, _ in results:
+            f.write(f">{seq_id}\n{sequence}\n")
+
+WRITERS = {
+    "tsv": lambda path, results, version, args: write_tsv(path, results, args.goterms, args.iprlookup),
+    "json": lambda path, results, version, args: write_json(path, results, version),
+    "xml": lambda path, results, version, args: write_xml(path, results, version),
+    "gff3": lambda path, results, version, args: write_gff3(path, results, version),
+}
+
+def main():
+    """Scans the input FASTA with the configured costs and writes the requested outputs"""
+    args = parse_arguments()
+    version = os.environ.get("IPRSCAN_STANDIN_VERSION", "5.72-103.0")
+    if args.version:
+        print(f"InterProScan version {version}\nInterProScan stand-in, no analyses are run")
+        return
+
+    records = read_fasta(args.input)
+    residues = sum(len(sequence) for _, sequence in records)
+
+    fail_pattern = os.environ.get("IPRSCAN_STANDIN_FAIL_PATTERN", "")
+    if fail_pattern:
+        pattern = re.compile(fail_pattern)
+        failing = [seq_id for seq_id, sequence in records if pattern.search(seq_id) or pattern.search(sequence)]
+        if failing:
+            sys.exit(f"Error: analysis failed for {len(failing)} sequences, e.g. {failing[0]}")
+    if random.random() < float(os.environ.get("IPRSCAN_STANDIN_FAIL_RATE", "0")):
+        sys.exit("Error: random failure injected by IPRSCAN_STANDIN_FAIL_RATE")
+
+    # Held until outputs are written; filled so the pages count towards RSS
+    memory_bytes = int(float(os.environ.get("IPRSCAN_STANDIN_MEMORY_MB", "0")) * 1024 ** 2
+                       + float(os.environ.get("IPRSCAN_STANDIN_MEMORY_KB_PER_RESIDUE", "0")) * 1024 * residues)
+    footprint = b"\x01" * memory_bytes
+
+    time.sleep(
+        float(os.environ.get("IPRSCAN_STANDIN_STARTUP_SECONDS", "0"))
+        + float(os.environ.get("IPRSCAN_STANDIN_SECONDS_PER_RESIDUE", "0")) * residues / max(1, args.cpu)
+    )
+
+    analyses = [analysis.strip().lower() for analysis in args.applications.split(",") if analysis.strip()] or ["pfam"]
+    match_rate = float(os.environ.get("IPRSCAN_STANDIN_MATCH_RATE", "0.7"))
+    results = [
+        (seq_id, sequence, hashlib.md5(sequence.encode()).hexdigest(), make_matches(sequence, analyses, match_rate))
+        for seq_id, sequence in records
+    ]
+    formats = [fmt.strip().lower() for fmt in ",".join(args.formats).split(",") if fmt.strip()]
+    for fmt in formats:
+        if fmt not in WRITERS:
+            sys.exit(f"Error: unsupported output format {fmt}")
+        WRITERS[fmt](f"{args.output_file_base}.{fmt}", results, version, args)
+    del footprint
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+dedup_sequences.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script removes identical protein sequences before the pipeline runs and restores
+their outputs at the end, so that each unique sequence goes through hmmsearch, InterProScan,
+hmmalign and transfer_annotations once, whatever the number of IDs it appears under.
+
+It has two modes:
+
+1 - collapse - Streams the input FASTA, keying sequences by their MD5 digest (case-insensitive).
+The first ID of each digest is its representative and is written to the unique FASTA,
+while duplicates.json maps every representative to its duplicate IDs and reports
+the total and unique sequence counts and the dedup ratio (total / unique).
+
+2 - fanout - After the pipeline, links each duplicate's sequence directory to its
+representative's directory (a relative symlink, not a copy). Files inside the directory
+keep the representative's ID; duplicates.json is the index from one to the other.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import logging
+from utils import get_logger, read_fasta_records, write_fasta_record
+
+def parse_arguments():
+    """Parse command-line arguments for collapsing duplicate sequences and fanning out their outputs.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description=
+    "Collapses identical sequences before the pipeline and links their outputs afterwards.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    collapse_parser = subparsers.add_parser("collapse")
+    collapse_parser.add_argument("-iF", "--fasta", help="Path to input protein FASTA file", required=True, type=str)
+    collapse_parser.add_argument("-o", "--output-fasta", help="Path to FASTA with unique sequences", required=True, type=str)
+    collapse_parser.add_argument("-d", "--duplicates-json", help="Path to duplicates JSON", required=True, type=str)
+
+    fanout_parser = subparsers.add_parser("fanout")
+    fanout_parser.add_argument("-d", "--duplicates-json", help="Path to duplicates JSON", required=True, type=str)
+    fanout_parser.add_argument("-o", "--output-dir", help="Output directory with per-sequence directories", required=True, type=str)
+
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/dedup_sequences.log")
+    return parser.parse_args()
+
+def collapse_duplicates(fasta: str, output_fasta: str, duplicates_json: str, logger: logging.Logger) -> dict:
+    """Writes the unique sequences of a FASTA and the duplicates index.
+
+    Args:
+        fasta: Path to the input protein FASTA
+        output_fasta: Path to the FASTA with one record per unique sequence
+        duplicates_json: Path to the duplicates JSON
+        logger: Logger instance for tracking execution
+
+    Returns:
+        dict: Content of duplicates JSON, {"duplicates": {rep_id: [dup_ids]}, "stats": {...}}
+    """
+    representatives = {}
+    duplicates = {}
+    total_sequences = 0
+    with open(output_fasta, "w", encoding="utf-8") as out_file:
+        for header, sequence in read_fasta_records(fasta):
+            total_sequences += 1
+            seq_id = header.split(maxsplit=1)[0]
+            digest = hashlib.md5(sequence.upper().encode("utf-8")).digest()
+            representative = representatives.get(digest)
+            if representative is None:
+                representatives[digest] = seq_id
+                write_fasta_record(out_file, header, sequence)
+            elif seq_id != representative:
+                duplicates.setdefault(representative, []).append(seq_id)
+
+    unique_sequences = len(representatives)
+    content = {
+        "duplicates": duplicates,
+        "stats": {
+            "total_sequences": total_sequences,
+            "unique_sequences": unique_sequences,
+            "duplicate_ids": total_sequences - unique_sequences,
+            "dedup_ratio": round(total_sequences / unique_sequences, 4) if unique_sequences else 1.0,
+        },
+    }
+    with open(duplicates_json, "w", encoding="utf-8") as f:
+        json.dump(content, f, indent=4)
+    logger.info(
+        "DEDUP_SEQUENCES --- COLLAPSE --- %d sequences, %d unique (dedup ratio %.2f)",
+        total_sequences, unique_sequences, content["stats"]["dedup_ratio"]
+    )
+    return content
+
+def fan_out_duplicates(duplicates_json: str, output_dir: str, logger: logging.Logger) -> int:
+    """Links every duplicate ID's sequence directory to its representative's directory.
+
+    Args:
+        duplicates_json: Path to the duplicates JSON written by collapse_duplicates
+        output_dir: Output directory with per-sequence directories
+        logger: Logger instance for tracking execution
+
+    Returns:
+        int: Number of links created
+    """
+    with open(duplicates_json, "r", encoding="utf-8") as f:
+        duplicates = json.load(f)["duplicates"]
+
+    links = 0
+    for representative, duplicate_ids in duplicates.items():
+        representative_dirname = representative.replace("|", "-")
+        if not os.path.isdir(os.path.join(output_dir, representative_dirname)):
+            logger.warning("DEDUP_SEQUENCES --- FANOUT --- No output directory for representative %s", representative)
+            continue
+        for duplicate_id in duplicate_ids:
+            duplicate_dir = os.path.join(output_dir, duplicate_id.replace("|", "-"))
+            if os.path.lexists(duplicate_dir):
+                continue
+            os.symlink(representative_dirname, duplicate_dir, target_is_directory=True)
+            links += 1
+    logger.info("DEDUP_SEQUENCES --- FANOUT --- Linked %d duplicate sequence directories", links)
+    return links
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("DEDUP_SEQUENCES --- MAIN --- Running with arguments: %s", args)
+    try:
+        if args.mode == "collapse":
+            collapse_duplicates(args.fasta, args.output_fasta, args.duplicates_json, logger)
+        else:
+            fan_out_duplicates(args.duplicates_json, args.output_dir, logger)
+    except (IOError, ValueError) as e:
+        logger.error("DEDUP_SEQUENCES --- MAIN --- %s", e)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
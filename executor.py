@@ -30,9 +30,15 @@ import psutil
 import subprocess
 import argparse
 import sys
+import time
 import logging
 from configparser import ConfigParser
 from joblib import Parallel, delayed
+from hits_table import open_hits_table, HITS_TABLE_DIRNAME
+from iprscan_controller import IprscanController, run_adaptive, MEMORY_PER_CORE_GB, SYSTEM_RESERVE_GB
+from merge_reports_in_sequences import merge_domain_chunk_reports
+from prepare_fasta_per_domain import can_run_hmmalign
+from resource_manifest import load_resource_manifest
 from utils import get_logger
 
 def load_config(config_file=None):
@@ -63,22 +69,60 @@ def load_config(config_file=None):
             fallback=1),
             "seq_batch_size_iprscan": config.getint("Parameters", "seq_batch_size_iprscan",
             fallback=2000),
+            "batch_mode_iprscan": config.get("Parameters", "batch_mode_iprscan",
+            fallback="sequences"),
+            "batch_residues_iprscan": config.getint("Parameters", "batch_residues_iprscan",
+            fallback=1000000),
+            "max_batch_length_iprscan": config.getint("Parameters", "max_batch_length_iprscan",
+            fallback=None),
             "analyses_iprscan": config.get("Parameters", "analyses_iprscan",
             fallback=""),
             "enable_precalc_iprscan": config.getboolean("Parameters", "enable_precalc_iprscan",
             fallback=False),
             "disable_res_iprscan": config.getboolean("Parameters", "disable_res_iprscan",
             fallback=False),
+            "hit_sequences_only_iprscan": config.getboolean("Parameters", "hit_sequences_only_iprscan",
+            fallback=False),
+            "cache_iprscan": config.get("Parameters", "cache_iprscan",
+            fallback=""),
+            "version_iprscan": config.get("Parameters", "version_iprscan",
+            fallback=""),
+            "no_split_tsv_iprscan": config.getboolean("Parameters", "no_split_tsv_iprscan",
+            fallback=False),
+            "adaptive_iprscan": config.getboolean("Parameters", "adaptive_iprscan",
+            fallback=False),
+            "target_batch_minutes_iprscan": config.getfloat("Parameters", "target_batch_minutes_iprscan",
+            fallback=30.0),
+            "max_quarantine_iprscan": config.getint("Parameters", "max_quarantine_iprscan",
+            fallback=10),
             "threads": config.getint("Parameters", "threads",
             fallback=2),
             "total_memory": config.getint("Parameters", "total_memory",
             fallback=None),
             "nucleotide": config.getboolean("Parameters", "nucleotide",
             fallback=False),
+            "dedup_sequences": config.getboolean("Parameters", "dedup_sequences",
+            fallback=False),
             "bit_cutoffs": config.get("Parameters", "bit_cutoffs",
             fallback="gathering"),
+            "hmmsearch_shards": config.getint("Parameters", "hmmsearch_shards",
+            fallback=1),
+            "hmmsearch_shard_by": config.get("Parameters", "hmmsearch_shard_by",
+            fallback="sequences"),
+            "hmmsearch_cache": config.get("Parameters", "hmmsearch_cache",
+            fallback=""),
             "trim": config.getboolean("Parameters", "trim",
             fallback=False),
+            "alignment_source": config.get("Parameters", "alignment_source",
+            fallback="hmmalign"),
+            "hmmalign_backend": config.get("Parameters", "hmmalign_backend",
+            fallback="binary"),
+            "hmmalign_chunk_size": config.getint("Parameters", "hmmalign_chunk_size",
+            fallback=0),
+            "alignment_cache": config.get("Parameters", "alignment_cache",
+            fallback=""),
+            "go_source": config.get("Parameters", "go_source",
+            fallback="iprscan"),
             "eco_codes": config.get("Parameters", "eco_codes",
             fallback="").split(),
         }
@@ -111,6 +155,17 @@ def parse_arguments():
     parser.add_argument("-iBs", "--seq-batch-size-iprscan",
                         type=int, help="Number of sequences per batch in InterProScan",
                         required=False, default=2000)
+    parser.add_argument("-iBm", "--batch-mode-iprscan", type=str,
+                        help="How to batch sequences for InterProScan. Options: 'sequences' (count only) \
+                        or 'residues' (also balance batches by total residues)",
+                        required=False, default="sequences")
+    parser.add_argument("-iBr", "--batch-residues-iprscan", type=int,
+                        help="Maximum total residues per InterProScan batch in residues mode",
+                        required=False, default=1000000)
+    parser.add_argument("-iBl", "--max-batch-length-iprscan", type=int,
+                        help="Optional: in residues mode, sequences longer than this \
+                        run in InterProScan batches of their own",
+                        required=False, default=None)
     parser.add_argument("-iA", "--analyses-iprscan",
                         help="Optional: Comma-separated analyses to limit InterProScan run. \
                         If you just want what's used in the pipeline (GO terms), pass the string: \
@@ -126,6 +181,34 @@ def parse_arguments():
                         help="Flag to disable residue-level annotations in InterProScan outputs, \
                         may increase performance, but possible miss some cross-match annotations.",
                         required=False)
+    parser.add_argument("-iHo", "--hit-sequences-only-iprscan",
+                        action="store_true",
+                        help="Flag to run InterProScan only on sequences with hmmsearch hits \
+                        to domains with resources, the only ones whose GO terms are used in transfer",
+                        required=False)
+    parser.add_argument("-iCa", "--cache-iprscan", type=str,
+                        help="Optional: SQLite cache of InterProScan matches per sequence MD5, \
+                        shared between runs. Only sequences missing from it are scanned",
+                        required=False, default="")
+    parser.add_argument("-iV", "--version-iprscan", type=str,
+                        help="Optional: InterProScan version used in cache keys, \
+                        read from interproscan.sh --version if not given",
+                        required=False, default="")
+    parser.add_argument("-iNs", "--no-split-tsv-iprscan", action="store_true",
+                        help="Flag to keep InterProScan TSV matches only in the proteome-wide \
+                        match index (iprscan_matches.sqlite), without an iprscan.tsv per sequence",
+                        required=False)
+    parser.add_argument("-iAd", "--adaptive-iprscan", action="store_true",
+                        help="Flag to adapt InterProScan batch size and concurrent batches to the \
+                        throughput, memory and CPU of finished batches (see iprscan_controller.py)",
+                        required=False)
+    parser.add_argument("-iTm", "--target-batch-minutes-iprscan", type=float,
+                        help="Adaptive mode: target duration of an InterProScan batch in minutes",
+                        required=False, default=30.0)
+    parser.add_argument("-iMq", "--max-quarantine-iprscan", type=int,
+                        help="Maximum sequences quarantined per failed InterProScan batch while bisecting it \
+                        (0 disables bisection, failing the batch)",
+                        required=False, default=10)
     parser.add_argument("-t", "--threads", type=int, help="Number of threads",
                         required=False, default=2)
     parser.add_argument("-m", "--total_memory", type=int,
@@ -134,13 +217,51 @@ def parse_arguments():
     parser.add_argument("-n", "--nucleotide", action="store_true",
                         help="Flag for nucleotide sequences",
                         required=False)
+    parser.add_argument("-dS", "--dedup-sequences", action="store_true",
+                        help="Flag to process identical sequences once, linking the outputs \
+                        of their other IDs at the end (see dedup_sequences.py)",
+                        required=False)
     parser.add_argument("-bc", "--bit-cutoffs", type=str,
                         help="Bit score cutoffs for PyHMMER's hmmsearch. \
                         Options: 'noise', 'gathering', 'trusted'",
                         required=False, default="gathering")
+    parser.add_argument("-hS", "--hmmsearch-shards", type=int,
+                        help="Number of hmmsearch shards to run in parallel, \
+                        merged afterwards by merge_hmmsearch_shards.py",
+                        required=False, default=1)
+    parser.add_argument("-hSb", "--hmmsearch-shard-by", type=str,
+                        help="What to split between hmmsearch shards. \
+                        Options: 'sequences', 'profiles'",
+                        required=False, default="sequences")
+    parser.add_argument("-hC", "--hmmsearch-cache", type=str,
+                        help="Optional: SQLite cache of hmmsearch hits per sequence, \
+                        shared between runs against the same HMM database",
+                        required=False, default="")
     parser.add_argument("--trim", action="store_true",
                         help="Flag to enable trimming in hmmalign",
                         required=False)
+    parser.add_argument("-aS", "--alignment-source", type=str,
+                        help="Alignment used to transfer annotations. Options: 'hmmalign' \
+                        (default, seed-mapped hmmalign run) or 'hmmsearch' (HMM states of the \
+                        hmmsearch alignments, skipping run_hmmalign.py)",
+                        required=False, default="hmmalign")
+    parser.add_argument("-hB", "--hmmalign-backend", type=str,
+                        help="How run_hmmalign.py aligns. Options: 'binary' (default, the \
+                        hmmalign binary on PATH) or 'pyhmmer' (in-process, no HMMER binary needed)",
+                        required=False, default="binary")
+    parser.add_argument("-hCs", "--hmmalign-chunk-size", type=int,
+                        help="Split domains with more hits than this into chunks aligned \
+                        and transferred in parallel. 0 (default) aligns every domain whole",
+                        required=False, default=0)
+    parser.add_argument("-aC", "--alignment-cache", type=str,
+                        help="Optional: SQLite cache of aligned hit subsequences, shared \
+                        between runs against the same HMMs and seeds",
+                        required=False, default="")
+    parser.add_argument("-gS", "--go-source", type=str,
+                        help="Source of target GO terms. Options: 'iprscan' (default, InterProScan GO \
+                        annotations) or 'mappings' (Pfam hits through pfam2go/interpro2go in \
+                        resource_dir/mappings, skipping run_iprscan.py)",
+                        required=False, default="iprscan")
     parser.add_argument("-e", "--eco-codes", nargs="*",
                         help="Space-separated ECO codes",
                         required=False, default="")
@@ -173,8 +294,25 @@ def parse_arguments():
         if not isinstance(config["bit_cutoffs"], str) or config["bit_cutoffs"] not in valid_cutoffs:
             parser.error(f"Invalid bit_cutoffs value: '{config['bit_cutoffs']}'. Must be one of: {', '.join(valid_cutoffs)}")
 
-    # Validate required parameters
-    required = ["fasta", "hmm", "iprscan_path", "resource_dir", "output_dir"]
+    if config.get("hmmsearch_shard_by", "sequences") not in ["sequences", "profiles"]:
+        parser.error(f"Invalid hmmsearch_shard_by value: '{config['hmmsearch_shard_by']}'. Must be one of: sequences, profiles")
+
+    if config.get("batch_mode_iprscan", "sequences") not in ["sequences", "residues"]:
+        parser.error(f"Invalid batch_mode_iprscan value: '{config['batch_mode_iprscan']}'. Must be one of: sequences, residues")
+
+    if config.get("alignment_source", "hmmalign") not in ["hmmalign", "hmmsearch"]:
+        parser.error(f"Invalid alignment_source value: '{config['alignment_source']}'. Must be one of: hmmalign, hmmsearch")
+
+    if config.get("hmmalign_backend", "binary") not in ["binary", "pyhmmer"]:
+        parser.error(f"Invalid hmmalign_backend value: '{config['hmmalign_backend']}'. Must be one of: binary, pyhmmer")
+
+    if config.get("go_source", "iprscan") not in ["iprscan", "mappings"]:
+        parser.error(f"Invalid go_source value: '{config['go_source']}'. Must be one of: iprscan, mappings")
+
+    # Validate required parameters, InterProScan isn't run with GO terms from mappings
+    required = ["fasta", "hmm", "resource_dir", "output_dir"]
+    if config.get("go_source", "iprscan") == "iprscan":
+        required.insert(2, "iprscan_path")
     missing = [param for param in required if param not in config or not config[param]]
     if missing:
         parser.error(f"Missing required parameters: {', '.join(missing)}")
@@ -213,6 +351,13 @@ def run_command(command: list, logger: logging.Logger):
         logger.error("STDERR:\n%s", e.stderr)
         sys.exit(1)
 
+def is_sequence_dir(output_dir: str, subdir: str) -> bool:
+    """Checks if an output subdirectory holds a sequence's outputs, not a domain's
+    (PF*), InterProScan batches or the hmmsearch hits table."""
+    return (os.path.isdir(os.path.join(output_dir, subdir))
+            and not subdir.startswith("PF")
+            and subdir not in ("batches", HITS_TABLE_DIRNAME))
+
 def get_seqs_and_count(json_file: str) -> tuple[list[str], int]:
     """Get list of all sequences and total count from all_sequences.json file.
 
@@ -227,25 +372,141 @@ def get_seqs_and_count(json_file: str) -> tuple[list[str], int]:
 
     # Flatten all batches into a single list
     all_sequences = []
-    for batch in data.values():
+    for batch in get_sequence_batches(json_file, data):
         all_sequences.extend(batch)
 
     return all_sequences, len(all_sequences)
 
-def create_sequence_batches(sequences: list[str], batch_size: int) -> list[list[str]]:
-    """Create batches of sequences of specified size.
+def get_sequence_batches(json_file: str, data: dict = None) -> list[list[str]]:
+    """Get the sequence batches made by seq_and_batch_prep.py from all_sequences.json,
+    skipping the "batching" statistics entry.
+
+    Args:
+        json_file: Path to all_sequences.json
+        data: Already loaded all_sequences.json content (optional)
+
+    Returns:
+        list[list[str]]: List of sequence batches, in batch order
+    """
+    if data is None:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    return [batch for key, batch in data.items() if key.startswith("batch_") and isinstance(batch, list)]
+
+def select_iprscan_sequences(output_dir: str, resource_dir: str, per_dom_json: str, logger: logging.Logger) -> str:
+    """Writes iprscan_sequences.json with the sequences that hit at least one domain with
+    resources (see prepare_fasta_per_domain.can_run_hmmalign), the only ones for which
+    transfer_annotations.py reads InterProScan GO terms.
 
     Args:
-        sequences: List of sequence IDs
-        batch_size: Number of sequences per batch
+        output_dir: Output directory with the hmmsearch outputs
+        resource_dir: Resource directory with per-domain files
+        per_dom_json: Path to hmmsearch_per_domain.json, used if the hits table is absent
+        logger: Logger instance for output
 
     Returns:
-        list[list[str]]: List of sequence batches
+        str: Path to iprscan_sequences.json
     """
-    return [
-        sequences[i:i + batch_size]
-        for i in range(0, len(sequences), batch_size)
+    hits_table = open_hits_table(output_dir)
+    hits_per_domain = None
+    if hits_table is not None:
+        dom_accessions = hits_table.accessions
+    else:
+        with open(per_dom_json, "r", encoding="utf-8") as f:
+            hits_per_domain = json.load(f)
+        dom_accessions = list(hits_per_domain)
+
+    manifest = load_resource_manifest(resource_dir, logger)
+    usable_domains = [
+        dom_accession for dom_accession in dom_accessions
+        if can_run_hmmalign(dom_accession, resource_dir, output_dir, manifest)["can_align"]
     ]
+    sequences = set()
+    for dom_accession in usable_domains:
+        if hits_table is not None:
+            sequences.update(hits_table.domain_hits(dom_accession))
+        else:
+            sequences.update(hits_per_domain[dom_accession])
+
+    selection_json = os.path.join(output_dir, "iprscan_sequences.json")
+    with open(selection_json, "w", encoding="utf-8") as f:
+        json.dump({"sequences": sorted(sequences), "domains": sorted(usable_domains)}, f, indent=4)
+    logger.info(
+        "EXECUTOR --- SELECT_IPRSCAN_SEQUENCES --- %d sequences hit %d of %d domains with resources",
+        len(sequences), len(usable_domains), len(dom_accessions)
+    )
+    return selection_json
+
+def report_iprscan_savings(
+    all_sequences_json: str, elapsed_seconds: float, cpu_cores_iprscan: int,
+    number_jobs_iprscan: int, output_dir: str, logger: logging.Logger) -> dict:
+    """Reports the sequences left out of InterProScan and estimates the CPU-hours saved,
+    extrapolating the CPU time per residue measured in this run to the excluded residues.
+
+    Args:
+        all_sequences_json: Path to all_sequences.json, with its "batching" statistics
+        elapsed_seconds: Wall time of the InterProScan step
+        cpu_cores_iprscan: CPU cores allocated per InterProScan job
+        number_jobs_iprscan: Number of parallel InterProScan jobs
+        output_dir: Directory where iprscan_savings.json is written
+        logger: Logger instance for output
+
+    Returns:
+        dict: The savings report
+    """
+    with open(all_sequences_json, "r", encoding="utf-8") as f:
+        batching = json.load(f).get("batching", {})
+    batched_residues = batching.get("batched_residues", 0)
+    excluded_residues = batching.get("excluded_residues", 0)
+    parallel_jobs = max(1, min(number_jobs_iprscan, len(batching.get("batches", {})) or 1))
+    cpu_hours = elapsed_seconds * cpu_cores_iprscan * parallel_jobs / 3600
+
+    report = {
+        "scanned_sequences": batching.get("batched_sequences", 0),
+        "scanned_residues": batched_residues,
+        "excluded_sequences": batching.get("excluded_sequences", 0),
+        "excluded_residues": excluded_residues,
+        "allocated_cpu_hours": round(cpu_hours, 3),
+        "estimated_cpu_hours_saved": round(cpu_hours * excluded_residues / batched_residues, 3) if batched_residues else 0.0,
+    }
+    with open(os.path.join(output_dir, "iprscan_savings.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    logger.info(
+        "EXECUTOR --- IPRSCAN_SAVINGS --- Skipped %d sequences (%d residues), an estimated %.2f CPU-hours saved",
+        report["excluded_sequences"], excluded_residues, report["estimated_cpu_hours_saved"]
+    )
+    return report
+
+def collect_iprscan_quarantine(output_dir: str, logger: logging.Logger) -> dict:
+    """Merges the batches/*.quarantine.json files written by run_iprscan.py into iprscan_quarantine.json,
+    listing the sequences left without InterProScan matches after bisecting failed batches.
+
+    Args:
+        output_dir: Output directory of the pipeline
+        logger: Logger instance
+
+    Returns:
+        dict: Contents of iprscan_quarantine.json (empty if no batch failed)
+    """
+    batch_reports = []
+    for quarantine_path in sorted(glob.glob(os.path.join(output_dir, "batches", "*.quarantine.json"))):
+        with open(quarantine_path, "r", encoding="utf-8") as f:
+            batch_reports.append(json.load(f))
+    if not batch_reports:
+        return {}
+    content = {
+        "quarantined": [seq_id for report in batch_reports for seq_id in report["quarantined"]],
+        "rescanned_sequences": sum(report["rescanned_sequences"] for report in batch_reports),
+        "batches": batch_reports,
+    }
+    with open(os.path.join(output_dir, "iprscan_quarantine.json"), "w", encoding="utf-8") as f:
+        json.dump(content, f, indent=4)
+    logger.warning(
+        "EXECUTOR --- IPRSCAN_QUARANTINE --- %d failed batches bisected: %d sequences quarantined without matches, "
+        "%d sequences re-scanned. See iprscan_quarantine.json",
+        len(batch_reports), len(content["quarantined"]), content["rescanned_sequences"]
+    )
+    return content
 
 def validate_iprscan_resources(
     cpu_cores_iprscan: int,
@@ -268,8 +529,8 @@ def validate_iprscan_resources(
         bool: True if resources are sufficient, False otherwise
     """
     # Recommended Constants from InterProScan Docs - Conservative
-    memory_per_core = 0.5  # 8GB/16 cores = 0.5GB/core
-    system_reserve_gb = 2  # Reserve for OS/other processes
+    memory_per_core = MEMORY_PER_CORE_GB  # 8GB/16 cores = 0.5GB/core
+    system_reserve_gb = SYSTEM_RESERVE_GB  # Reserve for OS/other processes
     min_cores = 3  # Minimum cores needed (1 for main process + 2 for worker)
     # Maximum recommended seq batch size, increase at your own risk (+ memory req.)
     max_rec_seq_batch_size = 8000
@@ -327,21 +588,86 @@ def main():
     cpu_cores_iprscan = args.cpu_cores_iprscan
     number_jobs_iprscan = args.number_jobs_iprscan
     seq_batch_size_iprscan = args.seq_batch_size_iprscan
+    batch_mode_iprscan = args.batch_mode_iprscan
+    batch_residues_iprscan = args.batch_residues_iprscan
+    max_batch_length_iprscan = args.max_batch_length_iprscan
     analyses_iprscan = args.analyses_iprscan
     enable_precalc_iprscan = args.enable_precalc_iprscan
     disable_res_iprscan = args.disable_res_iprscan
+    hit_sequences_only_iprscan = args.hit_sequences_only_iprscan
+    cache_iprscan = args.cache_iprscan
+    version_iprscan = args.version_iprscan
+    no_split_tsv_iprscan = args.no_split_tsv_iprscan
+    adaptive_iprscan = args.adaptive_iprscan
+    target_batch_minutes_iprscan = args.target_batch_minutes_iprscan
+    max_quarantine_iprscan = args.max_quarantine_iprscan
     resource_dir = args.resource_dir
     output_dir = args.output_dir
     eco_codes = args.eco_codes
     threads = args.threads
     total_memory = args.total_memory
     nucleotide = args.nucleotide
+    dedup_sequences = args.dedup_sequences
     bit_cutoffs = args.bit_cutoffs
+    hmmsearch_shards = args.hmmsearch_shards
+    hmmsearch_shard_by = args.hmmsearch_shard_by
+    hmmsearch_cache = args.hmmsearch_cache
     trim = args.trim
+    hmmalign_backend = args.hmmalign_backend
+    hmmalign_chunk_size = args.hmmalign_chunk_size
+    alignment_cache = args.alignment_cache
+    alignment_source = args.alignment_source
+    go_source = args.go_source
     python_executable = args.python
     logger, timestamped_log = get_logger(args.log)
     all_sequences_json = os.path.join(output_dir, "all_sequences.json")
 
+    # translate_sequences.py
+    # Nucleotide input is translated once and the protein FASTA used by every later step
+    if nucleotide:
+        translated_fasta = os.path.join(output_dir, "translated_sequences.fasta")
+        if os.path.exists(translated_fasta):
+            logger.info("EXECUTOR --- TRANSLATE_SEQUENCES.PY --- Output already exists %s. Skipping.", translated_fasta)
+        else:
+            run_command([
+                python_executable,
+                "translate_sequences.py",
+                "-iF", input_fasta,
+                "-o", translated_fasta,
+                "-t", str(threads),
+                "-l", timestamped_log,
+            ], logger)
+            logger.info("EXECUTOR --- TRANSLATE_SEQUENCES.PY --- Executed.")
+        input_fasta = translated_fasta
+
+    # dedup_sequences.py collapse
+    # Identical sequences go through the pipeline once, under their first ID
+    duplicates_json = os.path.join(output_dir, "duplicates.json")
+    total_sequences = None
+    if dedup_sequences:
+        unique_fasta = os.path.join(output_dir, "unique_sequences.fasta")
+        if os.path.exists(duplicates_json):
+            logger.info("EXECUTOR --- DEDUP_SEQUENCES.PY --- Output already exists %s. Skipping.", duplicates_json)
+        else:
+            run_command([
+                python_executable,
+                "dedup_sequences.py",
+                "-l", timestamped_log,
+                "collapse",
+                "-iF", input_fasta,
+                "-o", unique_fasta,
+                "-d", duplicates_json,
+            ], logger)
+            logger.info("EXECUTOR --- DEDUP_SEQUENCES.PY --- Collapse executed.")
+        with open(duplicates_json, "r", encoding="utf-8") as f:
+            dedup_stats = json.load(f)["stats"]
+        logger.info(
+            "EXECUTOR --- DEDUP_SEQUENCES.PY --- %d sequences, %d unique, dedup ratio %.2f",
+            dedup_stats["total_sequences"], dedup_stats["unique_sequences"], dedup_stats["dedup_ratio"]
+        )
+        total_sequences = dedup_stats["total_sequences"]
+        input_fasta = unique_fasta
+
     # run_hmmsearch.py
     per_dom_json = os.path.join(output_dir, "hmmsearch_per_domain.json")
     if os.path.exists(per_dom_json):
@@ -355,11 +681,35 @@ def main():
             "-iH", input_hmm,
             "-o", output_dir,
             "-bc", bit_cutoffs,
+            # Shards run side by side, sharing the threads
+            "-t", str(max(1, threads // max(1, hmmsearch_shards))),
             "-l", timestamped_log,
         ]
-        if nucleotide:
-            run_hmmsearch_call.append("-n")
-        run_command(run_hmmsearch_call, logger)
+        if hmmsearch_cache:
+            run_hmmsearch_call.extend(["-c", hmmsearch_cache])
+        if total_sequences is not None:
+            # E-values as if every duplicate had been searched
+            run_hmmsearch_call.extend(["-Z", str(total_sequences)])
+        if hmmsearch_shards > 1:
+            # Shard outputs left by an interrupted or differently sharded run would be merged with this run's
+            for stale_path in glob.glob(os.path.join(output_dir, "hmmsearch_*.shard_*_of_*.json")):
+                os.remove(stale_path)
+            run_hmmsearch_shard_tasks = [
+                run_hmmsearch_call + ["-s", f"{shard_index}/{hmmsearch_shards}", "-sb", hmmsearch_shard_by]
+                for shard_index in range(1, hmmsearch_shards + 1)
+            ]
+            Parallel(n_jobs=threads)(
+                delayed(run_command)(task, logger)
+                for task in run_hmmsearch_shard_tasks
+            )
+            run_command([
+                python_executable,
+                "merge_hmmsearch_shards.py",
+                "-o", output_dir,
+                "-l", timestamped_log,
+            ], logger)
+        else:
+            run_command(run_hmmsearch_call, logger)
         logger.info("EXECUTOR --- RUN_HMMSEARCH.PY --- Executed.")
 
     # seq_and_batch_prep.py
@@ -372,21 +722,22 @@ def main():
             "-iF", input_fasta,
             "-o", output_dir,
             "-b", str(seq_batch_size_iprscan),
+            "-bm", batch_mode_iprscan,
+            "-br", str(batch_residues_iprscan),
             "-l", timestamped_log,
         ]
-        if nucleotide:
-            seq_batch_prep_call.append("-n")
+        if max_batch_length_iprscan:
+            seq_batch_prep_call.extend(["-bL", str(max_batch_length_iprscan)])
+        if hit_sequences_only_iprscan:
+            selection_json = select_iprscan_sequences(output_dir, resource_dir, per_dom_json, logger)
+            seq_batch_prep_call.extend(["-iS", selection_json])
         run_command(seq_batch_prep_call, logger)
         logger.info("EXECUTOR --- SEQ_AND_BATCH_PREP.PY --- Executed.")
 
-    # Count sequences from hmmsearch_sequences.json
-    list_of_sequences, seq_count = get_seqs_and_count(all_sequences_json)
-    sequence_batches = create_sequence_batches(list_of_sequences, seq_batch_size_iprscan)
-
-    if seq_count < seq_batch_size_iprscan:
-        can_run = validate_iprscan_resources(cpu_cores_iprscan, seq_count, logger, total_memory)
-    else:
-        can_run = validate_iprscan_resources(cpu_cores_iprscan, seq_batch_size_iprscan, logger, total_memory)
+    # Batches come from all_sequences.json, as made by seq_and_batch_prep.py (by count or by residues)
+    sequence_batches = get_sequence_batches(all_sequences_json)
+    largest_batch = max((len(batch) for batch in sequence_batches), default=0)
+    can_run = go_source == "mappings" or validate_iprscan_resources(cpu_cores_iprscan, largest_batch, logger, total_memory)
 
     if not can_run:
         logger.warning("EXECUTOR --- VAL_IPRSCAN_RESOURCES --- No resources available for InterProScan. Exiting pipeline.")
@@ -394,13 +745,20 @@ def main():
 
     # run_iprscan.py
     run_iprscan_done = os.path.join(output_dir, "run_iprscan.done")
-    if os.path.exists(run_iprscan_done):
+    if go_source == "mappings":
+        logger.info("EXECUTOR --- RUN_IPRSCAN.PY --- Skipping, GO terms come from pfam2go/interpro2go mappings")
+    elif os.path.exists(run_iprscan_done):
         logger.info("EXECUTOR --- RUN_IPRSCAN.PY --- Skipping, output already exists")
     else:
-        run_iprscan_tasks = []
-        for batch_idx, sequence_batch in enumerate(sequence_batches, 1):
-            batch_seq_str = ",".join(sequence_batch)
-            batch_seq_str = batch_seq_str.replace("|", "-")  # Avoid shell parsing issues with pipes
+        # Kept next to the batch outputs, so later steps don't take them for a sequence's outputs
+        batch_ids_dir = os.path.join(output_dir, "batches")
+        os.makedirs(batch_ids_dir, exist_ok=True)
+
+        def make_iprscan_command(sequence_batch: list[str], batch_idx: int) -> list:
+            # IDs go through a file, as adaptive batches can outgrow the per-argument length limit (128 KiB)
+            batch_ids_file = os.path.join(batch_ids_dir, f"iprscan_batch_{batch_idx}.ids.txt")
+            with open(batch_ids_file, "w", encoding="utf-8") as f:
+                f.write("".join(f"{seq_id.replace('|', '-')}\n" for seq_id in sequence_batch))
 
             # General arguments
             cmd = [
@@ -418,20 +776,50 @@ def main():
                 cmd.append("-iDpc")
             if disable_res_iprscan:
                 cmd.append("-iDr")
+            if cache_iprscan:
+                cmd.extend(["-iC", cache_iprscan])
+            if version_iprscan:
+                cmd.extend(["-iV", version_iprscan])
+            if no_split_tsv_iprscan:
+                cmd.append("-iNs")
+            cmd.extend(["-iMq", str(max_quarantine_iprscan)])
 
             # Mode-specific arguments for 'batch'
             cmd.extend([
                 "batch",
-                "-sB", batch_seq_str,
+                "-sBf", batch_ids_file,
                 "-sBi", str(batch_idx),
                 "-sPd", output_dir,
             ])
-            run_iprscan_tasks.append(cmd)
-
-        Parallel(n_jobs=number_jobs_iprscan)(
-            delayed(run_command)(task, logger)
-            for task in run_iprscan_tasks
-        )
+            return cmd
+
+        iprscan_start = time.perf_counter()
+        if adaptive_iprscan:
+            available_memory = total_memory if total_memory is not None else psutil.virtual_memory().available / (1024**3)
+            controller = IprscanController(
+                memory_budget_gb=max(0, available_memory - SYSTEM_RESERVE_GB),
+                cpu_cores_iprscan=cpu_cores_iprscan,
+                batch_size=largest_batch or seq_batch_size_iprscan,
+                number_jobs=number_jobs_iprscan,
+                target_batch_minutes=target_batch_minutes_iprscan,
+            )
+            batch_records = run_adaptive(
+                [seq_id for sequence_batch in sequence_batches for seq_id in sequence_batch],
+                make_iprscan_command, controller, logger
+            )
+            with open(os.path.join(output_dir, "iprscan_batches.json"), "w", encoding="utf-8") as f:
+                json.dump(batch_records, f, indent=4)
+        else:
+            Parallel(n_jobs=number_jobs_iprscan)(
+                delayed(run_command)(make_iprscan_command(sequence_batch, batch_idx), logger)
+                for batch_idx, sequence_batch in enumerate(sequence_batches, 1)
+            )
+        collect_iprscan_quarantine(output_dir, logger)
+        if hit_sequences_only_iprscan:
+            report_iprscan_savings(
+                all_sequences_json, time.perf_counter() - iprscan_start,
+                cpu_cores_iprscan, number_jobs_iprscan, output_dir, logger
+            )
         with open(run_iprscan_done, "w", encoding="utf-8") as f:
             # Write the names of all sequences in the batch, open each batch *done file to know which sequences should not be in a new batch.
             f.write("")
@@ -442,33 +830,28 @@ def main():
     if os.path.exists(prepare_fasta_done):
         logger.info("EXECUTOR --- PREPARE_FASTA_PER_DOMAIN.PY --- Skipping, output already exists")
     else:
-        with open(per_dom_json, "r", encoding="utf-8") as f:
-            hits_per_domain = json.load(f)
-
-        prepare_fasta_tasks = [
-            [
-                python_executable,
-                "prepare_fasta_per_domain.py",
-                "-iJ", per_dom_json,
-                "-iD", dom_accession,
-                "-r", resource_dir,
-                "-o", output_dir,
-                "-l", timestamped_log
-            ]
-            for dom_accession in hits_per_domain
-        ]
-
-        Parallel(n_jobs=threads)(
-            delayed(run_command)(task, logger)
-            for task in prepare_fasta_tasks
-        )
+        # One pass over the hits table (or the full JSON for older outputs) prepares every domain
+        hits_table_dir = os.path.join(output_dir, HITS_TABLE_DIRNAME)
+        hits_table_args = ["-iT", hits_table_dir] if open_hits_table(output_dir) is not None else []
+        run_command([
+            python_executable,
+            "prepare_fasta_per_domain.py",
+            "-iJ", per_dom_json,
+            "-a",
+            "-r", resource_dir,
+            "-o", output_dir,
+            *hits_table_args,
+            "-l", timestamped_log
+        ], logger)
         with open(prepare_fasta_done, "w", encoding="utf-8") as f:
             f.write("")
         logger.info("EXECUTOR --- PREPARE_FASTA_PER_DOMAIN.PY --- Executed.")
 
     # run_hmmalign.py
     run_hmmalign_done = os.path.join(output_dir, "run_hmmalign.done")
-    if os.path.exists(run_hmmalign_done):
+    if alignment_source == "hmmsearch":
+        logger.info("EXECUTOR --- RUN_HMMALIGN.PY --- Skipping, transferring through hmmsearch HMM states")
+    elif os.path.exists(run_hmmalign_done):
         logger.info("EXECUTOR --- RUN_HMMALIGN.PY --- Skipping, output already exists")
     else:
         run_hmmalign_tasks = []
@@ -482,8 +865,13 @@ def main():
                         "run_hmmalign.py",
                         "-iDI", domain_info,
                         "-d", subdir,
+                        "-b", hmmalign_backend,
                         "-l", timestamped_log
                     ]
+                    if alignment_cache:
+                        task.extend(["-aC", alignment_cache])
+                    if hmmalign_chunk_size > 0:
+                        task.extend(["-cS", str(hmmalign_chunk_size), "-t", str(threads)])
                     if trim:
                         task.append("--trim")
                     run_hmmalign_tasks.append(task)
@@ -501,9 +889,25 @@ def main():
         logger.info("EXECUTOR --- TRANSFER_ANNOTATIONS.PY --- Skipping, output already exists")
     else:
         transfer_annotations_tasks = []
+        hits_table_dir = os.path.join(output_dir, HITS_TABLE_DIRNAME)
+        hmmsearch_states = hits_table_dir if os.path.isdir(hits_table_dir) else per_dom_json
         for subdir in os.listdir(output_dir):
             subdir_path = os.path.join(output_dir, subdir)
             if os.path.isdir(subdir_path) and subdir.startswith("PF"):
+                if alignment_source == "hmmsearch":
+                    if os.path.isfile(os.path.join(subdir_path, "domain_info.json")):
+                        transfer_annotations_tasks.append([
+                            python_executable,
+                            "transfer_annotations.py",
+                            "-iHs", hmmsearch_states,
+                            "-r", resource_dir,
+                            "-d", subdir,
+                            "-o", output_dir,
+                            "-gS", go_source,
+                            "--eco-codes", *eco_codes,
+                            "-l", timestamped_log
+                        ])
+                    continue
                 dom_aligns = [dom_align for dom_align in glob.glob(os.path.join(subdir_path, "PF*_hmmalign.sth")) if os.path.isfile(dom_align)]
                 for dom_align in dom_aligns:
                     transfer_annotations_tasks.append([
@@ -513,6 +917,7 @@ def main():
                         "-r", resource_dir,
                         "-d", subdir,
                         "-o", output_dir,
+                        "-gS", go_source,
                         "--eco-codes", *eco_codes,
                         "-l", timestamped_log
                     ])
@@ -521,6 +926,9 @@ def main():
             delayed(run_command)(task, logger)
             for task in transfer_annotations_tasks
         )
+        for subdir in os.listdir(output_dir):
+            if subdir.startswith("PF") and merge_domain_chunk_reports(os.path.join(output_dir, subdir), subdir):
+                logger.info("EXECUTOR --- TRANSFER_ANNOTATIONS.PY --- Merged chunk reports of %s", subdir)
         with open(transfer_annotations_done, "w", encoding="utf-8") as f:
             f.write("")
         logger.info("EXECUTOR --- TRANSFER_ANNOTATIONS.PY --- Executed.")
@@ -533,7 +941,7 @@ def main():
         merge_reports_in_sequences_tasks = []
         for subdir in os.listdir(output_dir):
             subdir_path = os.path.join(output_dir, subdir)
-            if os.path.isdir(subdir_path) and not subdir.startswith("PF"):
+            if is_sequence_dir(output_dir, subdir):
                 merge_reports_in_sequences_tasks.append([
                     python_executable,
                     "merge_reports_in_sequences.py",
@@ -557,7 +965,7 @@ def main():
         make_view_jsons_tasks = []
         for subdir in os.listdir(output_dir):
             subdir_path = os.path.join(output_dir, subdir)
-            if os.path.isdir(subdir_path) and not subdir.startswith("PF") and subdir != "batches":
+            if is_sequence_dir(output_dir, subdir):
                 make_view_jsons_tasks.append([
                     python_executable,
                     "make_view_jsons.py",
@@ -573,6 +981,18 @@ def main():
             f.write("")
         logger.info("EXECUTOR --- MAKE_VIEW_JSONS.PY --- Executed.")
 
+    # dedup_sequences.py fanout
+    if dedup_sequences:
+        run_command([
+            python_executable,
+            "dedup_sequences.py",
+            "-l", timestamped_log,
+            "fanout",
+            "-d", duplicates_json,
+            "-o", output_dir,
+        ], logger)
+        logger.info("EXECUTOR --- DEDUP_SEQUENCES.PY --- Fanout executed.")
+
     logger.info("EXECUTOR --- Pipeline finished successfully")
 
 if __name__ == "__main__":
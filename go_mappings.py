@@ -0,0 +1,145 @@
+"""
+go_mappings.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module derives target GO terms from Pfam hits and local GO mapping files,
+used by transfer_annotations.py (--go-source mappings) instead of InterProScan outputs,
+so the executor can skip run_iprscan.py entirely.
+
+Mapping files are read from resource_dir/mappings, as published by the GO Consortium
+(https://current.geneontology.org/ontology/external2go/):
+    - pfam2go: Pfam families to GO terms
+    - interpro2go: InterPro entries to GO terms, reached from Pfam accessions through
+      interpro_pfam_accession_mapping.tsv
+
+Each Pfam hit of a target becomes a row in the format of the InterProScan match index
+(see iprscan_index.py), with the GO terms of its family and InterPro entry, so GO sets are
+gathered by the same accession and interval rules as InterProScan matches.
+"""
+
+import os
+import re
+from typing import Optional
+import pandas as pd
+
+PFAM2GO_FILENAME = "pfam2go"
+INTERPRO2GO_FILENAME = "interpro2go"
+PFAM_INTERPRO_MAP_FILENAME = "interpro_pfam_accession_mapping.tsv"
+
+GO_ID_PATTERN = re.compile(r"GO:\d{7}")
+
+def parse_external2go(mapping_path: str) -> dict[str, set[str]]:
+    """Parses an external2go file into {accession: {GO IDs}}, e.g. the line
+    "Pfam:PF00001 7tm_1 > GO:G protein-coupled receptor activity ; GO:0004930"
+    gives {"PF00001": {"GO:0004930"}}. Comment lines start with "!"."""
+    mapping = {}
+    with open(mapping_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("!") or ">" not in line:
+                continue
+            source, _, target = line.rpartition(";")
+            accession = source.split(maxsplit=1)[0].split(":", 1)[-1] if source.strip() else ""
+            go_id = GO_ID_PATTERN.search(target)
+            if accession and go_id:
+                mapping.setdefault(accession, set()).add(go_id.group(0))
+    return mapping
+
+def read_pfam_interpro_mapping(map_path: str) -> dict[str, str]:
+    """Reads interpro_pfam_accession_mapping.tsv into {Pfam_ID: InterPro_ID}."""
+    mapping = pd.read_csv(map_path, sep="\t", header=0, dtype=str).dropna(subset=["Pfam_ID", "InterPro_ID"])
+    return dict(zip(mapping["Pfam_ID"], mapping["InterPro_ID"]))
+
+class GoMappings:
+    """GO terms of Pfam families, from pfam2go and from interpro2go through their InterPro entries."""
+
+    def __init__(
+        self, pfam2go: dict[str, set[str]], interpro2go: dict[str, set[str]],
+        pfam_interpro: dict[str, str]):
+        self.pfam2go = pfam2go
+        self.interpro2go = interpro2go
+        self.pfam_interpro = pfam_interpro
+
+    def interpro_id(self, pfam_id: str) -> str:
+        return self.pfam_interpro.get(pfam_id, "")
+
+    def go_terms(self, pfam_id: str) -> set[str]:
+        """GO terms of a Pfam family and of its InterPro entry."""
+        return self.pfam2go.get(pfam_id, set()) | self.interpro2go.get(self.interpro_id(pfam_id), set())
+
+    def sequence_matches(self, sequence_hits: dict[str, list[dict]]) -> list[tuple]:
+        """Turns the Pfam hits of a target into InterProScan match index rows.
+
+        Args:
+            sequence_hits: {pfam_id: [hit dicts with ali_from and ali_to]}, as from HitsTable.sequence_hits
+
+        Returns:
+            list[tuple]: [(analysis, signature_accession, interpro_accession, start, stop, go_terms)]
+        """
+        rows = []
+        for pfam_id, hits in sequence_hits.items():
+            go_terms = "|".join(sorted(self.go_terms(pfam_id)))
+            for hit in hits:
+                rows.append(("Pfam", pfam_id, self.interpro_id(pfam_id) or "-", hit["ali_from"], hit["ali_to"], go_terms))
+        return rows
+
+def load_go_mappings(resource_dir: str) -> Optional[GoMappings]:
+    """Loads the mapping files in resource_dir/mappings, None if neither pfam2go nor interpro2go is present."""
+    mappings_dir = os.path.join(resource_dir, "mappings")
+    pfam2go_path = os.path.join(mappings_dir, PFAM2GO_FILENAME)
+    interpro2go_path = os.path.join(mappings_dir, INTERPRO2GO_FILENAME)
+    if not os.path.isfile(pfam2go_path) and not os.path.isfile(interpro2go_path):
+        return None
+    pfam2go = parse_external2go(pfam2go_path) if os.path.isfile(pfam2go_path) else {}
+    interpro2go = parse_external2go(interpro2go_path) if os.path.isfile(interpro2go_path) else {}
+    map_path = os.path.join(mappings_dir, PFAM_INTERPRO_MAP_FILENAME)
+    pfam_interpro = read_pfam_interpro_mapping(map_path) if os.path.isfile(map_path) else {}
+    return GoMappings(pfam2go, interpro2go, pfam_interpro)
+
+def compare_go_sets(reference: dict[str, set[str]], derived: dict[str, set[str]]) -> dict:
+    """Agreement of GO sets derived from mappings with reference (InterProScan) GO sets,
+    over the keys (e.g. target hits) of the reference.
+
+    Returns:
+        dict: Counts of compared, identical and empty sets, mean Jaccard index
+        and micro-averaged precision and recall of the derived GO terms
+    """
+    compared = identical = reference_empty = derived_empty = 0
+    jaccard_sum = 0.0
+    shared = derived_total = reference_total = 0
+    for key, reference_set in reference.items():
+        derived_set = derived.get(key, set())
+        compared += 1
+        identical += reference_set == derived_set
+        reference_empty += not reference_set
+        derived_empty += not derived_set
+        union = reference_set | derived_set
+        jaccard_sum += len(reference_set & derived_set) / len(union) if union else 1.0
+        shared += len(reference_set & derived_set)
+        derived_total += len(derived_set)
+        reference_total += len(reference_set)
+    return {
+        "compared": compared,
+        "identical": identical,
+        "identical_fraction": round(identical / compared, 4) if compared else 1.0,
+        "mean_jaccard": round(jaccard_sum / compared, 4) if compared else 1.0,
+        "precision": round(shared / derived_total, 4) if derived_total else 1.0,
+        "recall": round(shared / reference_total, 4) if reference_total else 1.0,
+        "reference_empty": reference_empty,
+        "derived_empty": derived_empty,
+    }
@@ -0,0 +1,179 @@
+"""
+hits_table.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module writes and reads the columnar hits table (output_dir/hmmsearch_hits),
+a compact companion of hmmsearch_per_domain.json written by run_hmmsearch.py.
+
+The table is a directory of NumPy arrays, one row per domain hit, with rows grouped by domain:
+    - domain_code, sequence_code (int32): indexes into domains.json and sequences.json
+    - bitscore (float64), ali_from, ali_to, hmm_from, hmm_to (int32)
+    - subseq_offsets, state_path_offsets (int64, rows + 1): slices of the subseqs.npy
+      and state_paths.npy character blobs (uint8)
+    - domain_offsets (int64, domains + 1): rows of each domain (domain index)
+    - sequence_rows (int64) and sequence_offsets (int64, sequences + 1): row numbers
+      grouped by sequence (sequence index)
+
+Arrays are memory-mapped on reading, so looking up one domain or one sequence
+only touches its own rows instead of parsing the whole JSON.
+"""
+
+import os
+import json
+from typing import Optional
+import numpy as np
+
+HITS_TABLE_DIRNAME = "hmmsearch_hits"
+
+INT_COLUMNS = ["ali_from", "ali_to", "hmm_from", "hmm_to"]
+
+def write_hits_table(hits_per_domain: dict, table_dir: str) -> None:
+    """Writes hits in the {pfam_id: {seq_id: [{seq_hits_data}]}} structure as a columnar table.
+
+    Args:
+        hits_per_domain: Hits as written to hmmsearch_per_domain.json
+        table_dir: Directory of the table, created if needed
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    accessions = list(hits_per_domain)
+    hmm_names = []
+    sequence_codes = {}
+    columns = {"domain_code": [], "sequence_code": [], "bitscore": [], **{name: [] for name in INT_COLUMNS}}
+    subseqs, state_paths = [], []
+    domain_offsets = [0]
+
+    for domain_code, accession in enumerate(accessions):
+        hmm_name = ""
+        for seq_id, hits in hits_per_domain[accession].items():
+            sequence_code = sequence_codes.setdefault(seq_id, len(sequence_codes))
+            for hit in hits:
+                hmm_name = hit["hmm_name"]
+                columns["domain_code"].append(domain_code)
+                columns["sequence_code"].append(sequence_code)
+                columns["bitscore"].append(hit["bitscore"])
+                for name in INT_COLUMNS:
+                    columns[name].append(hit.get(name, 0))
+                subseqs.append(hit["subseq"])
+                state_paths.append(hit.get("state_path", ""))
+        hmm_names.append(hmm_name)
+        domain_offsets.append(len(columns["domain_code"]))
+
+    for name, values in columns.items():
+        dtype = np.float64 if name == "bitscore" else np.int32
+        np.save(os.path.join(table_dir, f"{name}.npy"), np.asarray(values, dtype=dtype))
+    for name, strings in (("subseq", subseqs), ("state_path", state_paths)):
+        lengths = np.fromiter((len(string) for string in strings), dtype=np.int64, count=len(strings))
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        np.save(os.path.join(table_dir, f"{name}_offsets.npy"), offsets)
+        np.save(os.path.join(table_dir, f"{name}s.npy"), np.frombuffer("".join(strings).encode("ascii"), dtype=np.uint8))
+
+    sequence_code_column = np.asarray(columns["sequence_code"], dtype=np.int64)
+    sequence_rows = np.argsort(sequence_code_column, kind="stable").astype(np.int64)
+    sequence_counts = np.bincount(sequence_code_column, minlength=len(sequence_codes))
+    np.save(os.path.join(table_dir, "domain_offsets.npy"), np.asarray(domain_offsets, dtype=np.int64))
+    np.save(os.path.join(table_dir, "sequence_rows.npy"), sequence_rows)
+    np.save(os.path.join(table_dir, "sequence_offsets.npy"), np.concatenate(([0], np.cumsum(sequence_counts))).astype(np.int64))
+
+    with open(os.path.join(table_dir, "domains.json"), "w", encoding="utf-8") as f:
+        json.dump({"accessions": accessions, "hmm_names": hmm_names}, f)
+    with open(os.path.join(table_dir, "sequences.json"), "w", encoding="utf-8") as f:
+        json.dump(list(sequence_codes), f)
+
+class HitsTable:
+    """Read access to a columnar hits table written by write_hits_table."""
+
+    def __init__(self, table_dir: str):
+        self.table_dir = table_dir
+        with open(os.path.join(table_dir, "domains.json"), "r", encoding="utf-8") as f:
+            domains = json.load(f)
+        with open(os.path.join(table_dir, "sequences.json"), "r", encoding="utf-8") as f:
+            self.sequences = json.load(f)
+        self.accessions = domains["accessions"]
+        self.hmm_names = domains["hmm_names"]
+        self._domain_codes = {accession: code for code, accession in enumerate(self.accessions)}
+        self._sequence_codes = {seq_id: code for code, seq_id in enumerate(self.sequences)}
+        self._columns = {}
+
+    def _column(self, name: str) -> np.ndarray:
+        """Loads a column lazily, memory-mapped."""
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.table_dir, f"{name}.npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def _string(self, name: str, row: int) -> str:
+        offsets = self._column(f"{name}_offsets")
+        return self._column(f"{name}s")[offsets[row]:offsets[row + 1]].tobytes().decode("ascii")
+
+    def domain_hit_counts(self) -> dict[str, int]:
+        """Returns {pfam_id: number of hits}, reading only the domain index."""
+        offsets = self._column("domain_offsets")
+        return {accession: int(offsets[code + 1] - offsets[code]) for code, accession in enumerate(self.accessions)}
+
+    def hit(self, row: int) -> dict:
+        """Rebuilds the hit dictionary of a row, as in hmmsearch_per_domain.json."""
+        domain_code = int(self._column("domain_code")[row])
+        seq_id = self.sequences[int(self._column("sequence_code")[row])]
+        ali_from, ali_to = int(self._column("ali_from")[row]), int(self._column("ali_to")[row])
+        hit = {
+            "hmm_name": self.hmm_names[domain_code],
+            "target_seq_name": seq_id,
+            "bitscore": float(self._column("bitscore")[row]),
+            "ali_from": ali_from,
+            "ali_to": ali_to,
+            "ali_range": f"/{ali_from}-{ali_to}",
+            "subseq": self._string("subseq", row),
+        }
+        state_path = self._string("state_path", row)
+        if state_path:
+            hit["hmm_from"] = int(self._column("hmm_from")[row])
+            hit["hmm_to"] = int(self._column("hmm_to")[row])
+            hit["state_path"] = state_path
+        return hit
+
+    def domain_hits(self, pfam_id: str) -> dict[str, list[dict]]:
+        """Returns {seq_id: [{seq_hits_data}]} for a domain, empty if it has no hits."""
+        code = self._domain_codes.get(pfam_id)
+        if code is None:
+            return {}
+        offsets = self._column("domain_offsets")
+        sequences = {}
+        for row in range(int(offsets[code]), int(offsets[code + 1])):
+            hit = self.hit(row)
+            sequences.setdefault(hit["target_seq_name"], []).append(hit)
+        return sequences
+
+    def sequence_hits(self, seq_id: str) -> dict[str, list[dict]]:
+        """Returns {pfam_id: [{seq_hits_data}]} for a sequence, empty if it has no hits."""
+        code = self._sequence_codes.get(seq_id)
+        if code is None:
+            return {}
+        offsets = self._column("sequence_offsets")
+        rows = self._column("sequence_rows")[int(offsets[code]):int(offsets[code + 1])]
+        domains = {}
+        for row in rows:
+            domain_code = int(self._column("domain_code")[row])
+            domains.setdefault(self.accessions[domain_code], []).append(self.hit(int(row)))
+        return domains
+
+def open_hits_table(output_dir: str) -> Optional[HitsTable]:
+    """Opens output_dir/hmmsearch_hits if present, None for outputs written without it."""
+    table_dir = os.path.join(output_dir, HITS_TABLE_DIRNAME)
+    if not os.path.isfile(os.path.join(table_dir, "domains.json")):
+        return None
+    return HitsTable(table_dir)
@@ -0,0 +1,388 @@
+"""
+hmm_states.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module maps sequences onto the match states of a profile HMM and rebuilds
+Pfam-format alignment lines from those mappings, so annotation transfer can relate
+seed and target residues through shared HMM match states instead of an hmmalign run.
+
+Every sequence is represented by its "nodes": a list with the residue (uppercase) or
+deletion ('-') at each of the M match states, plus the lowercase residues inserted after
+each state (index 0 holds residues inserted before the first match state).
+
+Sources of nodes:
+    - Target hits: the state path persisted by run_hmmsearch.py, a run-length string of
+      M (match), I (insertion) and D (deletion) operations starting at hmm_from.
+    - Seed rows: the seed alignment columns, mapped to match states through the MAP
+      annotation of the family HMM (or the seed's #=GC RF line, if the HMM has no MAP).
+    - Precomputed seed rows: resource_dir/PF*/seed_states.json, written once per release by
+      seed_states.py, holding state paths of only the annotated and conservation-reference
+      seed rows, so neither the seed alignment nor the HMM is parsed per run.
+    - Minimal seed: resource_dir/PF*/alignment.minimal.seed, written by minimal_seed.py with
+      only those seed rows, in the original seed columns, mapped through the MAP as the full seed.
+
+The rendered lines follow hmmalign's Pfam output conventions used by transfer_annotations.py:
+uppercase residues in match columns, lowercase residues in insert columns, '-' for deletions
+and '.' for insert padding, with target rows named <target_name>target/<ali_range>.
+"""
+
+import os
+import re
+import json
+from typing import Optional
+from hits_table import HitsTable
+from resource_pack import open_family_pack
+
+STATE_PATH_PATTERN = re.compile(r"(\d+)([MID])")
+SEED_STATES_FILENAME = "seed_states.json"
+MINIMAL_SEED_FILENAME = "alignment.minimal.seed"
+
+def alignment_to_state_path(hmm_sequence: str, target_sequence: str) -> str:
+    """Encodes a pyhmmer domain alignment as a run-length state path.
+
+    Args:
+        hmm_sequence: Aligned HMM consensus, with '.' in insert columns
+        target_sequence: Aligned target, with '-' in deletion columns
+
+    Returns:
+        str: State path, e.g. "12M3I1D8M"
+    """
+    ops = []
+    for hmm_char, target_char in zip(hmm_sequence, target_sequence):
+        if hmm_char == ".":
+            op = "I"
+        elif target_char == "-":
+            op = "D"
+        else:
+            op = "M"
+        if ops and ops[-1][0] == op:
+            ops[-1][1] += 1
+        else:
+            ops.append([op, 1])
+    return "".join(f"{count}{op}" for op, count in ops)
+
+def nodes_to_state_path(match: list[str], inserts: list[str]) -> tuple[str, int, str]:
+    """Encodes (match, inserts) nodes as (subseq, hmm_from, state_path), the inverse of
+    state_path_to_nodes with hmm_from 1, so seed rows are stored like target hits."""
+    ops = []
+    def add(op: str, count: int) -> None:
+        if count == 0:
+            return
+        if ops and ops[-1][0] == op:
+            ops[-1][1] += count
+        else:
+            ops.append([op, count])
+    add("I", len(inserts[0]))
+    for node, residue in enumerate(match, start=1):
+        add("D" if residue == "-" else "M", 1)
+        add("I", len(inserts[node]))
+    subseq = inserts[0] + "".join(
+        (residue if residue != "-" else "") + inserts[node] for node, residue in enumerate(match, start=1)
+    )
+    return subseq, 1, "".join(f"{count}{op}" for op, count in ops)
+
+def parse_state_path(state_path: str) -> list[tuple[str, int]]:
+    """Decodes a run-length state path into (operation, count) tuples."""
+    return [(op, int(count)) for count, op in STATE_PATH_PATTERN.findall(state_path)]
+
+def empty_nodes(hmm_length: int) -> tuple[list[str], list[str]]:
+    """Returns (match, inserts) node lists for a sequence absent from every state."""
+    return ["-"] * hmm_length, [""] * (hmm_length + 1)
+
+def state_path_to_nodes(subseq: str, hmm_from: int, state_path: str, hmm_length: int) -> tuple[list[str], list[str]]:
+    """Places the residues of a hit subsequence on the HMM states of its state path.
+
+    Args:
+        subseq: Ungapped hit subsequence (match and insert residues)
+        hmm_from: First HMM state of the alignment (1-based)
+        state_path: Run-length state path from alignment_to_state_path
+        hmm_length: Number of match states (M) in the HMM
+
+    Returns:
+        tuple[list[str], list[str]]: (match, inserts) nodes
+
+    Raises:
+        ValueError: If the state path does not fit the subsequence or the HMM
+    """
+    match, inserts = empty_nodes(hmm_length)
+    node = hmm_from - 1
+    residue_index = 0
+    for op, count in parse_state_path(state_path):
+        if op == "M":
+            if node + count > hmm_length or residue_index + count > len(subseq):
+                raise ValueError(f"State path {state_path} does not fit subsequence of length {len(subseq)} and HMM of length {hmm_length}")
+            for _ in range(count):
+                match[node] = subseq[residue_index].upper()
+                node += 1
+                residue_index += 1
+        elif op == "I":
+            inserts[node] += subseq[residue_index:residue_index + count].lower()
+            residue_index += count
+        else:
+            node += count
+    if residue_index != len(subseq) or node > hmm_length:
+        raise ValueError(f"State path {state_path} does not fit subsequence of length {len(subseq)} and HMM of length {hmm_length}")
+    return match, inserts
+
+def read_hmm_match_columns(hmm_path: str) -> tuple[int, Optional[list[int]]]:
+    """Reads the model length and the MAP annotation from a HMMER3 text HMM file.
+    MAP holds, for each match state, the (1-based) alignment column it was built from.
+
+    Args:
+        hmm_path: Path to a single-model HMMER3 text file (e.g. resource_dir/PF*/domain.hmm)
+
+    Returns:
+        tuple[int, Optional[list[int]]]: (hmm_length, match_columns), the latter None if MAP is absent
+    """
+    hmm_length = 0
+    match_columns = []
+    alphabet_size = None
+    has_map = False
+    with open(hmm_path, "r", encoding="utf-8") as hmm_file:
+        for line in hmm_file:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "//":
+                break
+            if alphabet_size is None:
+                if fields[0] == "LENG":
+                    hmm_length = int(fields[1])
+                elif fields[0] == "MAP":
+                    has_map = fields[1].lower() == "yes"
+                elif fields[0] == "HMM":
+                    alphabet_size = len(fields) - 1
+                continue
+            # Only the match emission line of each node starts with the node number
+            if fields[0].isdigit() and len(fields) > alphabet_size + 1:
+                map_field = fields[alphabet_size + 1]
+                match_columns.append(int(map_field) if map_field.isdigit() else None)
+
+    if not has_map or len(match_columns) != hmm_length or None in match_columns:
+        return hmm_length, None
+    return hmm_length, match_columns
+
+def read_seed_alignment(seed_path: str) -> tuple[dict[str, str], str]:
+    """Reads a Stockholm (or Pfam-format) seed alignment, joining interleaved blocks.
+
+    Args:
+        seed_path: Path to the seed alignment (e.g. resource_dir/PF*/alignment.seed)
+
+    Returns:
+        tuple[dict[str, str], str]: ({row_name: aligned_sequence}, reference line or "")
+    """
+    rows = {}
+    reference = []
+    with open(seed_path, "r", encoding="utf-8", errors="replace") as seed_file:
+        for line in seed_file:
+            if line.startswith("#=GC RF"):
+                reference.append(line.split()[-1])
+                continue
+            if not line.strip() or line.startswith("#") or line.startswith("//"):
+                continue
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            rows[fields[0]] = rows.get(fields[0], "") + fields[1]
+    return rows, "".join(reference)
+
+def reference_to_match_columns(reference: str) -> list[int]:
+    """Converts a #=GC RF line into 1-based match columns (any non-gap character marks one)."""
+    return [column for column, char in enumerate(reference, start=1) if char not in ".-_~"]
+
+def get_seed_match_columns(hmm_path: str, reference: str = "") -> tuple[int, list[int]]:
+    """Gets the seed columns of each match state, from the HMM MAP or the seed's RF line.
+
+    Raises:
+        ValueError: If neither source maps every match state
+    """
+    hmm_length, match_columns = read_hmm_match_columns(hmm_path)
+    if match_columns is None and reference:
+        match_columns = reference_to_match_columns(reference)
+    if match_columns is None or len(match_columns) != hmm_length:
+        raise ValueError(f"Cannot map seed columns to the {hmm_length} match states of {hmm_path}: no MAP annotation or usable RF line")
+    return hmm_length, match_columns
+
+def seed_row_to_nodes(aligned_row: str, match_columns: list[int]) -> tuple[list[str], list[str]]:
+    """Places the residues of an aligned seed row on HMM states.
+
+    Args:
+        aligned_row: Seed row as in the seed alignment
+        match_columns: 1-based seed column of each match state
+
+    Returns:
+        tuple[list[str], list[str]]: (match, inserts) nodes
+    """
+    match, inserts = empty_nodes(len(match_columns))
+    column_to_node = {column: node for node, column in enumerate(match_columns, start=1)}
+    last_node = 0
+    for column, char in enumerate(aligned_row, start=1):
+        node = column_to_node.get(column)
+        if node is not None:
+            match[node - 1] = char.upper() if char.isalpha() else "-"
+            last_node = node
+        elif char.isalpha():
+            inserts[last_node] += char.lower()
+    return match, inserts
+
+def aligned_row_to_nodes(aligned_row: str, hmm_length: int) -> tuple[list[str], list[str]]:
+    """Places the residues of an hmmalign-style row (all consensus columns, uppercase or '-'
+    in match columns, lowercase or '.' in insert columns) on HMM states. Any other
+    character, such as the '*' of a translated stop codon, is a match column.
+
+    Raises:
+        ValueError: If the row doesn't have hmm_length match columns
+    """
+    match, inserts = empty_nodes(hmm_length)
+    node = 0
+    for char in aligned_row:
+        if not char.islower() and char != ".":
+            if node == hmm_length:
+                raise ValueError(f"Aligned row has more than {hmm_length} match columns")
+            match[node] = char
+            node += 1
+        elif char.isalpha():
+            inserts[node] += char
+    if node != hmm_length:
+        raise ValueError(f"Aligned row has {node} match columns, expected {hmm_length}")
+    return match, inserts
+
+def load_seed_state_rows(seed_path: str) -> Optional[tuple[int, list[tuple[str, list[str], list[str]]]]]:
+    """Loads the precomputed seed rows (seed_states.json) next to a seed alignment.
+
+    Returns:
+        Optional[tuple[int, list]]: (hmm_length, [(name, match, inserts)]), None if absent
+    """
+    seed_states_path = os.path.join(os.path.dirname(seed_path), SEED_STATES_FILENAME)
+    if not os.path.isfile(seed_states_path):
+        return None
+    with open(seed_states_path, "r", encoding="utf-8") as f:
+        seed_states = json.load(f)
+    hmm_length = seed_states["hmm_length"]
+    rows = [
+        (name, *state_path_to_nodes(row["subseq"], row["hmm_from"], row["state_path"], hmm_length))
+        for name, row in seed_states["rows"].items()
+    ]
+    return hmm_length, rows
+
+def has_reduced_seed(seed_path: str) -> bool:
+    """Whether a seed alignment has a seed_states.json or minimal seed next to it."""
+    seed_dir = os.path.dirname(seed_path)
+    return (os.path.isfile(os.path.join(seed_dir, SEED_STATES_FILENAME))
+            or os.path.isfile(os.path.join(seed_dir, MINIMAL_SEED_FILENAME)))
+
+def read_seed_rows(hmm_path: str, seed_path: str) -> tuple[int, list[tuple[str, list[str], list[str]]]]:
+    """Gets (hmm_length, seed rows as (name, match, inserts)) from the resource files alone:
+    seed_states.json when present, otherwise the rows of the minimal seed, or of the full
+    seed alignment, mapped through the HMM."""
+    precomputed = load_seed_state_rows(seed_path)
+    if precomputed is not None:
+        return precomputed
+    minimal_seed_path = os.path.join(os.path.dirname(seed_path), MINIMAL_SEED_FILENAME)
+    if os.path.isfile(minimal_seed_path):
+        seed_path = minimal_seed_path
+    seed_rows, reference = read_seed_alignment(seed_path)
+    hmm_length, match_columns = get_seed_match_columns(hmm_path, reference)
+    return hmm_length, [(name, *seed_row_to_nodes(aligned_row, match_columns)) for name, aligned_row in seed_rows.items()]
+
+def get_seed_rows(hmm_path: str, seed_path: str) -> tuple[int, list[tuple[str, list[str], list[str]]]]:
+    """Gets (hmm_length, seed rows as (name, match, inserts)) from the resource pack when
+    it holds the family, otherwise from the resource files (see read_seed_rows)."""
+    family_pack = open_family_pack(seed_path)
+    if family_pack is not None:
+        pack, family = family_pack
+        return pack.seed_rows(family)
+    return read_seed_rows(hmm_path, seed_path)
+
+def render_state_alignment(rows: list[tuple[str, list[str], list[str]]]) -> list[str]:
+    """Renders (name, match, inserts) rows as Pfam-format alignment lines.
+
+    Insert columns are as wide as the longest insertion at each state, left-aligned
+    and padded with '.', and a #=GC RF line marks match columns with 'x'.
+
+    Returns:
+        list[str]: Alignment lines, without trailing newlines
+    """
+    if not rows:
+        return ["# STOCKHOLM 1.0", "", "//"]
+    hmm_length = len(rows[0][1])
+    insert_widths = [max(len(inserts[node]) for _, _, inserts in rows) for node in range(hmm_length + 1)]
+    name_width = max(len(name) for name, _, _ in rows) + 1
+
+    def render(match: list[str], inserts: list[str]) -> str:
+        pieces = [inserts[0].ljust(insert_widths[0], ".")]
+        for node in range(1, hmm_length + 1):
+            pieces.append(match[node - 1])
+            pieces.append(inserts[node].ljust(insert_widths[node], "."))
+        return "".join(pieces)
+
+    lines = ["# STOCKHOLM 1.0", ""]
+    lines.extend(f"{name.ljust(name_width)}{render(match, inserts)}" for name, match, inserts in rows)
+    reference = render(["x"] * hmm_length, [""] * (hmm_length + 1))
+    lines.append(f"{'#=GC RF'.ljust(name_width)}{reference}")
+    lines.append("//")
+    return lines
+
+def alignment_match_states(alignment_lines: list[str], hmm_length: int) -> dict[str, tuple[str, ...]]:
+    """Returns {row name: match nodes} of Pfam-format alignment lines, to compare
+    alignments whose insert columns are laid out differently."""
+    states = {}
+    for line in alignment_lines:
+        if not line.strip() or line.startswith(("#", "//")):
+            continue
+        name, aligned_row = line.split()[:2]
+        states[name] = tuple(aligned_row_to_nodes(aligned_row, hmm_length)[0])
+    return states
+
+def get_target_rows(domain_hits: dict, hmm_length: int) -> list[tuple[str, list[str], list[str]]]:
+    """Builds target rows from a domain's {seq_id: [hit dicts]} hmmsearch entry.
+    Hits without a persisted state path (older hmmsearch outputs) are skipped.
+    """
+    rows = []
+    for target_name, hits in domain_hits.items():
+        for hit in hits:
+            if "state_path" not in hit:
+                continue
+            match, inserts = state_path_to_nodes(hit["subseq"], hit["hmm_from"], hit["state_path"], hmm_length)
+            rows.append((f"{target_name}target/{hit['ali_range']}", match, inserts))
+    return rows
+
+def build_state_alignment_lines(hmmsearch_per_domain: str, pfam_id: str, hmm_path: str, seed_path: str) -> list[str]:
+    """Builds hmmalign-like alignment lines for a domain from hmmsearch state paths,
+    combining every seed row (or only the precomputed ones, see get_seed_rows) with every
+    target hit of the domain.
+
+    Args:
+        hmmsearch_per_domain: Path to hmmsearch_per_domain.json with persisted state paths,
+            or to the hmmsearch_hits columnar table, from which only the domain's rows are read
+        pfam_id: Pfam domain accession
+        hmm_path: Path to the domain's HMM
+        seed_path: Path to the domain's seed alignment
+
+    Returns:
+        list[str]: Alignment lines, in the format read by transfer_annotations.py
+    """
+    if os.path.isdir(hmmsearch_per_domain):
+        domain_hits = HitsTable(hmmsearch_per_domain).domain_hits(pfam_id)
+    else:
+        with open(hmmsearch_per_domain, "r", encoding="utf-8") as f:
+            domain_hits = json.load(f).get(pfam_id, {})
+    hmm_length, rows = get_seed_rows(hmm_path, seed_path)
+    rows.extend(get_target_rows(domain_hits, hmm_length))
+    return render_state_alignment(rows)
@@ -0,0 +1,139 @@
+"""
+hmmsearch_cache.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module holds an on-disk (SQLite) cache of per-sequence hmmsearch domain hits,
+used by run_hmmsearch.py (--cache) so that sequences seen in earlier runs,
+e.g. shared between a reference proteome, strains and isoforms, are not searched again.
+
+Entries are keyed by (sequence MD5, HMM database checksum, bit_cutoffs).
+Inclusion under the gathering, trusted and noise cutoffs is decided by bit scores,
+which do not depend on the database size, so cached hits stay valid across runs
+with different numbers of sequences. The Z used when an entry was searched is
+recorded next to it. Sequences without hits are stored with an empty hit list,
+so they are not searched again either. Each entry also records whether hmmsearch
+reported the sequence at all, since a reported sequence may have no included domain
+with a Pfam accession and still belongs in hmmsearch_sequences.json. Entries from
+before this flag existed are treated as missing and searched again.
+"""
+
+import json
+import hashlib
+import sqlite3
+from typing import Iterable
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_hits (
+    seq_md5 TEXT NOT NULL,
+    hmm_checksum TEXT NOT NULL,
+    bit_cutoffs TEXT NOT NULL,
+    database_size INTEGER,
+    hits TEXT NOT NULL,
+    PRIMARY KEY (seq_md5, hmm_checksum, bit_cutoffs)
+)
+"""
+
+# SQLite limits the number of host parameters per statement
+QUERY_BATCH_SIZE = 500
+
+def file_md5(path: str, block_size: int = 1 << 20) -> str:
+    """Computes the MD5 checksum of a file, reading it in blocks."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+def sequence_md5(sequence: str) -> str:
+    """Computes the MD5 of a protein sequence, case-insensitive."""
+    return hashlib.md5(sequence.upper().encode("utf-8")).hexdigest()
+
+def open_cache(cache_path: str) -> sqlite3.Connection:
+    """Opens (creating if needed) the hmmsearch cache database.
+    WAL mode and a busy timeout let parallel shards share the same cache file."""
+    connection = sqlite3.connect(cache_path, timeout=300)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(CACHE_SCHEMA)
+    connection.commit()
+    return connection
+
+def get_cached_hits(
+    connection: sqlite3.Connection, seq_md5s: Iterable[str],
+    hmm_checksum: str, bit_cutoffs: str) -> dict[str, dict]:
+    """Fetches cached hits for the given sequence digests.
+
+    Args:
+        connection: Open cache connection
+        seq_md5s: Sequence MD5 digests to look up
+        hmm_checksum: Checksum of the searched HMM profiles
+        bit_cutoffs: Bit score cutoffs used ("noise", "gathering", or "trusted")
+
+    Returns:
+        dict[str, dict]: {seq_md5: {"reported": bool, "hits": [[pfam_id, {seq_hits_data}], ...]}}
+        for cached digests, with an empty hits list for sequences known to have no hits
+    """
+    unique_md5s = list(dict.fromkeys(seq_md5s))
+    cached = {}
+    for start in range(0, len(unique_md5s), QUERY_BATCH_SIZE):
+        batch = unique_md5s[start:start + QUERY_BATCH_SIZE]
+        placeholders = ",".join("?" * len(batch))
+        rows = connection.execute(
+            f"SELECT seq_md5, hits FROM domain_hits WHERE hmm_checksum = ? AND bit_cutoffs = ? AND seq_md5 IN ({placeholders})",
+            (hmm_checksum, bit_cutoffs, *batch)
+        )
+        for seq_md5, hits in rows:
+            entry = json.loads(hits)
+            if isinstance(entry, dict):
+                cached[seq_md5] = entry
+    return cached
+
+def store_hits(
+    connection: sqlite3.Connection, hits_per_md5: dict[str, dict],
+    hmm_checksum: str, bit_cutoffs: str, database_size: int) -> None:
+    """Stores per-sequence hits, as returned by get_cached_hits, with the Z used to search them."""
+    connection.executemany(
+        "INSERT OR REPLACE INTO domain_hits (seq_md5, hmm_checksum, bit_cutoffs, database_size, hits) VALUES (?, ?, ?, ?, ?)",
+        (
+            (seq_md5, hmm_checksum, bit_cutoffs, database_size, json.dumps(hits))
+            for seq_md5, hits in hits_per_md5.items()
+        )
+    )
+    connection.commit()
+
+def split_hits_per_sequence(hits_per_domain: dict) -> dict[str, list]:
+    """Converts {pfam_id: {seq_id: [{seq_hits_data}]}} into {seq_id: [[pfam_id, {seq_hits_data}], ...]},
+    dropping target_seq_name so entries can be shared by identical sequences under other names."""
+    hits_per_sequence = {}
+    for accession, sequences in hits_per_domain.items():
+        for seq_id, hits in sequences.items():
+            for hit in hits:
+                cached_hit = {key: value for key, value in hit.items() if key != "target_seq_name"}
+                hits_per_sequence.setdefault(seq_id, []).append([accession, cached_hit])
+    return hits_per_sequence
+
+def join_hits_per_domain(hits_per_sequence: dict[str, list]) -> dict:
+    """Rebuilds {pfam_id: {seq_id: [{seq_hits_data}]}} from {seq_id: [[pfam_id, {seq_hits_data}], ...]}."""
+    hits_per_domain = {}
+    for seq_id, hits in hits_per_sequence.items():
+        for accession, hit in hits:
+            hits_per_domain.setdefault(accession, {}).setdefault(seq_id, []).append(
+                {"hmm_name": hit["hmm_name"], "target_seq_name": seq_id,
+                 **{key: value for key, value in hit.items() if key != "hmm_name"}}
+            )
+    return hits_per_domain
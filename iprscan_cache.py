@@ -0,0 +1,128 @@
+"""
+iprscan_cache.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module holds an on-disk (SQLite) cache of InterProScan TSV matches per sequence,
+used by run_iprscan.py (--cache) so that sequences scanned in earlier runs, e.g. shared
+between repeated proteome runs, are not scanned again.
+
+Entries are keyed by (sequence MD5, InterProScan version, analyses, residue annotation flag),
+the settings that change the TSV content. Matches are stored as TSV lines without their
+first column (the protein accession), which is filled back in with the ID of the sequence
+the lines are written for. Sequences without matches are stored with no lines,
+so they are not scanned again either.
+"""
+
+import re
+import json
+import sqlite3
+import subprocess
+from typing import Iterable, Optional
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS iprscan_matches (
+    seq_md5 TEXT NOT NULL,
+    iprscan_version TEXT NOT NULL,
+    analyses TEXT NOT NULL,
+    residues INTEGER NOT NULL,
+    tsv_lines TEXT NOT NULL,
+    PRIMARY KEY (seq_md5, iprscan_version, analyses, residues)
+)
+"""
+
+# SQLite limits the number of host parameters per statement
+QUERY_BATCH_SIZE = 500
+
+def get_iprscan_version(iprscan_path: str) -> Optional[str]:
+    """Reads the InterProScan version from `interproscan.sh --version`, None if it can't be found."""
+    try:
+        result = subprocess.run(
+            [iprscan_path, "--version"], stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, check=False, timeout=600
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = re.search(r"InterProScan version (\S+)", result.stdout.decode("utf-8", errors="replace"))
+    return match.group(1) if match else None
+
+def normalize_analyses(analyses: str) -> str:
+    """Sorts and lowercases a comma-separated analyses string, so equivalent lists share entries.
+    An empty string stands for InterProScan's default analyses."""
+    return ",".join(sorted({analysis.strip().lower() for analysis in analyses.split(",") if analysis.strip()}))
+
+def open_cache(cache_path: str) -> sqlite3.Connection:
+    """Opens (creating if needed) the InterProScan cache database.
+    WAL mode and a busy timeout let parallel batches share the same cache file."""
+    connection = sqlite3.connect(cache_path, timeout=300)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(CACHE_SCHEMA)
+    connection.commit()
+    return connection
+
+def get_cached_matches(
+    connection: sqlite3.Connection, seq_md5s: Iterable[str],
+    iprscan_version: str, analyses: str, residues: bool) -> dict[str, list[str]]:
+    """Fetches cached matches for the given sequence digests.
+
+    Args:
+        connection: Open cache connection
+        seq_md5s: Sequence MD5 digests to look up
+        iprscan_version: InterProScan version, e.g. 5.72-103.0
+        analyses: Normalized analyses string (see normalize_analyses)
+        residues: Whether residue-level annotations were enabled
+
+    Returns:
+        dict[str, list[str]]: {seq_md5: [TSV lines without the first column]} for cached digests,
+        with an empty list for sequences known to have no matches
+    """
+    unique_md5s = list(dict.fromkeys(seq_md5s))
+    cached = {}
+    for start in range(0, len(unique_md5s), QUERY_BATCH_SIZE):
+        batch = unique_md5s[start:start + QUERY_BATCH_SIZE]
+        placeholders = ",".join("?" * len(batch))
+        rows = connection.execute(
+            "SELECT seq_md5, tsv_lines FROM iprscan_matches WHERE iprscan_version = ? AND analyses = ? "
+            f"AND residues = ? AND seq_md5 IN ({placeholders})",
+            (iprscan_version, analyses, int(residues), *batch)
+        )
+        for seq_md5, tsv_lines in rows:
+            cached[seq_md5] = json.loads(tsv_lines)
+    return cached
+
+def store_matches(
+    connection: sqlite3.Connection, matches_per_md5: dict[str, list[str]],
+    iprscan_version: str, analyses: str, residues: bool) -> None:
+    """Stores per-sequence matches, as returned by get_cached_matches."""
+    connection.executemany(
+        "INSERT OR REPLACE INTO iprscan_matches (seq_md5, iprscan_version, analyses, residues, tsv_lines) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (seq_md5, iprscan_version, analyses, int(residues), json.dumps(lines))
+            for seq_md5, lines in matches_per_md5.items()
+        )
+    )
+    connection.commit()
+
+def strip_accession(line: str) -> str:
+    """Removes the protein accession (first column) and line break of a TSV line."""
+    return line.rstrip("\n").split("\t", 1)[-1]
+
+def add_accession(seq_id: str, stripped_line: str) -> str:
+    """Puts a protein accession and line break back in a stripped TSV line."""
+    return f"{seq_id}\t{stripped_line}\n"
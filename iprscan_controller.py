@@ -0,0 +1,260 @@
+"""
+iprscan_controller.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module runs InterProScan batches with adaptive batch size and concurrency,
+used by the executor with adaptive_iprscan instead of a fixed number of jobs
+over batches of fixed size.
+
+While batches run, the RSS and CPU use of each run_iprscan.py process tree
+(including interproscan.sh and its Java workers) are sampled with psutil.
+When a batch finishes, its sequences per minute and peak RSS update the controller,
+which then sizes the next batches to take about target_batch_minutes and allows
+as many concurrent batches as fit in the memory budget and the CPUs,
+given the memory and CPU the finished batches actually used.
+"""
+
+import os
+import sys
+import time
+import logging
+import subprocess
+import tempfile
+from collections import deque
+from typing import Callable, Optional
+import psutil
+
+GB = 1024 ** 3
+# InterProScan docs recommendation (8GB/16 cores), used until a batch finishes
+MEMORY_PER_CORE_GB = 0.5
+# Reserve for OS/other processes
+SYSTEM_RESERVE_GB = 2
+
+class IprscanController:
+    """Adapts InterProScan batch size and concurrency to the throughput and memory of finished batches."""
+
+    def __init__(
+        self, memory_budget_gb: float, cpu_cores_iprscan: int, batch_size: int,
+        number_jobs: int, min_batch_size: int = 100, max_batch_size: int = 8000,
+        target_batch_minutes: float = 30.0, total_cpus: Optional[int] = None):
+        self.memory_budget = memory_budget_gb * GB
+        self.cpu_cores_iprscan = cpu_cores_iprscan
+        self.initial_batch_size = batch_size
+        self.initial_jobs = max(1, number_jobs)
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max(max_batch_size, min_batch_size)
+        self.target_batch_minutes = target_batch_minutes
+        self.total_cpus = total_cpus or os.cpu_count() or 1
+        # Sequences per minute of a batch, exponentially averaged
+        self.throughput = None
+        # Cores used by a batch on average, from sampled CPU percentages
+        self.cores_per_job = None
+        # (batch sequences, peak RSS in bytes) of finished batches
+        self.memory_observations = []
+
+    def record(self, n_sequences: int, elapsed_seconds: float, peak_rss: int, mean_cpu_percent: float) -> None:
+        """Updates throughput, memory and CPU estimates with a finished batch."""
+        throughput = n_sequences / max(elapsed_seconds / 60, 1e-6)
+        self.throughput = throughput if self.throughput is None else 0.5 * (self.throughput + throughput)
+        if peak_rss > 0:
+            self.memory_observations.append((n_sequences, peak_rss))
+        if mean_cpu_percent > 0:
+            cores = min(max(mean_cpu_percent / 100, 1.0), float(self.cpu_cores_iprscan))
+            self.cores_per_job = cores if self.cores_per_job is None else 0.5 * (self.cores_per_job + cores)
+
+    def job_memory(self, batch_size: int) -> float:
+        """Estimates the peak RSS (bytes) of a batch of batch_size sequences.
+
+        Before any observation, uses the InterProScan docs recommendation per core.
+        With one batch size observed, memory is taken as fixed up to that size and proportional
+        above it. With more, a linear fit (fixed JVM and data memory plus a cost per sequence)
+        is used, never below the largest peak of a batch at least as large.
+        """
+        if not self.memory_observations:
+            return self.cpu_cores_iprscan * MEMORY_PER_CORE_GB * GB
+        sizes = {size for size, _ in self.memory_observations}
+        if len(sizes) == 1:
+            size, peak = max(self.memory_observations, key=lambda observation: observation[1])
+            return peak * max(1.0, batch_size / max(size, 1))
+        n = len(self.memory_observations)
+        mean_size = sum(size for size, _ in self.memory_observations) / n
+        mean_peak = sum(peak for _, peak in self.memory_observations) / n
+        covariance = sum((size - mean_size) * (peak - mean_peak) for size, peak in self.memory_observations)
+        variance = sum((size - mean_size) ** 2 for size, _ in self.memory_observations)
+        slope = max(0.0, covariance / variance)
+        intercept = max(0.0, mean_peak - slope * mean_size)
+        floor = max((peak for size, peak in self.memory_observations if size >= batch_size), default=0)
+        return max(intercept + slope * batch_size, floor)
+
+    def next_batch_size(self) -> int:
+        """Batch size for the next launch: about target_batch_minutes of work, fitting the memory budget."""
+        if self.throughput is None:
+            size = self.initial_batch_size
+        else:
+            size = int(self.throughput * self.target_batch_minutes)
+        size = min(max(size, self.min_batch_size), self.max_batch_size)
+        while size > self.min_batch_size and self.job_memory(size) > self.memory_budget:
+            size = max(self.min_batch_size, size // 2)
+        return size
+
+    def allowed_jobs(self, batch_size: int) -> int:
+        """Number of concurrent batches of batch_size sequences fitting in memory and CPUs (at least 1)."""
+        memory_jobs = int(self.memory_budget // max(self.job_memory(batch_size), 1))
+        if self.cores_per_job is None:
+            jobs = min(self.initial_jobs, memory_jobs)
+        else:
+            cpu_jobs = int(self.total_cpus // self.cores_per_job)
+            jobs = min(cpu_jobs, memory_jobs)
+        return max(1, jobs)
+
+class ProcessTreeSampler:
+    """Samples RSS and CPU percent of a process and its descendants.
+    Keeps psutil.Process objects so CPU percentages are measured between samples."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._processes = {}
+
+    def sample(self) -> tuple[int, float]:
+        """Returns (RSS bytes, CPU percent) of the tree, (0, 0.0) once it's gone."""
+        try:
+            root = self._processes.setdefault(self.pid, psutil.Process(self.pid))
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0, 0.0
+        rss, cpu = 0, 0.0
+        for process in tree:
+            process = self._processes.setdefault(process.pid, process)
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent(interval=None)
+            except psutil.Error:
+                continue
+        return rss, cpu
+
+def kill_process_tree(process: subprocess.Popen) -> None:
+    """Kills a batch's run_iprscan.py process and its descendants (interproscan.sh and its Java workers)."""
+    try:
+        tree = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        tree = []
+    process.kill()
+    for child in tree:
+        try:
+            child.kill()
+        except psutil.Error:
+            continue
+    process.wait()
+
+def stop_running_batches(running: dict) -> None:
+    """Kills the process trees of all running batches, after a failed one."""
+    for other in running.values():
+        kill_process_tree(other["process"])
+        other["stderr"].close()
+
+def run_adaptive(
+    sequence_ids: list[str], make_command: Callable[[list[str], int], list],
+    controller: IprscanController, logger: logging.Logger,
+    poll_interval: float = 5.0) -> list[dict]:
+    """Runs InterProScan batches over sequence_ids, sized and launched as the controller allows.
+
+    Args:
+        sequence_ids: Sequences to scan, in order
+        make_command: Builds the run_iprscan.py command of a batch from its sequences and index
+        controller: Adaptive controller
+        logger: Logger instance
+        poll_interval: Seconds between samples of running batches
+
+    Returns:
+        list[dict]: One record per batch (index, sequences, seconds, peak RSS, mean CPU, jobs at launch)
+
+    Exits with code 1 if a batch fails or can't be launched, as run_command does in the executor,
+    killing the process trees of the batches still running.
+    """
+    pending = deque(sequence_ids)
+    running = {}
+    records = []
+    batch_idx = 1
+    while pending or running:
+        while pending:
+            batch_size = controller.next_batch_size()
+            jobs = controller.allowed_jobs(batch_size)
+            if len(running) >= jobs:
+                break
+            running_rss = sum(batch["last_rss"] for batch in running.values())
+            if running and running_rss + controller.job_memory(batch_size) > controller.memory_budget:
+                break
+            batch = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+            stderr = tempfile.TemporaryFile(mode="w+")
+            try:
+                process = subprocess.Popen(make_command(batch, batch_idx), stdout=subprocess.DEVNULL, stderr=stderr, text=True)
+            except OSError as e:
+                stderr.close()
+                logger.error("IPRSCAN_CONTROLLER --- LAUNCH --- Batch %d failed to launch: %s", batch_idx, e)
+                stop_running_batches(running)
+                sys.exit(1)
+            running[process.pid] = {
+                "process": process, "stderr": stderr, "sampler": ProcessTreeSampler(process.pid),
+                "index": batch_idx, "sequences": len(batch), "start": time.perf_counter(),
+                "peak_rss": 0, "last_rss": 0, "cpu_samples": [], "jobs": jobs,
+            }
+            logger.info(
+                "IPRSCAN_CONTROLLER --- LAUNCH --- Batch %d: %d sequences, %d running of %d allowed",
+                batch_idx, len(batch), len(running), jobs
+            )
+            batch_idx += 1
+
+        time.sleep(poll_interval)
+        for pid in list(running):
+            batch = running[pid]
+            rss, cpu = batch["sampler"].sample()
+            if rss:
+                batch["last_rss"] = rss
+                batch["peak_rss"] = max(batch["peak_rss"], rss)
+                batch["cpu_samples"].append(cpu)
+            returncode = batch["process"].poll()
+            if returncode is None:
+                continue
+            del running[pid]
+            elapsed = time.perf_counter() - batch["start"]
+            if returncode != 0:
+                batch["stderr"].seek(0)
+                logger.error(
+                    "IPRSCAN_CONTROLLER --- RUN --- Batch %d failed with return code %d\nSTDERR:\n%s",
+                    batch["index"], returncode, batch["stderr"].read()
+                )
+                stop_running_batches(running)
+                sys.exit(1)
+            batch["stderr"].close()
+            # The first CPU sample of each process is always 0.0
+            cpu_samples = batch["cpu_samples"][1:] or batch["cpu_samples"]
+            mean_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 0.0
+            controller.record(batch["sequences"], elapsed, batch["peak_rss"], mean_cpu)
+            records.append({
+                "batch": batch["index"], "sequences": batch["sequences"], "seconds": round(elapsed, 2),
+                "peak_rss_gb": round(batch["peak_rss"] / GB, 3), "mean_cpu_percent": round(mean_cpu, 1),
+                "jobs_at_launch": batch["jobs"],
+            })
+            logger.info(
+                "IPRSCAN_CONTROLLER --- RECORD --- Batch %d: %d sequences in %.1fs, peak RSS %.2fGB, "
+                "mean CPU %.0f%%. Next batch size %d",
+                batch["index"], batch["sequences"], elapsed, batch["peak_rss"] / GB, mean_cpu,
+                controller.next_batch_size()
+            )
+    return sorted(records, key=lambda record: record["batch"])
@@ -0,0 +1,127 @@
+"""
+iprscan_index.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module writes and reads the proteome-wide InterProScan match index
+(output_dir/iprscan_matches.sqlite), filled by run_iprscan.py as each batch finishes
+and queried by transfer_annotations.py for GO terms, instead of one iprscan.tsv per sequence.
+
+Each row holds the columns of a TSV line used in the pipeline: sequence ID, analysis,
+signature accession, InterPro accession, start and stop locations and the GO terms,
+already parsed into a "|"-separated string of GO IDs. Rows are indexed by sequence ID.
+"""
+
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+IPRSCAN_INDEX_FILENAME = "iprscan_matches.sqlite"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    seq_id TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    signature_accession TEXT NOT NULL,
+    interpro_accession TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL,
+    go_terms TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_seq_id ON matches (seq_id);
+"""
+
+# SQLite limits the number of host parameters per statement
+QUERY_BATCH_SIZE = 500
+
+def parse_go_column(go_column: str) -> str:
+    """Cleans a TSV GO Annotations column into "|"-separated GO IDs, e.g.
+    "GO:0005515(InterPro)|GO:0006302(PANTHER)" -> "GO:0005515|GO:0006302"."""
+    if not go_column or not go_column.strip() or go_column.strip() == "-":
+        return ""
+    return "|".join(term.split("(")[0].strip() for term in go_column.split("|") if term)
+
+def parse_tsv_line(line: str) -> Optional[tuple]:
+    """Parses an InterProScan TSV line into an index row, None for blank or malformed lines."""
+    columns = line.rstrip("\n").split("\t")
+    if len(columns) < 8:
+        return None
+    columns += [""] * (15 - len(columns))
+    try:
+        start, stop = int(columns[6]), int(columns[7])
+    except ValueError:
+        return None
+    return (columns[0], columns[3], columns[4], columns[11] or "-", start, stop, parse_go_column(columns[13]))
+
+def open_index(index_path: str) -> sqlite3.Connection:
+    """Opens (creating if needed) the match index.
+    WAL mode and a busy timeout let parallel batches write to the same index."""
+    connection = sqlite3.connect(index_path, timeout=300)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(INDEX_SCHEMA)
+    connection.commit()
+    return connection
+
+def index_sequence_lines(connection: sqlite3.Connection, sequence_lines: dict[str, list[str]]) -> int:
+    """Replaces the indexed matches of each sequence with its TSV lines.
+
+    Args:
+        connection: Open index connection
+        sequence_lines: {seq_id: [TSV lines]}, sequences without matches included with no lines
+
+    Returns:
+        int: Number of rows indexed
+    """
+    seq_ids = list(sequence_lines)
+    rows = [
+        row for lines in sequence_lines.values() for row in map(parse_tsv_line, lines)
+        if row is not None
+    ]
+    with connection:
+        for start in range(0, len(seq_ids), QUERY_BATCH_SIZE):
+            batch = seq_ids[start:start + QUERY_BATCH_SIZE]
+            connection.execute(f"DELETE FROM matches WHERE seq_id IN ({','.join('?' * len(batch))})", batch)
+        connection.executemany("INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+def load_sequence_matches(connection: sqlite3.Connection, seq_ids: Iterable[str]) -> dict[str, list[tuple]]:
+    """Loads the matches of the given sequences into memory.
+
+    Returns:
+        dict[str, list[tuple]]: {seq_id: [(analysis, signature_accession, interpro_accession,
+        start, stop, go_terms)]}, without sequences that have no indexed matches
+    """
+    unique_ids = list(dict.fromkeys(seq_ids))
+    matches = {}
+    for start in range(0, len(unique_ids), QUERY_BATCH_SIZE):
+        batch = unique_ids[start:start + QUERY_BATCH_SIZE]
+        rows = connection.execute(
+            "SELECT seq_id, analysis, signature_accession, interpro_accession, start, stop, go_terms "
+            f"FROM matches WHERE seq_id IN ({','.join('?' * len(batch))}) ORDER BY rowid",
+            batch
+        )
+        for seq_id, *row in rows:
+            matches.setdefault(seq_id, []).append(tuple(row))
+    return matches
+
+def open_iprscan_index(output_dir: str) -> Optional[sqlite3.Connection]:
+    """Opens output_dir/iprscan_matches.sqlite if present, None for outputs written without it."""
+    index_path = os.path.join(output_dir, IPRSCAN_INDEX_FILENAME)
+    if not os.path.isfile(index_path):
+        return None
+    return open_index(index_path)
@@ -0,0 +1,271 @@
+"""
+iprscan_splitters.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module splits InterProScan batch outputs (TSV, XML, JSON and GFF3) into
+one iprscan.<format> file per sequence directory, used by run_iprscan.py.
+
+Every splitter streams its input, so a batch document is never loaded whole:
+    - TSV: one pass over lines, keyed by the first column.
+    - XML: iterparse, writing each <protein> element once closed and then clearing it.
+    - JSON: incremental decoding of the "results" array, one protein object at a time.
+    - GFF3: one pass over lines, following ##sequence-region directives, feature seqids
+      and the trailing ##FASTA section.
+
+Proteins are assigned to sequences by their IDs (xref ids in XML and JSON),
+checked against a set of the batch's sequence IDs. Writes go through SequenceWriters,
+which buffers text per sequence and appends it to the files in large blocks.
+"""
+
+import os
+import re
+import json
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+JSON_CHUNK_SIZE = 1 << 20
+
+class SequenceWriters:
+    """Buffered writers of <parent_dir>/<sanitized seq_id>/<filename>, one per sequence.
+
+    Text is kept per sequence until it, or all buffers together, pass a size limit,
+    then appended to the file, so no file stays open and memory use is bounded.
+    A file is truncated the first time it's written to in a split.
+    """
+
+    def __init__(self, parent_dir: str, filename: str, buffer_size: int = 1 << 16, max_buffered: int = 1 << 23):
+        self.parent_dir = parent_dir
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.max_buffered = max_buffered
+        self._buffers = {}
+        self._sizes = {}
+        self._buffered = 0
+        self._started = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, seq_id: str, text: str) -> None:
+        """Buffers text for a sequence, flushing when past the limits."""
+        self._buffers.setdefault(seq_id, []).append(text)
+        self._sizes[seq_id] = self._sizes.get(seq_id, 0) + len(text)
+        self._buffered += len(text)
+        if self._sizes[seq_id] >= self.buffer_size:
+            self.flush(seq_id)
+        elif self._buffered >= self.max_buffered:
+            self.flush_all()
+
+    def flush(self, seq_id: str) -> None:
+        """Appends the buffered text of a sequence to its file."""
+        chunks = self._buffers.pop(seq_id, None)
+        if not chunks:
+            return
+        self._buffered -= self._sizes.pop(seq_id)
+        seq_dir = os.path.join(self.parent_dir, seq_id.replace("|", "-"))
+        os.makedirs(seq_dir, exist_ok=True)
+        mode = "a" if seq_id in self._started else "w"
+        with open(os.path.join(seq_dir, self.filename), mode, encoding="utf-8") as f:
+            f.write("".join(chunks))
+        self._started.add(seq_id)
+
+    def flush_all(self) -> None:
+        for seq_id in list(self._buffers):
+            self.flush(seq_id)
+
+    @property
+    def sequences_written(self) -> int:
+        return len(self._started)
+
+    def close(self) -> int:
+        """Flushes every buffer, returning the number of sequences written."""
+        self.flush_all()
+        return self.sequences_written
+
+def split_tsv(input_file: str, sequence_ids: set[str], parent_dir: str) -> int:
+    """Splits a batch TSV by its first column (protein accession).
+
+    Returns:
+        int: Number of sequences written
+    """
+    with SequenceWriters(parent_dir, "iprscan.tsv") as writers, \
+         open(input_file, "r", encoding="utf-8") as f:
+        for line in f:
+            seq_id = line.split("\t", 1)[0]
+            if seq_id in sequence_ids and line.strip():
+                writers.write(seq_id, line)
+    return writers.sequences_written
+
+def local_name(tag: str) -> str:
+    """Tag without its {namespace}."""
+    return tag.rsplit("}", 1)[-1]
+
+def split_xml(input_file: str, sequence_ids: set[str], parent_dir: str) -> int:
+    """Splits a batch XML by <protein> element, each written inside a copy of the root element.
+
+    Returns:
+        int: Number of sequences written
+    """
+    root = None
+    opening = closing = ""
+    written = set()
+    for event, elem in ET.iterparse(input_file, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                namespace = root.tag[1:].split("}", 1)[0] if root.tag.startswith("{") else ""
+                if namespace:
+                    ET.register_namespace("", namespace)
+                # Namespaced attributes (e.g. xsi:schemaLocation) are left out
+                attributes = "".join(
+                    f" {name}={quoteattr(value)}" for name, value in root.attrib.items() if not name.startswith("{")
+                )
+                xmlns = f' xmlns="{namespace}"' if namespace else ""
+                opening = f'<?xml version="1.0" encoding="UTF-8"?>\n<{local_name(root.tag)}{xmlns}{attributes}>\n'
+                closing = f"</{local_name(root.tag)}>\n"
+            continue
+        if local_name(elem.tag) != "protein":
+            continue
+        protein_ids = {child.get("id") for child in elem if local_name(child.tag) == "xref"}
+        matching_ids = protein_ids & sequence_ids
+        if matching_ids:
+            protein = ET.tostring(elem, encoding="unicode")
+            for seq_id in matching_ids:
+                seq_dir = os.path.join(parent_dir, seq_id.replace("|", "-"))
+                os.makedirs(seq_dir, exist_ok=True)
+                with open(os.path.join(seq_dir, "iprscan.xml"), "w", encoding="utf-8") as f:
+                    f.write(opening + protein + "\n" + closing)
+            written |= matching_ids
+        # Proteins are children of the root, keep it from growing
+        root.clear()
+    return len(written)
+
+def iter_json_results(input_file: str, chunk_size: int = JSON_CHUNK_SIZE):
+    """Yields the header (text before the "results" array) and then each object of the array,
+    reading the file in chunks.
+
+    Raises:
+        ValueError: If the file has no "results" array or ends inside it
+    """
+    decoder = json.JSONDecoder()
+    with open(input_file, "r", encoding="utf-8") as f:
+        buffer = ""
+        while True:
+            match = re.search(r'"results"\s*:\s*\[', buffer)
+            if match:
+                yield buffer[:match.start()]
+                buffer = buffer[match.end():]
+                break
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"No results array in {input_file}")
+            buffer += chunk
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                if position == len(buffer):
+                    raise json.JSONDecodeError("Incomplete", buffer, position)
+                result, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Unterminated results array in {input_file}")
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield result
+
+def split_json(input_file: str, sequence_ids: set[str], parent_dir: str) -> int:
+    """Splits a batch JSON by object of its "results" array, keeping the InterProScan version.
+
+    Returns:
+        int: Number of sequences written
+    """
+    results = iter_json_results(input_file)
+    version = re.search(r'"interproscan-version"\s*:\s*"([^"]*)"', next(results))
+    header = {"interproscan-version": version.group(1)} if version else {}
+    written = set()
+    for result in results:
+        matching_ids = {xref.get("id") for xref in result.get("xref", [])} & sequence_ids
+        for seq_id in matching_ids:
+            seq_dir = os.path.join(parent_dir, seq_id.replace("|", "-"))
+            os.makedirs(seq_dir, exist_ok=True)
+            with open(os.path.join(seq_dir, "iprscan.json"), "w", encoding="utf-8") as f:
+                json.dump({**header, "results": [result]}, f)
+        written |= matching_ids
+    return len(written)
+
+def split_gff3(input_file: str, sequence_ids: set[str], parent_dir: str) -> int:
+    """Splits a batch GFF3 by sequence, repeating the file header directives in each output.
+
+    Returns:
+        int: Number of sequences written
+    """
+    header = []
+    in_header = True
+    in_fasta = False
+    fasta_id = None
+    with SequenceWriters(parent_dir, "iprscan.gff3") as writers, \
+         open(input_file, "r", encoding="utf-8") as f:
+        started = set()
+        for line in f:
+            if in_fasta:
+                if line.startswith(">"):
+                    fasta_id = line[1:].split(maxsplit=1)[0] if line[1:].strip() else None
+                    if fasta_id in sequence_ids:
+                        if fasta_id not in started:
+                            writers.write(fasta_id, "".join(header))
+                            started.add(fasta_id)
+                        writers.write(fasta_id, "##FASTA\n")
+                if fasta_id in sequence_ids:
+                    writers.write(fasta_id, line)
+            elif line.startswith("##FASTA"):
+                in_fasta = True
+            elif line.startswith("##sequence-region"):
+                in_header = False
+                fields = line.split()
+                seq_id = fields[1] if len(fields) > 1 else None
+                if seq_id in sequence_ids:
+                    if seq_id not in started:
+                        writers.write(seq_id, "".join(header))
+                        started.add(seq_id)
+                    writers.write(seq_id, line)
+            elif line.startswith("#"):
+                if in_header:
+                    header.append(line)
+            elif line.strip():
+                seq_id = line.split("\t", 1)[0]
+                if seq_id in sequence_ids:
+                    writers.write(seq_id, line)
+    return writers.sequences_written
+
+SPLITTERS = {
+    "tsv": split_tsv,
+    "xml": split_xml,
+    "json": split_json,
+    "gff3": split_gff3,
+}
@@ -0,0 +1,171 @@
+"""
+merge_hmmsearch_shards.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script merges the outputs of sharded run_hmmsearch.py invocations (--shard K/N)
+into the regular hmmsearch_per_domain.json, hmmsearch_sequences.json and
+hmmsearch_sequences.txt files, as if hmmsearch had been run in a single process.
+
+The merge is deterministic: domains are written in sorted accession order and,
+within a domain, sequences are ordered by descending bit score and then by name.
+Since each (domain, sequence) pair is produced by exactly one shard, the hits of a pair
+keep the order in which the shard reported them.
+
+Required command-line arguments:
+- output-dir: Directory where the merged outputs are written
+
+Optional command-line arguments:
+- shard-dir: Directory holding the shard outputs (default: the output directory)
+- log: Log file path
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import logging
+from run_hmmsearch import write_hmmsearch_outputs, sort_hits_per_domain
+from utils import get_logger
+
+SHARD_FILE_PATTERN = re.compile(r"^hmmsearch_sequences\.shard_(\d+)_of_(\d+)\.json$")
+
+def parse_arguments():
+    """Parse command-line arguments for merging hmmsearch shard outputs.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description=
+    "Merges run_hmmsearch.py shard outputs into hmmsearch_per_domain.json \
+    and hmmsearch_sequences.json/txt.")
+    parser.add_argument("-o", "--output-dir", help="Output dir path", required=True, type=str)
+    parser.add_argument("-sd", "--shard-dir", help="Directory with shard outputs, defaults to the output dir",
+                        required=False, type=str, default=None)
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/merge_hmmsearch_shards.log")
+    return parser.parse_args()
+
+def find_shard_outputs(shard_dir: str) -> list[tuple[str, str]]:
+    """Finds and validates the shard outputs in a directory.
+
+    All shards must share the same shard count, split mode, cutoffs and database size,
+    and every index from 1 to N must be present exactly once.
+
+    Args:
+        shard_dir: Directory holding the shard outputs
+
+    Returns:
+        list[tuple[str, str]]: (sequences_json, per_domain_json) paths ordered by shard index
+
+    Raises:
+        ValueError: If no shards are found or the shard set is incomplete or inconsistent
+    """
+    shards = {}
+    shard_counts = set()
+    for filename in os.listdir(shard_dir):
+        match = SHARD_FILE_PATTERN.match(filename)
+        if match:
+            shard_index, shard_count = int(match.group(1)), int(match.group(2))
+            shards[shard_index] = filename
+            shard_counts.add(shard_count)
+
+    if not shards:
+        raise ValueError(f"No hmmsearch shard outputs found in {shard_dir}")
+    if len(shard_counts) > 1:
+        raise ValueError(f"Shard outputs from runs with different shard counts found in {shard_dir}: {sorted(shard_counts)}")
+
+    shard_count = shard_counts.pop()
+    missing = sorted(set(range(1, shard_count + 1)) - set(shards))
+    if missing:
+        raise ValueError(f"Missing hmmsearch shards {missing} of {shard_count} in {shard_dir}")
+
+    shard_paths = []
+    run_settings = set()
+    for shard_index in range(1, shard_count + 1):
+        sequences_json = os.path.join(shard_dir, shards[shard_index])
+        per_domain_json = os.path.join(shard_dir, f"hmmsearch_per_domain.shard_{shard_index}_of_{shard_count}.json")
+        if not os.path.isfile(per_domain_json):
+            raise ValueError(f"Missing per domain output for shard {shard_index} of {shard_count}: {per_domain_json}")
+        with open(sequences_json, "r", encoding="utf-8") as f:
+            shard_info = json.load(f).get("shard", {})
+        run_settings.add((shard_info.get("by"), shard_info.get("database_size"), shard_info.get("bit_cutoffs")))
+        shard_paths.append((sequences_json, per_domain_json))
+
+    if len(run_settings) > 1:
+        raise ValueError(f"Shards were run with different settings (by, database_size, bit_cutoffs): {sorted(run_settings, key=str)}")
+
+    return shard_paths
+
+def merge_shard_hits(shard_paths: list[tuple[str, str]]) -> tuple[dict, set]:
+    """Merges shard hits into a single {pfam_id: {seq_id: [{seq_hits_data}]}} dictionary.
+
+    Args:
+        shard_paths: (sequences_json, per_domain_json) paths for every shard
+
+    Returns:
+        tuple[dict, set]: (hits_per_domain, hit_sequences)
+
+    Raises:
+        ValueError: If the same domain-sequence pair is reported by more than one shard
+    """
+    merged = {}
+    hit_sequences = set()
+    for sequences_json, per_domain_json in shard_paths:
+        with open(sequences_json, "r", encoding="utf-8") as f:
+            hit_sequences.update(json.load(f)["sequences"])
+        with open(per_domain_json, "r", encoding="utf-8") as f:
+            shard_hits = json.load(f)
+        for accession, sequences in shard_hits.items():
+            domain_hits = merged.setdefault(accession, {})
+            for seq_id, hits in sequences.items():
+                if seq_id in domain_hits:
+                    raise ValueError(f"Domain {accession} - sequence {seq_id} pair found in more than one shard")
+                domain_hits[seq_id] = hits
+
+    return sort_hits_per_domain(merged), hit_sequences
+
+def merge_hmmsearch_shards(shard_dir: str, output_dir: str, logger: logging.Logger) -> None:
+    """Finds, validates and merges shard outputs, writing the regular hmmsearch outputs.
+
+    Args:
+        shard_dir: Directory holding the shard outputs
+        output_dir: Directory where merged outputs are written
+        logger: Logger instance for tracking execution
+    """
+    shard_paths = find_shard_outputs(shard_dir)
+    logger.info("MERGE_HMMSEARCH_SHARDS --- Merging %d shards from %s", len(shard_paths), shard_dir)
+    hits_per_domain, hit_sequences = merge_shard_hits(shard_paths)
+    os.makedirs(output_dir, exist_ok=True)
+    write_hmmsearch_outputs(hits_per_domain, hit_sequences, output_dir, logger)
+    logger.info("MERGE_HMMSEARCH_SHARDS --- Merged %d domains and %d hit sequences", len(hits_per_domain), len(hit_sequences))
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    shard_dir = args.shard_dir or args.output_dir
+    logger.info("MERGE_HMMSEARCH_SHARDS --- MAIN --- Running with arguments: %s", args)
+    try:
+        merge_hmmsearch_shards(shard_dir, args.output_dir, logger)
+    except ValueError as e:
+        logger.error("MERGE_HMMSEARCH_SHARDS --- MAIN --- %s", e)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -25,12 +25,16 @@ The main function:
 merge_sequences - combines a sequence's domain reports into a single JSON with structure:
 report[sequence][domain] = {<pair's data>} and stores as aggregated_report.json in the sequence directory.
 
+merge_domain_chunk_reports, called by the executor, joins the PF*_chunk<N>_report.json files
+written for chunks of large domains (see run_hmmalign.py --chunk-size) into the domain's PF*_report.json.
+
 Required command-line arguments:
 - sequence: Sequence identifier for scoped logging
 - sequence-dir: Path to the sequence directory containing PF*_report.json files
 """
 
 import os
+import glob
 import argparse
 import logging
 import json
@@ -94,6 +98,26 @@ def merge_sequences(sequence_dir: str, multi_logger: Callable, logger: logging.L
 
     return aggregated_report_path
 
+def merge_domain_chunk_reports(domain_dir: str, pfam_id: str) -> str:
+    """Merges a domain's PF*_chunk<N>_report.json files into PF*_report.json, removing them.
+    Chunks hold disjoint targets, so their "sequences" are joined as they are.
+    Returns the path to the merged report, "" if the domain had no chunk reports."""
+    chunk_reports = sorted(glob.glob(os.path.join(domain_dir, f"{pfam_id}_chunk*_report.json")))
+    if not chunk_reports:
+        return ""
+
+    sequences = {}
+    for chunk_report in chunk_reports:
+        with open(chunk_report, 'r', encoding='utf-8') as report_file:
+            sequences.update(json.load(report_file)["sequences"])
+
+    domain_report_path = os.path.join(domain_dir, f"{pfam_id}_report.json")
+    with open(domain_report_path, "w", encoding="utf-8") as report_file:
+        json.dump({"domain_id": pfam_id, "sequences": sequences}, report_file, indent=4)
+    for chunk_report in chunk_reports:
+        os.remove(chunk_report)
+    return domain_report_path
+
 def main():
     """Main function, initializes this script"""
     args = parse_arguments()
@@ -0,0 +1,116 @@
+"""
+minimal_seed.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script derives, once per resource release, a reduced seed alignment for each family:
+resource_dir/PF*/alignment.minimal.seed, with only the seed rows transfer_annotations.py
+reads (rows of sequences in annotations.json and the conservation reference row of
+conservations.json), in the original seed columns, plus the #=GC RF line if present.
+
+Because columns are kept as in alignment.seed, the HMM MAP annotation still places every
+residue on its match state. run_hmmalign.py uses the minimal seed when present: targets are
+aligned to the HMM alone and the minimal seed rows are placed on the same states, since
+hmmalign --mapali only accepts the exact seed the HMM was built from. Alignments then carry
+a handful of seed rows instead of the whole seed.
+
+Usage:
+    python minimal_seed.py -r resources -t 8
+"""
+
+import os
+import argparse
+import logging
+from typing import Optional
+from joblib import Parallel, delayed
+from hmm_states import MINIMAL_SEED_FILENAME, read_seed_alignment
+from seed_states import read_json_keys, select_reference_rows
+from utils import get_logger
+
+def parse_arguments():
+    """Parse command-line arguments for writing minimal seed alignments
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Writes resource_dir/PF*/alignment.minimal.seed for every family")
+    parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
+    parser.add_argument("-d", "--domains", help="Only these families", nargs="*", default=[])
+    parser.add_argument("-t", "--threads", help="Families processed at once", required=False, type=int, default=1)
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/minimal_seed.log")
+    return parser.parse_args()
+
+def write_minimal_seed(family_dir: str) -> Optional[tuple[int, int]]:
+    """Writes a family's alignment.minimal.seed.
+
+    Args:
+        family_dir: resource_dir/PF* directory with alignment.seed
+
+    Returns:
+        Optional[tuple[int, int]]: (rows kept, rows in the seed), None if the family has no seed
+    """
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    if not os.path.isfile(seed_path):
+        return None
+    seed_rows, reference = read_seed_alignment(seed_path)
+    selected = select_reference_rows(
+        list(seed_rows),
+        read_json_keys(os.path.join(family_dir, "annotations.json")),
+        read_json_keys(os.path.join(family_dir, "conservations.json")),
+    )
+    name_width = max([len(name) for name in selected] + [len("#=GC RF")]) + 1
+    minimal_seed_path = os.path.join(family_dir, MINIMAL_SEED_FILENAME)
+    with open(f"{minimal_seed_path}.tmp", "w", encoding="utf-8") as f:
+        f.write("# STOCKHOLM 1.0\n\n")
+        for name in selected:
+            f.write(f"{name.ljust(name_width)}{seed_rows[name]}\n")
+        if reference:
+            f.write(f"{'#=GC RF'.ljust(name_width)}{reference}\n")
+        f.write("//\n")
+    os.replace(f"{minimal_seed_path}.tmp", minimal_seed_path)
+    return len(selected), len(seed_rows)
+
+def write_all_minimal_seeds(resource_dir: str, logger: logging.Logger, domains: list[str] = None, threads: int = 1) -> dict[str, tuple[int, int]]:
+    """Writes alignment.minimal.seed for every family (or the given ones) of resource_dir.
+
+    Returns:
+        dict[str, tuple[int, int]]: {family: (rows kept, rows in the seed)}
+    """
+    families = domains or sorted(
+        entry.name for entry in os.scandir(resource_dir) if entry.is_dir() and entry.name.startswith("PF")
+    )
+    written = Parallel(n_jobs=threads)(
+        delayed(write_minimal_seed)(os.path.join(resource_dir, family)) for family in families
+    )
+    row_counts = {family: rows for family, rows in zip(families, written) if rows is not None}
+    logger.info(
+        "MINIMAL_SEED --- WRITE --- Wrote %s for %d families, keeping %d of %d seed rows",
+        MINIMAL_SEED_FILENAME, len(row_counts),
+        sum(kept for kept, _ in row_counts.values()), sum(total for _, total in row_counts.values())
+    )
+    return row_counts
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("MINIMAL_SEED --- MAIN --- Running with arguments: %s", args)
+    write_all_minimal_seeds(args.resource_dir, logger, args.domains, args.threads)
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,12 @@ and the paths to the resource directory and output directory.
 If so, call prep_domain_fasta.
 
 2 - prep_domain_fasta - Accesses the JSON in search of the given accession and makes a multifasta with all hits contained in it.
+If the hmmsearch_hits columnar table is given (--hits-table), only the domain's rows are read from it instead.
+
+3 - prep_all_domain_fastas (--all-domains) - Reads the hits once and writes the multifasta and
+domain_info.json of every domain that passes can_run_hmmalign, used by the executor instead of
+one process per domain. FASTAs are written through DomainFastaWriters, which keeps a bounded
+number of files open.
 
 Obs.: It'll make a subdir for each valid domain in the output directory. Also, it'll put the substring
 "target/" between target_seq_name and ali range to facilitate parsing in the transfer_annotations step:
@@ -38,7 +44,10 @@ import os
 import json
 import argparse
 import logging
-from typing import Any, Callable
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional
+from hits_table import HitsTable
+from resource_manifest import ResourceManifest, load_resource_manifest
 from utils import get_logger, get_multi_logger
 # from modules.decorators import measure_time_and_memory
 
@@ -53,18 +62,31 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description=
     'Generates a temporary multifasta for running hmmalign using a hits per domain JSON.')
     parser.add_argument("-iJ", "--per-dom-json", help="Path to hits per domain json", required=True, type=str)
-    parser.add_argument("-iD", "--domain-accession", help="The domain Pfam accession you're prepping for", required=True, type=str)
+    parser.add_argument("-iD", "--domain-accession", help="The domain Pfam accession you're prepping for", required=False, type=str)
+    parser.add_argument("-a", "--all-domains", action="store_true",
+        help="Prepare every domain with resources in one pass over the hits, instead of --domain-accession")
+    parser.add_argument("-mF", "--max-open-files", help="All domains mode: maximum FASTA files open at once",
+        required=False, type=int, default=64)
     parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
     parser.add_argument("-o", "--output-dir", help="Output dir path", required=True, type=str)
+    parser.add_argument("-iT", "--hits-table", help="Optional: path to the hmmsearch_hits columnar table, \
+        read instead of the hits per domain json", required=False, type=str, default=None)
     parser.add_argument("-l", "--log", help="Log path", \
         required=False, type=str, default="logs/prepare_fasta_per_domain.log")
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.domain_accession and not args.all_domains:
+        parser.error("One of --domain-accession or --all-domains is required")
+    return args
 
-def can_run_hmmalign(dom_accession: str, resource_dir: str, output_dir: str) -> dict[str, Any]:
+def can_run_hmmalign(
+    dom_accession: str, resource_dir: str, output_dir: str,
+    manifest: Optional[ResourceManifest] = None) -> dict[str, Any]:
     """
     For a given domain accession, checks if the necessary resource files are present.
     Required: HMM file and seed alignment
     Optional but need at least one: conservations or annotations file
+    With a resource manifest (see resource_manifest.py), files it lists are taken as
+    present without checking the filesystem.
     """
     if '.' in dom_accession:
         dom_accession = dom_accession.split('.')[0]
@@ -75,49 +97,191 @@ def can_run_hmmalign(dom_accession: str, resource_dir: str, output_dir: str) ->
     annotations_file_path = os.path.join(resource_dir, dom_accession, "annotations.json")
     pfam_id_hmmaligned = os.path.join(output_dir, dom_accession, dom_accession + "_hmmalign.sth")
 
+    if manifest is not None:
+        present = {path for path in [hmm_file_path, seed_alignment_path, conservations_file_path, annotations_file_path]
+                   if manifest.has_file(dom_accession, os.path.basename(path))}
+    else:
+        present = {path for path in [hmm_file_path, seed_alignment_path, conservations_file_path, annotations_file_path]
+                   if os.path.isfile(path)}
+
     # Required files check
-    required_files_exist = (os.path.isfile(hmm_file_path) and
-                          os.path.isfile(seed_alignment_path))
+    required_files_exist = hmm_file_path in present and seed_alignment_path in present
 
     # At least one optional file must exist
-    optional_file_exists = (os.path.isfile(conservations_file_path) or
-                          os.path.isfile(annotations_file_path))
+    optional_file_exists = conservations_file_path in present or annotations_file_path in present
 
     domain_run_info = {
         "can_align": required_files_exist and optional_file_exists,
-        "hmm_file": hmm_file_path if os.path.isfile(hmm_file_path) else None,
-        "seed_alignment": seed_alignment_path if os.path.isfile(seed_alignment_path) else None,
-        "conservations": conservations_file_path if os.path.isfile(conservations_file_path) else None,
-        "annotations": annotations_file_path if os.path.isfile(annotations_file_path) else None,
+        "hmm_file": hmm_file_path if hmm_file_path in present else None,
+        "seed_alignment": seed_alignment_path if seed_alignment_path in present else None,
+        "conservations": conservations_file_path if conservations_file_path in present else None,
+        "annotations": annotations_file_path if annotations_file_path in present else None,
         "pfam_id_hmmaligned": pfam_id_hmmaligned
     }
     return domain_run_info
 
-def prep_domain_fasta(per_dom_json: str, dom_accession: str, output_dir: str, domain_logger: logging.Logger, multi_logger: Callable) -> (str | None):
+def hit_fasta_record(hit: dict) -> str:
+    """FASTA record of a hit, with "target/" between the target name and its ali range."""
+    return f">{hit.get('target_seq_name', '')}target/{hit.get('ali_range', '')}\n{hit.get('subseq', '')}\n"
+
+class DomainFastaWriters:
+    """Writers of <output_dir>/<accession>/<accession>_hits.fasta, keeping at most max_open_files open.
+    When another file is needed, the least recently used one is closed, and reopened for appending
+    if that domain has more hits."""
+
+    def __init__(self, output_dir: str, max_open_files: int = 64):
+        self.output_dir = output_dir
+        self.max_open_files = max(1, max_open_files)
+        self._handles = OrderedDict()
+        self.paths = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, accession: str, text: str) -> None:
+        handle = self._handles.get(accession)
+        if handle is None:
+            if len(self._handles) >= self.max_open_files:
+                _, oldest = self._handles.popitem(last=False)
+                oldest.close()
+            if accession not in self.paths:
+                domain_dir = os.path.join(self.output_dir, accession)
+                os.makedirs(domain_dir, exist_ok=True)
+                self.paths[accession] = os.path.join(domain_dir, f"{accession}_hits.fasta")
+                handle = open(self.paths[accession], "w", encoding="utf-8")
+            else:
+                handle = open(self.paths[accession], "a", encoding="utf-8")
+            self._handles[accession] = handle
+        else:
+            self._handles.move_to_end(accession)
+        handle.write(text)
+
+    def close(self) -> dict[str, str]:
+        """Closes every open file, returning {accession: FASTA path} of the domains written."""
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            handle.close()
+        return self.paths
+
+def iter_domain_hits(per_dom_json: str, accessions: list[str], hits_table: Optional[HitsTable] = None) -> Iterator[tuple[str, dict]]:
+    """Yields (accession, hit) for the given domains, reading the hits JSON once,
+    or only the rows of these domains from the hits table."""
+    if hits_table is not None:
+        for accession in accessions:
+            for sequence_hits in hits_table.domain_hits(accession).values():
+                for hit in sequence_hits:
+                    yield accession, hit
+        return
+    with open(per_dom_json, "r", encoding="utf-8") as f:
+        hits = json.load(f)
+    for accession in accessions:
+        for sequence_hits in hits.get(accession, {}).values():
+            for hit in sequence_hits:
+                yield accession, hit
+
+def write_domain_info(
+    domain_info: dict, dom_fasta_path: str, dom_accession: str, output_dir: str,
+    logger: logging.Logger, multi_logger: Callable) -> Optional[str]:
+    """Writes <output_dir>/<dom_accession>/domain_info.json with the domain's FASTA path."""
+    domain_info['dom_fasta'] = dom_fasta_path
+    output_json_path = os.path.join(output_dir, dom_accession, 'domain_info.json')
+    os.makedirs(os.path.dirname(output_json_path), exist_ok=True)
+    try:
+        with open(output_json_path, 'w', encoding='utf-8') as f:
+            json.dump(domain_info, f, indent=4)
+        logger.info("PREPARE_FASTA_PER_DOMAIN --- Information for  %s was written to %s", dom_accession, output_json_path)
+        return output_json_path
+    except IOError as e:
+        multi_logger("error", "PREPARE_FASTA_PER_DOMAIN --- Error writing domain info to %s: %s", output_json_path, e)
+        return None
+
+def prep_all_domain_fastas(
+    per_dom_json: str, resource_dir: str, output_dir: str, logger: logging.Logger,
+    multi_logger: Callable, hits_table: Optional[str] = None, max_open_files: int = 64) -> dict[str, str]:
+    """
+    Writes the hits FASTA and domain_info.json of every domain with the resources
+    can_run_hmmalign requires, in one pass over the hits per domain JSON (or the hits table).
+
+    Args:
+        per_dom_json: Path to hmmsearch_per_domain.json
+        resource_dir: Resource dir path
+        output_dir: Output dir path, where each domain's subdirectory is made
+        logger: Logger for info messages
+        multi_logger: Callable for warning+ messages
+        hits_table: Optional path to the hmmsearch_hits table, read instead of the JSON
+        max_open_files: Maximum FASTA files open at once
+
+    Returns:
+        dict[str, str]: {accession: domain_info.json path} of the prepared domains
+    """
+    table = HitsTable(hits_table) if hits_table else None
+    try:
+        if table is not None:
+            accessions = table.accessions
+        else:
+            with open(per_dom_json, 'r', encoding='utf-8') as f:
+                accessions = list(json.load(f))
+    except IOError as e:
+        multi_logger("error", "PREPARE_FASTA_PER_DOMAIN --- Error opening or reading file %s: %s", hits_table or per_dom_json, e)
+        return {}
+
+    manifest = load_resource_manifest(resource_dir, logger)
+    domain_infos = {}
+    for accession in accessions:
+        domain_info = can_run_hmmalign(accession, resource_dir, output_dir, manifest)
+        if domain_info['can_align']:
+            domain_infos[accession] = domain_info
+    logger.info(
+        "PREPARE_FASTA_PER_DOMAIN --- %d of %d domains have the required resource files",
+        len(domain_infos), len(accessions)
+    )
+
+    with DomainFastaWriters(output_dir, max_open_files) as writers:
+        for accession, hit in iter_domain_hits(per_dom_json, list(domain_infos), table):
+            writers.write(accession, hit_fasta_record(hit))
+    fasta_paths = writers.paths
+
+    prepared = {}
+    for accession, domain_info in domain_infos.items():
+        if accession not in fasta_paths:
+            multi_logger("warning", "PREPARE_FASTA_PER_DOMAIN --- No hits found for domain %s", accession)
+            continue
+        info_path = write_domain_info(domain_info, fasta_paths[accession], accession, output_dir, logger, multi_logger)
+        if info_path:
+            prepared[accession] = info_path
+    logger.info("PREPARE_FASTA_PER_DOMAIN --- Prepared FASTA and domain info for %d domains", len(prepared))
+    return prepared
+
+def prep_domain_fasta(
+    per_dom_json: str, dom_accession: str, output_dir: str, domain_logger: logging.Logger,
+    multi_logger: Callable, hits_table: Optional[str] = None) -> (str | None):
     """
     Loads a hits per domain JSON and searches for a target domain by its accession to
     generate a FASTA containing its hits across all sequences.
+    With hits_table, only the domain's rows of the columnar hits table are read instead.
     Each domain's files are stored in a domain subdirectory within the output directory.
     """
-    fasta_data = ""
+    fasta_lines = []
+    source = hits_table or per_dom_json
     try:
-        with open(per_dom_json, 'r', encoding='utf-8') as f:
-            hits = json.load(f)
+        if hits_table:
+            hits = {dom_accession: HitsTable(hits_table).domain_hits(dom_accession)}
+        else:
+            with open(per_dom_json, 'r', encoding='utf-8') as f:
+                hits = json.load(f)
     except IOError as e:
-        multi_logger("error", "PREPARE_FASTA_PER_DOMAIN --- Error opening or reading file %s: %s", per_dom_json, e)
+        multi_logger("error", "PREPARE_FASTA_PER_DOMAIN --- Error opening or reading file %s: %s", source, e)
         return None
 
     domain_logger.info("PREPARE_FASTA_PER_DOMAIN --- Preparing fasta for domain %s", dom_accession)
 
-    for accession, sequences in hits.items():
-        if accession == dom_accession:
-            for sequence_hits in sequences.values():
-                for hit in sequence_hits:
-                    subseq = hit.get('subseq', '')
-                    ali_range = hit.get('ali_range', '')
-                    target_seq_name = hit.get('target_seq_name', '')
-                    header = f">{target_seq_name}target/{ali_range}"
-                    fasta_data += f"{header}\n{subseq}\n"
+    for sequence_hits in hits.get(dom_accession, {}).values():
+        for hit in sequence_hits:
+            fasta_lines.append(hit_fasta_record(hit))
+    fasta_data = "".join(fasta_lines)
 
     if not fasta_data:
         multi_logger("warning", "PREPARE_FASTA_PER_DOMAIN --- No hits found for domain %s", dom_accession)
@@ -148,24 +312,24 @@ def main():
     log_path = args.log
 
     main_logger, _ = get_logger(log_path, scope="main")
+    if args.all_domains:
+        main_logger.info("PREPARE_FASTA_PER_DOMAIN --- Running prepare_fasta_per_domain for all domains with arguments: %s", args)
+        prep_all_domain_fastas(
+            per_dom_json, resource_dir, output_dir, main_logger, get_multi_logger([main_logger]),
+            args.hits_table, args.max_open_files
+        )
+        return
+
     domain_logger, _ = get_logger(log_path, scope="domain", identifier=dom_accession)
     log_to_both = get_multi_logger([main_logger, domain_logger])
 
     domain_logger.info("PREPARE_FASTA_PER_DOMAIN --- Running prepare_fasta_per_domain with arguments: %s", args)
 
-    domain_info = can_run_hmmalign(dom_accession, resource_dir, output_dir)
+    domain_info = can_run_hmmalign(dom_accession, resource_dir, output_dir, load_resource_manifest(resource_dir, domain_logger))
     if domain_info['can_align']:
-        dom_fasta_path = prep_domain_fasta(per_dom_json, dom_accession, output_dir, domain_logger, log_to_both)
+        dom_fasta_path = prep_domain_fasta(per_dom_json, dom_accession, output_dir, domain_logger, log_to_both, args.hits_table)
         if dom_fasta_path:
-            domain_info['dom_fasta'] = dom_fasta_path
-            output_json_path = os.path.join(output_dir, dom_accession, 'domain_info.json')
-            os.makedirs(os.path.dirname(output_json_path), exist_ok=True)
-            try:
-                with open(output_json_path, 'w', encoding='utf-8') as f:
-                    json.dump(domain_info, f, indent=4)
-                domain_logger.info("PREPARE_FASTA_PER_DOMAIN --- Information for  %s was written to %s", dom_accession, output_json_path)
-            except IOError as e:
-                log_to_both("error", "PREPARE_FASTA_PER_DOMAIN --- Error writing domain info to %s: %s", output_json_path, e)
+            write_domain_info(domain_info, dom_fasta_path, dom_accession, output_dir, domain_logger, log_to_both)
     else:
         log_to_both("warning", "PREPARE_FASTA_PER_DOMAIN --- Missing required files for domain %s", dom_accession)
 
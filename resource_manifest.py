@@ -0,0 +1,282 @@
+"""
+resource_manifest.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script builds and verifies resource_dir/resource_manifest.json, a listing of the files
+(size and SHA-256) of each Pfam family directory and of mappings/, built once per resource
+release. prepare_fasta_per_domain.py, transfer_annotations.py and the executor read it
+into memory instead of checking each family's files on the filesystem, which adds up to
+thousands of stat calls on network filesystems.
+
+The manifest holds a checksum of its own listing, checked when loading: a manifest that
+doesn't match it (e.g. edited by hand or truncated) is ignored, and files are checked
+on the filesystem as before. Loading also lists resource_dir once (a single directory
+read) and ignores, with a warning, a manifest whose family directories differ from it,
+as when families were added or removed after it was built. Files a manifest doesn't list
+are still looked up on the filesystem, so files added to a family later aren't missed;
+only files it lists skip the filesystem. Run verify to catch changed or removed files.
+
+Usage:
+    python resource_manifest.py build -r resources -pR 37.0 -t 8
+    python resource_manifest.py verify -r resources
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import datetime
+import logging
+from typing import Optional
+from joblib import Parallel, delayed
+from utils import get_logger
+
+RESOURCE_MANIFEST_FILENAME = "resource_manifest.json"
+MAPPINGS_DIRNAME = "mappings"
+HASH_CHUNK_SIZE = 1 << 20
+
+# Loaded manifests per path, with the (mtime, size) they were loaded at
+_LOADED_MANIFESTS = {}
+
+def parse_arguments():
+    """Parse command-line arguments for building or verifying a resource manifest
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Builds or verifies resource_dir/resource_manifest.json")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    build_parser = subparsers.add_parser("build")
+    build_parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
+    build_parser.add_argument("-pR", "--pfam-release", help="Pfam release of the resources, e.g. 37.0",
+                              required=False, type=str, default="")
+    build_parser.add_argument("--no-hashes", action="store_true", help="List files and sizes without SHA-256 hashes")
+    build_parser.add_argument("-t", "--threads", help="Threads for hashing files", required=False, type=int, default=1)
+
+    verify_parser = subparsers.add_parser("verify")
+    verify_parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
+    verify_parser.add_argument("-t", "--threads", help="Threads for hashing files", required=False, type=int, default=1)
+
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/resource_manifest.log")
+    return parser.parse_args()
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def listing_checksum(families: dict, mappings: dict) -> str:
+    """SHA-256 of the canonical JSON of the listing, stored in and checked against the manifest."""
+    canonical = json.dumps({"families": families, "mappings": mappings}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def list_directory(directory: str) -> dict[str, int]:
+    """Returns {filename: size} of the regular files in a directory."""
+    with os.scandir(directory) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+def build_manifest(resource_dir: str, logger: logging.Logger, hashes: bool = True,
+                   pfam_release: str = "", threads: int = 1) -> dict:
+    """Lists the files of every family directory (and mappings/) in resource_dir.
+
+    Args:
+        resource_dir: Resource dir path
+        logger: Logger instance
+        hashes: Whether to compute the SHA-256 of every file
+        pfam_release: Optional release label stored in the manifest
+        threads: Threads for hashing files
+
+    Returns:
+        dict: Manifest content, {"families": {family: {filename: {"size", "sha256"}}},
+        "mappings": {filename: {...}}, "checksum", ...}
+    """
+    listings = {}
+    with os.scandir(resource_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                listings[entry.name] = list_directory(entry.path)
+
+    file_keys = [(name, filename) for name, files in sorted(listings.items()) for filename in sorted(files)]
+    if hashes:
+        digests = Parallel(n_jobs=threads, prefer="threads")(
+            delayed(file_sha256)(os.path.join(resource_dir, name, filename)) for name, filename in file_keys
+        )
+    else:
+        digests = [None] * len(file_keys)
+
+    entries = {}
+    for (name, filename), digest in zip(file_keys, digests):
+        file_entry = {"size": listings[name][filename]}
+        if digest is not None:
+            file_entry["sha256"] = digest
+        entries.setdefault(name, {})[filename] = file_entry
+    for name, files in listings.items():
+        if not files:
+            entries.setdefault(name, {})
+
+    mappings = entries.pop(MAPPINGS_DIRNAME, {})
+    families = dict(sorted(entries.items()))
+    logger.info(
+        "RESOURCE_MANIFEST --- BUILD --- Listed %d files in %d family directories and %d mapping files",
+        sum(len(files) for files in families.values()), len(families), len(mappings)
+    )
+    return {
+        "pfam_release": pfam_release,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "hashes": hashes,
+        "families": families,
+        "mappings": mappings,
+        "checksum": listing_checksum(families, mappings),
+    }
+
+def write_manifest(manifest: dict, resource_dir: str) -> str:
+    """Writes the manifest to resource_dir/resource_manifest.json, returning its path."""
+    manifest_path = os.path.join(resource_dir, RESOURCE_MANIFEST_FILENAME)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path)
+    return manifest_path
+
+class ResourceManifest:
+    """In-memory view of a loaded resource manifest."""
+
+    def __init__(self, content: dict, resource_dir: str = ""):
+        self.content = content
+        self.resource_dir = resource_dir
+        self.families = content["families"]
+        self.mappings = content["mappings"]
+
+    def family_files(self, family: str) -> dict:
+        """{filename: {"size", "sha256"}} of a family, empty if it has no directory."""
+        return self.families.get(family, {})
+
+    def has_file(self, family: str, filename: str) -> bool:
+        """Listed files are taken as present, unlisted ones are checked on the filesystem."""
+        if filename in self.families.get(family, {}):
+            return True
+        return os.path.isfile(os.path.join(self.resource_dir, family, filename))
+
+    def has_mapping(self, filename: str) -> bool:
+        if filename in self.mappings:
+            return True
+        return os.path.isfile(os.path.join(self.resource_dir, MAPPINGS_DIRNAME, filename))
+
+def list_family_directories(resource_dir: str) -> set[str]:
+    """Names of the directories in resource_dir other than mappings/, from a single directory read."""
+    with os.scandir(resource_dir) as entries:
+        return {entry.name for entry in entries if entry.is_dir() and entry.name != MAPPINGS_DIRNAME}
+
+def load_resource_manifest(resource_dir: str, logger: Optional[logging.Logger] = None) -> Optional[ResourceManifest]:
+    """Loads resource_dir/resource_manifest.json, None if absent, failing its checksum or stale
+    (listing other family directories than resource_dir has).
+    Manifests are kept per process, and only read again if the file changes.
+
+    Args:
+        resource_dir: Resource dir path
+        logger: Optional logger for a warning when the manifest is ignored
+
+    Returns:
+        Optional[ResourceManifest]: Loaded manifest, None to fall back to filesystem checks
+    """
+    manifest_path = os.path.join(resource_dir, RESOURCE_MANIFEST_FILENAME)
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        return None
+    loaded = _LOADED_MANIFESTS.get(manifest_path)
+    if loaded is not None and loaded[0] == (stat.st_mtime_ns, stat.st_size):
+        return loaded[1]
+
+    manifest = None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        if content.get("checksum") == listing_checksum(content["families"], content["mappings"]):
+            manifest = ResourceManifest(content, resource_dir)
+    except (IOError, ValueError, KeyError, TypeError):
+        pass
+    if manifest is None:
+        if logger is not None:
+            logger.warning("RESOURCE_MANIFEST --- LOAD --- Ignoring %s, it fails its checksum or can't be read", manifest_path)
+    else:
+        found = list_family_directories(resource_dir)
+        listed = set(manifest.families)
+        if found != listed:
+            if logger is not None:
+                logger.warning(
+                    "RESOURCE_MANIFEST --- LOAD --- Ignoring stale %s (Pfam release %s, created %s): "
+                    "%d family directories added and %d removed since it was built, rebuild it",
+                    manifest_path, content.get("pfam_release") or "unknown", content.get("created", "unknown"),
+                    len(found - listed), len(listed - found)
+                )
+            manifest = None
+    _LOADED_MANIFESTS[manifest_path] = ((stat.st_mtime_ns, stat.st_size), manifest)
+    return manifest
+
+def flatten_listing(families: dict, mappings: dict) -> dict[str, dict]:
+    """Returns {relative path: file entry} of a listing."""
+    files = {os.path.join(MAPPINGS_DIRNAME, filename): entry for filename, entry in mappings.items()}
+    for family, family_files in families.items():
+        files.update({os.path.join(family, filename): entry for filename, entry in family_files.items()})
+    return files
+
+def verify_manifest(resource_dir: str, manifest: ResourceManifest, threads: int = 1) -> list[str]:
+    """Compares the files of resource_dir with a manifest.
+
+    Returns:
+        list[str]: Problems found (missing, unlisted or changed files), empty if none
+    """
+    current = build_manifest(resource_dir, logging.getLogger(__name__), manifest.content.get("hashes", True), threads=threads)
+    listed = flatten_listing(manifest.families, manifest.mappings)
+    found = flatten_listing(current["families"], current["mappings"])
+    problems = [f"missing: {path}" for path in sorted(listed.keys() - found.keys())]
+    problems += [f"not in manifest: {path}" for path in sorted(found.keys() - listed.keys())]
+    problems += [f"changed: {path}" for path in sorted(listed.keys() & found.keys()) if listed[path] != found[path]]
+    return problems
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("RESOURCE_MANIFEST --- MAIN --- Running with arguments: %s", args)
+    if args.mode == "build":
+        manifest = build_manifest(args.resource_dir, logger, not args.no_hashes, args.pfam_release, args.threads)
+        manifest_path = write_manifest(manifest, args.resource_dir)
+        logger.info("RESOURCE_MANIFEST --- MAIN --- Wrote %s", manifest_path)
+        return
+
+    manifest = load_resource_manifest(args.resource_dir, logger)
+    if manifest is None:
+        logger.error("RESOURCE_MANIFEST --- VERIFY --- No valid manifest in %s", args.resource_dir)
+        sys.exit(1)
+    problems = verify_manifest(args.resource_dir, manifest, args.threads)
+    for problem in problems:
+        logger.error("RESOURCE_MANIFEST --- VERIFY --- %s", problem)
+    if problems:
+        sys.exit(1)
+    logger.info("RESOURCE_MANIFEST --- VERIFY --- Resources match the manifest")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+resource_pack.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script compiles resource_dir into resource_dir/resource_pack.bin, a single file
+read through mmap with random access by Pfam ID, built once per resource release.
+For every family with an HMM and seed it holds:
+    - hmm: the HMM in HMMER's binary (pressed) format, loaded by pyhmmer without text parsing
+    - seed_rows: (hmm_length, [(name, match, inserts)]), the seed rows placed on HMM states
+      as hmm_states.read_seed_rows gives them (from seed_states.json, the minimal seed or the
+      full seed, whichever the family had when the pack was built, never from an older pack)
+    - annotations and conservations: the parsed annotations.json and conservations.json
+    - interpro_id: the family's InterPro entry, from mappings/interpro_pfam_accession_mapping.tsv
+
+Layout: an 8-byte magic, the offset and length of the index (two little-endian uint64),
+the pickled records, then the pickled index {family: {record: (offset, length) or value}}.
+run_hmmalign.py, hmm_states.py and transfer_annotations.py read a family's records from
+the pack when present, unpickling only the bytes of the records they need.
+Rebuild it whenever resources change.
+
+Usage:
+    python resource_pack.py -r resources -t 8
+"""
+
+import os
+import io
+import json
+import mmap
+import pickle
+import struct
+import argparse
+import logging
+from typing import Any, Optional
+from joblib import Parallel, delayed
+from pyhmmer.plan7 import HMM, HMMFile
+from go_mappings import PFAM_INTERPRO_MAP_FILENAME, read_pfam_interpro_mapping
+from utils import get_logger
+
+RESOURCE_PACK_FILENAME = "resource_pack.bin"
+PACK_MAGIC = b"KRAPACK1"
+HEADER_FORMAT = "<8sQQ"
+
+# Opened packs per path, with the (mtime, size) they were opened at
+_OPENED_PACKS = {}
+
+def parse_arguments():
+    """Parse command-line arguments for building a resource pack
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compiles resource_dir into resource_dir/resource_pack.bin")
+    parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
+    parser.add_argument("-t", "--threads", help="Families processed at once", required=False, type=int, default=1)
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/resource_pack.log")
+    return parser.parse_args()
+
+def read_json_records(json_path: str) -> Optional[dict]:
+    """Parsed JSON file, None if absent."""
+    if not os.path.isfile(json_path):
+        return None
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def pack_family(family_dir: str) -> Optional[dict[str, bytes]]:
+    """Serializes the records of a family directory.
+
+    Returns:
+        Optional[dict[str, bytes]]: {record: bytes}, None if the family lacks its HMM or seed
+    """
+    # Imported here since hmm_states reads packs through this module
+    from hmm_states import read_seed_rows
+    hmm_path = os.path.join(family_dir, "domain.hmm")
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    if not os.path.isfile(hmm_path) or not os.path.isfile(seed_path):
+        return None
+    with HMMFile(hmm_path) as hmm_file:
+        hmm = hmm_file.read()
+    hmm_bytes = io.BytesIO()
+    hmm.write(hmm_bytes, binary=True)
+    records = {
+        "hmm": hmm_bytes.getvalue(),
+        "seed_rows": pickle.dumps(read_seed_rows(hmm_path, seed_path), protocol=pickle.HIGHEST_PROTOCOL),
+    }
+    for record in ["annotations", "conservations"]:
+        content = read_json_records(os.path.join(family_dir, f"{record}.json"))
+        if content is not None:
+            records[record] = pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
+    return records
+
+def build_resource_pack(resource_dir: str, logger: logging.Logger, threads: int = 1) -> str:
+    """Writes resource_dir/resource_pack.bin with every family that has an HMM and seed.
+
+    Returns:
+        str: Path to the written pack
+    """
+    families = sorted(entry.name for entry in os.scandir(resource_dir) if entry.is_dir() and entry.name.startswith("PF"))
+    packed = Parallel(n_jobs=threads)(delayed(pack_family)(os.path.join(resource_dir, family)) for family in families)
+
+    map_path = os.path.join(resource_dir, "mappings", PFAM_INTERPRO_MAP_FILENAME)
+    interpro_ids = read_pfam_interpro_mapping(map_path) if os.path.isfile(map_path) else {}
+
+    pack_path = os.path.join(resource_dir, RESOURCE_PACK_FILENAME)
+    index = {}
+    with open(f"{pack_path}.tmp", "wb") as pack_file:
+        pack_file.write(struct.pack(HEADER_FORMAT, PACK_MAGIC, 0, 0))
+        for family, records in zip(families, packed):
+            if records is None:
+                continue
+            entry = {"interpro_id": interpro_ids.get(family, "")}
+            for record, data in records.items():
+                entry[record] = (pack_file.tell(), len(data))
+                pack_file.write(data)
+            index[family] = entry
+        index_offset = pack_file.tell()
+        index_bytes = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        pack_file.write(index_bytes)
+        pack_file.seek(0)
+        pack_file.write(struct.pack(HEADER_FORMAT, PACK_MAGIC, index_offset, len(index_bytes)))
+    os.replace(f"{pack_path}.tmp", pack_path)
+    logger.info("RESOURCE_PACK --- BUILD --- Packed %d of %d families into %s (%d bytes)",
+                len(index), len(families), pack_path, os.path.getsize(pack_path))
+    return pack_path
+
+class ResourcePack:
+    """Read-only, memory-mapped view of a resource pack."""
+
+    def __init__(self, pack_path: str):
+        self.pack_path = pack_path
+        with open(pack_path, "rb") as pack_file:
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = struct.unpack_from(HEADER_FORMAT, self.data, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{pack_path} is not a resource pack")
+        self.index = pickle.loads(self.data[index_offset:index_offset + index_length])
+
+    def has_family(self, family: str) -> bool:
+        return family in self.index
+
+    def _record(self, family: str, record: str) -> Optional[bytes]:
+        location = self.index[family].get(record)
+        if location is None:
+            return None
+        offset, length = location
+        return self.data[offset:offset + length]
+
+    def record_size(self, family: str, record: str) -> int:
+        """Bytes of a family's record in the pack, 0 if it has none."""
+        location = self.index[family].get(record)
+        return 0 if location is None else location[1]
+
+    def _unpickled(self, family: str, record: str) -> Any:
+        data = self._record(family, record)
+        return None if data is None else pickle.loads(data)
+
+    def hmm(self, family: str) -> HMM:
+        """The family's HMM, read from its binary format."""
+        with HMMFile(io.BytesIO(self._record(family, "hmm"))) as hmm_file:
+            return hmm_file.read()
+
+    def seed_rows(self, family: str) -> tuple[int, list[tuple[str, list[str], list[str]]]]:
+        """(hmm_length, [(name, match, inserts)]), as hmm_states.get_seed_rows."""
+        return self._unpickled(family, "seed_rows")
+
+    def annotations(self, family: str) -> Optional[dict]:
+        """Parsed annotations.json, None if the family has none."""
+        return self._unpickled(family, "annotations")
+
+    def conservations(self, family: str) -> Optional[dict]:
+        """Parsed conservations.json, None if the family has none."""
+        return self._unpickled(family, "conservations")
+
+    def interpro_id(self, family: str) -> str:
+        return self.index[family]["interpro_id"]
+
+def open_resource_pack(resource_dir: str) -> Optional[ResourcePack]:
+    """Opens resource_dir/resource_pack.bin, None if absent.
+    Packs are kept open per process, and only opened again if the file changes."""
+    pack_path = os.path.join(resource_dir, RESOURCE_PACK_FILENAME)
+    try:
+        stat = os.stat(pack_path)
+    except OSError:
+        return None
+    opened = _OPENED_PACKS.get(pack_path)
+    if opened is not None and opened[0] == (stat.st_mtime_ns, stat.st_size):
+        return opened[1]
+    pack = ResourcePack(pack_path)
+    _OPENED_PACKS[pack_path] = ((stat.st_mtime_ns, stat.st_size), pack)
+    return pack
+
+def open_family_pack(family_file_path: str) -> Optional[tuple[ResourcePack, str]]:
+    """For a resource file path (resource_dir/PF*/<file>), returns (pack, family)
+    if resource_dir has a pack holding the family, None otherwise."""
+    family_dir = os.path.dirname(os.path.abspath(family_file_path))
+    pack = open_resource_pack(os.path.dirname(family_dir))
+    family = os.path.basename(family_dir)
+    if pack is None or not pack.has_family(family):
+        return None
+    return pack, family
+
+def load_hmm(hmm_path: str) -> HMM:
+    """Reads a family's HMM from the resource pack when it holds the family, otherwise from hmm_path."""
+    family_pack = open_family_pack(hmm_path)
+    if family_pack is not None:
+        pack, family = family_pack
+        return pack.hmm(family)
+    with HMMFile(hmm_path) as hmm_file:
+        return hmm_file.read()
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("RESOURCE_PACK --- MAIN --- Running with arguments: %s", args)
+    build_resource_pack(args.resource_dir, logger, args.threads)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+resource_store.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This module keeps parsed resources in memory for the life of a process, so files shared
+by many reads (annotations.json and conservations.json of a family, the InterPro mapping
+TSV, the GO DAG of go-basic.obo, resource pack records) are parsed once per process.
+
+Entries are keyed by kind and source path, and are only reused while the source file keeps
+the (mtime, size) it was loaded at, as resource_manifest.py does with manifests. Sources
+that can't be stat'ed are loaded without caching. The store is bounded by the summed size
+of the source files of its entries, evicting the least recently used entries past it, and
+counts hits, misses and evictions.
+
+Cached objects are shared between callers, which must not modify them.
+"""
+
+import os
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+_PROCESS_STORE = None
+
+def load_json_file(json_path: str) -> Any:
+    """Parsed content of a JSON file."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class ResourceStore:
+    """Size-bounded LRU cache of parsed resources, keyed by kind and source path."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, path: str, loader: Callable[[], Any], kind: str = "", size: Optional[int] = None) -> Any:
+        """Returns the cached value of (kind, path), calling loader() on a miss.
+
+        Args:
+            path: Source file of the value, whose (mtime, size) validates the entry
+            loader: Builds the value, e.g. by parsing path
+            kind: Distinguishes values built from the same path
+            size: Bytes the entry counts against the bound, the size of path by default
+
+        Returns:
+            Any: Cached or freshly loaded value. None values aren't cached.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.misses += 1
+            return loader()
+        key = (kind, path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        if entry is not None:
+            self._remove(key)
+        value = loader()
+        if value is not None:
+            size = stat.st_size if size is None else size
+            self.entries[key] = (signature, size, value)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+        return value
+
+    def _remove(self, key: tuple) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def json_file(self, json_path: str) -> Any:
+        """Parsed JSON file, raising as open/json.load do."""
+        return self.load(json_path, lambda: load_json_file(json_path), kind="json")
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+        }
+
+def get_resource_store() -> ResourceStore:
+    """The store shared by everything running in this process, created on first use."""
+    global _PROCESS_STORE
+    if _PROCESS_STORE is None:
+        _PROCESS_STORE = ResourceStore()
+    return _PROCESS_STORE
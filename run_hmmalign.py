@@ -32,18 +32,49 @@ Command-line arguments:
 - dom-info: Path to domain info JSON file with required paths
 - domain-accession: Domain identifier used for scoped logging
 - trim: Optional flag to enable trimming nonhomologous residues from the multiple sequence alignment (default: False)
+- backend: Optional, 'binary' (default, the hmmalign binary on PATH) or 'pyhmmer' (in-process)
+- chunk-size: Optional, domains with more hits are split into chunks of whole targets, aligned
+  in parallel (threads at once) into PF*_chunk<N>_hmmalign.sth files (default: 0, no chunks)
+- alignment-cache: Optional SQLite cache of aligned subsequences (see alignment_cache.py), only
+  subsequences missing from it are aligned and cached rows are spliced into the alignment
 - log: Optional path for log file (default: logs/run_hmmalign.log)
 
 The script uses the following hmmalign options:
 - --outformat Pfam: Outputs alignment in Pfam format
 - --mapali: Maps the new sequences onto the existing seed alignment
 - --trim: Trims nonhomologous residues from the MSA output (optional)
+
+The pyhmmer backend aligns the domain sequences in-process with pyhmmer's TraceAligner
+(the library behind hmmalign), then places seed rows on the HMM match states through the
+HMM MAP annotation, as --mapali does (see hmm_states.py). Seed and target residues share
+the same match columns as in hmmalign's output, though insert columns may be laid out
+differently, which doesn't change what transfer_annotations.py reads from them.
+
+When a domain has a seed_states.json (see seed_states.py) or an alignment.minimal.seed
+(see minimal_seed.py), neither backend maps the full seed: targets are aligned to the HMM
+alone and only the annotated and conservation-reference seed rows are placed on the same
+match states.
 """
 
+import os
+import glob
 import argparse
 import json
 import subprocess
-from utils import get_logger, get_multi_logger
+import tempfile
+from joblib import Parallel, delayed
+from pyhmmer.easel import SequenceFile
+from pyhmmer.plan7 import TraceAligner
+from hmm_states import (
+    get_seed_rows,
+    has_reduced_seed,
+    aligned_row_to_nodes,
+    render_state_alignment,
+)
+from resource_pack import load_hmm
+from alignment_cache import open_alignment_cache, get_cached_rows, store_rows
+from hmmsearch_cache import file_md5, sequence_md5
+from utils import get_logger, get_multi_logger, read_fasta_records
 from typing import Callable
 # from modules.decorators import measure_time_and_memory
 # from memory_profiler import profile
@@ -63,20 +94,254 @@ def parse_arguments():
     parser.add_argument("-iDI", "--dom-info", help="Path to domain info JSON with paths", required=True, type=str)
     parser.add_argument("-d", "--domain-accession", help="Domain accession for scoped logging", required=True, type=str)
     parser.add_argument("--trim", help="Flag to enable trimming in hmmalign", action="store_true")
+    parser.add_argument("-b", "--backend", help="Alignment backend: 'binary' (hmmalign on PATH) or 'pyhmmer' (in-process)",
+                        required=False, type=str, choices=["binary", "pyhmmer"], default="binary")
+    parser.add_argument("-cS", "--chunk-size", help="Split domains with more hits than this into chunks aligned in parallel, 0 to disable",
+                        required=False, type=int, default=0)
+    parser.add_argument("-t", "--threads", help="Chunks aligned at once", required=False, type=int, default=1)
+    parser.add_argument("-aC", "--alignment-cache", help="Optional: path to a SQLite cache of aligned subsequences, \
+                        created if missing. Subsequences already aligned to the same HMM and seed are not aligned again.",
+                        required=False, type=str, default="")
     parser.add_argument("-l", "--log", help="Log path", \
         required=False, type=str, default="logs/run_hmmalign.log")
     return parser.parse_args()
 
+def align_target_rows(
+    hmm_file_path: str, fasta_path: str, hmm_length: int, trim: bool = False,
+    backend: str = "pyhmmer", aligner: TraceAligner = None) -> list[tuple[str, list[str], list[str]]]:
+    """
+    Aligns the sequences of a FASTA to a domain's HMM alone, without seed rows.
+
+    Args:
+        hmm_file_path: Path to the domain's HMM
+        fasta_path: Path to FASTA file with sequences to align
+        hmm_length: Number of match states of the HMM
+        trim: If True, trims residues outside the HMM, as hmmalign --trim
+        backend: 'pyhmmer' to align in-process, 'binary' to run hmmalign without --mapali
+        aligner: Optional TraceAligner to reuse across domains
+
+    Returns:
+        list[tuple[str, list[str], list[str]]]: (name, match, inserts) rows, in FASTA order
+    """
+    if backend == "binary":
+        command = ["hmmalign", "--outformat", "Pfam"] + (["--trim"] if trim else []) + [hmm_file_path, fasta_path]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
+        rows = []
+        for line in result.stdout.splitlines():
+            if line.strip() and not line.startswith(("#", "//")):
+                name, aligned_row = line.split()[:2]
+                rows.append((name, *aligned_row_to_nodes(aligned_row, hmm_length)))
+        return rows
+
+    hmm = load_hmm(hmm_file_path)
+    with SequenceFile(fasta_path, "fasta", digital=True, alphabet=hmm.alphabet) as sequence_file:
+        sequences = sequence_file.read_block()
+    if len(sequences) == 0:
+        return []
+    aligner = aligner or TraceAligner()
+    traces = aligner.compute_traces(hmm, sequences)
+    msa = aligner.align_traces(hmm, sequences, traces, trim=trim, all_consensus_cols=True)
+    return [
+        (name.decode(), *aligned_row_to_nodes(aligned_row, hmm_length))
+        for name, aligned_row in zip(msa.names, msa.alignment)
+    ]
+
+def align_domain_in_process(
+    hmm_file_path: str, seed_alignment_path: str, dom_fasta: str,
+    trim: bool = False, aligner: TraceAligner = None) -> list[str]:
+    """
+    Aligns a domain's hit sequences to its HMM with pyhmmer and maps its seed rows
+    onto the same match states, giving lines equivalent to hmmalign --outformat Pfam --mapali.
+
+    Args:
+        hmm_file_path: Path to the domain's HMM
+        seed_alignment_path: Path to the domain's seed alignment
+        dom_fasta: Path to FASTA file with the domain's hit sequences
+        trim: If True, trims residues outside the HMM, as hmmalign --trim
+        aligner: Optional TraceAligner to reuse across domains
+
+    Returns:
+        list[str]: Pfam-format alignment lines, seed rows first (only the precomputed
+        ones when the domain has a seed_states.json, see seed_states.py)
+    """
+    hmm_length, rows = get_seed_rows(hmm_file_path, seed_alignment_path)
+    rows.extend(align_target_rows(hmm_file_path, dom_fasta, hmm_length, trim, "pyhmmer", aligner))
+    return render_state_alignment(rows)
+
+def align_domain_with_cache(
+    hmm_file_path: str, seed_alignment_path: str, dom_fasta: str, cache_path: str,
+    multi_logger: Callable, trim: bool = False, backend: str = "binary") -> list[str]:
+    """
+    Aligns only the hit subsequences missing from an alignment cache (see alignment_cache.py),
+    splicing cached rows of the others into the domain alignment, with the seed rows placed
+    on the same match states as in align_domain_in_process.
+
+    Args:
+        hmm_file_path: Path to the domain's HMM
+        seed_alignment_path: Path to the domain's seed alignment
+        dom_fasta: Path to FASTA file with the domain's hit sequences
+        cache_path: Path to the SQLite alignment cache, created if missing
+        multi_logger: Logger function for output
+        trim: If True, trims residues outside the HMM, as hmmalign --trim
+        backend: 'binary' or 'pyhmmer', used to align cache misses
+
+    Returns:
+        list[str]: Pfam-format alignment lines, seed rows first, targets in FASTA order
+    """
+    hmm_length, rows = get_seed_rows(hmm_file_path, seed_alignment_path)
+    records = [(header.split()[0], sequence) for header, sequence in read_fasta_records(dom_fasta)]
+    subseq_md5s = [sequence_md5(sequence) for _, sequence in records]
+    hmm_checksum = file_md5(hmm_file_path)
+    seed_checksum = file_md5(seed_alignment_path)
+
+    connection = open_alignment_cache(cache_path)
+    try:
+        cached = get_cached_rows(connection, subseq_md5s, hmm_checksum, seed_checksum, trim)
+        misses = {}
+        for (name, sequence), subseq_md5 in zip(records, subseq_md5s):
+            if subseq_md5 not in cached and subseq_md5 not in misses:
+                misses[subseq_md5] = (name, sequence)
+        multi_logger("info", "RUN_HMMALIGN --- CACHE --- %d of %d subsequences found in cache, aligning %d unique subsequences",
+                     sum(subseq_md5 in cached for subseq_md5 in subseq_md5s), len(records), len(misses))
+        if misses:
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(dom_fasta))) as tmp_dir:
+                misses_fasta = os.path.join(tmp_dir, "misses.fasta")
+                with open(misses_fasta, 'w', encoding='utf-8') as misses_file:
+                    # Renamed by digest, since identical subsequences may come under several names
+                    misses_file.writelines(f">{subseq_md5}\n{sequence}\n" for subseq_md5, (_, sequence) in misses.items())
+                new_rows = {
+                    subseq_md5: (match, inserts)
+                    for subseq_md5, match, inserts in align_target_rows(hmm_file_path, misses_fasta, hmm_length, trim, backend)
+                }
+            store_rows(connection, new_rows, hmm_checksum, seed_checksum, trim)
+            cached.update(new_rows)
+    finally:
+        connection.close()
+
+    rows.extend((name, *cached[subseq_md5]) for (name, _), subseq_md5 in zip(records, subseq_md5s))
+    return render_state_alignment(rows)
+
+def align_to_file(
+    hmm_file_path: str, seed_alignment_path: str, dom_fasta: str, output_path: str,
+    multi_logger: Callable, trim: bool = False, backend: str = "binary", cache_path: str = "") -> None:
+    """
+    Aligns the sequences of a FASTA to a domain's HMM and seed, writing a Pfam-format alignment.
+
+    Args:
+        hmm_file_path: Path to the domain's HMM
+        seed_alignment_path: Path to the domain's seed alignment
+        dom_fasta: Path to FASTA file with sequences to align
+        output_path: Path of the Stockholm alignment to write
+        multi_logger: Logger function for output
+        trim: If True, adds --trim flag to hmmalign command
+        backend: 'binary' to run the hmmalign binary, 'pyhmmer' to align in-process
+        cache_path: Optional SQLite alignment cache, only subsequences missing from it are aligned
+    """
+    if cache_path:
+        alignment_lines = align_domain_with_cache(
+            hmm_file_path, seed_alignment_path, dom_fasta, cache_path, multi_logger, trim, backend
+        )
+        with open(output_path, 'w', encoding='utf-8') as hmmaligned_file:
+            hmmaligned_file.write("\n".join(alignment_lines) + "\n")
+        multi_logger("info", "RUN_HMMALIGN --- RUN --- Generated with the alignment cache: %s", output_path)
+        return
+
+    if backend == "pyhmmer":
+        alignment_lines = align_domain_in_process(hmm_file_path, seed_alignment_path, dom_fasta, trim)
+        with open(output_path, 'w', encoding='utf-8') as hmmaligned_file:
+            hmmaligned_file.write("\n".join(alignment_lines) + "\n")
+        multi_logger("info", "RUN_HMMALIGN --- RUN --- Generated in-process: %s", output_path)
+        return
+
+    if has_reduced_seed(seed_alignment_path):
+        # Targets aligned to the HMM alone, the precomputed or minimal seed rows placed on the same
+        # states (--mapali only accepts the seed the HMM was built from)
+        hmm_length, rows = get_seed_rows(hmm_file_path, seed_alignment_path)
+        rows.extend(align_target_rows(hmm_file_path, dom_fasta, hmm_length, trim, "binary"))
+        with open(output_path, 'w', encoding='utf-8') as hmmaligned_file:
+            hmmaligned_file.write("\n".join(render_state_alignment(rows)) + "\n")
+        multi_logger("info", "RUN_HMMALIGN --- RUN --- Generated with a reduced seed: %s", output_path)
+        return
+
+    command = f"hmmalign --outformat Pfam --mapali {seed_alignment_path}"
+    if trim:
+        command += " --trim"
+    command += f" {hmm_file_path} {dom_fasta} > {output_path}"
+
+    result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+    if result.returncode != 0:
+        multi_logger("error", "RUN_HMMALIGN --- RUN --- Error running hmmalign: %s", result.stderr.decode('utf-8'))
+    else:
+        multi_logger("info", "RUN_HMMALIGN --- RUN --- Generated: %s", output_path)
+
+def chunk_path(path: str, chunk_idx: int, suffix: str) -> str:
+    """Path of a chunk's file, e.g. PF00001_hmmalign.sth -> PF00001_chunk3_hmmalign.sth
+    and PF00001_hits.fasta -> PF00001_chunk3_hits.fasta."""
+    directory, filename = os.path.split(path)
+    prefix = filename[:-len(suffix)] if filename.endswith(suffix) else filename
+    return os.path.join(directory, f"{prefix}_chunk{chunk_idx}{suffix}")
+
+def split_domain_fasta(dom_fasta: str, chunk_size: int) -> list[str]:
+    """
+    Splits a domain's hits FASTA into chunks of about chunk_size records, keeping every hit
+    of a target (records named <target_name>target/<ali_range>) in the same chunk, so each
+    target's report comes whole from a single chunk.
+
+    Args:
+        dom_fasta: Path to the domain's PF*_hits.fasta
+        chunk_size: Records per chunk
+
+    Returns:
+        list[str]: Paths of the chunk FASTAs, empty if the FASTA has chunk_size records or fewer
+    """
+    targets = {}
+    with open(dom_fasta, 'r', encoding='utf-8') as fasta_file:
+        record = []
+        for line in fasta_file:
+            if line.startswith(">") and record:
+                targets.setdefault(record[0][1:].split("target/")[0], []).append("".join(record))
+                record = []
+            record.append(line)
+        if record:
+            targets.setdefault(record[0][1:].split("target/")[0], []).append("".join(record))
+    if sum(len(records) for records in targets.values()) <= chunk_size:
+        return []
+
+    chunk_paths = []
+    chunk_records = []
+    for records in targets.values():
+        chunk_records.extend(records)
+        if len(chunk_records) >= chunk_size:
+            chunk_paths.append(chunk_path(dom_fasta, len(chunk_paths) + 1, "_hits.fasta"))
+            with open(chunk_paths[-1], 'w', encoding='utf-8') as chunk_file:
+                chunk_file.writelines(chunk_records)
+            chunk_records = []
+    if chunk_records:
+        chunk_paths.append(chunk_path(dom_fasta, len(chunk_paths) + 1, "_hits.fasta"))
+        with open(chunk_paths[-1], 'w', encoding='utf-8') as chunk_file:
+            chunk_file.writelines(chunk_records)
+    return chunk_paths
+
 #@measure_time_and_memory
 #@profile
-def run_hmmalign(dom_info_json: str, multi_logger: Callable, trim: bool = False) -> None:
+def run_hmmalign(
+    dom_info_json: str, multi_logger: Callable, trim: bool = False, backend: str = "binary",
+    chunk_size: int = 0, threads: int = 1, cache_path: str = "") -> None:
     """
     Runs hmmalign for the domain in the domain_info JSON.
+    Domains with more than chunk_size hits are split into target chunks, aligned in parallel
+    against the same HMM and seed into PF*_chunk<N>_hmmalign.sth files, each one read by
+    its own transfer_annotations.py run.
 
     Args:
         dom_info_json: Path to domain info JSON file
         multi_logger: Logger function for output
         trim: If True, adds --trim flag to hmmalign command
+        backend: 'binary' to run the hmmalign binary, 'pyhmmer' to align in-process
+        chunk_size: Hits per chunk for large domains, 0 to always align the domain whole
+        threads: Chunks aligned at once
+        cache_path: Optional SQLite alignment cache (see alignment_cache.py)
     """
     with open(dom_info_json, 'r', encoding='utf-8') as dom_info_file:
         dom_info_json = json.load(dom_info_file)
@@ -86,30 +351,43 @@ def run_hmmalign(dom_info_json: str, multi_logger: Callable, trim: bool = False)
     pfam_id_hmmaligned = dom_info_json['pfam_id_hmmaligned']
     dom_fasta = dom_info_json['dom_fasta']
 
-    command = f"hmmalign --outformat Pfam --mapali {seed_alignment_path}"
-    if trim:
-        command += " --trim"
-    command += f" {hmm_file_path} {dom_fasta} > {pfam_id_hmmaligned}"
+    # Leftovers of a previous run with a different chunking would be transferred as well
+    stale_pattern = pfam_id_hmmaligned[:-len("_hmmalign.sth")] + "_chunk*_hmmalign.sth"
+    for stale_path in glob.glob(stale_pattern):
+        os.remove(stale_path)
 
-    result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    chunk_fastas = split_domain_fasta(dom_fasta, chunk_size) if chunk_size > 0 else []
+    if not chunk_fastas:
+        align_to_file(hmm_file_path, seed_alignment_path, dom_fasta, pfam_id_hmmaligned, multi_logger, trim, backend, cache_path)
+        return
 
-    if result.returncode != 0:
-        multi_logger("error", "RUN_HMMALIGN --- RUN --- Error running hmmalign: %s", result.stderr.decode('utf-8'))
-    else:
-        multi_logger("info", "RUN_HMMALIGN --- RUN --- Generated: %s", pfam_id_hmmaligned)
+    if os.path.isfile(pfam_id_hmmaligned):
+        os.remove(pfam_id_hmmaligned)
+    multi_logger("info", "RUN_HMMALIGN --- RUN --- Aligning %s in %d chunks of about %d hits",
+                 dom_fasta, len(chunk_fastas), chunk_size)
+    Parallel(n_jobs=threads, prefer="threads")(
+        delayed(align_to_file)(
+            hmm_file_path, seed_alignment_path, chunk_fasta,
+            chunk_path(pfam_id_hmmaligned, chunk_idx, "_hmmalign.sth"), multi_logger, trim, backend, cache_path
+        )
+        for chunk_idx, chunk_fasta in enumerate(chunk_fastas, start=1)
+    )
+    for chunk_fasta in chunk_fastas:
+        os.remove(chunk_fasta)
 
 def main():
     """Main function, initializes this script"""
     args = parse_arguments()
     domain_info_json = args.dom_info
     trim = args.trim
+    backend = args.backend
 
     main_logger, _ = get_logger(args.log, scope="main")
     domain_logger, _ = get_logger(args.log, scope="domain", identifier=args.domain_accession)
     log_to_both = get_multi_logger([main_logger, domain_logger])
     log_to_both("info", "RUN_HMMALIGN --- Running hmmalign for domain info JSON: %s", domain_info_json)
 
-    run_hmmalign(domain_info_json, log_to_both, trim)
+    run_hmmalign(domain_info_json, log_to_both, trim, backend, args.chunk_size, args.threads, args.alignment_cache)
 
 if __name__ == '__main__':
     main()
@@ -24,12 +24,25 @@ a flag to indicate nucleotide sequences, bit score cutoffs for reporting hits, a
 
 1 - Runs pyHMMER hmmsearch on the FASTA file using the provided HMM database file,
 generates a 'hmmsearch_per_domain.json' file in the output directory.
+Each hit keeps the HMM state path of its domain alignment (see hmm_states.py).
 Also, generates a 'hmmsearch_sequences.txt' and a 'hmmsearch_sequences.json'
 file in the output directory, these last two contain the sequence IDs with at least 1 domain hit.
+The same hits are written as a columnar table in 'hmmsearch_hits/' (see hits_table.py),
+indexed by domain and by sequence for consumers that only need some of the rows.
 
     1.5 - Loads the sequence file, either as a SequenceFile or a DigitalSequenceBlock,
     depending on size and available memory. For nucleotide sequences, performs translation to protein sequences before searching.
 
+2 - Optionally runs a single shard of the search (--shard K/N), splitting either the target sequences
+or the HMM profiles round-robin. Each shard writes its results with a '.shard_K_of_N' suffix,
+and merge_hmmsearch_shards.py combines them into the regular outputs. When splitting by sequences,
+the global database size (-Z) is kept equal to the whole input so E-values match a single-process run.
+Shards run side by side, so each should get its share of the cores through --cpus.
+
+3 - Optionally reuses per-sequence hits from an on-disk cache (--cache, see hmmsearch_cache.py),
+keyed by sequence MD5, HMM database checksum and bit_cutoffs. Only sequences missing from the cache
+are searched, with Z set to the whole input, and their hits (or lack of hits) are added to the cache.
+
 This script assumes that the user will provide HMM profiles from a curated database,
 where specific bit score thresholds for each profile should be present,
 including both per-sequence and per-domain reporting and inclusion thresholds.
@@ -45,13 +58,58 @@ import json
 import argparse
 import logging
 import sys
-from typing import Union
+from typing import Union, Optional
 import psutil
 import pyhmmer
 from pyhmmer.easel import DigitalSequenceBlock, DigitalSequence
+from hmm_states import alignment_to_state_path
+from hits_table import write_hits_table, HITS_TABLE_DIRNAME
+from hmmsearch_cache import (
+    file_md5,
+    sequence_md5,
+    open_cache,
+    get_cached_hits,
+    store_hits,
+    split_hits_per_sequence,
+    join_hits_per_domain,
+)
 from utils import get_logger
 # from modules.decorators import measure_time_and_memory
 
+SHARD_MODES = ["sequences", "profiles"]
+
+def parse_shard_spec(shard: str) -> tuple[int, int]:
+    """Parses a shard spec in the 'K/N' format, where K is the 1-based
+    index of this shard and N the total number of shards.
+
+    Args:
+        shard: Shard spec string, e.g. "2/8"
+
+    Returns:
+        tuple[int, int]: (shard_index, shard_count)
+
+    Raises:
+        ValueError: If the spec is malformed or K is not within 1..N
+    """
+    try:
+        index_str, count_str = shard.split("/")
+        shard_index, shard_count = int(index_str), int(count_str)
+    except (ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid shard spec '{shard}', expected 'K/N' (e.g. 1/4)") from e
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(f"Invalid shard spec '{shard}', K must be between 1 and N")
+    return shard_index, shard_count
+
+def get_shard_suffix(shard_index: int, shard_count: int) -> str:
+    """Returns the file name suffix used by a shard's outputs, empty for unsharded runs."""
+    if shard_count <= 1:
+        return ""
+    return f".shard_{shard_index}_of_{shard_count}"
+
+def in_shard(position: int, shard_index: int, shard_count: int) -> bool:
+    """Round-robin shard membership for the 0-based position of a sequence or profile."""
+    return position % shard_count == shard_index - 1
+
 def parse_arguments():
     """Parse command-line arguments for running hmmsearch
     using a sequence database against target HMMs,
@@ -76,20 +134,53 @@ def parse_arguments():
     parser.add_argument("-bc", "--bit-cutoffs",
                         help="Bit score cutoffs for reporting hits. Options: 'noise', 'gathering', 'trusted'",
                         required=False, type=str, default="gathering")
+    parser.add_argument("-s", "--shard",
+                        help="Optional: run only shard K of N, given as 'K/N' (e.g. 1/4). \
+                        Outputs get a '.shard_K_of_N' suffix, combine them with merge_hmmsearch_shards.py",
+                        required=False, type=str, default=None)
+    parser.add_argument("-sb", "--shard-by",
+                        help="What to split between shards. Options: 'sequences', 'profiles'",
+                        required=False, type=str, choices=SHARD_MODES, default="sequences")
+    parser.add_argument("-Z", "--database-size",
+                        help="Optional: global number of target sequences used for E-value calculation. \
+                        Defaults to the number of sequences in the input FASTA.",
+                        required=False, type=int, default=None)
+    parser.add_argument("-c", "--cache",
+                        help="Optional: path to a SQLite hmmsearch cache, created if missing. \
+                        Sequences already in the cache for the same HMM database and cutoffs are not searched again.",
+                        required=False, type=str, default=None)
+    parser.add_argument("-t", "--cpus",
+                        help="CPU threads used by hmmsearch, 0 for all available cores",
+                        required=False, type=int, default=0)
     parser.add_argument("-l", "--log",
                         help="Log path",
                         required=False, type=str, default="logs/run_hmmsearch.log")
-    return parser.parse_args()
+    args = parser.parse_args()
+
+    args.shard_index, args.shard_count = 1, 1
+    if args.shard:
+        try:
+            args.shard_index, args.shard_count = parse_shard_spec(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
 
-def load_and_translate_sequence_file(fasta_path: str, logger: logging.Logger, is_nucleotide: bool = False) -> Union[DigitalSequenceBlock, DigitalSequence]:
+    return args
+
+def load_and_translate_sequence_file(
+    fasta_path: str, logger: logging.Logger, is_nucleotide: bool = False,
+    shard_index: int = 1, shard_count: int = 1) -> Union[DigitalSequenceBlock, DigitalSequence]:
     """
     Loads a multifasta file either as a SequenceFile or a DigitalSequenceBlock,
     the latter only if the file loaded to memory would take less than 20% of the available memory.
+    When sharding by sequences (shard_count > 1), only the sequences belonging to
+    the shard are kept, always as a DigitalSequenceBlock.
 
     Args:
         fasta_path: Path to the multifasta file
         logger: Logger instance for tracking execution
         is_nucleotide: If True, treats input as nucleotide sequences (default: False)
+        shard_index: 1-based index of the sequence shard to keep (default: 1)
+        shard_count: Total number of sequence shards (default: 1, no sharding)
 
     Returns:
         Union[DigitalSequenceBlock, DigitalSequence]: Loaded sequence file
@@ -105,7 +196,16 @@ def load_and_translate_sequence_file(fasta_path: str, logger: logging.Logger, is
         alphabet = pyhmmer.easel.Alphabet.amino()
 
     with pyhmmer.easel.SequenceFile(fasta_path, digital=True, alphabet=alphabet) as seq_file:
-        if target_size < available_memory * 0.2:
+        if shard_count > 1:
+            logger.info("RUN_HMMSEARCH --- LOAD_TRANSLATE --- Keeping sequence shard %d of %d", shard_index, shard_count)
+            targets = DigitalSequenceBlock(alphabet, (
+                seq for position, seq in enumerate(seq_file)
+                if in_shard(position, shard_index, shard_count)
+            ))
+            if is_nucleotide:
+                logger.info("RUN_HMMSEARCH --- LOAD_TRANSLATE --- Translating nucleotide sequences to protein sequences")
+                targets = targets.translate()
+        elif target_size < available_memory * 0.2:
             logger.info("RUN_HMMSEARCH --- LOAD_TRANSLATE --- Pre-fetching targets into memory")
             targets = seq_file.read_block()
             if is_nucleotide:
@@ -119,54 +219,29 @@ def load_and_translate_sequence_file(fasta_path: str, logger: logging.Logger, is
                 targets = targets.translate()
     return targets
 
-def run_hmmsearch(hmm: str, fasta_path: str, output_dir: str, logger: logging.Logger, bit_cutoffs: str = "gathering", is_nucleotide: bool = False) -> None:
-    """Run HMMER search against target sequences and save results.
+def count_fasta_sequences(fasta_path: str) -> int:
+    """Counts the records in a FASTA file by its header lines."""
+    count = 0
+    with open(fasta_path, "rb") as f:
+        for line in f:
+            if line.startswith(b">"):
+                count += 1
+    return count
 
-    Executes hmmsearch using HMM profiles as queries against target sequences.
-    Processes hits to extract domain information and saves results in multiple formats.
+def collect_domain_hits(all_top_hits) -> tuple[dict, set]:
+    """Collects included domain hits with a Pfam accession from hmmsearch results.
 
     Args:
-        hmm: Path to HMM profiles database file
-        fasta_path: Path to target sequences FASTA file
-        output_dir: Directory to save output files
-        logger: Logger instance for tracking execution
-        bit_cutoffs: Bit score cutoffs for reporting hits ("noise", "gathering", or "trusted")
-        is_nucleotide: If True, treats input as nucleotide sequences (default: False)
+        all_top_hits: Iterable of pyhmmer TopHits, one per query HMM
 
     Returns:
-        set[str]: Set of sequence IDs that had at least one domain hit
-
-    Outputs:
-        - hmmsearch_per_domain.json: JSON file containing detailed domain hits
-          Structure: {pfam_id: {seq_id: [{seq_hits_data}]}}
-        - hmmsearch_sequences.txt: Plain text file with hit sequence IDs
-        - hmmsearch_sequences.json: JSON file with hit sequence IDs
-
-    Domain data includes:
-        - hmm_name: Name of the matching HMM profile
-        - target_seq_name: ID of the target sequence
-        - bitscore: HMMER bit score for the match
-        - ali_from: Start position of alignment in target
-        - ali_to: End position of alignment in target
-        - ali_range: Formatted string of alignment range
-        - subseq: Aligned subsequence without gaps
+        tuple[dict, set]: (hits_per_domain, hit_sequences), where hits_per_domain
+        follows the {pfam_id: {seq_id: [{seq_hits_data}]}} structure
     """
-    valid_cutoffs = ["noise", "gathering", "trusted"]
-    if bit_cutoffs not in valid_cutoffs:
-        logger.warning("RUN_HMMSEARCH --- RUN --- Invalid bit_cutoffs value: '%s'. Using default 'gathering'.", bit_cutoffs)
-        bit_cutoffs = "gathering"
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    with open(hmm, 'rb') as f:
-        hmms = list(pyhmmer.plan7.HMMFile(f))
-
-    targets = load_and_translate_sequence_file(fasta_path, logger, is_nucleotide)
-
     hits_per_domain = {}
     hit_sequences = set()
 
-    for top_hits in pyhmmer.hmmsearch(hmms, targets, bit_cutoffs=bit_cutoffs):
+    for top_hits in all_top_hits:
         for hit in top_hits:
             target_seq = hit.name.decode("utf-8")
             hit_sequences.add(target_seq)
@@ -193,29 +268,236 @@ def run_hmmsearch(hmm: str, fasta_path: str, output_dir: str, logger: logging.Lo
                     "ali_from": ali_from_1,
                     "ali_to": ali_to_1,
                     "ali_range": ali_range,
-                    "subseq": subseq
+                    "subseq": subseq,
+                    "hmm_from": alignment.hmm_from,
+                    "hmm_to": alignment.hmm_to,
+                    "state_path": alignment_to_state_path(alignment.hmm_sequence, dirty_subseq)
                 })
 
-    sequences_txt_path = os.path.join(output_dir, "hmmsearch_sequences.txt")
-    sequences_json_path = os.path.join(output_dir, "hmmsearch_sequences.json")
-    per_domain_output = os.path.join(output_dir, "hmmsearch_per_domain.json")
+    return hits_per_domain, hit_sequences
+
+def sort_hits_per_domain(hits_per_domain: dict) -> dict:
+    """Orders domains by accession and, within a domain, sequences by descending
+    bit score and then by name, so outputs do not depend on how hits were gathered."""
+    sorted_hits = {}
+    for accession in sorted(hits_per_domain):
+        sequences = hits_per_domain[accession]
+        ordered_ids = sorted(sequences, key=lambda seq_id: (-sequences[seq_id][0]["bitscore"], seq_id))
+        sorted_hits[accession] = {seq_id: sequences[seq_id] for seq_id in ordered_ids}
+    return sorted_hits
+
+def search_with_cache(
+    hmms: list, targets: DigitalSequenceBlock, hmm_checksum: str, cache_path: str,
+    logger: logging.Logger, bit_cutoffs: str = "gathering",
+    database_size: Optional[int] = None, cpus: int = 0) -> tuple[dict, set]:
+    """Runs hmmsearch only for target sequences missing from the cache.
 
-    # Text file (human readable, grep and so on)
-    with open(sequences_txt_path, "w", encoding='utf-8') as f:
-        for seq in sorted(hit_sequences):
-            f.write(f"{seq}\n")
+    Identical sequences are searched once, whatever their names. Missing sequences are
+    searched with Z equal to database_size (default: all targets), then stored in the cache
+    with whether hmmsearch reported them, so hit_sequences matches collect_domain_hits.
+
+    Args:
+        hmms: HMM profiles to search with
+        targets: Digital protein target sequences
+        hmm_checksum: Checksum identifying the HMM profiles
+        cache_path: Path to the SQLite cache file
+        logger: Logger instance for tracking execution
+        bit_cutoffs: Bit score cutoffs for reporting hits
+        database_size: Global number of target sequences (Z)
+        cpus: CPU threads used by hmmsearch, 0 for all available cores
+
+    Returns:
+        tuple[dict, set]: (hits_per_domain, hit_sequences), with the sorted
+        {pfam_id: {seq_id: [{seq_hits_data}]}} structure
+    """
+    if database_size is None:
+        database_size = len(targets)
+    target_md5s = [sequence_md5(target.textize().sequence) for target in targets]
+
+    connection = open_cache(cache_path)
+    try:
+        cached = get_cached_hits(connection, target_md5s, hmm_checksum, bit_cutoffs)
+        to_search = {}
+        for target, seq_md5 in zip(targets, target_md5s):
+            if seq_md5 not in cached and seq_md5 not in to_search:
+                to_search[seq_md5] = target
+        logger.info(
+            "RUN_HMMSEARCH --- CACHE --- %d of %d sequences found in cache, searching %d unique sequences with Z=%d",
+            len(targets) - sum(seq_md5 not in cached for seq_md5 in target_md5s), len(targets), len(to_search), database_size
+        )
+
+        if to_search:
+            misses = DigitalSequenceBlock(targets.alphabet, to_search.values())
+            miss_hits, miss_sequences = collect_domain_hits(pyhmmer.hmmsearch(hmms, misses, cpus=cpus, bit_cutoffs=bit_cutoffs, Z=database_size))
+            miss_hits_per_sequence = split_hits_per_sequence(miss_hits)
+            new_entries = {}
+            for seq_md5, target in to_search.items():
+                target_name = target.name.decode("utf-8")
+                new_entries[seq_md5] = {
+                    "reported": target_name in miss_sequences,
+                    "hits": miss_hits_per_sequence.get(target_name, []),
+                }
+            store_hits(connection, new_entries, hmm_checksum, bit_cutoffs, database_size)
+            cached.update(new_entries)
+    finally:
+        connection.close()
+
+    hits_per_sequence = {}
+    hit_sequences = set()
+    for target, seq_md5 in zip(targets, target_md5s):
+        target_name = target.name.decode("utf-8")
+        if cached[seq_md5]["reported"]:
+            hit_sequences.add(target_name)
+        if cached[seq_md5]["hits"]:
+            hits_per_sequence[target_name] = cached[seq_md5]["hits"]
+    return sort_hits_per_domain(join_hits_per_domain(hits_per_sequence)), hit_sequences
+
+def write_hmmsearch_outputs(
+    hits_per_domain: dict, hit_sequences: set, output_dir: str,
+    logger: logging.Logger, suffix: str = "", shard_info: Optional[dict] = None) -> None:
+    """Writes hmmsearch_per_domain.json, hmmsearch_sequences.json and, for unsharded
+    runs, hmmsearch_sequences.txt and the hmmsearch_hits columnar table in the output directory.
+
+    Args:
+        hits_per_domain: Hits in the {pfam_id: {seq_id: [{seq_hits_data}]}} structure
+        hit_sequences: Set of sequence IDs with at least one hit
+        output_dir: Directory to save output files
+        logger: Logger instance for tracking execution
+        suffix: File name suffix placed before the extension, used by shards
+        shard_info: Shard metadata stored in the shard's sequences JSON for merging
+    """
+    sequences_txt_path = os.path.join(output_dir, f"hmmsearch_sequences{suffix}.txt")
+    sequences_json_path = os.path.join(output_dir, f"hmmsearch_sequences{suffix}.json")
+    per_domain_output = os.path.join(output_dir, f"hmmsearch_per_domain{suffix}.json")
+
+    sequences_json = {"sequences": list(sorted(hit_sequences))}
+    if shard_info:
+        sequences_json["shard"] = shard_info
+    else:
+        # Text file (human readable, grep and so on)
+        with open(sequences_txt_path, "w", encoding='utf-8') as f:
+            for seq in sorted(hit_sequences):
+                f.write(f"{seq}\n")
+        logger.info(f"RUN_HMMSEARCH --- RUN --- HmmSearch hit sequences saved in text format - {sequences_txt_path}")
 
     # JSON file (programmatic access)
     with open(sequences_json_path, "w", encoding='utf-8') as f:
-        json.dump({"sequences": list(sorted(hit_sequences))}, f, indent=4)
+        json.dump(sequences_json, f, indent=4)
 
     with open(per_domain_output, "w", encoding='utf-8') as f:
         json.dump(hits_per_domain, f, indent=4)
 
-    logger.info(f"RUN_HMMSEARCH --- RUN --- HmmSearch hit sequences saved in text format - {sequences_txt_path}")
     logger.info(f"RUN_HMMSEARCH --- RUN --- HmmSearch hit sequences saved in JSON format - {sequences_json_path}")
     logger.info(f"RUN_HMMSEARCH --- RUN --- HmmSearch TopHits results saved per domain - {per_domain_output}")
 
+    if not shard_info:
+        hits_table_dir = os.path.join(output_dir, HITS_TABLE_DIRNAME)
+        write_hits_table(hits_per_domain, hits_table_dir)
+        logger.info(f"RUN_HMMSEARCH --- RUN --- HmmSearch hits saved as a columnar table - {hits_table_dir}")
+
+def run_hmmsearch(
+    hmm: str, fasta_path: str, output_dir: str, logger: logging.Logger,
+    bit_cutoffs: str = "gathering", is_nucleotide: bool = False,
+    shard_index: int = 1, shard_count: int = 1, shard_by: str = "sequences",
+    database_size: Optional[int] = None, cache_path: Optional[str] = None, cpus: int = 0) -> None:
+    """Run HMMER search against target sequences and save results.
+
+    Executes hmmsearch using HMM profiles as queries against target sequences.
+    Processes hits to extract domain information and saves results in multiple formats.
+
+    Args:
+        hmm: Path to HMM profiles database file
+        fasta_path: Path to target sequences FASTA file
+        output_dir: Directory to save output files
+        logger: Logger instance for tracking execution
+        bit_cutoffs: Bit score cutoffs for reporting hits ("noise", "gathering", or "trusted")
+        is_nucleotide: If True, treats input as nucleotide sequences (default: False)
+        shard_index: 1-based index of the shard to run (default: 1)
+        shard_count: Total number of shards (default: 1, no sharding)
+        shard_by: Split target "sequences" or HMM "profiles" between shards
+        database_size: Global number of target sequences (Z) for E-values,
+            defaults to the number of sequences in fasta_path when sharding by sequences
+        cache_path: Optional SQLite cache of per-sequence hits (see hmmsearch_cache.py),
+            when given only sequences missing from it are searched
+        cpus: CPU threads used by hmmsearch, 0 for all available cores (default: 0)
+
+    Returns:
+        set[str]: Set of sequence IDs that had at least one domain hit
+
+    Outputs:
+        - hmmsearch_per_domain.json: JSON file containing detailed domain hits
+          Structure: {pfam_id: {seq_id: [{seq_hits_data}]}}
+        - hmmsearch_sequences.txt: Plain text file with hit sequence IDs
+        - hmmsearch_sequences.json: JSON file with hit sequence IDs
+        - hmmsearch_hits/: Columnar hits table indexed by domain and sequence (see hits_table.py)
+        Shards write hmmsearch_per_domain.shard_K_of_N.json and
+        hmmsearch_sequences.shard_K_of_N.json instead.
+
+    Domain data includes:
+        - hmm_name: Name of the matching HMM profile
+        - target_seq_name: ID of the target sequence
+        - bitscore: HMMER bit score for the match
+        - ali_from: Start position of alignment in target
+        - ali_to: End position of alignment in target
+        - ali_range: Formatted string of alignment range
+        - subseq: Aligned subsequence without gaps
+        - hmm_from: First HMM match state of the alignment
+        - hmm_to: Last HMM match state of the alignment
+        - state_path: Run-length HMM state path (M/I/D) of the subseq residues,
+          used to transfer annotations through match states without hmmalign
+    """
+    valid_cutoffs = ["noise", "gathering", "trusted"]
+    if bit_cutoffs not in valid_cutoffs:
+        logger.warning("RUN_HMMSEARCH --- RUN --- Invalid bit_cutoffs value: '%s'. Using default 'gathering'.", bit_cutoffs)
+        bit_cutoffs = "gathering"
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(hmm, 'rb') as f:
+        hmms = list(pyhmmer.plan7.HMMFile(f))
+
+    sequence_shards = shard_count if shard_by == "sequences" else 1
+    if shard_count > 1 and shard_by == "profiles":
+        hmms = [hmm_profile for position, hmm_profile in enumerate(hmms) if in_shard(position, shard_index, shard_count)]
+        logger.info("RUN_HMMSEARCH --- RUN --- Profile shard %d of %d holds %d HMMs", shard_index, shard_count, len(hmms))
+
+    if database_size is None and sequence_shards > 1:
+        database_size = count_fasta_sequences(fasta_path)
+    if database_size is not None:
+        logger.info("RUN_HMMSEARCH --- RUN --- Using global database size Z=%d", database_size)
+
+    targets = load_and_translate_sequence_file(fasta_path, logger, is_nucleotide, shard_index, sequence_shards)
+
+    if cache_path:
+        if not isinstance(targets, DigitalSequenceBlock):
+            targets = targets.read_block()
+        hmm_checksum = file_md5(hmm)
+        if shard_count > 1 and shard_by == "profiles":
+            hmm_checksum = f"{hmm_checksum}:profiles:{shard_index}/{shard_count}"
+        hits_per_domain, hit_sequences = search_with_cache(
+            hmms, targets, hmm_checksum, cache_path, logger, bit_cutoffs, database_size, cpus
+        )
+    else:
+        search_options = {"cpus": cpus, "bit_cutoffs": bit_cutoffs}
+        if database_size is not None:
+            search_options["Z"] = database_size
+        hits_per_domain, hit_sequences = collect_domain_hits(pyhmmer.hmmsearch(hmms, targets, **search_options))
+
+    shard_info = None
+    if shard_count > 1:
+        shard_info = {
+            "index": shard_index,
+            "count": shard_count,
+            "by": shard_by,
+            "database_size": database_size,
+            "bit_cutoffs": bit_cutoffs,
+        }
+    write_hmmsearch_outputs(
+        hits_per_domain, hit_sequences, output_dir, logger,
+        suffix=get_shard_suffix(shard_index, shard_count), shard_info=shard_info
+    )
+    return hit_sequences
+
 def main():
     """Main function, initializes this script"""
     args = parse_arguments()
@@ -227,8 +509,13 @@ def main():
     is_nucleotide = args.nucleotide
     logger.info("RUN_HMMSEARCH --- MAIN --- Running hmmsearch with arguments: %s", args)
 
-    # Run hmmsearch for all sequences
-    run_hmmsearch(input_hmm, input_fasta, output_dir, logger, bit_cutoffs, is_nucleotide)
+    # Run hmmsearch for all sequences, or a single shard of them
+    run_hmmsearch(
+        input_hmm, input_fasta, output_dir, logger, bit_cutoffs, is_nucleotide,
+        shard_index=args.shard_index, shard_count=args.shard_count,
+        shard_by=args.shard_by, database_size=args.database_size, cache_path=args.cache,
+        cpus=args.cpus
+    )
 
 if __name__ == '__main__':
     main()
@@ -36,7 +36,27 @@ Functions:
     1 - parse_arguments - Parse command-line arguments for running InterProScan.
     2 - create_batch_fasta - Creates a FASTA file containing all sequences in a batch.
     3 - run_interproscan - Run InterProScan with the given arguments.
-    4 - split_iprscan_output - Splits InterProScan output files by sequence.
+    4 - split_iprscan_output - Splits InterProScan output files (TSV, XML, JSON, GFF3) by sequence,
+        streaming each batch file (see iprscan_splitters.py).
+    5 - get_batch_md5s - Computes the MD5 digest of each sequence in a batch.
+    6 - scan_with_cache - Runs InterProScan only on the batch sequences missing from the cache.
+    7 - read_batch_tsv - Groups the lines of a batch TSV by sequence.
+    8 - finish_batch - Indexes the TSV matches of a batch and splits its outputs.
+    9 - run_interproscan_bisecting - Runs a batch, bisecting it on failure to quarantine bad sequences.
+    10 - write_quarantine - Records quarantined and re-scanned sequences of a batch.
+
+If InterProScan fails on a batch, the batch is split in halves and each half is run again,
+recursively, until the sequences that fail on their own are isolated in a quarantine list
+(batches/iprscan_batch_<idx>.quarantine.json) and every other sequence has its results.
+
+With --cache (batch mode), matches are kept in an SQLite cache (see iprscan_cache.py)
+keyed by sequence MD5, InterProScan version, analyses and residue annotation flag.
+Only cache misses go into the batch FASTA, and per-sequence TSV files are written
+from the cache, whether their sequences were scanned in this run or an earlier one.
+
+In batch mode, the TSV matches of each batch are also added to the proteome-wide match index
+(<sequence parent dir>/iprscan_matches.sqlite, see iprscan_index.py), read by transfer_annotations.py.
+With --no-split-tsv, per-sequence iprscan.tsv files are not written at all.
 
 Reference for TSV output columns:
 https://interproscan-docs.readthedocs.io/en/latest/OutputFormats.html#tab-separated-values-format-tsv
@@ -45,11 +65,25 @@ https://interproscan-docs.readthedocs.io/en/latest/OutputFormats.html#tab-separa
 
 import os
 import sys
+import json
 import argparse
 import logging
 import subprocess
-from typing import Callable
-from utils import get_logger, get_multi_logger
+import xml.etree.ElementTree as ET
+from typing import Callable, Optional
+from utils import get_logger, get_multi_logger, read_fasta_records
+from hmmsearch_cache import sequence_md5
+from iprscan_cache import (
+    get_iprscan_version,
+    normalize_analyses,
+    open_cache,
+    get_cached_matches,
+    store_matches,
+    strip_accession,
+    add_accession,
+)
+from iprscan_index import IPRSCAN_INDEX_FILENAME, open_index, index_sequence_lines
+from iprscan_splitters import SequenceWriters, SPLITTERS
 
 def parse_arguments():
     """Parse command-line arguments for running InterProScan."""
@@ -74,6 +108,9 @@ def parse_arguments():
     batch_file_parser = subparsers.add_parser("batch")
     batch_file_parser.add_argument("-sB", "--sequence-batch",
                         help="Comma-separated list of sequence IDs to process")
+    batch_file_parser.add_argument("-sBf", "--sequence-batch-file",
+                        help="File with the sequence IDs to process, one per line, \
+                        for batches too large for a command-line argument")
     batch_file_parser.add_argument("-sBi", "--sequence-batch-index",
                         help="Index of this batch (for naming)")
     batch_file_parser.add_argument("-sPd", "--sequence-parent-dir",
@@ -104,6 +141,22 @@ def parse_arguments():
     parser.add_argument("-iCc", "--cpu-cores",
                         help="Number of CPU cores to use per job",
                         required=False, type=int, default=8)
+    parser.add_argument("-iC", "--cache",
+                        help="Optional (batch mode): SQLite cache of InterProScan matches per sequence, \
+                        shared between runs. Only sequences missing from it are scanned",
+                        required=False, type=str, default="")
+    parser.add_argument("-iV", "--iprscan-version",
+                        help="Optional: InterProScan version used in cache keys, \
+                        read from interproscan.sh --version if not given",
+                        required=False, type=str, default="")
+    parser.add_argument("-iMq", "--max-quarantine",
+                        help="Batch mode: a failed batch is bisected to quarantine the sequences making \
+                        InterProScan fail, giving up past this many (0 disables bisection)",
+                        required=False, type=int, default=10)
+    parser.add_argument("-iNs", "--no-split-tsv", action="store_true",
+                        help="Flag to keep TSV matches only in the match index (batch mode), \
+                        without writing an iprscan.tsv per sequence",
+                        required=False)
     parser.add_argument("-l", "--log",
                         help="Log path",
                         required=False, type=str, default="logs/run_iprscan.log")
@@ -116,32 +169,40 @@ def parse_arguments():
             parser.error("Single mode requires --sequence")
 
     if args.mode == "batch":
-        if not args.sequence_batch:
-            parser.error("Batch mode requires --sequence-batch")
+        if not args.sequence_batch and not args.sequence_batch_file:
+            parser.error("Batch mode requires --sequence-batch or --sequence-batch-file")
         if not args.sequence_batch_index:
             parser.error("Batch mode requires --sequence")
         if not args.sequence_parent_dir:
             parser.error("Batch mode requires --sequence-parent-dir")
 
     # Validate batch mode arguments
-    if args.sequence_batch and not args.sequence_parent_dir:
+    has_batch = bool(getattr(args, "sequence_batch", None) or getattr(args, "sequence_batch_file", None))
+    if has_batch and not args.sequence_parent_dir:
         parser.error("--sequence-batch requires --sequence-parent-dir")
-    if args.sequence_parent_dir and not args.sequence_batch:
+    if getattr(args, "sequence_parent_dir", None) and not has_batch:
         parser.error("--sequence-parent-dir requires --sequence-batch")
 
     args.output_format = ', '.join(fmt.strip() for fmt in args.output_format.split(','))
 
     return args
 
+def read_sequence_batch(args: argparse.Namespace) -> list[str]:
+    """Sequence IDs of a batch, from --sequence-batch-file when given, else from --sequence-batch."""
+    if args.sequence_batch_file:
+        with open(args.sequence_batch_file, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return [sb.strip() for sb in args.sequence_batch.split(',')]
+
 def create_batch_fasta(
-    sequence_parent_dir: str, sequence_batch_dash: list[str], batch_idx: int,
+    sequence_parent_dir: str, sequence_batch_dash: list[str], batch_idx: int | str,
     logger: logging.Logger, multi_logger: Callable) -> str:
     """Creates a FASTA file containing all sequences in the batch.
 
     Args:
         sequence_parent_dir: Parent directory containing sequence subdirectories
         sequence_batch_dash: List of sequence IDs in this batch, using dashes instead of pipes
-        batch_idx: Index of this batch (for naming)
+        batch_idx: Index of this batch, or its bisection label (for naming)
         logger: Logger function
 
     Returns:
@@ -179,57 +240,51 @@ def create_batch_fasta(
 
 def split_iprscan_output(
     output_base: str, sequence_batch_pipe: list[str], formats: list[str],
-    logger: logging.Logger, multi_logger: Callable) -> None:
+    logger: logging.Logger, multi_logger: Callable,
+    sequence_tsv_lines: Optional[dict[str, list[str]]] = None) -> None:
     """Splits InterProScan output files by sequence.
 
     Args:
         output_base: Base path of InterProScan output files
-        sequence_ids: List of sequence IDs in the batch
+        sequence_batch_pipe: List of sequence IDs in the batch
         formats: List of output formats to process
         logger: Logger function
+        sequence_tsv_lines: Optional {seq_id: [TSV lines]}, already grouped (e.g. from the
+            InterProScan cache), written as the per-sequence TSV files instead of splitting the batch TSV
     """
-    logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- Using sequence_ids: %s", sequence_batch_pipe)
+    logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- Splitting outputs of %d sequences", len(sequence_batch_pipe))
+    parent_dir = os.path.dirname(os.path.dirname(output_base))
+    sequence_ids = set(sequence_batch_pipe)
     for fmt in formats:
         fmt = fmt.strip().lower()
+        if fmt == "tsv" and sequence_tsv_lines is not None:
+            with SequenceWriters(parent_dir, "iprscan.tsv") as writers:
+                for seq_id, lines in sequence_tsv_lines.items():
+                    if lines:
+                        writers.write(seq_id, "".join(lines))
+            logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
+            Wrote grouped TSV output for %d sequences", writers.sequences_written)
+            continue
+
+        splitter = SPLITTERS.get(fmt)
+        if splitter is None:
+            multi_logger("warning", "RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
+            Unknown or unsupported InterProScan output format: %s", fmt.upper())
+            continue
         input_file = f"{output_base}.{fmt}"
         logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- Splitting InterProScan output file: %s", input_file)
         if not os.path.exists(input_file):
             multi_logger("error", "RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
             InterProScan output file not found: %s", input_file)
             continue
-
-        if fmt == "tsv":
-            logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- Splitting TSV output")
-            # TSV format - split by sequence ID in first column
-            with open(input_file, "r", encoding="utf-8") as f:
-                # Group lines by sequence ID
-                sequence_outputs = {}
-                for line in f:
-                    if line.strip():
-                        seq_id = line.split("\t")[0]
-                        logger.info(f"RUN_IPRSCAN --- SPLIT_IPRSCAN --- Sequence ID {seq_id}")
-                        if seq_id in sequence_batch_pipe:
-                            sequence_outputs.setdefault(seq_id, []).append(line)
-
-                # Write individual sequence files
-                for seq_id, lines in sequence_outputs.items():
-                    sanitized_seq_id = seq_id.replace("|", "-")
-                    seq_dir = os.path.join(os.path.dirname(os.path.dirname(output_base)), sanitized_seq_id)
-                    os.makedirs(seq_dir, exist_ok=True)
-                    out_file = os.path.join(seq_dir, f"iprscan.{fmt}")
-                    with open(out_file, "w", encoding="utf-8") as f:
-                        f.writelines(lines)
-            logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
-            Split TSV output for %d sequences", len(sequence_outputs))
-
-        elif fmt in ["xml", "json", "gff3"]:
-            logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
-            Splitting %s output is not yet supported, may be in the future \
-            if sufficient need is made evident", fmt.upper())
-
-        else:
-            multi_logger("warning", "RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
-            Unknown or unsupported InterProScan output format: %s", fmt.upper())
+        try:
+            written = splitter(input_file, sequence_ids, parent_dir)
+        except (ValueError, ET.ParseError) as e:
+            multi_logger("error", "RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
+            Could not split %s output %s: %s", fmt.upper(), input_file, e)
+            continue
+        logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- \
+        Split %s output for %d sequences", fmt.upper(), written)
 
     logger.info("RUN_IPRSCAN --- SPLIT_IPRSCAN --- Finished splitting InterProScan output files")
 
@@ -290,6 +345,239 @@ def run_interproscan(
         Output saved to %s.%s", output_basefile, output_format.lower())
 
 
+def get_batch_md5s(
+    sequence_parent_dir: str, sequence_batch_dash: list[str], multi_logger: Callable) -> dict[str, str]:
+    """Computes the MD5 digest of each sequence in the batch, from its sequence.fasta.
+
+    Args:
+        sequence_parent_dir: Parent directory containing sequence subdirectories
+        sequence_batch_dash: List of sequence IDs in this batch, using dashes instead of pipes
+        multi_logger: Callable to send messages to both a main and batch logger
+
+    Returns:
+        dict[str, str]: {seq_id_dash: MD5}, without sequences whose FASTA is missing
+    """
+    md5s = {}
+    for seq_id in sequence_batch_dash:
+        seq_fasta = os.path.join(sequence_parent_dir, seq_id, "sequence.fasta")
+        if not os.path.exists(seq_fasta):
+            multi_logger("warning", "RUN_IPRSCAN --- GET_BATCH_MD5S --- Sequence file not found: %s", seq_fasta)
+            continue
+        for _, sequence in read_fasta_records(seq_fasta):
+            md5s[seq_id] = sequence_md5(sequence)
+    return md5s
+
+def run_interproscan_bisecting(
+    args, sequence_batch_dash: list[str], logger: logging.Logger,
+    multi_logger: Callable) -> tuple[list[tuple[str, list[str]]], list[str], int]:
+    """Runs InterProScan on a batch and, if it fails, on each half of it, recursively,
+    so a few bad sequences are quarantined while the rest of the batch completes.
+    Sub-batches are labelled by their path from the batch, e.g. batch 3 -> 3a, 3b -> 3aa, ...
+
+    Args:
+        args: Parsed command-line arguments (batch mode)
+        sequence_batch_dash: List of sequence IDs to scan, using dashes instead of pipes
+        logger: Logger function
+        multi_logger: Callable to send messages to both a main and batch logger
+
+    Returns:
+        tuple: [(output base, sequence IDs)] of the successful runs, quarantined sequence IDs
+        and the number of sequences scanned again after failures
+
+    Raises:
+        subprocess.CalledProcessError: If bisection is disabled (max_quarantine 0)
+        or more than max_quarantine sequences fail on their own, suggesting a failure unrelated to sequences
+    """
+    parts, quarantined = [], []
+    rescanned = runs = 0
+    pending = [(str(args.sequence_batch_index), sequence_batch_dash)]
+    while pending:
+        label, sequences = pending.pop(0)
+        runs += 1
+        if label != str(args.sequence_batch_index):
+            rescanned += len(sequences)
+        input_fasta = create_batch_fasta(
+            sequence_parent_dir=args.sequence_parent_dir,
+            sequence_batch_dash=sequences,
+            batch_idx=label,
+            logger=logger,
+            multi_logger=multi_logger
+        )
+        output_base = os.path.join(os.path.dirname(input_fasta), f"iprscan_batch_{label}")
+        try:
+            run_interproscan(
+                iprscan_path=args.iprscan_path,
+                enable_precalc=args.enable_precalc,
+                disable_res=args.disable_res,
+                input_fasta=input_fasta,
+                output_basefile=output_base,
+                output_format=args.output_format,
+                analyses=args.analyses,
+                cpu_cores=args.cpu_cores,
+                multi_logger=multi_logger
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode("utf-8", errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+            multi_logger("warning", "RUN_IPRSCAN --- BISECT --- InterProScan failed on batch %s (%d sequences): %s",
+                         label, len(sequences), stderr)
+            if args.max_quarantine == 0:
+                raise
+            if len(sequences) > 1:
+                middle = len(sequences) // 2
+                pending[:0] = [(f"{label}a", sequences[:middle]), (f"{label}b", sequences[middle:])]
+                continue
+            quarantined.extend(sequences)
+            multi_logger("warning", "RUN_IPRSCAN --- BISECT --- Quarantined sequence %s", sequences[0])
+            if len(quarantined) > args.max_quarantine:
+                multi_logger("error", "RUN_IPRSCAN --- BISECT --- More than %d sequences failed on their own, \
+                the failure is likely not caused by sequences. Giving up on batch %s",
+                args.max_quarantine, args.sequence_batch_index)
+                raise
+            continue
+        parts.append((output_base, sequences))
+
+    if rescanned or quarantined:
+        multi_logger("warning", "RUN_IPRSCAN --- BISECT --- Batch %s: %d sequences re-scanned in %d extra runs, %d quarantined",
+                     args.sequence_batch_index, rescanned, runs - 1, len(quarantined))
+    return parts, quarantined, rescanned
+
+def write_quarantine(
+    sequence_parent_dir: str, batch_idx: str, quarantined: list[str], rescanned: int) -> Optional[str]:
+    """Writes batches/iprscan_batch_<idx>.quarantine.json if any sequence was quarantined
+    or re-scanned, collected by the executor into iprscan_quarantine.json.
+
+    Returns:
+        Optional[str]: Path to the written file, None if nothing was written
+    """
+    if not quarantined and not rescanned:
+        return None
+    quarantine_path = os.path.join(sequence_parent_dir, "batches", f"iprscan_batch_{batch_idx}.quarantine.json")
+    with open(quarantine_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "batch": batch_idx,
+            "quarantined": [seq_id.replace("-", "|") for seq_id in quarantined],
+            "rescanned_sequences": rescanned,
+        }, f, indent=4)
+    return quarantine_path
+
+def scan_with_cache(
+    args, cache_path: str, iprscan_version: str, sequence_batch_dash: list[str],
+    logger: logging.Logger, multi_logger: Callable
+    ) -> tuple[list[tuple[str, list[str]]], dict[str, list[str]], list[str], int]:
+    """Runs InterProScan on the batch sequences missing from the cache, stores their matches,
+    and returns the matches of the whole batch.
+
+    Args:
+        args: Parsed command-line arguments (batch mode)
+        cache_path: Path to the InterProScan cache database
+        iprscan_version: InterProScan version used in cache keys
+        sequence_batch_dash: List of sequence IDs in this batch, using dashes instead of pipes
+        logger: Logger function
+        multi_logger: Callable to send messages to both a main and batch logger
+
+    Returns:
+        tuple: [(output base, sequence IDs)] of the InterProScan runs (empty if every sequence was cached),
+        {seq_id (pipes): [TSV lines]} for every scanned or cached sequence of the batch,
+        quarantined sequence IDs and the number of sequences re-scanned after failures
+    """
+    analyses = normalize_analyses(args.analyses)
+    residues = not args.disable_res
+    batch_md5s = get_batch_md5s(args.sequence_parent_dir, sequence_batch_dash, multi_logger)
+    connection = open_cache(cache_path)
+    parts, quarantined, rescanned = [], [], 0
+    try:
+        cached = get_cached_matches(connection, batch_md5s.values(), iprscan_version, analyses, residues)
+        misses = [seq_id for seq_id, md5 in batch_md5s.items() if md5 not in cached]
+        logger.info(
+            "RUN_IPRSCAN --- CACHE --- %d of %d sequences found in cache (InterProScan %s)",
+            len(batch_md5s) - len(misses), len(batch_md5s), iprscan_version
+        )
+
+        if misses:
+            parts, quarantined, rescanned = run_interproscan_bisecting(args, misses, logger, multi_logger)
+        for output_base, part in parts:
+            tsv_path = f"{output_base}.tsv"
+            if not os.path.exists(tsv_path):
+                multi_logger("error", "RUN_IPRSCAN --- CACHE --- \
+                InterProScan TSV output not found, nothing stored: %s", tsv_path)
+                continue
+            md5_per_pipe = {seq_id.replace("-", "|"): batch_md5s[seq_id] for seq_id in part}
+            scanned = {batch_md5s[seq_id]: [] for seq_id in part}
+            with open(tsv_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    md5 = md5_per_pipe.get(line.split("\t", 1)[0])
+                    if md5 is not None and line.strip():
+                        scanned[md5].append(strip_accession(line))
+            store_matches(connection, scanned, iprscan_version, analyses, residues)
+            cached.update(scanned)
+    finally:
+        connection.close()
+
+    batch_matches = {}
+    for seq_id, md5 in batch_md5s.items():
+        if md5 not in cached:
+            continue
+        seq_id_pipe = seq_id.replace("-", "|")
+        batch_matches[seq_id_pipe] = [add_accession(seq_id_pipe, line) for line in cached[md5]]
+    return parts, batch_matches, quarantined, rescanned
+
+def read_batch_tsv(tsv_path: str, sequence_batch_pipe: list[str]) -> dict[str, list[str]]:
+    """Groups the lines of a batch TSV by sequence, in one pass.
+
+    Returns:
+        dict[str, list[str]]: {seq_id: [TSV lines]} for every sequence of the batch,
+        with no lines for sequences without matches
+    """
+    sequence_lines = {seq_id: [] for seq_id in sequence_batch_pipe}
+    if os.path.exists(tsv_path):
+        with open(tsv_path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines = sequence_lines.get(line.split("\t", 1)[0])
+                if lines is not None and line.strip():
+                    lines.append(line)
+    return sequence_lines
+
+def finish_batch(
+    parts: list[tuple[str, list[str]]], sequence_parent_dir: str, formats: list[str],
+    sequence_lines: dict[str, list[str]], no_split_tsv: bool,
+    logger: logging.Logger, multi_logger: Callable) -> None:
+    """Adds the TSV matches of a batch to the match index, then splits its outputs by sequence.
+
+    Args:
+        parts: [(output base, sequence IDs with dashes)] of the batch's InterProScan runs
+        sequence_parent_dir: Parent directory of sequence subdirectories, where the index lies
+        formats: List of output formats to split
+        sequence_lines: {seq_id: [TSV lines]} for every sequence of the batch with results
+        no_split_tsv: Whether to skip writing per-sequence iprscan.tsv files
+        logger: Logger function
+        multi_logger: Callable to send messages to both a main and batch logger
+    """
+    connection = open_index(os.path.join(sequence_parent_dir, IPRSCAN_INDEX_FILENAME))
+    try:
+        indexed = index_sequence_lines(connection, sequence_lines)
+    finally:
+        connection.close()
+    logger.info("RUN_IPRSCAN --- INDEX --- Indexed %d matches of %d sequences", indexed, len(sequence_lines))
+
+    other_formats = [fmt for fmt in formats if fmt.strip().lower() != "tsv"]
+    if not no_split_tsv and len(other_formats) < len(formats):
+        split_iprscan_output(
+            output_base=os.path.join(sequence_parent_dir, "batches", "iprscan_batch"),
+            sequence_batch_pipe=list(sequence_lines),
+            formats=["tsv"],
+            logger=logger,
+            multi_logger=multi_logger,
+            sequence_tsv_lines=sequence_lines)
+    # Other formats only come from InterProScan runs, not the cache
+    if other_formats:
+        for output_base, part in parts:
+            split_iprscan_output(
+                output_base=output_base,
+                sequence_batch_pipe=[seq_id.replace("-", "|") for seq_id in part],
+                formats=other_formats,
+                logger=logger,
+                multi_logger=multi_logger)
+
 def main():
     """Main function, initializes this script"""
     args = parse_arguments()
@@ -311,32 +599,41 @@ def main():
         Absence indicates issue with missing batch arguments. Exiting.")
         sys.exit(1)
 
-    input_fasta = None
-    sequence_batch_pipe = None
+    iprscan_version = None
+    if args.cache and args.mode == "batch":
+        iprscan_version = args.iprscan_version or get_iprscan_version(args.iprscan_path)
+        if not iprscan_version:
+            log_to_both("warning", "RUN_IPRSCAN --- MAIN --- Could not read the InterProScan version, \
+            running without cache. Pass it with --iprscan-version.")
 
-    if args.mode == "single":
-        # Single File Mode
-        input_fasta = args.fasta
-    elif args.mode == "batch":
-        # Batch Mode
-        sequence_batch_dash = [sb.strip() for sb in args.sequence_batch.split(',')]
-        sequence_batch_pipe = [sb.replace("-", "|") for sb in sequence_batch_dash]
-        input_fasta = create_batch_fasta(
-            sequence_parent_dir=args.sequence_parent_dir,
-            sequence_batch_dash=sequence_batch_dash,
-            batch_idx=args.sequence_batch_index,
-            logger=sequence_logger,
-            multi_logger=log_to_both
+    if args.mode == "batch":
+        sequence_batch_dash = read_sequence_batch(args)
+        formats = [fmt.strip() for fmt in args.output_format.split(',')]
+        if iprscan_version:
+            parts, sequence_lines, quarantined, rescanned = scan_with_cache(
+                args, args.cache, iprscan_version, sequence_batch_dash, sequence_logger, log_to_both
+            )
+        else:
+            parts, quarantined, rescanned = run_interproscan_bisecting(
+                args, sequence_batch_dash, sequence_logger, log_to_both
+            )
+            sequence_lines = {}
+            for output_base, part in parts:
+                sequence_lines.update(read_batch_tsv(f"{output_base}.tsv", [sb.replace("-", "|") for sb in part]))
+        finish_batch(
+            parts, args.sequence_parent_dir, formats, sequence_lines,
+            args.no_split_tsv, sequence_logger, log_to_both
         )
+        write_quarantine(args.sequence_parent_dir, args.sequence_batch_index, quarantined, rescanned)
+        return
 
-    if input_fasta and args.mode == "single":
-        output_base = os.path.join(os.path.dirname(input_fasta), "iprscan")
-    elif input_fasta and args.mode == "batch":
-        output_base = os.path.join(os.path.dirname(input_fasta), f"iprscan_batch_{args.sequence_batch_index}")
-    else:
+    # Single File Mode
+    input_fasta = args.fasta
+    if not input_fasta:
         log_to_both("error", "RUN_IPRSCAN --- MAIN --- No input fasta file found, \
         cannot run InterProScan without sequences. Exiting.")
         sys.exit(1)
+    output_base = os.path.join(os.path.dirname(input_fasta), "iprscan")
 
     # Run InterProScan
     run_interproscan(
@@ -351,15 +648,5 @@ def main():
         multi_logger=log_to_both
     )
 
-    # Split outputs if in batch mode
-    if args.mode == "batch" and sequence_batch_pipe:
-        formats = [fmt.strip() for fmt in args.output_format.split(',')]
-        split_iprscan_output(
-            output_base=output_base,
-            sequence_batch_pipe=sequence_batch_pipe,
-            formats=formats,
-            logger=sequence_logger,
-            multi_logger=log_to_both)
-
 if __name__ == '__main__':
     main()
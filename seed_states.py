@@ -0,0 +1,146 @@
+"""
+seed_states.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script precomputes, once per resource release, the HMM states of the seed rows that
+annotation transfer reads: rows whose sequence has entries in annotations.json and the
+conservation reference row, the single key of conservations.json. Each family gets a
+resource_dir/PF*/seed_states.json with, for every such row, its residues and a state path
+(as run_hmmsearch.py persists for target hits), placing each residue on its HMM match
+state or between states as an insertion:
+
+{"hmm_length": 254, "rows": {"Q9NU22_HUMAN/325-451": {"subseq": ..., "hmm_from": 1, "state_path": "3I120M2D..."}}}
+
+With it, run_hmmalign.py aligns targets to the HMM alone instead of re-embedding the whole
+seed with --mapali, and transfer_annotations.py (alignment_source hmmsearch) skips parsing
+the seed and HMM, both working on alignments with only the rows they use.
+Rebuild it whenever the family's seed, HMM, annotations or conservations change.
+
+Usage:
+    python seed_states.py -r resources -t 8
+"""
+
+import os
+import json
+import argparse
+import logging
+from typing import Optional
+from joblib import Parallel, delayed
+from hmm_states import (
+    SEED_STATES_FILENAME,
+    read_seed_alignment,
+    get_seed_match_columns,
+    seed_row_to_nodes,
+    nodes_to_state_path,
+)
+from utils import get_logger
+
+def parse_arguments():
+    """Parse command-line arguments for precomputing seed states
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Writes resource_dir/PF*/seed_states.json for every family")
+    parser.add_argument("-r", "--resource-dir", help="Resource dir path", required=True, type=str)
+    parser.add_argument("-d", "--domains", help="Only these families", nargs="*", default=[])
+    parser.add_argument("-t", "--threads", help="Families processed at once", required=False, type=int, default=1)
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/seed_states.log")
+    return parser.parse_args()
+
+def read_json_keys(json_path: str) -> list[str]:
+    """Top-level keys of a JSON file, empty if it's absent or empty."""
+    if not os.path.isfile(json_path):
+        return []
+    with open(json_path, "r", encoding="utf-8") as f:
+        return list(json.load(f) or {})
+
+def select_reference_rows(row_names: list[str], annotated_sequences: list[str], conservation_keys: list[str]) -> list[str]:
+    """Seed rows read by annotation transfer: rows of annotated sequences (annotations.json
+    is keyed by the row name before "/") and the conservation reference row."""
+    annotated = set(annotated_sequences)
+    conservation = set(conservation_keys)
+    return [name for name in row_names if name.split("/")[0] in annotated or name in conservation]
+
+def build_seed_states(family_dir: str) -> Optional[dict]:
+    """Computes the seed_states.json content of a family directory.
+
+    Args:
+        family_dir: resource_dir/PF* directory with domain.hmm and alignment.seed
+
+    Returns:
+        Optional[dict]: {"hmm_length", "rows": {name: {"subseq", "hmm_from", "state_path"}}},
+        None if the family lacks its HMM or seed
+    """
+    hmm_path = os.path.join(family_dir, "domain.hmm")
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    if not os.path.isfile(hmm_path) or not os.path.isfile(seed_path):
+        return None
+    seed_rows, reference = read_seed_alignment(seed_path)
+    hmm_length, match_columns = get_seed_match_columns(hmm_path, reference)
+    selected = select_reference_rows(
+        list(seed_rows),
+        read_json_keys(os.path.join(family_dir, "annotations.json")),
+        read_json_keys(os.path.join(family_dir, "conservations.json")),
+    )
+    rows = {}
+    for name in selected:
+        subseq, hmm_from, state_path = nodes_to_state_path(*seed_row_to_nodes(seed_rows[name], match_columns))
+        rows[name] = {"subseq": subseq, "hmm_from": hmm_from, "state_path": state_path}
+    return {"hmm_length": hmm_length, "rows": rows}
+
+def write_seed_states(family_dir: str) -> Optional[int]:
+    """Writes a family's seed_states.json, returning its number of rows (None if skipped)."""
+    seed_states = build_seed_states(family_dir)
+    if seed_states is None:
+        return None
+    seed_states_path = os.path.join(family_dir, SEED_STATES_FILENAME)
+    with open(f"{seed_states_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(seed_states, f)
+    os.replace(f"{seed_states_path}.tmp", seed_states_path)
+    return len(seed_states["rows"])
+
+def write_all_seed_states(resource_dir: str, logger: logging.Logger, domains: list[str] = None, threads: int = 1) -> dict[str, int]:
+    """Writes seed_states.json for every family (or the given ones) of resource_dir.
+
+    Returns:
+        dict[str, int]: {family: rows written}, for families with an HMM and seed
+    """
+    families = domains or sorted(
+        entry.name for entry in os.scandir(resource_dir) if entry.is_dir() and entry.name.startswith("PF")
+    )
+    written = Parallel(n_jobs=threads)(
+        delayed(write_seed_states)(os.path.join(resource_dir, family)) for family in families
+    )
+    row_counts = {family: rows for family, rows in zip(families, written) if rows is not None}
+    logger.info(
+        "SEED_STATES --- WRITE --- Wrote %s for %d of %d families, %d seed rows in total",
+        SEED_STATES_FILENAME, len(row_counts), len(families), sum(row_counts.values())
+    )
+    return row_counts
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("SEED_STATES --- MAIN --- Running with arguments: %s", args)
+    write_all_seed_states(args.resource_dir, logger, args.domains, args.threads)
+
+if __name__ == "__main__":
+    main()
@@ -18,18 +18,27 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
 MA 02110-1301, USA.
 
-This script prepares sequences from a FASTA file for batch processing:
+This script prepares sequences from a FASTA file for batch processing,
+in a single streaming pass over the input:
 
 1. Creates a JSON mapping (all_sequences.json) that organizes sequence IDs
-   into batches of configurable size
+   into batches of configurable size, either by sequence count or by total residues,
+   with the statistics of each batch under the "batching" key. Optionally, only the sequences
+   listed in an include JSON (e.g. those hitting resource-backed Pfam domains) are batched
 
 2. Creates individual directories for each sequence and writes the
    corresponding sequence to a FASTA file within each directory
 
+3. Writes per-sequence statistics (sequence_stats.tsv): ID, length and MD5
+
 The script accepts the following parameters:
 - FASTA file path (required)
 - Output directory path (required)
 - Batch size (default: 2000)
+- Batch mode: "sequences" (count only) or "residues" (default: sequences)
+- Residues per batch, for the residues mode (default: 1000000)
+- Longest sequence sharing a batch, for the residues mode (optional)
+- JSON with the sequences to batch, as {"sequences": [...]} (optional, default: all)
 - Flag to indicate nucleotide sequences (default: protein sequences)
 - Log file path (optional)
 
@@ -37,11 +46,13 @@ The script accepts the following parameters:
 
 import os
 import json
+import hashlib
 import argparse
 import logging
-from typing import Iterator
-from Bio.SeqRecord import SeqRecord
-from utils import get_logger, seqrecord_yielder, make_dirs_and_write_fasta
+from typing import Iterator, Optional
+from utils import get_logger, read_fasta_records, chunk_records, translate_records, write_fasta_record
+
+BATCH_MODES = ["sequences", "residues"]
 
 def parse_arguments():
     """Parse command-line arguments for sequence and batch preparation"""
@@ -52,6 +63,17 @@ def parse_arguments():
                     required=True, type=str)
     parser.add_argument("-b", "--batch-size", help="Maximum sequences per batch",
                     type=int, default=2000)
+    parser.add_argument("-bm", "--batch-mode", help="Batch by sequence count only or also by total residues",
+                    type=str, choices=BATCH_MODES, default="sequences")
+    parser.add_argument("-br", "--batch-residues", help="Maximum total residues per batch in residues mode",
+                    type=int, default=1000000)
+    parser.add_argument("-bL", "--max-batch-length",
+                    help="Optional: in residues mode, sequences longer than this get a batch of their own",
+                    type=int, default=None)
+    parser.add_argument("-iS", "--include-sequences",
+                    help="Optional: JSON with the only sequence IDs to batch, as {'sequences': [...]}. \
+                    Every sequence still gets its directory and statistics",
+                    type=str, default=None)
     parser.add_argument("-n", "--nucleotide",
                     help="Flag to indicate nucleotide instead of default protein sequences",
                     action="store_true")
@@ -61,41 +83,152 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def create_sequence_batches_json(
-    sequences: Iterator[SeqRecord],
+def iter_prepared_records(fasta: str, is_nucleotide: bool = False, chunk_size: int = 5000) -> Iterator[tuple[str, str]]:
+    """Yields (header, protein sequence) tuples, translating nucleotide input chunk by chunk."""
+    if not is_nucleotide:
+        yield from read_fasta_records(fasta)
+        return
+    for chunk in chunk_records(read_fasta_records(fasta), chunk_size):
+        yield from translate_records(chunk)
+
+class SequenceBatcher:
+    """Groups sequences into batches as they are streamed.
+
+    In "sequences" mode a batch closes at batch_size sequences. In "residues" mode it also
+    closes before its total residues would exceed batch_residues, and sequences longer than
+    max_length are placed in batches of their own, so that batches have similar expected
+    InterProScan runtimes.
+    """
+
+    def __init__(self, batch_size: int, batch_mode: str = "sequences",
+                 batch_residues: int = 1000000, max_length: Optional[int] = None):
+        if batch_mode not in BATCH_MODES:
+            raise ValueError(f"Invalid batch mode '{batch_mode}', must be one of: {', '.join(BATCH_MODES)}")
+        self.batch_size = batch_size
+        self.batch_mode = batch_mode
+        self.batch_residues = batch_residues
+        self.max_length = max_length
+        self.batches = {}
+        self.batch_stats = {}
+        self._current = []
+        self._residues = 0
+        self._longest = 0
+        self.excluded_sequences = 0
+        self.excluded_residues = 0
+
+    def _close(self) -> None:
+        if not self._current:
+            return
+        batch_name = f"batch_{len(self.batches) + 1}"
+        self.batches[batch_name] = self._current
+        self.batch_stats[batch_name] = {"sequences": len(self._current), "residues": self._residues, "longest": self._longest}
+        self._current, self._residues, self._longest = [], 0, 0
+
+    def add(self, seq_id: str, length: int) -> None:
+        """Adds a sequence, closing the current batch first if it would not fit."""
+        if self.batch_mode == "residues":
+            if self.max_length is not None and length > self.max_length:
+                self._close()
+                self._current, self._residues, self._longest = [seq_id], length, length
+                self._close()
+                return
+            if self._current and self._residues + length > self.batch_residues:
+                self._close()
+        self._current.append(seq_id)
+        self._residues += length
+        self._longest = max(self._longest, length)
+        if len(self._current) >= self.batch_size:
+            self._close()
+
+    def exclude(self, length: int) -> None:
+        """Counts a sequence left out of every batch."""
+        self.excluded_sequences += 1
+        self.excluded_residues += length
+
+    def finish(self) -> dict:
+        """Closes the last batch and returns the all_sequences.json content."""
+        self._close()
+        residues = [stats["residues"] for stats in self.batch_stats.values()]
+        return {
+            **self.batches,
+            "batching": {
+                "mode": self.batch_mode,
+                "batch_size": self.batch_size,
+                "batch_residues": self.batch_residues if self.batch_mode == "residues" else None,
+                "max_length": self.max_length if self.batch_mode == "residues" else None,
+                "max_batch_residues": max(residues, default=0),
+                "min_batch_residues": min(residues, default=0),
+                "batched_sequences": sum(len(batch) for batch in self.batches.values()),
+                "batched_residues": sum(residues),
+                "excluded_sequences": self.excluded_sequences,
+                "excluded_residues": self.excluded_residues,
+                "batches": self.batch_stats,
+            },
+        }
+
+def prepare_sequences_and_batches(
+    records: Iterator[tuple[str, str]],
     batch_size: int,
     output_dir: str,
-    logger: logging.Logger) -> None:
-    """Creates JSON file mapping batch numbers to sequence IDs.
+    logger: logging.Logger,
+    batch_mode: str = "sequences",
+    batch_residues: int = 1000000,
+    max_length: Optional[int] = None,
+    include_sequences: Optional[set] = None) -> dict[str, list[str]]:
+    """Writes the batch map, the per-sequence FASTA files and the sequence statistics in one pass.
 
     Args:
-        sequences: Iterator of SeqRecord objects
+        records: Iterator of (header, protein sequence) tuples
         batch_size: Maximum sequences per batch
         output_dir: Output directory path
         logger: Logger instance for tracking execution
-    """
-    all_sequences = {}
-    current_batch = []
-    batch_num = 1
-
-    for record in sequences:
-        seq_id = record.id
-        current_batch.append(seq_id)
+        batch_mode: "sequences" or "residues" (see SequenceBatcher)
+        batch_residues: Maximum total residues per batch in residues mode
+        max_length: In residues mode, sequences longer than this get a batch of their own
+        include_sequences: If given, only these sequence IDs are batched
 
-        if len(current_batch) >= batch_size:
-            all_sequences[f"batch_{batch_num}"] = current_batch
-            current_batch = []
-            batch_num += 1
+    Returns:
+        dict[str, list[str]]: The batch map written to all_sequences.json
+    """
+    batcher = SequenceBatcher(batch_size, batch_mode, batch_residues, max_length)
+    sequence_count = 0
 
-    # Handle any remaining sequences
-    if current_batch:
-        all_sequences[f"batch_{batch_num}"] = current_batch
+    stats_path = os.path.join(output_dir, "sequence_stats.tsv")
+    with open(stats_path, "w", encoding="utf-8") as stats_file:
+        stats_file.write("sequence_id\tlength\tmd5\n")
+        for header, sequence in records:
+            seq_id = header.split(maxsplit=1)[0]
+            used_queryname = seq_id.replace("|", "-")
+            sequence_dir = os.path.join(output_dir, used_queryname)
+            try:
+                os.mkdir(sequence_dir)
+            except FileExistsError:
+                pass
+            with open(os.path.join(sequence_dir, "sequence.fasta"), "w", encoding="utf-8") as fasta_file:
+                write_fasta_record(fasta_file, header, sequence)
+            stats_file.write(f"{seq_id}\t{len(sequence)}\t{hashlib.md5(sequence.upper().encode('utf-8')).hexdigest()}\n")
+            sequence_count += 1
+            if include_sequences is None or seq_id in include_sequences:
+                batcher.add(seq_id, len(sequence))
+            else:
+                batcher.exclude(len(sequence))
 
+    all_sequences = batcher.finish()
     output_path = os.path.join(output_dir, "all_sequences.json")
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(all_sequences, f, indent=4)
 
-    logger.info("SEQ_BATCH_PREP --- Created all_sequences.json with %d batches", batch_num)
+    logger.info(
+        "SEQ_BATCH_PREP --- Prepared %d sequences, created all_sequences.json with %d batches (%s mode, %d to %d residues per batch)",
+        sequence_count, len(batcher.batches), batch_mode,
+        all_sequences["batching"]["min_batch_residues"], all_sequences["batching"]["max_batch_residues"]
+    )
+    if include_sequences is not None:
+        logger.info(
+            "SEQ_BATCH_PREP --- Left %d sequences (%d residues) out of the batches, not in the include list",
+            batcher.excluded_sequences, batcher.excluded_residues
+        )
+    return batcher.batches
 
 def main():
     """Main function to prepare sequences and batches"""
@@ -105,15 +238,19 @@ def main():
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
 
-    # First pass - create sequence batches JSON
-    sequences = seqrecord_yielder(args.fasta, args.nucleotide, logger)
-    create_sequence_batches_json(sequences, args.batch_size, args.output_dir, logger)
+    # Single pass - batch map, sequence directories/files and statistics
+    include_sequences = None
+    if args.include_sequences:
+        with open(args.include_sequences, "r", encoding="utf-8") as f:
+            include_sequences = set(json.load(f)["sequences"])
 
-    # Second pass - create individual sequence directories/files
-    sequences = seqrecord_yielder(args.fasta, args.nucleotide, logger)
-    make_dirs_and_write_fasta(sequences, args.output_dir)
+    records = iter_prepared_records(args.fasta, args.nucleotide)
+    prepare_sequences_and_batches(
+        records, args.batch_size, args.output_dir, logger,
+        args.batch_mode, args.batch_residues, args.max_batch_length, include_sequences
+    )
 
     logger.info("SEQ_BATCH_PREP --- Sequence and batch preparation completed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,44 @@
+"""
+Shared fixtures for tests/: the PF90001 seed family, built with pyhmmer,
+used by the hmm_states, run_hmmalign, seed_states, minimal_seed and resource_pack tests.
+"""
+
+from pyhmmer.easel import Alphabet, TextMSA, TextSequence
+from pyhmmer.plan7 import Builder, Background
+
+import pytest
+
+### Fixtures
+
+# Column 9 ("Q" in 1 of 4 rows) becomes an insert column when building the HMM
+SEED_ROWS = {
+    "SEED0_HUMAN/1-22": "MKVLAAGI-VGLLLAACSSHKEE",
+    "SEED1_MOUSE/1-23": "MKVLSAGIQVGLLLAACSTHKEE",
+    "SEED2_RAT/1-22": "MRVLAAGI-IGLLLAACSSHREE",
+    "SEED3_BOVIN/1-21": "MKVLAAGL-VGLLVAACS-HKDE",
+}
+
+@pytest.fixture
+def seed_family(tmp_path):
+    """Writes resources/PF90001 with the SEED_ROWS seed alignment and its HMM (with MAP and
+    gathering cutoffs), returning the family directory. Tests add the other files they need."""
+    alphabet = Alphabet.amino()
+    msa = TextMSA(
+        name=b"PF90001",
+        sequences=[TextSequence(name=name.encode(), sequence=row) for name, row in SEED_ROWS.items()]
+    )
+    hmm, _, _ = Builder(alphabet).build_msa(msa.digitize(alphabet), Background(alphabet))
+    hmm.name = b"Fam1"
+    hmm.accession = b"PF90001.1"
+    hmm.cutoffs.gathering = (10.0, 10.0)
+
+    domain_dir = tmp_path / "resources" / "PF90001"
+    domain_dir.mkdir(parents=True)
+    with open(domain_dir / "domain.hmm", "wb") as f:
+        hmm.write(f)
+    with open(domain_dir / "alignment.seed", "w", encoding="utf-8") as f:
+        f.write("# STOCKHOLM 1.0\n\n")
+        for name, row in SEED_ROWS.items():
+            f.write(f"{name} {row}\n")
+        f.write("//\n")
+    return domain_dir
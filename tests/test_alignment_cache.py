@@ -0,0 +1,41 @@
+"""
+Unit tests for alignment_cache.py
+"""
+
+import sys
+import os
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from alignment_cache import open_alignment_cache, get_cached_rows, store_rows
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def cache_connection(tmp_path):
+    connection = open_alignment_cache(str(tmp_path / "alignment_cache.sqlite"))
+    yield connection
+    connection.close()
+
+###T store_rows and get_cached_rows
+
+def test_store_and_get_cached_rows(cache_connection):
+    rows = {
+        "md5a": (["M", "K", "-", "V"], ["pp", "", "qq", "", ""]),
+        "md5b": (["M", "-", "-", "V"], ["", "", "", "", "w"]),
+    }
+    store_rows(cache_connection, rows, "hmm1", "seed1", False)
+    assert get_cached_rows(cache_connection, ["md5a", "md5b", "md5c", "md5a"], "hmm1", "seed1", False) == rows
+
+def test_cached_rows_keyed_by_checksums_and_trim(cache_connection):
+    store_rows(cache_connection, {"md5a": (["M", "K"], ["", "", ""])}, "hmm1", "seed1", False)
+    assert get_cached_rows(cache_connection, ["md5a"], "hmm1", "seed1", True) == {}
+    assert get_cached_rows(cache_connection, ["md5a"], "hmm2", "seed1", False) == {}
+    assert get_cached_rows(cache_connection, ["md5a"], "hmm1", "seed2", False) == {}
+
+def test_get_cached_rows_batches_queries(cache_connection):
+    rows = {f"md5{i}": (["M"], ["", ""]) for i in range(1200)}
+    store_rows(cache_connection, rows, "hmm1", "seed1", True)
+    assert len(get_cached_rows(cache_connection, list(rows), "hmm1", "seed1", True)) == 1200
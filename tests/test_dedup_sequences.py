@@ -0,0 +1,81 @@
+"""
+Unit tests for dedup_sequences.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dedup_sequences import collapse_duplicates, fan_out_duplicates
+from utils import read_fasta_records
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def duplicated_fasta(tmp_path):
+    """FASTA with 5 records and 3 unique sequences (one duplicate differs only in case)"""
+    fasta_path = tmp_path / "input.fasta"
+    fasta_path.write_text(
+        ">sp|P00001|ONE_HUMAN First\nMKVLAAGI\nVGLL\n"
+        ">sp|P00002|TWO_HUMAN\nMKVLAAGIVGLL\n"
+        ">sp|P00003|THREE_HUMAN\nPPPPWWWW\n"
+        ">sp|P00004|FOUR_HUMAN\nmkvlaagivgll\n"
+        ">sp|P00005|FIVE_HUMAN\nGGGG\n",
+        encoding="utf-8"
+    )
+    return str(fasta_path)
+
+###T collapse_duplicates
+
+def test_collapse_duplicates_writes_representatives(tmp_path, duplicated_fasta):
+    output_fasta = tmp_path / "unique.fasta"
+    duplicates_json = tmp_path / "duplicates.json"
+    content = collapse_duplicates(duplicated_fasta, str(output_fasta), str(duplicates_json), MagicMock())
+
+    records = list(read_fasta_records(str(output_fasta)))
+    assert [header for header, _ in records] == ["sp|P00001|ONE_HUMAN First", "sp|P00003|THREE_HUMAN", "sp|P00005|FIVE_HUMAN"]
+    assert records[0][1] == "MKVLAAGIVGLL"
+    assert content["duplicates"] == {"sp|P00001|ONE_HUMAN": ["sp|P00002|TWO_HUMAN", "sp|P00004|FOUR_HUMAN"]}
+    assert content["stats"] == {"total_sequences": 5, "unique_sequences": 3, "duplicate_ids": 2, "dedup_ratio": 1.6667}
+    with open(duplicates_json, encoding="utf-8") as f:
+        assert json.load(f) == content
+
+def test_collapse_duplicates_empty_fasta(tmp_path):
+    fasta_path = tmp_path / "empty.fasta"
+    fasta_path.write_text("", encoding="utf-8")
+    content = collapse_duplicates(str(fasta_path), str(tmp_path / "unique.fasta"), str(tmp_path / "duplicates.json"), MagicMock())
+    assert content["duplicates"] == {}
+    assert content["stats"]["dedup_ratio"] == 1.0
+
+###T fan_out_duplicates
+
+def test_fan_out_duplicates_links_directories(tmp_path, duplicated_fasta):
+    duplicates_json = tmp_path / "duplicates.json"
+    collapse_duplicates(duplicated_fasta, str(tmp_path / "unique.fasta"), str(duplicates_json), MagicMock())
+    output_dir = tmp_path / "output"
+    (output_dir / "sp-P00001-ONE_HUMAN").mkdir(parents=True)
+    (output_dir / "sp-P00001-ONE_HUMAN" / "sp-P00001-ONE_HUMAN_report.json").write_text("{}", encoding="utf-8")
+    (output_dir / "sp-P00004-FOUR_HUMAN").mkdir()
+
+    assert fan_out_duplicates(str(duplicates_json), str(output_dir), MagicMock()) == 1
+    link = output_dir / "sp-P00002-TWO_HUMAN"
+    assert link.is_symlink()
+    assert os.readlink(link) == "sp-P00001-ONE_HUMAN"
+    assert (link / "sp-P00001-ONE_HUMAN_report.json").exists()
+    assert not (output_dir / "sp-P00004-FOUR_HUMAN").is_symlink()
+
+    # Running again finds every link in place
+    assert fan_out_duplicates(str(duplicates_json), str(output_dir), MagicMock()) == 0
+
+def test_fan_out_duplicates_missing_representative(tmp_path):
+    duplicates_json = tmp_path / "duplicates.json"
+    duplicates_json.write_text(json.dumps({"duplicates": {"A": ["B"]}, "stats": {}}), encoding="utf-8")
+    logger = MagicMock()
+    assert fan_out_duplicates(str(duplicates_json), str(tmp_path), logger) == 0
+    logger.warning.assert_called_once()
+    assert not (tmp_path / "B").exists()
@@ -0,0 +1,109 @@
+"""
+Unit tests for executor.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from executor import (
+    get_seqs_and_count,
+    get_sequence_batches,
+    select_iprscan_sequences,
+    report_iprscan_savings,
+    collect_iprscan_quarantine,
+    is_sequence_dir,
+)
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def all_sequences_json(tmp_path):
+    """all_sequences.json in residues mode, with batch statistics"""
+    json_path = tmp_path / "all_sequences.json"
+    json_path.write_text(json.dumps({
+        "batch_1": ["sp|P1|A_HUMAN", "sp|P2|B_HUMAN"],
+        "batch_2": ["sp|P3|TITIN_HUMAN"],
+        "batching": {"mode": "residues", "batches": {"batch_1": {"sequences": 2}, "batch_2": {"sequences": 1}}},
+    }), encoding="utf-8")
+    return str(json_path)
+
+###T get_sequence_batches and get_seqs_and_count
+
+def test_get_sequence_batches_skips_statistics(all_sequences_json):
+    assert get_sequence_batches(all_sequences_json) == [["sp|P1|A_HUMAN", "sp|P2|B_HUMAN"], ["sp|P3|TITIN_HUMAN"]]
+
+def test_get_seqs_and_count_skips_statistics(all_sequences_json):
+    assert get_seqs_and_count(all_sequences_json) == (["sp|P1|A_HUMAN", "sp|P2|B_HUMAN", "sp|P3|TITIN_HUMAN"], 3)
+
+###T select_iprscan_sequences and report_iprscan_savings
+
+@pytest.fixture
+def hits_and_resources(tmp_path):
+    """Hits to 2 domains, only PF00001 with resources"""
+    hits_per_domain = {
+        "PF00001": {"sp|P1|A_HUMAN": [{}], "sp|P2|B_HUMAN": [{}]},
+        "PF00002": {"sp|P2|B_HUMAN": [{}], "sp|P3|C_HUMAN": [{}]},
+    }
+    per_dom_json = tmp_path / "out" / "hmmsearch_per_domain.json"
+    per_dom_json.parent.mkdir()
+    per_dom_json.write_text(json.dumps(hits_per_domain), encoding="utf-8")
+    resource_dir = tmp_path / "resources"
+    for filename in ["domain.hmm", "alignment.seed", "annotations.json"]:
+        (resource_dir / "PF00001").mkdir(parents=True, exist_ok=True)
+        (resource_dir / "PF00001" / filename).write_text("", encoding="utf-8")
+    (resource_dir / "PF00002").mkdir()
+    (resource_dir / "PF00002" / "domain.hmm").write_text("", encoding="utf-8")
+    return str(tmp_path / "out"), str(resource_dir), str(per_dom_json)
+
+def test_select_iprscan_sequences_keeps_resource_backed_hits(hits_and_resources):
+    output_dir, resource_dir, per_dom_json = hits_and_resources
+    selection_json = select_iprscan_sequences(output_dir, resource_dir, per_dom_json, MagicMock())
+    with open(selection_json, encoding="utf-8") as f:
+        assert json.load(f) == {"sequences": ["sp|P1|A_HUMAN", "sp|P2|B_HUMAN"], "domains": ["PF00001"]}
+
+def test_report_iprscan_savings(tmp_path):
+    all_sequences_json = tmp_path / "all_sequences.json"
+    all_sequences_json.write_text(json.dumps({
+        "batch_1": ["a"], "batch_2": ["b"],
+        "batching": {"batches": {"batch_1": {}, "batch_2": {}}, "batched_sequences": 2,
+                     "batched_residues": 1000, "excluded_sequences": 6, "excluded_residues": 3000},
+    }), encoding="utf-8")
+    report = report_iprscan_savings(str(all_sequences_json), 1800, 8, 4, str(tmp_path), MagicMock())
+    # 0.5 h x 8 cores x 2 jobs (only 2 batches) = 8 CPU-hours for 1000 residues
+    assert report["allocated_cpu_hours"] == 8.0
+    assert report["estimated_cpu_hours_saved"] == 24.0
+    assert os.path.isfile(tmp_path / "iprscan_savings.json")
+
+###T collect_iprscan_quarantine
+
+def test_collect_iprscan_quarantine(tmp_path):
+    logger = MagicMock()
+    assert collect_iprscan_quarantine(str(tmp_path), logger) == {}
+    logger.warning.assert_not_called()
+
+    (tmp_path / "batches").mkdir()
+    for batch, quarantined, rescanned in [("1", ["sp|P1|A_HUMAN"], 6), ("3", ["sp|P3|C_HUMAN", "sp|P4|D_HUMAN"], 10)]:
+        (tmp_path / "batches" / f"iprscan_batch_{batch}.quarantine.json").write_text(json.dumps(
+            {"batch": batch, "quarantined": quarantined, "rescanned_sequences": rescanned}
+        ), encoding="utf-8")
+    content = collect_iprscan_quarantine(str(tmp_path), logger)
+    assert content["quarantined"] == ["sp|P1|A_HUMAN", "sp|P3|C_HUMAN", "sp|P4|D_HUMAN"]
+    assert content["rescanned_sequences"] == 16
+    with open(tmp_path / "iprscan_quarantine.json", encoding="utf-8") as f:
+        assert json.load(f) == content
+    logger.warning.assert_called_once()
+
+###T is_sequence_dir
+
+def test_is_sequence_dir_skips_domain_batch_and_table_dirs(tmp_path):
+    for subdir in ["sp-P1-A_HUMAN", "PF00001", "batches", "hmmsearch_hits"]:
+        (tmp_path / subdir).mkdir()
+    (tmp_path / "batches" / "iprscan_batch_1.ids.txt").write_text("sp-P1-A_HUMAN\n", encoding="utf-8")
+    (tmp_path / "all_sequences.json").write_text("{}", encoding="utf-8")
+    assert [subdir for subdir in sorted(os.listdir(tmp_path)) if is_sequence_dir(str(tmp_path), subdir)] == ["sp-P1-A_HUMAN"]
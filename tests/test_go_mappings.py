@@ -0,0 +1,75 @@
+"""
+Unit tests for go_mappings.py
+"""
+
+import sys
+import os
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from go_mappings import parse_external2go, load_go_mappings, compare_go_sets
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def mappings_resource_dir(tmp_path):
+    """resource_dir/mappings with pfam2go, interpro2go and the Pfam-InterPro accession mapping"""
+    mappings_dir = tmp_path / "mappings"
+    mappings_dir.mkdir()
+    (mappings_dir / "pfam2go").write_text(
+        "!version date: 2025/01/01\n"
+        "Pfam:PF07728 AAA_5 > GO:ATP binding ; GO:0005524\n"
+        "Pfam:PF00001 7tm_1 > GO:G protein-coupled receptor activity ; GO:0004930\n",
+        encoding="utf-8"
+    )
+    (mappings_dir / "interpro2go").write_text(
+        "!Generated from InterPro\n"
+        "InterPro:IPR011704 ATPase, dynein-related, AAA domain > GO:ATP hydrolysis activity ; GO:0016887\n"
+        "InterPro:IPR011704 ATPase, dynein-related, AAA domain > GO:ATP binding ; GO:0005524\n",
+        encoding="utf-8"
+    )
+    (mappings_dir / "interpro_pfam_accession_mapping.tsv").write_text(
+        "Pfam_ID\tInterPro_ID\nPF07728\tIPR011704\nPF00001\tIPR000276\n", encoding="utf-8"
+    )
+    return str(tmp_path)
+
+###T parse_external2go and load_go_mappings
+
+def test_parse_external2go(mappings_resource_dir):
+    mapping = parse_external2go(os.path.join(mappings_resource_dir, "mappings", "interpro2go"))
+    assert mapping == {"IPR011704": {"GO:0016887", "GO:0005524"}}
+
+def test_load_go_mappings(mappings_resource_dir, tmp_path):
+    go_mappings = load_go_mappings(mappings_resource_dir)
+    assert go_mappings.interpro_id("PF07728") == "IPR011704"
+    assert go_mappings.go_terms("PF07728") == {"GO:0005524", "GO:0016887"}
+    assert go_mappings.go_terms("PF00001") == {"GO:0004930"}
+    assert go_mappings.go_terms("PF99999") == set()
+    assert load_go_mappings(str(tmp_path / "missing")) is None
+
+def test_sequence_matches_rows(mappings_resource_dir):
+    go_mappings = load_go_mappings(mappings_resource_dir)
+    rows = go_mappings.sequence_matches({
+        "PF07728": [{"ali_from": 325, "ali_to": 451}],
+        "PF12345": [{"ali_from": 10, "ali_to": 60}],
+    })
+    assert rows == [
+        ("Pfam", "PF07728", "IPR011704", 325, 451, "GO:0005524|GO:0016887"),
+        ("Pfam", "PF12345", "-", 10, 60, ""),
+    ]
+
+###T compare_go_sets
+
+def test_compare_go_sets():
+    reference = {"a": {"GO:1", "GO:2"}, "b": {"GO:3"}, "c": set()}
+    derived = {"a": {"GO:1"}, "b": {"GO:3"}, "c": {"GO:4"}}
+    report = compare_go_sets(reference, derived)
+    assert report["compared"] == 3
+    assert report["identical"] == 1
+    assert report["mean_jaccard"] == round((0.5 + 1 + 0) / 3, 4)
+    assert report["precision"] == round(2 / 3, 4)
+    assert report["recall"] == round(2 / 3, 4)
+    assert report["reference_empty"] == 1
+    assert report["derived_empty"] == 0
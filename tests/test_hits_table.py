@@ -0,0 +1,85 @@
+"""
+Unit tests for hits_table.py
+"""
+
+import sys
+import os
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from hits_table import write_hits_table, HitsTable, open_hits_table, HITS_TABLE_DIRNAME
+
+import pytest
+
+### Fixtures
+
+def make_hit(hmm_name, seq_id, bitscore, ali_from, ali_to, subseq, state_path=True):
+    """Hit dictionary as written by run_hmmsearch.py"""
+    hit = {
+        "hmm_name": hmm_name,
+        "target_seq_name": seq_id,
+        "bitscore": bitscore,
+        "ali_from": ali_from,
+        "ali_to": ali_to,
+        "ali_range": f"/{ali_from}-{ali_to}",
+        "subseq": subseq,
+    }
+    if state_path:
+        hit.update({"hmm_from": 1, "hmm_to": len(subseq), "state_path": f"{len(subseq)}M"})
+    return hit
+
+@pytest.fixture
+def hits_per_domain():
+    """Two domains, one sequence hit by both and one with two hits to the same domain"""
+    return {
+        "PF00001": {
+            "sp|P1|A_HUMAN": [make_hit("Dom1", "sp|P1|A_HUMAN", 55.25, 10, 15, "MKVLAA")],
+            "sp|P2|B_HUMAN": [
+                make_hit("Dom1", "sp|P2|B_HUMAN", 40.5, 3, 7, "MKVLS"),
+                make_hit("Dom1", "sp|P2|B_HUMAN", 40.5, 30, 33, "MRVL"),
+            ],
+        },
+        "PF00002": {
+            "sp|P1|A_HUMAN": [make_hit("Dom2", "sp|P1|A_HUMAN", 20.125, 40, 42, "WDT", state_path=False)],
+        },
+    }
+
+@pytest.fixture
+def hits_table(tmp_path, hits_per_domain):
+    """Table written from hits_per_domain"""
+    table_dir = str(tmp_path / HITS_TABLE_DIRNAME)
+    write_hits_table(hits_per_domain, table_dir)
+    return HitsTable(table_dir)
+
+###T write_hits_table and HitsTable.domain_hits
+
+def test_domain_hits_round_trip(hits_table, hits_per_domain):
+    for accession, sequences in hits_per_domain.items():
+        assert hits_table.domain_hits(accession) == sequences
+    assert hits_table.domain_hits("PF99999") == {}
+
+def test_domain_hit_counts(hits_table):
+    assert hits_table.domain_hit_counts() == {"PF00001": 3, "PF00002": 1}
+
+###T HitsTable.sequence_hits
+
+def test_sequence_hits(hits_table, hits_per_domain):
+    assert hits_table.sequence_hits("sp|P1|A_HUMAN") == {
+        "PF00001": hits_per_domain["PF00001"]["sp|P1|A_HUMAN"],
+        "PF00002": hits_per_domain["PF00002"]["sp|P1|A_HUMAN"],
+    }
+    assert hits_table.sequence_hits("sp|P2|B_HUMAN") == {"PF00001": hits_per_domain["PF00001"]["sp|P2|B_HUMAN"]}
+    assert hits_table.sequence_hits("sp|P9|NONE_HUMAN") == {}
+
+###T open_hits_table
+
+def test_open_hits_table(tmp_path, hits_per_domain):
+    assert open_hits_table(str(tmp_path)) is None
+    write_hits_table(hits_per_domain, str(tmp_path / HITS_TABLE_DIRNAME))
+    assert open_hits_table(str(tmp_path)).accessions == ["PF00001", "PF00002"]
+
+def test_empty_table(tmp_path):
+    write_hits_table({}, str(tmp_path))
+    table = HitsTable(str(tmp_path))
+    assert table.domain_hit_counts() == {}
+    assert table.sequence_hits("sp|P1|A_HUMAN") == {}
@@ -0,0 +1,179 @@
+"""
+Unit tests for hmm_states.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pyhmmer.plan7 import HMMFile
+
+from hmm_states import (
+    alignment_to_state_path,
+    parse_state_path,
+    state_path_to_nodes,
+    read_hmm_match_columns,
+    read_seed_alignment,
+    reference_to_match_columns,
+    get_seed_match_columns,
+    seed_row_to_nodes,
+    aligned_row_to_nodes,
+    alignment_match_states,
+    nodes_to_state_path,
+    render_state_alignment,
+    build_state_alignment_lines,
+)
+from run_hmmsearch import run_hmmsearch
+from transfer_annotations import extract_target_info_from_hmmalign, iterate_aligned_sequences
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def domain_resources(tmp_path, seed_family):
+    """Paths of PF90001's HMM and seed alignment (see conftest.py), a Pfam-A.hmm path and the HMM"""
+    with HMMFile(seed_family / "domain.hmm") as hmm_file:
+        hmm = hmm_file.read()
+    return str(seed_family / "domain.hmm"), str(seed_family / "alignment.seed"), str(tmp_path / "resources" / "Pfam-A.hmm"), hmm
+
+@pytest.fixture
+def hmmsearch_output(tmp_path, domain_resources):
+    """Runs hmmsearch with the PF90001 HMM against 2 targets"""
+    hmm_path, _, _, _ = domain_resources
+    fasta_path = tmp_path / "targets.fasta"
+    with open(fasta_path, "w", encoding="utf-8") as f:
+        f.write(">sp|P00001|ONE_HUMAN\nPPPPMKVLAAGIVGLLLAACSSHKEEPPPP\n")
+        f.write(">sp|P00002|TWO_HUMAN\nGGMKVLAAGIVGLLWWWLAACSSHKEEGG\n")
+    output_dir = tmp_path / "output"
+    run_hmmsearch(hmm_path, str(fasta_path), str(output_dir), MagicMock())
+    return str(output_dir / "hmmsearch_per_domain.json")
+
+###T alignment_to_state_path and parse_state_path
+
+def test_alignment_to_state_path_all_ops():
+    assert alignment_to_state_path("MKV..LAaG", "MKVqqL-AG") == "3M2I1M1D2M"
+
+def test_parse_state_path():
+    assert parse_state_path("3M2I1M1D2M") == [("M", 3), ("I", 2), ("M", 1), ("D", 1), ("M", 2)]
+
+###T state_path_to_nodes
+
+def test_state_path_to_nodes_places_residues():
+    match, inserts = state_path_to_nodes("MKVqqLAG", 2, "3M2I1M1D2M", 10)
+    assert match == ["-", "M", "K", "V", "L", "-", "A", "G", "-", "-"]
+    assert inserts[4] == "qq"
+    assert sum(len(insert) for insert in inserts) == 2
+
+def test_state_path_to_nodes_mismatch_raises():
+    with pytest.raises(ValueError):
+        state_path_to_nodes("MKV", 1, "4M", 10)
+    with pytest.raises(ValueError):
+        state_path_to_nodes("MKV", 9, "3M", 10)
+
+###T read_hmm_match_columns and seed mapping
+
+def test_read_hmm_match_columns_skips_insert_column(domain_resources):
+    hmm_path, _, _, hmm = domain_resources
+    hmm_length, match_columns = read_hmm_match_columns(hmm_path)
+    assert hmm_length == hmm.M == 22
+    assert 9 not in match_columns
+    assert match_columns == [column for column in range(1, 24) if column != 9]
+
+def test_read_seed_alignment_joins_blocks(tmp_path):
+    seed_path = tmp_path / "alignment.seed"
+    seed_path.write_text("# STOCKHOLM 1.0\n\nA/1-4 MK..\nB/1-3 MR.-\n\nA/1-4 VL\nB/1-3 V-\n#=GC RF xx.x\n#=GC RF xx\n//\n", encoding="utf-8")
+    rows, reference = read_seed_alignment(str(seed_path))
+    assert rows == {"A/1-4": "MK..VL", "B/1-3": "MR.-V-"}
+    assert reference == "xx.xxx"
+    assert reference_to_match_columns(reference) == [1, 2, 4, 5, 6]
+
+def test_get_seed_match_columns_falls_back_to_reference(tmp_path):
+    hmm_path = tmp_path / "domain.hmm"
+    hmm_path.write_text("HMMER3/f\nLENG  3\nMAP   no\nHMM A C\n//\n", encoding="utf-8")
+    assert get_seed_match_columns(str(hmm_path), "x.xx") == (3, [1, 3, 4])
+    with pytest.raises(ValueError):
+        get_seed_match_columns(str(hmm_path), "")
+
+def test_seed_row_to_nodes_lowercases_inserts():
+    match, inserts = seed_row_to_nodes("MKqV-L", [1, 2, 4, 5, 6])
+    assert match == ["M", "K", "V", "-", "L"]
+    assert inserts == ["", "", "q", "", "", ""]
+
+###T render_state_alignment
+
+def test_render_state_alignment_pads_inserts():
+    rows = [
+        ("A/1-4", ["M", "K", "V"], ["", "qq", "", ""]),
+        ("Btarget//5-7", ["M", "-", "V"], ["", "", "", "w"]),
+    ]
+    lines = render_state_alignment(rows)
+    sequences = {line.split()[0]: line.split()[-1] for line in lines[2:-1]}
+    assert sequences["A/1-4"] == "MqqKV."
+    assert sequences["Btarget//5-7"] == "M..-Vw"
+    assert sequences["#=GC"] == "x..xx."
+    assert lines[0] == "# STOCKHOLM 1.0" and lines[-1] == "//"
+
+###T build_state_alignment_lines
+
+def test_build_state_alignment_lines_feeds_transfer(hmmsearch_output, domain_resources):
+    hmm_path, seed_path, _, _ = domain_resources
+    lines = build_state_alignment_lines(hmmsearch_output, "PF90001", hmm_path, seed_path)
+
+    target_info = extract_target_info_from_hmmalign(MagicMock(), MagicMock(), lines)
+    assert set(target_info) == {"sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN"}
+    with open(hmmsearch_output, encoding="utf-8") as f:
+        hit = json.load(f)["PF90001"]["sp|P00002|TWO_HUMAN"][0]
+    assert hit["state_path"] != f"{len(hit['subseq'])}M"  # The WWW insertion is kept out of match states
+    assert list(target_info["sp|P00002|TWO_HUMAN"]) == [hit["ali_range"].lstrip("/")]
+
+    # Seed residue 10 (V, after the Q insert in SEED1) and target residue 13 (V) share a match state
+    rows = {line.split()[0]: line.split()[1] for line in lines if not line.startswith(("#", "//")) and line.strip()}
+    target_row_name = next(name for name in rows if name.startswith("sp|P00001|ONE_HUMAN"))
+    target_start = int(target_row_name.split("/")[-1].split("-")[0])
+    paired = {
+        source_pos: target_pos
+        for _, source_pos, target_pos, source_char, target_char in iterate_aligned_sequences(
+            rows["SEED1_MOUSE/1-23"], rows[target_row_name], 1, target_start, 23, 10000
+        )
+        if source_char.isupper() and target_char.isupper()
+    }
+    assert paired[10] == 13
+    assert 9 not in paired
+    assert paired[1] == 5
+
+def test_build_state_alignment_lines_from_hits_table(hmmsearch_output, domain_resources):
+    hmm_path, seed_path, _, _ = domain_resources
+    hits_table_dir = os.path.join(os.path.dirname(hmmsearch_output), "hmmsearch_hits")
+    assert build_state_alignment_lines(hits_table_dir, "PF90001", hmm_path, seed_path) == \
+        build_state_alignment_lines(hmmsearch_output, "PF90001", hmm_path, seed_path)
+
+###T aligned_row_to_nodes and alignment_match_states
+
+def test_aligned_row_to_nodes_reads_hmmalign_rows():
+    match, inserts = aligned_row_to_nodes("..ggMKqq-V.", 4)
+    assert match == ["M", "K", "-", "V"]
+    assert inserts == ["gg", "", "qq", "", ""]
+    with pytest.raises(ValueError):
+        aligned_row_to_nodes("MKV", 4)
+
+def test_aligned_row_to_nodes_keeps_stop_codons_in_match_columns():
+    match, inserts = aligned_row_to_nodes("MK*.qV", 4)
+    assert match == ["M", "K", "*", "V"]
+    assert inserts == ["", "", "", "q", ""]
+
+def test_alignment_match_states_ignores_insert_layout():
+    left = ["# STOCKHOLM 1.0", "", "A/1-4 MqqKV.", "#=GC RF x..xx.", "//"]
+    right = ["# STOCKHOLM 1.0", "", "A/1-4 M..qqKV", "//"]
+    assert alignment_match_states(left, 3) == alignment_match_states(right, 3) == {"A/1-4": ("M", "K", "V")}
+
+###T nodes_to_state_path
+
+def test_nodes_to_state_path_round_trip():
+    match, inserts = seed_row_to_nodes("qMKqV-Lww", [2, 3, 5, 6, 7])
+    subseq, hmm_from, state_path = nodes_to_state_path(match, inserts)
+    assert (subseq, hmm_from, state_path) == ("qMKqVLww", 1, "1I2M1I1M1D1M2I")
+    assert state_path_to_nodes(subseq, hmm_from, state_path, 5) == (match, inserts)
@@ -0,0 +1,67 @@
+"""
+Unit tests for iprscan_cache.py
+"""
+
+import sys
+import os
+import stat
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from iprscan_cache import (
+    get_iprscan_version,
+    normalize_analyses,
+    open_cache,
+    get_cached_matches,
+    store_matches,
+    strip_accession,
+    add_accession,
+)
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def cache(tmp_path):
+    connection = open_cache(str(tmp_path / "iprscan_cache.sqlite"))
+    yield connection
+    connection.close()
+
+###T normalize_analyses
+
+def test_normalize_analyses_sorts_and_lowercases():
+    assert normalize_analyses(" Pfam,gene3d ,PFAM,") == "gene3d,pfam"
+    assert normalize_analyses("") == ""
+
+###T get_cached_matches and store_matches
+
+def test_store_and_get_matches_by_key(cache):
+    store_matches(cache, {"MD5A": ["a\tPfam\tPF00001"], "MD5B": []}, "5.72-103.0", "pfam", True)
+    assert get_cached_matches(cache, ["MD5A", "MD5B", "MD5C"], "5.72-103.0", "pfam", True) == \
+        {"MD5A": ["a\tPfam\tPF00001"], "MD5B": []}
+    # Any other version, analyses or residue flag is a miss
+    assert get_cached_matches(cache, ["MD5A"], "5.73-104.0", "pfam", True) == {}
+    assert get_cached_matches(cache, ["MD5A"], "5.72-103.0", "gene3d,pfam", True) == {}
+    assert get_cached_matches(cache, ["MD5A"], "5.72-103.0", "pfam", False) == {}
+
+def test_get_cached_matches_large_query(cache):
+    store_matches(cache, {f"MD5{i}": [] for i in range(1200)}, "5.72-103.0", "", True)
+    assert len(get_cached_matches(cache, (f"MD5{i}" for i in range(1500)), "5.72-103.0", "", True)) == 1200
+
+###T strip_accession and add_accession
+
+def test_accession_round_trip():
+    line = "sp|P00001|ONE_HUMAN\tMD5\t120\tPfam\tPF00001\n"
+    stripped = strip_accession(line)
+    assert stripped == "MD5\t120\tPfam\tPF00001"
+    assert add_accession("sp|P00002|TWO_HUMAN", stripped) == "sp|P00002|TWO_HUMAN\tMD5\t120\tPfam\tPF00001\n"
+
+###T get_iprscan_version
+
+def test_get_iprscan_version(tmp_path):
+    script = tmp_path / "interproscan.sh"
+    script.write_text("#!/bin/sh\necho 'InterProScan version 5.72-103.0'\necho 'InterProScan Data 103.0'\n", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    assert get_iprscan_version(str(script)) == "5.72-103.0"
+    assert get_iprscan_version(str(tmp_path / "missing.sh")) is None
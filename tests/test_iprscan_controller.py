@@ -0,0 +1,121 @@
+"""
+Unit tests for iprscan_controller.py
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import psutil
+
+from iprscan_controller import IprscanController, ProcessTreeSampler, run_adaptive, GB
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def controller():
+    return IprscanController(
+        memory_budget_gb=16, cpu_cores_iprscan=4, batch_size=2000, number_jobs=2,
+        target_batch_minutes=10, total_cpus=16
+    )
+
+###T IprscanController
+
+def test_controller_defaults_before_observations(controller):
+    assert controller.job_memory(2000) == 2 * GB
+    assert controller.next_batch_size() == 2000
+    assert controller.allowed_jobs(2000) == 2
+
+def test_controller_sizes_batches_from_throughput(controller):
+    # 1000 sequences in 5 minutes: 200/min, 10 minute batches of 2000
+    controller.record(1000, 300, 4 * GB, 390.0)
+    assert controller.next_batch_size() == 2000
+    controller.record(1000, 60, 4 * GB, 390.0)
+    # Averaged throughput of 600/min asks for 6000, whose 24 GB estimate is halved into the 16 GB budget
+    assert controller.next_batch_size() == 3000
+    # One size observed: fixed memory up to it, proportional above it
+    assert controller.job_memory(500) == 4 * GB
+    assert controller.job_memory(2000) == 8 * GB
+    # 16 GB budget fits 2 batches of 2000, 16 CPUs fit 4 batches of ~3.9 cores
+    assert controller.allowed_jobs(2000) == 2
+    assert controller.allowed_jobs(500) == 4
+
+def test_controller_linear_memory_model_and_budget():
+    controller = IprscanController(memory_budget_gb=9, cpu_cores_iprscan=4, batch_size=1000, number_jobs=1, total_cpus=8)
+    controller.record(1000, 60, 3 * GB, 100.0)
+    controller.record(2000, 120, 4 * GB, 100.0)
+    # 2 GB fixed plus 1 GB per 1000 sequences
+    assert controller.job_memory(4000) == pytest.approx(6 * GB)
+    assert controller.job_memory(1500) == 4 * GB  # never below the peak of a larger batch
+    # 1000 sequences/min for 30 minutes, capped at 8000 sequences (10 GB), halved to fit in 9 GB
+    assert controller.next_batch_size() == 4000
+    assert controller.cores_per_job == 1.0
+    assert controller.allowed_jobs(4000) == 1
+
+###T ProcessTreeSampler
+
+def test_process_tree_sampler_current_and_missing_process():
+    rss, _ = ProcessTreeSampler(os.getpid()).sample()
+    assert rss > 0
+    assert ProcessTreeSampler(2 ** 22 + 12345).sample() == (0, 0.0)
+
+###T run_adaptive
+
+def test_run_adaptive_covers_all_sequences(tmp_path):
+    done_file = tmp_path / "done.txt"
+    def make_command(batch, batch_idx):
+        return [sys.executable, "-c",
+                f"open({str(done_file)!r}, 'a').write('{batch_idx}:' + {','.join(batch)!r} + '\\n')"]
+
+    controller = IprscanController(memory_budget_gb=64, cpu_cores_iprscan=1, batch_size=3, number_jobs=2,
+                                   min_batch_size=1, total_cpus=2)
+    sequence_ids = [f"seq{i}" for i in range(10)]
+    records = run_adaptive(sequence_ids, make_command, controller, MagicMock(), poll_interval=0.01)
+
+    lines = done_file.read_text(encoding="utf-8").splitlines()
+    scanned = sorted((int(line.split(":")[0]), line.split(":")[1].split(",")) for line in lines)
+    assert [seq for _, batch in scanned for seq in batch] == sequence_ids
+    assert [record["batch"] for record in records] == list(range(1, len(lines) + 1))
+    assert records[0]["sequences"] == 3
+    assert controller.throughput is not None
+
+def test_run_adaptive_exits_on_failed_batch():
+    controller = IprscanController(memory_budget_gb=64, cpu_cores_iprscan=1, batch_size=5, number_jobs=1)
+    logger = MagicMock()
+    with pytest.raises(SystemExit):
+        run_adaptive(["a", "b"], lambda batch, idx: [sys.executable, "-c", "import sys; sys.exit(3)"],
+                     controller, logger, poll_interval=0.01)
+    logger.error.assert_called_once()
+
+def test_run_adaptive_exits_on_launch_error():
+    controller = IprscanController(memory_budget_gb=64, cpu_cores_iprscan=1, batch_size=5, number_jobs=1)
+    logger = MagicMock()
+    with pytest.raises(SystemExit):
+        run_adaptive(["a", "b"], lambda batch, idx: [os.path.join(os.sep, "nonexistent", "run_iprscan")],
+                     controller, logger, poll_interval=0.01)
+    logger.error.assert_called_once()
+
+def test_run_adaptive_kills_process_trees_of_running_batches(tmp_path):
+    child_pid_file = tmp_path / "child.pid"
+    spawn_child = (
+        "import subprocess, sys, time; "
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+        f"open({str(child_pid_file)!r}, 'w').write(str(child.pid)); time.sleep(60)"
+    )
+    fail_later = "import time, sys; time.sleep(1); sys.exit(3)"
+    controller = IprscanController(memory_budget_gb=64, cpu_cores_iprscan=1, batch_size=1, number_jobs=2,
+                                   min_batch_size=1, total_cpus=2)
+    with pytest.raises(SystemExit):
+        run_adaptive(["a", "b"], lambda batch, idx: [sys.executable, "-c", spawn_child if idx == 1 else fail_later],
+                     controller, MagicMock(), poll_interval=0.05)
+
+    child_pid = int(child_pid_file.read_text(encoding="utf-8"))
+    try:
+        psutil.Process(child_pid).wait(timeout=5)
+    except psutil.NoSuchProcess:
+        pass
+    assert not psutil.pid_exists(child_pid) or psutil.Process(child_pid).status() == psutil.STATUS_ZOMBIE
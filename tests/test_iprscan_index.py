@@ -0,0 +1,73 @@
+"""
+Unit tests for iprscan_index.py
+"""
+
+import sys
+import os
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from iprscan_index import (
+    parse_go_column,
+    parse_tsv_line,
+    open_index,
+    index_sequence_lines,
+    load_sequence_matches,
+    open_iprscan_index,
+)
+
+import pytest
+
+### Fixtures
+
+def tsv_line(seq_id, signature, start, stop, interpro="-", go="-"):
+    return "\t".join([seq_id, "md5", "500", "Pfam", signature, "desc", str(start), str(stop),
+                      "1e-10", "T", "01-01-2025", interpro, "ipr desc", go, "-"]) + "\n"
+
+@pytest.fixture
+def index(tmp_path):
+    connection = open_index(str(tmp_path / "iprscan_matches.sqlite"))
+    yield connection
+    connection.close()
+
+###T parse_go_column and parse_tsv_line
+
+def test_parse_go_column():
+    assert parse_go_column("GO:0005524(InterPro)|GO:0016887(PANTHER)") == "GO:0005524|GO:0016887"
+    assert parse_go_column("-") == ""
+    assert parse_go_column("") == ""
+
+def test_parse_tsv_line_short_and_malformed():
+    # Lines without InterPro lookup columns have 11 columns
+    short = "\t".join(["A", "md5", "50", "Pfam", "PF00001", "desc", "3", "40", "1e-5", "T", "01-01-2025"]) + "\n"
+    assert parse_tsv_line(short) == ("A", "Pfam", "PF00001", "-", 3, 40, "")
+    assert parse_tsv_line("\n") is None
+    assert parse_tsv_line(short.replace("\t3\t", "\tx\t")) is None
+
+###T index_sequence_lines and load_sequence_matches
+
+def test_index_and_load_matches(index):
+    indexed = index_sequence_lines(index, {
+        "sp|P00001|ONE_HUMAN": [tsv_line("sp|P00001|ONE_HUMAN", "PF00001", 10, 90, "IPR000001", "GO:0005524(InterPro)")],
+        "sp|P00002|TWO_HUMAN": [],
+    })
+    assert indexed == 1
+    assert load_sequence_matches(index, ["sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN"]) == {
+        "sp|P00001|ONE_HUMAN": [("Pfam", "PF00001", "IPR000001", 10, 90, "GO:0005524")]
+    }
+
+def test_index_sequence_lines_replaces_rows(index):
+    index_sequence_lines(index, {"A": [tsv_line("A", "PF00001", 1, 50), tsv_line("A", "PF00002", 60, 90)]})
+    index_sequence_lines(index, {"A": [tsv_line("A", "PF00003", 5, 45)], "B": [tsv_line("B", "PF00001", 1, 50)]})
+    matches = load_sequence_matches(index, ["A", "B"])
+    assert [row[1] for row in matches["A"]] == ["PF00003"]
+    assert [row[1] for row in matches["B"]] == ["PF00001"]
+
+###T open_iprscan_index
+
+def test_open_iprscan_index_absent(tmp_path):
+    assert open_iprscan_index(str(tmp_path)) is None
+    open_index(str(tmp_path / "iprscan_matches.sqlite")).close()
+    connection = open_iprscan_index(str(tmp_path))
+    assert connection is not None
+    connection.close()
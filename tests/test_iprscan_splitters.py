@@ -0,0 +1,163 @@
+"""
+Unit tests for iprscan_splitters.py
+"""
+
+import json
+import sys
+import os
+import xml.etree.ElementTree as ET
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from iprscan_splitters import (
+    SequenceWriters,
+    split_tsv,
+    split_xml,
+    iter_json_results,
+    split_json,
+    split_gff3,
+)
+
+import pytest
+
+### Fixtures
+
+BATCH = {"sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN", "sp|P00003|THREE_HUMAN"}
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<protein-matches xmlns="https://ftp.ebi.ac.uk/pub/software/unix/iprscan/5/schemas" interproscan-version="5.72-103.0">
+    <protein>
+        <sequence md5="aaa">MKVLAAG</sequence>
+        <xref id="sp|P00001|ONE_HUMAN" name="sp|P00001|ONE_HUMAN First"/>
+        <xref id="sp|P00003|THREE_HUMAN" name="sp|P00003|THREE_HUMAN"/>
+        <matches>
+            <hmmer3-match evalue="1e-10" score="40.0">
+                <signature ac="PF00001"><entry ac="IPR000001"><go-xref id="GO:0005524" db="GO" name="ATP binding"/></entry></signature>
+            </hmmer3-match>
+        </matches>
+    </protein>
+    <protein>
+        <sequence md5="bbb">WWWW</sequence>
+        <xref id="sp|P00009|OTHER_HUMAN" name="sp|P00009|OTHER_HUMAN"/>
+        <matches/>
+    </protein>
+    <protein>
+        <sequence md5="ccc">GGGG</sequence>
+        <xref id="sp|P00002|TWO_HUMAN" name="sp|P00002|TWO_HUMAN"/>
+        <matches/>
+    </protein>
+</protein-matches>
+"""
+
+JSON_CONTENT = {
+    "interproscan-version": "5.72-103.0",
+    "results": [
+        {"sequence": "MKVLAAG", "md5": "aaa", "matches": [{"signature": {"accession": "PF00001"}}],
+         "xref": [{"name": "sp|P00001|ONE_HUMAN First", "id": "sp|P00001|ONE_HUMAN"}]},
+        {"sequence": "WWWW", "md5": "bbb", "matches": [], "xref": [{"name": "x", "id": "sp|P00009|OTHER_HUMAN"}]},
+        {"sequence": "GGGG", "md5": "ccc", "matches": [{"description": "brackets ] and braces } in [strings]"}],
+         "xref": [{"name": "sp|P00002|TWO_HUMAN", "id": "sp|P00002|TWO_HUMAN"}]},
+    ]
+}
+
+GFF3_CONTENT = """##gff-version 3
+##feature-ontology http://song.cvs.sourceforge.net/viewvc/song/ontology/sofa.obo?revision=1.269
+##interproscan-version 5.72-103.0
+##sequence-region sp|P00001|ONE_HUMAN 1 7
+sp|P00001|ONE_HUMAN\t.\tpolypeptide\t1\t7\t.\t+\t.\tmd5=aaa;ID=sp|P00001|ONE_HUMAN
+sp|P00001|ONE_HUMAN\tPfam\tprotein_match\t1\t6\t1e-10\t+\t.\tName=PF00001
+##sequence-region sp|P00009|OTHER_HUMAN 1 4
+sp|P00009|OTHER_HUMAN\t.\tpolypeptide\t1\t4\t.\t+\t.\tmd5=bbb;ID=sp|P00009|OTHER_HUMAN
+##FASTA
+>sp|P00001|ONE_HUMAN
+MKVLAAG
+>sp|P00009|OTHER_HUMAN
+WWWW
+"""
+
+def read_output(output_dir, seq_id, fmt):
+    path = output_dir / seq_id.replace("|", "-") / f"iprscan.{fmt}"
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+###T SequenceWriters
+
+def test_sequence_writers_flush_and_truncate(tmp_path):
+    (tmp_path / "A").mkdir()
+    (tmp_path / "A" / "out.txt").write_text("stale\n", encoding="utf-8")
+    with SequenceWriters(str(tmp_path), "out.txt", buffer_size=8, max_buffered=12) as writers:
+        for i in range(5):
+            writers.write("A", f"line{i}\n")
+            writers.write("B|x", f"b{i}\n")
+    assert writers.sequences_written == 2
+    assert (tmp_path / "A" / "out.txt").read_text(encoding="utf-8") == "".join(f"line{i}\n" for i in range(5))
+    assert (tmp_path / "B-x" / "out.txt").read_text(encoding="utf-8") == "".join(f"b{i}\n" for i in range(5))
+
+###T split_tsv
+
+def test_split_tsv(tmp_path):
+    tsv_path = tmp_path / "batch.tsv"
+    tsv_path.write_text(
+        "sp|P00001|ONE_HUMAN\taaa\t7\tPfam\tPF00001\n\nsp|P00009|OTHER_HUMAN\tbbb\t4\tPfam\tPF00002\n"
+        "sp|P00001|ONE_HUMAN\taaa\t7\tSMART\tSM00001\n", encoding="utf-8"
+    )
+    assert split_tsv(str(tsv_path), BATCH, str(tmp_path)) == 1
+    assert read_output(tmp_path, "sp|P00001|ONE_HUMAN", "tsv").splitlines()[1].endswith("SM00001")
+    assert read_output(tmp_path, "sp|P00009|OTHER_HUMAN", "tsv") is None
+
+###T split_xml
+
+def test_split_xml_by_protein_xrefs(tmp_path):
+    xml_path = tmp_path / "batch.xml"
+    xml_path.write_text(XML_CONTENT, encoding="utf-8")
+    assert split_xml(str(xml_path), BATCH, str(tmp_path)) == 3
+
+    root = ET.fromstring(read_output(tmp_path, "sp|P00003|THREE_HUMAN", "xml"))
+    namespace = "{https://ftp.ebi.ac.uk/pub/software/unix/iprscan/5/schemas}"
+    assert root.tag == f"{namespace}protein-matches"
+    assert root.get("interproscan-version") == "5.72-103.0"
+    proteins = root.findall(f"{namespace}protein")
+    assert len(proteins) == 1
+    assert proteins[0].find(f"{namespace}sequence").text == "MKVLAAG"
+    assert read_output(tmp_path, "sp|P00001|ONE_HUMAN", "xml") == read_output(tmp_path, "sp|P00003|THREE_HUMAN", "xml")
+    assert "GGGG" in read_output(tmp_path, "sp|P00002|TWO_HUMAN", "xml")
+    assert read_output(tmp_path, "sp|P00009|OTHER_HUMAN", "xml") is None
+
+###T iter_json_results and split_json
+
+def test_iter_json_results_small_chunks(tmp_path):
+    json_path = tmp_path / "batch.json"
+    json_path.write_text(json.dumps(JSON_CONTENT, indent=2), encoding="utf-8")
+    results = iter_json_results(str(json_path), chunk_size=7)
+    assert '"interproscan-version"' in next(results)
+    assert list(results) == JSON_CONTENT["results"]
+
+def test_iter_json_results_truncated(tmp_path):
+    json_path = tmp_path / "batch.json"
+    json_path.write_text(json.dumps(JSON_CONTENT)[:-40], encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_results(str(json_path), chunk_size=16))
+
+def test_split_json(tmp_path):
+    json_path = tmp_path / "batch.json"
+    json_path.write_text(json.dumps(JSON_CONTENT), encoding="utf-8")
+    assert split_json(str(json_path), BATCH, str(tmp_path)) == 2
+    assert json.loads(read_output(tmp_path, "sp|P00002|TWO_HUMAN", "json")) == {
+        "interproscan-version": "5.72-103.0", "results": [JSON_CONTENT["results"][2]]
+    }
+    assert read_output(tmp_path, "sp|P00009|OTHER_HUMAN", "json") is None
+
+###T split_gff3
+
+def test_split_gff3(tmp_path):
+    gff3_path = tmp_path / "batch.gff3"
+    gff3_path.write_text(GFF3_CONTENT, encoding="utf-8")
+    assert split_gff3(str(gff3_path), BATCH, str(tmp_path)) == 1
+    assert read_output(tmp_path, "sp|P00001|ONE_HUMAN", "gff3") == (
+        "##gff-version 3\n"
+        "##feature-ontology http://song.cvs.sourceforge.net/viewvc/song/ontology/sofa.obo?revision=1.269\n"
+        "##interproscan-version 5.72-103.0\n"
+        "##sequence-region sp|P00001|ONE_HUMAN 1 7\n"
+        "sp|P00001|ONE_HUMAN\t.\tpolypeptide\t1\t7\t.\t+\t.\tmd5=aaa;ID=sp|P00001|ONE_HUMAN\n"
+        "sp|P00001|ONE_HUMAN\tPfam\tprotein_match\t1\t6\t1e-10\t+\t.\tName=PF00001\n"
+        "##FASTA\n>sp|P00001|ONE_HUMAN\nMKVLAAG\n"
+    )
@@ -0,0 +1,52 @@
+"""
+Unit tests for merge_reports_in_sequences.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from merge_reports_in_sequences import merge_sequences, merge_domain_chunk_reports
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def domain_dir(tmp_path):
+    """PF07728 domain dir with the reports of 2 chunks"""
+    pfam_dir = tmp_path / "PF07728"
+    pfam_dir.mkdir()
+    for chunk_idx, target in [(1, "sp|A|ONE_HUMAN"), (2, "sp|B|TWO_HUMAN")]:
+        with open(pfam_dir / f"PF07728_chunk{chunk_idx}_report.json", "w", encoding="utf-8") as f:
+            json.dump({"domain_id": "PF07728", "sequences": {target: {"hit_intervals": {}}}}, f)
+    return str(pfam_dir)
+
+###T merge_sequences
+
+def test_merge_sequences(tmp_path):
+    sequence_dir = tmp_path / "sp-A-ONE_HUMAN"
+    sequence_dir.mkdir()
+    for pfam_id in ["PF07728", "PF00001"]:
+        with open(sequence_dir / f"{pfam_id}_report.json", "w", encoding="utf-8") as f:
+            json.dump({"sequence_id": "sp|A|ONE_HUMAN", "domain": {pfam_id: {"hit_intervals": {}}}}, f)
+    aggregated_report_path = merge_sequences(str(sequence_dir), MagicMock(), MagicMock())
+    with open(aggregated_report_path, encoding="utf-8") as f:
+        assert json.load(f) == {"sp|A|ONE_HUMAN": {"PF07728": {"hit_intervals": {}}, "PF00001": {"hit_intervals": {}}}}
+
+###T merge_domain_chunk_reports
+
+def test_merge_domain_chunk_reports(domain_dir):
+    report_path = merge_domain_chunk_reports(domain_dir, "PF07728")
+    assert os.listdir(domain_dir) == ["PF07728_report.json"]
+    with open(report_path, encoding="utf-8") as f:
+        assert json.load(f) == {
+            "domain_id": "PF07728",
+            "sequences": {"sp|A|ONE_HUMAN": {"hit_intervals": {}}, "sp|B|TWO_HUMAN": {"hit_intervals": {}}},
+        }
+
+def test_merge_domain_chunk_reports_without_chunks(tmp_path):
+    assert merge_domain_chunk_reports(str(tmp_path), "PF07728") == ""
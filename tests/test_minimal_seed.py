@@ -0,0 +1,53 @@
+"""
+Unit tests for minimal_seed.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from minimal_seed import write_minimal_seed, write_all_minimal_seeds
+from seed_states import write_all_seed_states
+from hmm_states import MINIMAL_SEED_FILENAME, read_seed_alignment, get_seed_rows, alignment_match_states
+from run_hmmalign import align_domain_in_process
+from conftest import SEED_ROWS
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def family_dir(seed_family):
+    """PF90001 resources (see conftest.py), with SEED1_MOUSE annotated and SEED0_HUMAN as conservation reference"""
+    (seed_family / "annotations.json").write_text(json.dumps({"SEED1_MOUSE": {"10": []}}), encoding="utf-8")
+    (seed_family / "conservations.json").write_text(json.dumps({"SEED0_HUMAN/1-22": {"3": 0.9}}), encoding="utf-8")
+    (seed_family / "PF90001_hits.fasta").write_text(">sp|P00001|ONE_HUMANtarget//1-30\nPPPPMKVLAAGIVGLLLAACSSHKEEPPPP\n", encoding="utf-8")
+    return str(seed_family)
+
+###T write_minimal_seed and write_all_minimal_seeds
+
+def test_write_minimal_seed_keeps_columns(family_dir):
+    assert write_minimal_seed(family_dir) == (2, 4)
+    rows, reference = read_seed_alignment(os.path.join(family_dir, MINIMAL_SEED_FILENAME))
+    assert rows == {name: SEED_ROWS[name] for name in ["SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23"]}
+    assert reference == ""
+    assert write_minimal_seed(os.path.dirname(family_dir)) is None
+
+def test_minimal_seed_alignment_matches_full_seed(family_dir):
+    hmm_path = os.path.join(family_dir, "domain.hmm")
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    fasta_path = os.path.join(family_dir, "PF90001_hits.fasta")
+    full_states = alignment_match_states(align_domain_in_process(hmm_path, seed_path, fasta_path), 22)
+
+    assert write_all_minimal_seeds(os.path.dirname(family_dir), MagicMock()) == {"PF90001": (2, 4)}
+    minimal_states = alignment_match_states(align_domain_in_process(hmm_path, seed_path, fasta_path), 22)
+    assert set(minimal_states) == {"SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23", "sp|P00001|ONE_HUMANtarget//1-30"}
+    assert all(minimal_states[name] == full_states[name] for name in minimal_states)
+
+    # Both reduced seeds give the same rows
+    minimal_rows = get_seed_rows(hmm_path, seed_path)
+    write_all_seed_states(os.path.dirname(family_dir), MagicMock())
+    assert get_seed_rows(hmm_path, seed_path) == minimal_rows
@@ -0,0 +1,104 @@
+"""
+Unit tests for prepare_fasta_per_domain.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from prepare_fasta_per_domain import prep_domain_fasta, prep_all_domain_fastas, DomainFastaWriters
+from hits_table import write_hits_table
+
+import pytest
+
+### Fixtures
+
+HITS_PER_DOMAIN = {
+    "PF00001": {
+        "sp|P1|A_HUMAN": [{"hmm_name": "Dom1", "target_seq_name": "sp|P1|A_HUMAN", "bitscore": 55.0,
+                           "ali_from": 10, "ali_to": 15, "ali_range": "/10-15", "subseq": "MKVLAA"}],
+        "sp|P2|B_HUMAN": [{"hmm_name": "Dom1", "target_seq_name": "sp|P2|B_HUMAN", "bitscore": 40.0,
+                           "ali_from": 3, "ali_to": 7, "ali_range": "/3-7", "subseq": "MKVLS"}],
+    },
+    "PF00002": {
+        "sp|P1|A_HUMAN": [{"hmm_name": "Dom2", "target_seq_name": "sp|P1|A_HUMAN", "bitscore": 20.0,
+                           "ali_from": 40, "ali_to": 42, "ali_range": "/40-42", "subseq": "WDT"}],
+    },
+}
+
+@pytest.fixture
+def hits_sources(tmp_path):
+    """hmmsearch_per_domain.json and hmmsearch_hits table with the same hits"""
+    per_dom_json = tmp_path / "hmmsearch_per_domain.json"
+    per_dom_json.write_text(json.dumps(HITS_PER_DOMAIN), encoding="utf-8")
+    table_dir = str(tmp_path / "hmmsearch_hits")
+    write_hits_table(HITS_PER_DOMAIN, table_dir)
+    return str(per_dom_json), table_dir
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    """Resources for PF00001 and PF00002 only, PF00003 has no annotations or conservations"""
+    resource_dir = tmp_path / "resources"
+    for accession, files in [("PF00001", ["annotations.json"]), ("PF00002", ["conservations.json"]), ("PF00003", [])]:
+        (resource_dir / accession).mkdir(parents=True)
+        for filename in ["domain.hmm", "alignment.seed", *files]:
+            (resource_dir / accession / filename).write_text("", encoding="utf-8")
+    return str(resource_dir)
+
+###T prep_domain_fasta
+
+def test_prep_domain_fasta_from_json(tmp_path, hits_sources):
+    per_dom_json, _ = hits_sources
+    fasta_path = prep_domain_fasta(per_dom_json, "PF00001", str(tmp_path / "out"), MagicMock(), MagicMock())
+    with open(fasta_path, encoding="utf-8") as f:
+        assert f.read() == ">sp|P1|A_HUMANtarget//10-15\nMKVLAA\n>sp|P2|B_HUMANtarget//3-7\nMKVLS\n"
+
+def test_prep_domain_fasta_table_matches_json(tmp_path, hits_sources):
+    per_dom_json, table_dir = hits_sources
+    json_fasta = prep_domain_fasta(per_dom_json, "PF00002", str(tmp_path / "json"), MagicMock(), MagicMock())
+    table_fasta = prep_domain_fasta("missing.json", "PF00002", str(tmp_path / "table"), MagicMock(), MagicMock(), table_dir)
+    with open(json_fasta, encoding="utf-8") as f1, open(table_fasta, encoding="utf-8") as f2:
+        assert f1.read() == f2.read()
+
+def test_prep_domain_fasta_no_hits(tmp_path, hits_sources):
+    _, table_dir = hits_sources
+    multi_logger = MagicMock()
+    assert prep_domain_fasta("missing.json", "PF09999", str(tmp_path), MagicMock(), multi_logger, table_dir) is None
+    multi_logger.assert_called_once()
+
+###T prep_all_domain_fastas
+
+@pytest.mark.parametrize("use_table", [False, True])
+def test_prep_all_domain_fastas_matches_per_domain(tmp_path, hits_sources, resource_dir, use_table):
+    per_dom_json, table_dir = hits_sources
+    all_dir, single_dir = tmp_path / "all", tmp_path / "single"
+    prepared = prep_all_domain_fastas(
+        per_dom_json, resource_dir, str(all_dir), MagicMock(), MagicMock(), table_dir if use_table else None
+    )
+    assert sorted(prepared) == ["PF00001", "PF00002"]
+    for accession in prepared:
+        single_fasta = prep_domain_fasta(per_dom_json, accession, str(single_dir), MagicMock(), MagicMock())
+        with open(single_fasta, encoding="utf-8") as f1, \
+             open(all_dir / accession / f"{accession}_hits.fasta", encoding="utf-8") as f2:
+            assert f1.read() == f2.read()
+        with open(prepared[accession], encoding="utf-8") as f:
+            domain_info = json.load(f)
+        assert domain_info["can_align"] and domain_info["dom_fasta"] == str(all_dir / accession / f"{accession}_hits.fasta")
+
+def test_prep_all_domain_fastas_no_resources(tmp_path, hits_sources):
+    per_dom_json, _ = hits_sources
+    assert prep_all_domain_fastas(per_dom_json, str(tmp_path / "missing"), str(tmp_path / "out"), MagicMock(), MagicMock()) == {}
+    assert not (tmp_path / "out").exists()
+
+###T DomainFastaWriters
+
+def test_domain_fasta_writers_bounded_handles(tmp_path):
+    with DomainFastaWriters(str(tmp_path), max_open_files=1) as writers:
+        for accession, text in [("PF00001", ">a\nMK\n"), ("PF00002", ">b\nWD\n"), ("PF00001", ">c\nVL\n")]:
+            writers.write(accession, text)
+            assert len(writers._handles) == 1
+    assert (tmp_path / "PF00001" / "PF00001_hits.fasta").read_text(encoding="utf-8") == ">a\nMK\n>c\nVL\n"
+    assert (tmp_path / "PF00002" / "PF00002_hits.fasta").read_text(encoding="utf-8") == ">b\nWD\n"
@@ -0,0 +1,129 @@
+"""
+Unit tests for resource_manifest.py
+"""
+
+import sys
+import os
+import json
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from resource_manifest import (
+    RESOURCE_MANIFEST_FILENAME,
+    build_manifest,
+    write_manifest,
+    load_resource_manifest,
+    verify_manifest
+)
+from prepare_fasta_per_domain import can_run_hmmalign
+from transfer_annotations import get_annotation_filepath
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def logger():
+    return MagicMock()
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    """resource_dir with one complete family, one without annotations and mappings/"""
+    resources = tmp_path / "resources"
+    for family, files in {
+        "PF07728": ["domain.hmm", "alignment.seed", "conservations.json", "annotations.json"],
+        "PF00001": ["domain.hmm", "alignment.seed", "conservations.json"],
+    }.items():
+        (resources / family).mkdir(parents=True)
+        for filename in files:
+            (resources / family / filename).write_text(f"{family} {filename}\n", encoding="utf-8")
+    (resources / "mappings").mkdir()
+    (resources / "mappings" / "pfam2go").write_text("!version date: 2025/01/01\n", encoding="utf-8")
+    return str(resources)
+
+###T build_manifest, write_manifest and load_resource_manifest
+
+def test_build_manifest(resource_dir, logger):
+    manifest = build_manifest(resource_dir, logger, pfam_release="37.0")
+    assert manifest["pfam_release"] == "37.0"
+    assert sorted(manifest["families"]) == ["PF00001", "PF07728"]
+    assert sorted(manifest["families"]["PF00001"]) == ["alignment.seed", "conservations.json", "domain.hmm"]
+    assert manifest["families"]["PF07728"]["domain.hmm"]["size"] == len("PF07728 domain.hmm\n")
+    assert len(manifest["families"]["PF07728"]["domain.hmm"]["sha256"]) == 64
+    assert list(manifest["mappings"]) == ["pfam2go"]
+
+def test_build_manifest_no_hashes(resource_dir, logger):
+    manifest = build_manifest(resource_dir, logger, hashes=False)
+    assert "sha256" not in manifest["families"]["PF07728"]["domain.hmm"]
+
+def test_load_resource_manifest(resource_dir, logger):
+    assert load_resource_manifest(resource_dir, logger) is None
+    manifest_path = write_manifest(build_manifest(resource_dir, logger), resource_dir)
+    assert manifest_path == os.path.join(resource_dir, RESOURCE_MANIFEST_FILENAME)
+    manifest = load_resource_manifest(resource_dir, logger)
+    assert manifest.has_file("PF07728", "annotations.json")
+    assert not manifest.has_file("PF00001", "annotations.json")
+    assert not manifest.has_file("PF99999", "domain.hmm")
+    assert manifest.has_mapping("pfam2go")
+    assert load_resource_manifest(resource_dir, logger) is manifest
+
+def test_load_resource_manifest_checksum_mismatch(resource_dir, logger):
+    content = build_manifest(resource_dir, logger)
+    content["families"]["PF00001"]["annotations.json"] = {"size": 2}
+    write_manifest(content, resource_dir)
+    assert load_resource_manifest(resource_dir, logger) is None
+    logger.warning.assert_called_once()
+
+def test_load_resource_manifest_stale_families(resource_dir, logger):
+    write_manifest(build_manifest(resource_dir, logger, pfam_release="37.0"), resource_dir)
+    os.mkdir(os.path.join(resource_dir, "PF00002"))
+    assert load_resource_manifest(resource_dir, logger) is None
+    logger.warning.assert_called_once()
+    assert "37.0" in logger.warning.call_args[0]
+
+def test_manifest_checks_unlisted_files_on_filesystem(resource_dir, logger):
+    write_manifest(build_manifest(resource_dir, logger), resource_dir)
+    manifest = load_resource_manifest(resource_dir, logger)
+    with open(os.path.join(resource_dir, "PF00001", "annotations.json"), "w", encoding="utf-8") as f:
+        f.write("{}")
+    assert manifest.has_file("PF00001", "annotations.json")
+    assert get_annotation_filepath(resource_dir, "PF00001", manifest)[0] == os.path.join(resource_dir, "PF00001", "annotations.json")
+
+###T verify_manifest
+
+def test_verify_manifest(resource_dir, logger):
+    write_manifest(build_manifest(resource_dir, logger), resource_dir)
+    manifest = load_resource_manifest(resource_dir, logger)
+    assert verify_manifest(resource_dir, manifest) == []
+
+    os.remove(os.path.join(resource_dir, "PF00001", "conservations.json"))
+    with open(os.path.join(resource_dir, "PF07728", "annotations.json"), "w", encoding="utf-8") as f:
+        json.dump({"changed": True}, f)
+    with open(os.path.join(resource_dir, "PF00001", "annotations.json"), "w", encoding="utf-8") as f:
+        f.write("{}")
+    assert verify_manifest(resource_dir, manifest) == [
+        f"missing: {os.path.join('PF00001', 'conservations.json')}",
+        f"not in manifest: {os.path.join('PF00001', 'annotations.json')}",
+        f"changed: {os.path.join('PF07728', 'annotations.json')}",
+    ]
+
+###T can_run_hmmalign and get_annotation_filepath with a manifest
+
+def test_can_run_hmmalign_with_manifest(resource_dir, logger, tmp_path):
+    write_manifest(build_manifest(resource_dir, logger), resource_dir)
+    manifest = load_resource_manifest(resource_dir, logger)
+    # Files are looked up in the manifest, not on disk
+    os.remove(os.path.join(resource_dir, "PF07728", "domain.hmm"))
+    result = can_run_hmmalign("PF07728.15", resource_dir, str(tmp_path / "output"), manifest)
+    assert result["can_align"] is True
+    assert result["hmm_file"] == os.path.join(resource_dir, "PF07728", "domain.hmm")
+    assert can_run_hmmalign("PF07728", resource_dir, str(tmp_path / "output"))["can_align"] is False
+    assert can_run_hmmalign("PF99999", resource_dir, str(tmp_path / "output"), manifest)["can_align"] is False
+
+def test_get_annotation_filepath_with_manifest(resource_dir, logger):
+    write_manifest(build_manifest(resource_dir, logger), resource_dir)
+    manifest = load_resource_manifest(resource_dir, logger)
+    annotations_filepath, conservations_filepath = get_annotation_filepath(resource_dir, "PF00001", manifest)
+    assert annotations_filepath is None
+    assert conservations_filepath == os.path.join(resource_dir, "PF00001", "conservations.json")
@@ -0,0 +1,105 @@
+"""
+Unit tests for resource_pack.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pyhmmer.plan7 import HMMFile
+
+from resource_pack import RESOURCE_PACK_FILENAME, build_resource_pack, open_resource_pack, load_hmm
+from hmm_states import get_seed_rows
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def resource_dir(seed_family):
+    """Resources with PF90001 (HMM and seed from conftest.py, annotations, conservations),
+    PF90002 (no seed) and the InterPro mapping"""
+    resources = seed_family.parent
+    (seed_family / "annotations.json").write_text(json.dumps({"SEED1_MOUSE": {"10": []}}), encoding="utf-8")
+    (seed_family / "conservations.json").write_text(json.dumps({"SEED0_HUMAN/1-22": {"3": 0.9}}), encoding="utf-8")
+    (resources / "PF90002").mkdir()
+    (resources / "mappings").mkdir()
+    (resources / "mappings" / "interpro_pfam_accession_mapping.tsv").write_text(
+        "InterPro_ID\tPfam_ID\nIPR000001\tPF90001\nIPR000002\tPF90002\n", encoding="utf-8"
+    )
+    return str(resources)
+
+###T build_resource_pack and ResourcePack
+
+def test_build_resource_pack_round_trip(resource_dir):
+    domain_dir = os.path.join(resource_dir, "PF90001")
+    expected_seed_rows = get_seed_rows(os.path.join(domain_dir, "domain.hmm"), os.path.join(domain_dir, "alignment.seed"))
+    logger = MagicMock()
+    pack_path = build_resource_pack(resource_dir, logger)
+    assert pack_path == os.path.join(resource_dir, RESOURCE_PACK_FILENAME)
+
+    pack = open_resource_pack(resource_dir)
+    assert pack.has_family("PF90001") and not pack.has_family("PF90002")
+    assert pack.annotations("PF90001") == {"SEED1_MOUSE": {"10": []}}
+    assert pack.conservations("PF90001") == {"SEED0_HUMAN/1-22": {"3": 0.9}}
+    assert pack.interpro_id("PF90001") == "IPR000001"
+    assert pack.seed_rows("PF90001") == expected_seed_rows
+
+    with HMMFile(os.path.join(domain_dir, "domain.hmm")) as hmm_file:
+        text_hmm = hmm_file.read()
+    packed_hmm = pack.hmm("PF90001")
+    assert packed_hmm.accession == text_hmm.accession and packed_hmm.M == text_hmm.M
+    assert list(packed_hmm.match_emissions[1]) == pytest.approx(list(text_hmm.match_emissions[1]), abs=1e-6)
+    logger.info.assert_called_once()
+
+def test_build_resource_pack_without_json_files(resource_dir):
+    os.remove(os.path.join(resource_dir, "PF90001", "annotations.json"))
+    build_resource_pack(resource_dir, MagicMock())
+    pack = open_resource_pack(resource_dir)
+    assert pack.annotations("PF90001") is None
+    assert pack.conservations("PF90001") == {"SEED0_HUMAN/1-22": {"3": 0.9}}
+
+def test_build_resource_pack_rebuild_reads_current_seed(resource_dir):
+    """Rebuilding takes seed rows from the changed seed, not from the existing pack"""
+    seed_path = os.path.join(resource_dir, "PF90001", "alignment.seed")
+    build_resource_pack(resource_dir, MagicMock())
+    with open(seed_path, encoding="utf-8") as f:
+        seed_lines = f.read().splitlines()
+    seed_lines.insert(-1, "SEED4_CHICK/1-22 MKVLAAGI-VGLLLAACSSHKEE")
+    with open(seed_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(seed_lines) + "\n")
+
+    build_resource_pack(resource_dir, MagicMock())
+    hmm_length, rows = open_resource_pack(resource_dir).seed_rows("PF90001")
+    assert "SEED4_CHICK/1-22" in [name for name, _, _ in rows]
+    assert hmm_length == open_resource_pack(resource_dir).hmm("PF90001").M
+
+###T open_resource_pack
+
+def test_open_resource_pack_absent(tmp_path):
+    assert open_resource_pack(str(tmp_path)) is None
+
+def test_open_resource_pack_reopens_rebuilt_pack(resource_dir):
+    build_resource_pack(resource_dir, MagicMock())
+    first = open_resource_pack(resource_dir)
+    assert open_resource_pack(resource_dir) is first
+    with open(os.path.join(resource_dir, "mappings", "interpro_pfam_accession_mapping.tsv"), "w", encoding="utf-8") as f:
+        f.write("InterPro_ID\tPfam_ID\nIPR000009\tPF90001\n")
+    build_resource_pack(resource_dir, MagicMock())
+    assert open_resource_pack(resource_dir).interpro_id("PF90001") == "IPR000009"
+
+###T load_hmm and pack-backed readers
+
+def test_readers_use_pack(resource_dir):
+    domain_dir = os.path.join(resource_dir, "PF90001")
+    hmm_path = os.path.join(domain_dir, "domain.hmm")
+    seed_path = os.path.join(domain_dir, "alignment.seed")
+    expected_seed_rows = get_seed_rows(hmm_path, seed_path)
+    build_resource_pack(resource_dir, MagicMock())
+    os.remove(hmm_path)
+    os.remove(seed_path)
+    assert load_hmm(hmm_path).accession == b"PF90001.1"
+    assert get_seed_rows(hmm_path, seed_path) == expected_seed_rows
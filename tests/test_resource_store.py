@@ -0,0 +1,89 @@
+"""
+Unit tests for resource_store.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from resource_store import ResourceStore, get_resource_store
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def source_files(tmp_path):
+    """Three 10-byte source files"""
+    paths = []
+    for idx in range(3):
+        path = tmp_path / f"source{idx}.json"
+        path.write_text(json.dumps({"k": f"value{idx}"})[:10].ljust(10), encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+###T ResourceStore.load
+
+def test_load_counts_hits_and_misses(source_files):
+    store = ResourceStore()
+    loader = MagicMock(return_value={"parsed": True})
+    first = store.load(source_files[0], loader)
+    second = store.load(source_files[0], loader)
+    assert first is second
+    loader.assert_called_once()
+    assert store.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 10}
+
+def test_load_separates_kinds(source_files):
+    store = ResourceStore()
+    assert store.load(source_files[0], lambda: "a", kind="a") == "a"
+    assert store.load(source_files[0], lambda: "b", kind="b") == "b"
+    assert store.stats()["entries"] == 2
+
+def test_load_evicts_least_recently_used(source_files):
+    store = ResourceStore(max_bytes=20)
+    store.load(source_files[0], lambda: 0)
+    store.load(source_files[1], lambda: 1)
+    store.load(source_files[0], lambda: 0)
+    store.load(source_files[2], lambda: 2, size=10)
+    assert [path for _, path in store.entries] == [source_files[0], source_files[2]]
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["bytes"] == 20
+
+def test_load_keeps_entry_larger_than_bound(source_files):
+    store = ResourceStore(max_bytes=5)
+    store.load(source_files[0], lambda: 0)
+    store.load(source_files[1], lambda: 1)
+    assert [path for _, path in store.entries] == [source_files[1]]
+
+def test_load_reloads_changed_source(source_files):
+    store = ResourceStore()
+    store.load(source_files[0], lambda: "old")
+    with open(source_files[0], "w", encoding="utf-8") as f:
+        f.write("changed, longer content")
+    assert store.load(source_files[0], lambda: "new") == "new"
+    assert store.stats()["bytes"] == len("changed, longer content")
+
+def test_load_missing_source_and_none_not_cached(tmp_path, source_files):
+    store = ResourceStore()
+    loader = MagicMock(return_value="value")
+    store.load(str(tmp_path / "absent.json"), loader)
+    store.load(str(tmp_path / "absent.json"), loader)
+    assert loader.call_count == 2
+    assert store.load(source_files[0], lambda: None) is None
+    assert store.stats()["entries"] == 0 and store.stats()["misses"] == 3
+
+###T ResourceStore.json_file and get_resource_store
+
+def test_json_file(tmp_path):
+    json_path = tmp_path / "annotations.json"
+    json_path.write_text(json.dumps({"SEED1_MOUSE": {"10": []}}), encoding="utf-8")
+    store = ResourceStore()
+    assert store.json_file(str(json_path)) == {"SEED1_MOUSE": {"10": []}}
+    with pytest.raises(FileNotFoundError):
+        store.json_file(str(tmp_path / "absent.json"))
+
+def test_get_resource_store_is_shared():
+    assert get_resource_store() is get_resource_store()
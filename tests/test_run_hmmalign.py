@@ -0,0 +1,145 @@
+"""
+Unit tests for run_hmmalign.py
+"""
+
+import json
+import shutil
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from run_hmmalign import align_domain_in_process, run_hmmalign, split_domain_fasta
+from hmm_states import alignment_match_states, read_seed_alignment
+from transfer_annotations import extract_target_info_from_hmmalign
+from conftest import SEED_ROWS
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def domain_info(tmp_path, seed_family):
+    """Writes PF90001's hits FASTA and domain_info.json, next to its HMM and seed (see conftest.py)"""
+    output_dir = tmp_path / "output" / "PF90001"
+    output_dir.mkdir(parents=True)
+    with open(output_dir / "PF90001_hits.fasta", "w", encoding="utf-8") as f:
+        f.write(">sp|P00001|ONE_HUMANtarget//1-30\nPPPPMKVLAAGIVGLLLAACSSHKEEPPPP\n")
+        f.write(">sp|P00002|TWO_HUMANtarget//3-27\nMKVLAAGIVGLLWWWLAACSSHKEE\n")
+    info = {
+        "hmm_file": str(seed_family / "domain.hmm"),
+        "seed_alignment": str(seed_family / "alignment.seed"),
+        "dom_fasta": str(output_dir / "PF90001_hits.fasta"),
+        "pfam_id_hmmaligned": str(output_dir / "PF90001_hmmalign.sth"),
+    }
+    info_path = output_dir / "domain_info.json"
+    with open(info_path, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    return str(info_path), info
+
+###T align_domain_in_process
+
+def test_align_domain_in_process_maps_seed_and_targets(domain_info):
+    _, info = domain_info
+    lines = align_domain_in_process(info["hmm_file"], info["seed_alignment"], info["dom_fasta"])
+    states = alignment_match_states(lines, 22)
+
+    assert set(states) == set(SEED_ROWS) | {"sp|P00001|ONE_HUMANtarget//1-30", "sp|P00002|TWO_HUMANtarget//3-27"}
+    # Seed residue Q (insert column 9) stays out of the match states
+    assert "".join(states["SEED1_MOUSE/1-23"]) == "MKVLSAGIVGLLLAACSTHKEE"
+    assert "".join(states["sp|P00002|TWO_HUMANtarget//3-27"]) == "MKVLAAGIVGLLLAACSSHKEE"
+    target_info = extract_target_info_from_hmmalign(MagicMock(), MagicMock(), lines)
+    assert set(target_info) == {"sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN"}
+
+def test_align_domain_in_process_trim(domain_info):
+    _, info = domain_info
+    lines = align_domain_in_process(info["hmm_file"], info["seed_alignment"], info["dom_fasta"], trim=True)
+    rows = {line.split()[0]: line.split()[1] for line in lines if line.startswith("sp|")}
+    assert "p" not in rows["sp|P00001|ONE_HUMANtarget//1-30"].replace(".", "")
+    untrimmed = align_domain_in_process(info["hmm_file"], info["seed_alignment"], info["dom_fasta"])
+    assert alignment_match_states(lines, 22) == alignment_match_states(untrimmed, 22)
+
+###T run_hmmalign
+
+def test_run_hmmalign_pyhmmer_backend_writes_alignment(domain_info):
+    info_path, info = domain_info
+    multi_logger = MagicMock()
+    run_hmmalign(info_path, multi_logger, backend="pyhmmer")
+    with open(info["pfam_id_hmmaligned"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "# STOCKHOLM 1.0" and lines[-1] == "//"
+    assert set(read_seed_alignment(info["pfam_id_hmmaligned"])[0]) >= set(SEED_ROWS)
+    multi_logger.assert_called_once()
+
+@pytest.mark.skipif(shutil.which("hmmalign") is None, reason="hmmalign binary not on PATH")
+def test_pyhmmer_backend_parity_with_binary(domain_info, tmp_path):
+    info_path, info = domain_info
+    for trim in (False, True):
+        run_hmmalign(info_path, MagicMock(), trim=trim, backend="binary")
+        with open(info["pfam_id_hmmaligned"], encoding="utf-8") as f:
+            binary_lines = f.read().splitlines()
+        in_process_lines = align_domain_in_process(info["hmm_file"], info["seed_alignment"], info["dom_fasta"], trim)
+        assert alignment_match_states(in_process_lines, 22) == alignment_match_states(binary_lines, 22)
+
+###T split_domain_fasta and chunked run_hmmalign
+
+def test_split_domain_fasta_keeps_targets_whole(tmp_path):
+    fasta_path = tmp_path / "PF90001_hits.fasta"
+    fasta_path.write_text(
+        ">sp|A|ONEtarget//1-10\nMKV\n>sp|A|ONEtarget//20-30\nMKV\n>sp|B|TWOtarget//1-10\nMKV\n>sp|C|THREEtarget//1-10\nMKV\n",
+        encoding="utf-8"
+    )
+    assert split_domain_fasta(str(fasta_path), 4) == []
+    chunk_paths = split_domain_fasta(str(fasta_path), 2)
+    assert [os.path.basename(path) for path in chunk_paths] == ["PF90001_chunk1_hits.fasta", "PF90001_chunk2_hits.fasta"]
+    with open(chunk_paths[0], encoding="utf-8") as f:
+        assert f.read().count(">sp|A|ONE") == 2
+
+def test_run_hmmalign_chunks_large_domain(domain_info):
+    info_path, info = domain_info
+    run_hmmalign(info_path, MagicMock(), backend="pyhmmer")
+    with open(info["pfam_id_hmmaligned"], encoding="utf-8") as f:
+        whole_states = alignment_match_states(f.read().splitlines(), 22)
+
+    run_hmmalign(info_path, MagicMock(), backend="pyhmmer", chunk_size=1, threads=2)
+    domain_dir = os.path.dirname(info_path)
+    assert sorted(os.listdir(domain_dir)) == [
+        "PF90001_chunk1_hmmalign.sth", "PF90001_chunk2_hmmalign.sth", "PF90001_hits.fasta", "domain_info.json"
+    ]
+    chunk_states = {}
+    for chunk_idx in (1, 2):
+        with open(os.path.join(domain_dir, f"PF90001_chunk{chunk_idx}_hmmalign.sth"), encoding="utf-8") as f:
+            states = alignment_match_states(f.read().splitlines(), 22)
+        assert set(SEED_ROWS) <= set(states)
+        chunk_states.update(states)
+    assert chunk_states == whole_states
+
+###T align_domain_with_cache
+
+def test_run_hmmalign_with_alignment_cache(domain_info, tmp_path):
+    info_path, info = domain_info
+    cache_path = str(tmp_path / "alignment_cache.sqlite")
+    with open(info["dom_fasta"], "a", encoding="utf-8") as f:
+        # Same subsequence as TWO_HUMAN's hit, under another name
+        f.write(">sp|P00003|TWO_MOUSEtarget//3-27\nMKVLAAGIVGLLWWWLAACSSHKEE\n")
+    expected_states = alignment_match_states(
+        align_domain_in_process(info["hmm_file"], info["seed_alignment"], info["dom_fasta"]), 22
+    )
+
+    multi_logger = MagicMock()
+    run_hmmalign(info_path, multi_logger, backend="pyhmmer", cache_path=cache_path)
+    multi_logger.assert_any_call(
+        "info", "RUN_HMMALIGN --- CACHE --- %d of %d subsequences found in cache, aligning %d unique subsequences", 0, 3, 2
+    )
+    with open(info["pfam_id_hmmaligned"], encoding="utf-8") as f:
+        first_lines = f.read().splitlines()
+    assert alignment_match_states(first_lines, 22) == expected_states
+
+    multi_logger = MagicMock()
+    run_hmmalign(info_path, multi_logger, backend="pyhmmer", cache_path=cache_path)
+    multi_logger.assert_any_call(
+        "info", "RUN_HMMALIGN --- CACHE --- %d of %d subsequences found in cache, aligning %d unique subsequences", 3, 3, 0
+    )
+    with open(info["pfam_id_hmmaligned"], encoding="utf-8") as f:
+        assert f.read().splitlines() == first_lines
@@ -0,0 +1,268 @@
+"""
+Unit tests for run_hmmsearch.py and merge_hmmsearch_shards.py
+"""
+
+import json
+import sys
+import os
+import sqlite3
+from unittest.mock import MagicMock, patch
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pyhmmer
+from pyhmmer.easel import Alphabet, TextMSA, TextSequence
+from pyhmmer.plan7 import Builder, Background
+
+from run_hmmsearch import (
+    parse_shard_spec,
+    get_shard_suffix,
+    in_shard,
+    count_fasta_sequences,
+    run_hmmsearch,
+)
+from merge_hmmsearch_shards import find_shard_outputs, merge_hmmsearch_shards
+from hmmsearch_cache import sequence_md5
+from hits_table import HitsTable
+
+import pytest
+
+### Fixtures
+
+FAMILY_SEEDS = {
+    "PF90001": ["MKVLAAGIVGLLLAACSSHKEE", "MKVLSAGIVGLLLAACSTHKEE", "MRVLAAGIIGLLLAACSSHREE", "MKVLAAGLVGLLVAACSSHKDE"],
+    "PF90002": ["WDTYGCPHNERWQFMYDGTC", "WDSYGCPHNEKWQFMYDGTC", "WETYGCPHNERWHFMYEGTC", "WDTYGCPHDERWQFLYDGSC"],
+    "PF90003": ["HHGRPTEVNQLIRDFKA", "HHGRPSEVNQLLRDFKA", "HHGKPTEVNQLIKDFRA", "HQGRPTEINQLIRDFKS"],
+}
+
+TARGETS = {
+    "sp|P00001|ONE_HUMAN": "PPPPMKVLAAGIVGLLLAACSSHKEEPPPPWDTYGCPHNERWQFMYDGTCPPPP",
+    "sp|P00002|TWO_HUMAN": "GGGGWDSYGCPHNEKWQFMYDGTCGGGG",
+    "sp|P00003|THREE_HUMAN": "SSSSHHGRPTEVNQLIRDFKASSSSMRVLAAGIIGLLLAACSSHREESSSS",
+    "sp|P00004|FOUR_HUMAN": "PPPPPPPPPPPPPPPPPPPPPPPPPPPP",
+    "sp|P00005|FIVE_HUMAN": "MKVLAAGLVGLLVAACSSHKDEAAAAHHGKPTEVNQLIKDFRA",
+    "sp|P00006|SIX_HUMAN": "AAAAWETYGCPHNERWHFMYEGTCAAAAMKVLSAGIVGLLLAACSTHKEE",
+    "sp|P00007|SEVEN_HUMAN": "TTTTTTHQGRPTEINQLIRDFKSTTTTTT",
+}
+
+def build_hmm(accession: str, seed_sequences: list):
+    """Builds a small HMM with a Pfam-like accession and gathering cutoffs."""
+    alphabet = Alphabet.amino()
+    msa = TextMSA(
+        name=accession.encode(),
+        sequences=[
+            TextSequence(name=f"SEED{i}_{accession}/1-{len(seq)}".encode(), sequence=seq)
+            for i, seq in enumerate(seed_sequences)
+        ]
+    )
+    hmm, _, _ = Builder(alphabet).build_msa(msa.digitize(alphabet), Background(alphabet))
+    hmm.name = f"{accession}_fam".encode()
+    hmm.accession = f"{accession}.1".encode()
+    hmm.cutoffs.gathering = (10.0, 10.0)
+    hmm.cutoffs.trusted = (12.0, 12.0)
+    hmm.cutoffs.noise = (8.0, 8.0)
+    return hmm
+
+@pytest.fixture
+def hmm_database(tmp_path):
+    """HMM database with 3 small families"""
+    hmm_path = tmp_path / "mini-Pfam-A.hmm"
+    with open(hmm_path, "wb") as f:
+        for accession, seeds in FAMILY_SEEDS.items():
+            build_hmm(accession, seeds).write(f)
+    return str(hmm_path)
+
+@pytest.fixture
+def targets_fasta(tmp_path):
+    """Target proteins, some with more than 1 domain and one without hits"""
+    fasta_path = tmp_path / "targets.fasta"
+    with open(fasta_path, "w", encoding="utf-8") as f:
+        for name, seq in TARGETS.items():
+            f.write(f">{name}\n{seq}\n")
+    return str(fasta_path)
+
+@pytest.fixture
+def logger():
+    """Mock logger"""
+    return MagicMock()
+
+def read_outputs(output_dir):
+    """Loads the regular hmmsearch outputs from a directory"""
+    with open(os.path.join(output_dir, "hmmsearch_per_domain.json"), encoding="utf-8") as f:
+        per_domain = json.load(f)
+    with open(os.path.join(output_dir, "hmmsearch_sequences.json"), encoding="utf-8") as f:
+        sequences = json.load(f)
+    with open(os.path.join(output_dir, "hmmsearch_sequences.txt"), encoding="utf-8") as f:
+        sequences_txt = f.read()
+    return per_domain, sequences, sequences_txt
+
+###T parse_shard_spec
+
+def test_parse_shard_spec_valid():
+    assert parse_shard_spec("1/4") == (1, 4)
+    assert parse_shard_spec("4/4") == (4, 4)
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "1-4", "a/b", "1/0", "1/2/3"])
+def test_parse_shard_spec_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_shard_spec(spec)
+
+###T get_shard_suffix and in_shard
+
+def test_get_shard_suffix():
+    assert get_shard_suffix(1, 1) == ""
+    assert get_shard_suffix(2, 3) == ".shard_2_of_3"
+
+def test_in_shard_round_robin_covers_all_positions_once():
+    shard_count = 3
+    for position in range(10):
+        owners = [k for k in range(1, shard_count + 1) if in_shard(position, k, shard_count)]
+        assert owners == [position % shard_count + 1]
+
+###T count_fasta_sequences
+
+def test_count_fasta_sequences(targets_fasta):
+    assert count_fasta_sequences(targets_fasta) == len(TARGETS)
+
+###T run_hmmsearch
+
+def test_run_hmmsearch_single_process(tmp_path, hmm_database, targets_fasta, logger):
+    output_dir = str(tmp_path / "single")
+    run_hmmsearch(hmm_database, targets_fasta, output_dir, logger)
+    per_domain, sequences, _ = read_outputs(output_dir)
+
+    assert set(per_domain) == set(FAMILY_SEEDS)
+    assert "sp|P00004|FOUR_HUMAN" not in sequences["sequences"]
+    hit = per_domain["PF90002"]["sp|P00002|TWO_HUMAN"][0]
+    assert hit["target_seq_name"] == "sp|P00002|TWO_HUMAN"
+    assert hit["ali_range"] == f"/{hit['ali_from']}-{hit['ali_to']}"
+
+    hits_table = HitsTable(os.path.join(output_dir, "hmmsearch_hits"))
+    assert {accession: hits_table.domain_hits(accession) for accession in hits_table.accessions} == per_domain
+
+@pytest.mark.parametrize("shard_by,shard_count", [("sequences", 3), ("profiles", 2), ("sequences", 10)])
+def test_sharded_run_merges_to_single_process_result(tmp_path, hmm_database, targets_fasta, logger, shard_by, shard_count):
+    single_dir = str(tmp_path / "single")
+    shard_dir = str(tmp_path / "shards")
+    run_hmmsearch(hmm_database, targets_fasta, single_dir, logger)
+
+    for shard_index in range(1, shard_count + 1):
+        run_hmmsearch(
+            hmm_database, targets_fasta, shard_dir, logger,
+            shard_index=shard_index, shard_count=shard_count, shard_by=shard_by
+        )
+    assert not os.path.exists(os.path.join(shard_dir, "hmmsearch_per_domain.json"))
+
+    merge_hmmsearch_shards(shard_dir, shard_dir, logger)
+
+    assert read_outputs(shard_dir) == read_outputs(single_dir)
+
+def test_sequence_shards_use_global_database_size(tmp_path, hmm_database, targets_fasta, logger):
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, shard_index=2, shard_count=3)
+    with open(tmp_path / "hmmsearch_sequences.shard_2_of_3.json", encoding="utf-8") as f:
+        shard_info = json.load(f)["shard"]
+    assert shard_info == {
+        "index": 2, "count": 3, "by": "sequences",
+        "database_size": len(TARGETS), "bit_cutoffs": "gathering"
+    }
+
+def test_run_hmmsearch_passes_cpus(tmp_path, hmm_database, targets_fasta, logger):
+    with patch("run_hmmsearch.pyhmmer.hmmsearch", wraps=pyhmmer.hmmsearch) as search_calls:
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "plain"), logger, cpus=2)
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "cached"), logger,
+                      cache_path=str(tmp_path / "hmmsearch_cache.sqlite"), cpus=2)
+    assert [call.kwargs["cpus"] for call in search_calls.call_args_list] == [2, 2]
+
+###T find_shard_outputs
+
+def test_find_shard_outputs_missing_shard(tmp_path, hmm_database, targets_fasta, logger):
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, shard_index=1, shard_count=2)
+    with pytest.raises(ValueError, match=r"Missing hmmsearch shards \[2\]"):
+        find_shard_outputs(str(tmp_path))
+
+def test_find_shard_outputs_mixed_settings(tmp_path, hmm_database, targets_fasta, logger):
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, shard_index=1, shard_count=2, shard_by="sequences")
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, shard_index=2, shard_count=2, shard_by="profiles")
+    with pytest.raises(ValueError, match="different settings"):
+        find_shard_outputs(str(tmp_path))
+
+def test_find_shard_outputs_empty_dir(tmp_path):
+    with pytest.raises(ValueError, match="No hmmsearch shard outputs"):
+        find_shard_outputs(str(tmp_path))
+
+###T run_hmmsearch with cache
+
+def count_searched_sequences(search_calls):
+    """Number of target sequences passed to each pyhmmer.hmmsearch call"""
+    return [len(call.args[1]) for call in search_calls.call_args_list]
+
+def test_cached_run_matches_uncached_run(tmp_path, hmm_database, targets_fasta, logger):
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "plain"), logger)
+    cache_path = str(tmp_path / "hmmsearch_cache.sqlite")
+
+    with patch("run_hmmsearch.pyhmmer.hmmsearch", wraps=pyhmmer.hmmsearch) as search_calls:
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "cold"), logger, cache_path=cache_path)
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "warm"), logger, cache_path=cache_path)
+
+    assert count_searched_sequences(search_calls) == [len(TARGETS)]
+    assert read_outputs(str(tmp_path / "cold")) == read_outputs(str(tmp_path / "plain"))
+    assert read_outputs(str(tmp_path / "warm")) == read_outputs(str(tmp_path / "plain"))
+
+def test_cached_run_keeps_sequences_reported_without_pfam_hits(tmp_path, hmm_database, targets_fasta, logger):
+    """A family without a Pfam accession reports EIGHT_HUMAN with no domain hit kept,
+    which must stay in hmmsearch_sequences.json when its result comes from the cache"""
+    local_hmm = build_hmm("LOCAL1", ["CWHMYKRDENWQCFYGHR", "CWHMYKRDEQWQCFYGHR", "CWHLYKRDENWQCYYGHR", "CFHMYKRDENWKCFYGHR"])
+    local_hmm.name = b"LOCAL1"
+    local_hmm.accession = b"LOCAL1"
+    with open(hmm_database, "ab") as f:
+        local_hmm.write(f)
+    with open(targets_fasta, "a", encoding="utf-8") as f:
+        f.write(">sp|P00008|EIGHT_HUMAN\nAAAACWHMYKRDENWQCFYGHRAAAA\n")
+    cache_path = str(tmp_path / "hmmsearch_cache.sqlite")
+
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "plain"), logger)
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "cold"), logger, cache_path=cache_path)
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "warm"), logger, cache_path=cache_path)
+
+    plain = read_outputs(str(tmp_path / "plain"))
+    assert "sp|P00008|EIGHT_HUMAN" in plain[1]["sequences"]
+    assert not any("sp|P00008|EIGHT_HUMAN" in sequences for sequences in plain[0].values())
+    assert read_outputs(str(tmp_path / "cold")) == plain
+    assert read_outputs(str(tmp_path / "warm")) == plain
+
+def test_cache_stores_no_hit_sequences_and_database_size(tmp_path, hmm_database, targets_fasta, logger):
+    cache_path = str(tmp_path / "hmmsearch_cache.sqlite")
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, cache_path=cache_path)
+
+    with sqlite3.connect(cache_path) as connection:
+        rows = dict(connection.execute("SELECT seq_md5, hits FROM domain_hits"))
+        sizes = {size for (size,) in connection.execute("SELECT database_size FROM domain_hits")}
+    assert len(rows) == len(TARGETS)
+    assert json.loads(rows[sequence_md5(TARGETS["sp|P00004|FOUR_HUMAN"])]) == {"reported": False, "hits": []}
+    assert sizes == {len(TARGETS)}
+
+def test_cache_reuses_hits_for_renamed_sequences(tmp_path, hmm_database, targets_fasta, logger):
+    cache_path = str(tmp_path / "hmmsearch_cache.sqlite")
+    run_hmmsearch(hmm_database, targets_fasta, str(tmp_path / "first"), logger, cache_path=cache_path)
+
+    isoforms_fasta = tmp_path / "isoforms.fasta"
+    isoforms_fasta.write_text(
+        f">sp|P00002-2|TWO_HUMAN\n{TARGETS['sp|P00002|TWO_HUMAN']}\n>sp|P00099|NEW_HUMAN\nMKVLAAGIVGLLLAACSSHKEEWWWW\n",
+        encoding="utf-8"
+    )
+    with patch("run_hmmsearch.pyhmmer.hmmsearch", wraps=pyhmmer.hmmsearch) as search_calls:
+        run_hmmsearch(hmm_database, str(isoforms_fasta), str(tmp_path / "second"), logger, cache_path=cache_path)
+
+    assert count_searched_sequences(search_calls) == [1]
+    per_domain, _, _ = read_outputs(str(tmp_path / "second"))
+    with open(tmp_path / "first" / "hmmsearch_per_domain.json", encoding="utf-8") as f:
+        original_hit = json.load(f)["PF90002"]["sp|P00002|TWO_HUMAN"][0]
+    assert per_domain["PF90002"]["sp|P00002-2|TWO_HUMAN"] == [{**original_hit, "target_seq_name": "sp|P00002-2|TWO_HUMAN"}]
+    assert "sp|P00099|NEW_HUMAN" in per_domain["PF90001"]
+
+def test_cache_is_keyed_by_bit_cutoffs(tmp_path, hmm_database, targets_fasta, logger):
+    cache_path = str(tmp_path / "hmmsearch_cache.sqlite")
+    with patch("run_hmmsearch.pyhmmer.hmmsearch", wraps=pyhmmer.hmmsearch) as search_calls:
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, cache_path=cache_path)
+        run_hmmsearch(hmm_database, targets_fasta, str(tmp_path), logger, bit_cutoffs="noise", cache_path=cache_path)
+    assert count_searched_sequences(search_calls) == [len(TARGETS), len(TARGETS)]
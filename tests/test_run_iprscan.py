@@ -0,0 +1,233 @@
+"""
+Unit tests for run_iprscan.py
+"""
+
+import json
+import sys
+import os
+import stat
+import subprocess
+from argparse import Namespace
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from run_iprscan import (
+    get_batch_md5s,
+    scan_with_cache,
+    split_iprscan_output,
+    read_batch_tsv,
+    finish_batch,
+    run_interproscan,
+    run_interproscan_bisecting,
+    write_quarantine,
+    read_sequence_batch,
+)
+from iprscan_cache import get_iprscan_version
+from iprscan_index import open_iprscan_index, load_sequence_matches, parse_tsv_line
+from hmmsearch_cache import sequence_md5
+
+import pytest
+
+### Fixtures
+
+# Writes one Pfam line for each input sequence containing W, fails on any sequence containing X,
+# and counts its runs
+FAKE_IPRSCAN = """#!{python}
+import sys
+args = sys.argv[1:]
+input_fasta, output_base = args[args.index("-i") + 1], args[args.index("-b") + 1]
+with open(input_fasta) as f:
+    records = [(block.split("\\n", 1)[0].split()[0], "".join(block.split("\\n")[1:])) for block in f.read().split(">")[1:]]
+with open("{counter}", "a") as f:
+    f.write(",".join(name for name, _ in records) + "\\n")
+if any("X" in sequence for _, sequence in records):
+    sys.exit("Pathological sequence")
+with open(output_base + ".tsv", "w") as out:
+    for name, sequence in records:
+        if "W" in sequence:
+            out.write(f"{{name}}\\tmd5\\t{{len(sequence)}}\\tPfam\\tPF00001\\tFam1\\t1\\t5\\t1e-5\\tT\\t01-01-2025\\n")
+"""
+
+SEQUENCES = {
+    "sp-P00001-ONE_HUMAN": "MKVLWAAG",
+    "sp-P00002-TWO_HUMAN": "MKVLAAGG",
+    "sp-P00003-THREE_HUMAN": "mkvlwaag",
+    "sp-P00004-FOUR_HUMAN": "MKVLXWAAG",
+    "sp-P00005-FIVE_HUMAN": "MKVLWWAAG",
+    "sp-P00006-SIX_HUMAN": "MXVL",
+}
+
+@pytest.fixture
+def batch_setup(tmp_path):
+    """Writes sequence directories and a fake interproscan.sh"""
+    output_dir = tmp_path / "output"
+    for seq_id, sequence in SEQUENCES.items():
+        (output_dir / seq_id).mkdir(parents=True)
+        (output_dir / seq_id / "sequence.fasta").write_text(f">{seq_id.replace('-', '|')}\n{sequence}\n", encoding="utf-8")
+    counter = tmp_path / "runs.txt"
+    script = tmp_path / "interproscan.sh"
+    script.write_text(FAKE_IPRSCAN.format(python=sys.executable, counter=counter), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return output_dir, script, counter
+
+STANDIN = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "interproscan_standin.py"))
+
+@pytest.fixture
+def standin_batch(tmp_path, monkeypatch):
+    """Batch FASTA of three 90-residue sequences, scanned by the bundled stand-in with every sequence matching"""
+    monkeypatch.setenv("IPRSCAN_STANDIN_MATCH_RATE", "1")
+    batch_ids = ["sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN", "sp|P00003|THREE_HUMAN"]
+    (tmp_path / "batches").mkdir()
+    fasta = tmp_path / "batches" / "batch_1.fasta"
+    fasta.write_text("".join(f">{seq_id}\n{residue * 90}\n" for seq_id, residue in zip(batch_ids, "KLM")), encoding="utf-8")
+    return str(fasta), str(tmp_path / "batches" / "iprscan_batch_1"), batch_ids
+
+def make_args(output_dir, script, batch_idx, max_quarantine=10):
+    return Namespace(
+        iprscan_path=str(script), sequence_parent_dir=str(output_dir), sequence_batch_index=str(batch_idx),
+        analyses="pfam", disable_res=False, enable_precalc=False, output_format="TSV", cpu_cores=1,
+        max_quarantine=max_quarantine
+    )
+
+###T read_sequence_batch
+
+def test_read_sequence_batch_from_file_or_argument(tmp_path):
+    ids_file = tmp_path / "batch_1.txt"
+    ids_file.write_text("sp-P00001-ONE_HUMAN\nsp-P00002-TWO_HUMAN\n\n", encoding="utf-8")
+    from_file = Namespace(sequence_batch=None, sequence_batch_file=str(ids_file))
+    from_argument = Namespace(sequence_batch="sp-P00001-ONE_HUMAN, sp-P00002-TWO_HUMAN", sequence_batch_file=None)
+    assert read_sequence_batch(from_file) == read_sequence_batch(from_argument) == ["sp-P00001-ONE_HUMAN", "sp-P00002-TWO_HUMAN"]
+
+###T get_batch_md5s
+
+def test_get_batch_md5s_skips_missing(batch_setup):
+    output_dir, _, _ = batch_setup
+    multi_logger = MagicMock()
+    md5s = get_batch_md5s(str(output_dir), ["sp-P00001-ONE_HUMAN", "sp-P00009-MISSING"], multi_logger)
+    assert md5s == {"sp-P00001-ONE_HUMAN": sequence_md5("MKVLWAAG")}
+    multi_logger.assert_called_once()
+
+###T scan_with_cache
+
+def test_scan_with_cache_only_scans_misses(tmp_path, batch_setup):
+    output_dir, script, counter = batch_setup
+    cache_path = str(tmp_path / "iprscan_cache.sqlite")
+
+    first_batch = ["sp-P00001-ONE_HUMAN", "sp-P00002-TWO_HUMAN"]
+    parts, matches, _, _ = scan_with_cache(make_args(output_dir, script, 1), cache_path, "5.72-103.0", first_batch, MagicMock(), MagicMock())
+    assert parts[0][0].endswith("iprscan_batch_1")
+    assert matches["sp|P00002|TWO_HUMAN"] == []
+    assert matches["sp|P00001|ONE_HUMAN"][0].startswith("sp|P00001|ONE_HUMAN\tmd5\t8\tPfam\tPF00001")
+
+    # THREE is ONE in lower case: the second batch is served from the cache without running InterProScan
+    second_batch = ["sp-P00003-THREE_HUMAN", "sp-P00002-TWO_HUMAN"]
+    parts, matches, _, _ = scan_with_cache(make_args(output_dir, script, 2), cache_path, "5.72-103.0", second_batch, MagicMock(), MagicMock())
+    assert parts == []
+    assert matches["sp|P00003|THREE_HUMAN"][0].startswith("sp|P00003|THREE_HUMAN\tmd5\t8\tPfam\tPF00001")
+    assert counter.read_text(encoding="utf-8").splitlines() == ["sp|P00001|ONE_HUMAN,sp|P00002|TWO_HUMAN"]
+
+    # A new InterProScan version scans again
+    scan_with_cache(make_args(output_dir, script, 3), cache_path, "5.73-104.0", ["sp-P00002-TWO_HUMAN"], MagicMock(), MagicMock())
+    assert len(counter.read_text(encoding="utf-8").splitlines()) == 2
+
+###T run_interproscan (with the bundled stand-in)
+
+def test_run_interproscan_with_standin(tmp_path, standin_batch):
+    fasta, output_base, batch_ids = standin_batch
+    run_interproscan(STANDIN, False, False, fasta, output_base, "TSV,XML,JSON,GFF3", "pfam,panther", 2, MagicMock())
+
+    with open(f"{output_base}.tsv", encoding="utf-8") as f:
+        rows = [parse_tsv_line(line) for line in f]
+    assert {row[0] for row in rows} == set(batch_ids)
+    assert {row[1] for row in rows} == {"Pfam", "PANTHER"}
+    assert all(row[3].startswith("IPR") for row in rows)
+
+    split_iprscan_output(output_base, batch_ids, ["tsv", "xml", "json", "gff3"], MagicMock(), MagicMock())
+    for seq_id in batch_ids:
+        for fmt in ["tsv", "xml", "json", "gff3"]:
+            assert (tmp_path / seq_id.replace("|", "-") / f"iprscan.{fmt}").is_file()
+    assert get_iprscan_version(STANDIN) == "5.72-103.0"
+
+def test_standin_failure_injection(monkeypatch, standin_batch):
+    fasta, output_base, _ = standin_batch
+    monkeypatch.setenv("IPRSCAN_STANDIN_FAIL_PATTERN", "TWO_HUMAN")
+    with pytest.raises(subprocess.CalledProcessError):
+        run_interproscan(STANDIN, False, False, fasta, output_base, "TSV", "", 1, MagicMock())
+    assert not os.path.exists(f"{output_base}.tsv")
+
+###T split_iprscan_output
+
+def test_split_iprscan_output_from_cached_matches(batch_setup):
+    output_dir, _, _ = batch_setup
+    output_base = os.path.join(output_dir, "batches", "iprscan_batch_1")
+    cached_matches = {"sp|P00001|ONE_HUMAN": ["sp|P00001|ONE_HUMAN\tmd5\t8\tPfam\tPF00001\n"], "sp|P00002|TWO_HUMAN": []}
+    split_iprscan_output(output_base, list(cached_matches), ["TSV"], MagicMock(), MagicMock(), sequence_tsv_lines=cached_matches)
+    assert (output_dir / "sp-P00001-ONE_HUMAN" / "iprscan.tsv").read_text(encoding="utf-8") == cached_matches["sp|P00001|ONE_HUMAN"][0]
+    assert not (output_dir / "sp-P00002-TWO_HUMAN" / "iprscan.tsv").exists()
+
+###T read_batch_tsv and finish_batch
+
+def test_finish_batch_indexes_without_splitting(batch_setup):
+    output_dir, _, _ = batch_setup
+    batches_dir = output_dir / "batches"
+    batches_dir.mkdir()
+    output_base = str(batches_dir / "iprscan_batch_1")
+    with open(f"{output_base}.tsv", "w", encoding="utf-8") as f:
+        f.write("sp|P00001|ONE_HUMAN\tmd5\t8\tPfam\tPF00001\tFam1\t1\t5\t1e-5\tT\t01-01-2025\n")
+        f.write("sp|P00009|OTHER_HUMAN\tmd5\t8\tPfam\tPF00001\tFam1\t1\t5\t1e-5\tT\t01-01-2025\n")
+    batch = ["sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN"]
+    sequence_lines = read_batch_tsv(f"{output_base}.tsv", batch)
+    assert [len(lines) for lines in sequence_lines.values()] == [1, 0]
+
+    parts = [(output_base, [seq_id.replace("|", "-") for seq_id in batch])]
+    finish_batch(parts, str(output_dir), ["TSV"], sequence_lines, True, MagicMock(), MagicMock())
+    assert not (output_dir / "sp-P00001-ONE_HUMAN" / "iprscan.tsv").exists()
+    connection = open_iprscan_index(str(output_dir))
+    assert load_sequence_matches(connection, batch) == {"sp|P00001|ONE_HUMAN": [("Pfam", "PF00001", "-", 1, 5, "")]}
+    connection.close()
+
+    finish_batch(parts, str(output_dir), ["TSV"], sequence_lines, False, MagicMock(), MagicMock())
+    assert (output_dir / "sp-P00001-ONE_HUMAN" / "iprscan.tsv").exists()
+
+###T run_interproscan_bisecting and write_quarantine
+
+def test_bisection_quarantines_failing_sequences(batch_setup):
+    output_dir, script, counter = batch_setup
+    batch = ["sp-P00001-ONE_HUMAN", "sp-P00002-TWO_HUMAN", "sp-P00004-FOUR_HUMAN", "sp-P00005-FIVE_HUMAN"]
+    multi_logger = MagicMock()
+    parts, quarantined, rescanned = run_interproscan_bisecting(make_args(output_dir, script, 7), batch, MagicMock(), multi_logger)
+
+    assert quarantined == ["sp-P00004-FOUR_HUMAN"]
+    assert [os.path.basename(output_base) for output_base, _ in parts] == ["iprscan_batch_7a", "iprscan_batch_7bb"]
+    assert [part for _, part in parts] == [batch[:2], ["sp-P00005-FIVE_HUMAN"]]
+    # Halves of 2, then FOUR and FIVE alone
+    assert rescanned == 2 + 2 + 1 + 1
+    assert len(counter.read_text(encoding="utf-8").splitlines()) == 5
+    assert read_batch_tsv(f"{parts[1][0]}.tsv", ["sp|P00005|FIVE_HUMAN"])["sp|P00005|FIVE_HUMAN"]
+
+    quarantine_path = write_quarantine(str(output_dir), "7", quarantined, rescanned)
+    with open(quarantine_path, encoding="utf-8") as f:
+        assert json.load(f) == {"batch": "7", "quarantined": ["sp|P00004|FOUR_HUMAN"], "rescanned_sequences": 6}
+    assert write_quarantine(str(output_dir), "8", [], 0) is None
+
+def test_bisection_gives_up_past_max_quarantine(batch_setup):
+    output_dir, script, _ = batch_setup
+    batch = ["sp-P00004-FOUR_HUMAN", "sp-P00001-ONE_HUMAN", "sp-P00006-SIX_HUMAN"]
+    with pytest.raises(subprocess.CalledProcessError):
+        run_interproscan_bisecting(make_args(output_dir, script, 1, max_quarantine=1), batch, MagicMock(), MagicMock())
+    with pytest.raises(subprocess.CalledProcessError):
+        run_interproscan_bisecting(make_args(output_dir, script, 2, max_quarantine=0), batch, MagicMock(), MagicMock())
+
+def test_scan_with_cache_does_not_store_quarantined(tmp_path, batch_setup):
+    output_dir, script, counter = batch_setup
+    cache_path = str(tmp_path / "iprscan_cache.sqlite")
+    batch = ["sp-P00001-ONE_HUMAN", "sp-P00004-FOUR_HUMAN"]
+    _, matches, quarantined, _ = scan_with_cache(make_args(output_dir, script, 1), cache_path, "5.72-103.0", batch, MagicMock(), MagicMock())
+    assert quarantined == ["sp-P00004-FOUR_HUMAN"]
+    assert list(matches) == ["sp|P00001|ONE_HUMAN"]
+
+    # Quarantined sequences are tried again in later runs
+    runs = len(counter.read_text(encoding="utf-8").splitlines())
+    scan_with_cache(make_args(output_dir, script, 2), cache_path, "5.72-103.0", batch, MagicMock(), MagicMock())
+    assert counter.read_text(encoding="utf-8").splitlines()[runs:] == ["sp|P00004|FOUR_HUMAN"]
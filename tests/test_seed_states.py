@@ -0,0 +1,74 @@
+"""
+Unit tests for seed_states.py
+"""
+
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from seed_states import select_reference_rows, build_seed_states, write_all_seed_states
+from hmm_states import (
+    SEED_STATES_FILENAME,
+    read_seed_alignment,
+    get_seed_match_columns,
+    seed_row_to_nodes,
+    get_seed_rows,
+    alignment_match_states,
+)
+from run_hmmalign import align_domain_in_process
+from conftest import SEED_ROWS
+
+import pytest
+
+### Fixtures
+
+@pytest.fixture
+def family_dir(seed_family):
+    """PF90001 resources (see conftest.py), with SEED1_MOUSE annotated and SEED0_HUMAN as conservation reference"""
+    (seed_family / "annotations.json").write_text(json.dumps({"SEED1_MOUSE": {"10": []}}), encoding="utf-8")
+    (seed_family / "conservations.json").write_text(json.dumps({"SEED0_HUMAN/1-22": {"3": 0.9}}), encoding="utf-8")
+    (seed_family / "PF90001_hits.fasta").write_text(">sp|P00001|ONE_HUMANtarget//1-30\nPPPPMKVLAAGIVGLLLAACSSHKEEPPPP\n", encoding="utf-8")
+    return str(seed_family)
+
+###T select_reference_rows
+
+def test_select_reference_rows():
+    assert select_reference_rows(list(SEED_ROWS), ["SEED1_MOUSE"], ["SEED0_HUMAN/1-22"]) == ["SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23"]
+    assert select_reference_rows(list(SEED_ROWS), [], []) == []
+
+###T build_seed_states and write_all_seed_states
+
+def test_build_seed_states_matches_seed_mapping(family_dir):
+    seed_states = build_seed_states(family_dir)
+    assert seed_states["hmm_length"] == 22
+    assert list(seed_states["rows"]) == ["SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23"]
+    # The Q of SEED1 (seed column 9) is an insertion after match state 8
+    assert seed_states["rows"]["SEED1_MOUSE/1-23"]["state_path"] == "8M1I14M"
+    assert build_seed_states(os.path.dirname(family_dir)) is None
+
+def test_write_all_seed_states_feeds_get_seed_rows(family_dir):
+    resource_dir = os.path.dirname(family_dir)
+    assert write_all_seed_states(resource_dir, MagicMock()) == {"PF90001": 2}
+    assert os.path.isfile(os.path.join(family_dir, SEED_STATES_FILENAME))
+
+    hmm_path = os.path.join(family_dir, "domain.hmm")
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    hmm_length, rows = get_seed_rows(hmm_path, seed_path)
+    seed_rows, reference = read_seed_alignment(seed_path)
+    _, match_columns = get_seed_match_columns(hmm_path, reference)
+    assert hmm_length == 22
+    assert rows == [(name, *seed_row_to_nodes(seed_rows[name], match_columns)) for name in ["SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23"]]
+
+def test_align_with_seed_states_keeps_target_states(family_dir):
+    hmm_path = os.path.join(family_dir, "domain.hmm")
+    seed_path = os.path.join(family_dir, "alignment.seed")
+    fasta_path = os.path.join(family_dir, "PF90001_hits.fasta")
+    full_states = alignment_match_states(align_domain_in_process(hmm_path, seed_path, fasta_path), 22)
+
+    write_all_seed_states(os.path.dirname(family_dir), MagicMock())
+    reduced_states = alignment_match_states(align_domain_in_process(hmm_path, seed_path, fasta_path), 22)
+    assert set(reduced_states) == {"SEED0_HUMAN/1-22", "SEED1_MOUSE/1-23", "sp|P00001|ONE_HUMANtarget//1-30"}
+    assert all(reduced_states[name] == full_states[name] for name in reduced_states)
@@ -0,0 +1,118 @@
+"""
+Unit tests for seq_and_batch_prep.py
+"""
+
+import json
+import hashlib
+import sys
+import os
+from unittest.mock import MagicMock
+# Add the parent directory to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Bio import SeqIO
+from seq_and_batch_prep import iter_prepared_records, prepare_sequences_and_batches, SequenceBatcher
+
+import pytest
+
+### Fixtures
+
+PROTEINS = {
+    "sp|P00001|ONE_HUMAN": "MKVLAAGIVGLLLAACSSHKEE" * 4,
+    "sp|P00002|TWO_HUMAN": "WDTYGCPHNERWQFMYDGTC",
+    "sp|P00003|THREE_HUMAN": "HHGRPTEVNQLIRDFKA",
+}
+
+@pytest.fixture
+def protein_fasta(tmp_path):
+    """Protein FASTA with descriptions and wrapped lines"""
+    fasta_path = tmp_path / "proteins.fasta"
+    with open(fasta_path, "w", encoding="utf-8") as f:
+        for name, sequence in PROTEINS.items():
+            f.write(f">{name} Some protein OS=Homo sapiens\n")
+            for start in range(0, len(sequence), 50):
+                f.write(sequence[start:start + 50] + "\n")
+    return str(fasta_path)
+
+###T prepare_sequences_and_batches
+
+def test_prepare_writes_batches_sequences_and_stats(tmp_path, protein_fasta):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    batches = prepare_sequences_and_batches(iter_prepared_records(protein_fasta), 2, str(output_dir), MagicMock())
+
+    assert batches == {"batch_1": ["sp|P00001|ONE_HUMAN", "sp|P00002|TWO_HUMAN"], "batch_2": ["sp|P00003|THREE_HUMAN"]}
+    with open(output_dir / "all_sequences.json", encoding="utf-8") as f:
+        all_sequences = json.load(f)
+    assert {key: value for key, value in all_sequences.items() if key != "batching"} == batches
+    assert all_sequences["batching"]["batches"]["batch_2"] == {"sequences": 1, "residues": 17, "longest": 17}
+
+    with open(output_dir / "sequence_stats.tsv", encoding="utf-8") as f:
+        stats = [line.rstrip("\n").split("\t") for line in f]
+    assert stats[0] == ["sequence_id", "length", "md5"]
+    assert stats[1:] == [
+        [name, str(len(sequence)), hashlib.md5(sequence.encode()).hexdigest()]
+        for name, sequence in PROTEINS.items()
+    ]
+
+def test_prepare_sequence_files_match_seqio_output(tmp_path, protein_fasta):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    prepare_sequences_and_batches(iter_prepared_records(protein_fasta), 2000, str(output_dir), MagicMock())
+
+    for record in SeqIO.parse(protein_fasta, "fasta"):
+        expected_path = tmp_path / "expected.fasta"
+        SeqIO.write(record, expected_path, "fasta")
+        written = output_dir / record.id.replace("|", "-") / "sequence.fasta"
+        assert written.read_text(encoding="utf-8") == expected_path.read_text(encoding="utf-8")
+
+###T iter_prepared_records
+
+def test_iter_prepared_records_translates_nucleotides(tmp_path):
+    fasta_path = tmp_path / "nucleotides.fasta"
+    fasta_path.write_text(">seq1 cds\nATGAAATTT\nTAA\n>seq2\nATGTGGTGT\n", encoding="utf-8")
+    assert list(iter_prepared_records(str(fasta_path), is_nucleotide=True, chunk_size=1)) == [
+        ("seq1 cds", "MKF*"), ("seq2", "MWC")
+    ]
+
+###T SequenceBatcher
+
+def batch_lengths(batcher, lengths):
+    """Adds sequences with the given lengths and returns the batches as lists of lengths"""
+    for i, length in enumerate(lengths):
+        batcher.add(f"seq{i}:{length}", length)
+    content = batcher.finish()
+    return [[int(seq_id.split(":")[1]) for seq_id in content[name]] for name in batcher.batches]
+
+def test_sequence_mode_ignores_residues():
+    assert batch_lengths(SequenceBatcher(2), [5000, 10, 10, 10, 10]) == [[5000, 10], [10, 10], [10]]
+
+def test_residue_mode_balances_by_total_residues():
+    batches = batch_lengths(SequenceBatcher(100, "residues", batch_residues=100), [60, 30, 20, 50, 50, 90, 5])
+    assert batches == [[60, 30], [20, 50], [50], [90, 5]]
+    assert all(sum(batch) <= 100 for batch in batches)
+
+def test_residue_mode_still_caps_sequence_count():
+    assert batch_lengths(SequenceBatcher(2, "residues", batch_residues=1000), [1, 1, 1]) == [[1, 1], [1]]
+
+def test_residue_mode_isolates_long_sequences():
+    batcher = SequenceBatcher(100, "residues", batch_residues=1000, max_length=300)
+    assert batch_lengths(batcher, [100, 35000, 200, 301, 50]) == [[100], [35000], [200], [301], [50]]
+    assert batcher.batch_stats["batch_2"] == {"sequences": 1, "residues": 35000, "longest": 35000}
+
+def test_sequence_batcher_invalid_mode():
+    with pytest.raises(ValueError):
+        SequenceBatcher(10, "bytes")
+
+def test_prepare_batches_only_included_sequences(tmp_path, protein_fasta):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    include = {"sp|P00001|ONE_HUMAN", "sp|P00003|THREE_HUMAN"}
+    batches = prepare_sequences_and_batches(
+        iter_prepared_records(protein_fasta), 2000, str(output_dir), MagicMock(), include_sequences=include
+    )
+    assert batches == {"batch_1": ["sp|P00001|ONE_HUMAN", "sp|P00003|THREE_HUMAN"]}
+    with open(output_dir / "all_sequences.json", encoding="utf-8") as f:
+        batching = json.load(f)["batching"]
+    assert (batching["excluded_sequences"], batching["excluded_residues"]) == (1, 20)
+    assert (output_dir / "sp-P00002-TWO_HUMAN" / "sequence.fasta").is_file()
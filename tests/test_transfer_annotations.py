@@ -18,6 +18,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from transfer_annotations import (
     parse_arguments,
     get_pfam_id_from_hmmalign_result,
+    get_chunk_label_from_hmmalign_result,
     get_annotation_filepath,
     read_files,
     iterate_aligned_sequences,
@@ -31,10 +32,12 @@ from transfer_annotations import (
     get_alignment_sequences,
     populate_conservation,
     load_go_ontology,
+    get_go_ontology,
     prepare_go_set,
     calculate_bma_similarity,
     populate_go_data_for_annotations,
     cleanup_improve_transfer_dict,
+    get_mapped_sequence_matches,
     convert_sets_and_tuples_to_lists,
     write_reports,
     map_and_filter_annot_pos,
@@ -48,6 +51,8 @@ from transfer_annotations import (
     validate_paired_annotations,
     main
 )
+from iprscan_index import open_index, index_sequence_lines, load_sequence_matches
+from go_mappings import GoMappings
 
 from utils import get_logger
 
@@ -3535,6 +3540,8 @@ def test_parse_arguments_required():
 
     expected = Namespace(
         dom_align="/home/user/results/human/PF07728_hmmalign.sth",
+        hmmsearch_states=None,
+        go_source="iprscan",
         resource_dir="/home/user/resources/",
         domain_accession="PF07728",
         output_dir="/home/user/results/human/PF07728/",
@@ -3566,6 +3573,13 @@ def test_get_pfam_id_from_hmmalign_result():
     assert get_pfam_id_from_hmmalign_result(hmmalign_result_mock) == "PF07728"
     hmmalign_result_mock_2 = "/home/user/results/human/PF00001_hmmalign.sth"
     assert get_pfam_id_from_hmmalign_result(hmmalign_result_mock_2) == "PF00001"
+    assert get_pfam_id_from_hmmalign_result("/home/user/results/human/PF00001/PF00001_chunk12_hmmalign.sth") == "PF00001"
+
+###T get_chunk_label_from_hmmalign_result
+
+def test_get_chunk_label_from_hmmalign_result():
+    assert get_chunk_label_from_hmmalign_result(hmmalign_result_mock) == ""
+    assert get_chunk_label_from_hmmalign_result("/home/user/results/human/PF00001/PF00001_chunk12_hmmalign.sth") == "chunk12"
 
 ###T get_annotation_filepath
 
@@ -4221,6 +4235,53 @@ def test_gather_go_terms_for_target_no_go(multi_logger, go_terms_dir_mock):
     )
     assert go_terms == set()
 
+def test_gather_go_terms_for_target_from_match_index(multi_logger, go_terms_dir_mock, tmp_path):
+    with open(os.path.join(go_terms_dir_mock, "target_name", "iprscan.tsv"), encoding="utf-8") as f:
+        lines = [line.replace("sp|Q9NU22|MDN1_HUMAN", "target_name", 1) for line in f]
+    connection = open_index(str(tmp_path / "iprscan_matches.sqlite"))
+    index_sequence_lines(connection, {"target_name": lines})
+    sequence_matches = load_sequence_matches(connection, ["target_name"])["target_name"]
+    connection.close()
+
+    for pfam_id, interpro_conv_id, hit_start, hit_end in (("PF07728", "IPR011704", 325, 451), ("PF00000", "", 1, 100)):
+        from_index = gather_go_terms_for_target(
+            multi_logger=multi_logger,
+            target_name="target_name",
+            pfam_id=pfam_id,
+            go_terms_dir="/missing/dir",
+            interpro_conv_id=interpro_conv_id,
+            hit_start=hit_start,
+            hit_end=hit_end,
+            sequence_matches=sequence_matches,
+        )
+        from_file = gather_go_terms_for_target(
+            multi_logger=multi_logger,
+            target_name="target_name",
+            pfam_id=pfam_id,
+            go_terms_dir=go_terms_dir_mock,
+            interpro_conv_id=interpro_conv_id,
+            hit_start=hit_start,
+            hit_end=hit_end,
+        )
+        assert from_index == from_file
+    assert from_index == set()
+
+def test_gather_go_terms_for_target_from_go_mappings(multi_logger, go_terms_dir_mock, tmp_path):
+    go_mappings = GoMappings({"PF07728": {"GO:0005524"}}, {"IPR011704": {"GO:0016887"}}, {"PF07728": "IPR011704"})
+    targets = {"target_name": {"hit_intervals": {"325-451": {"hit_start": 325, "hit_end": 451}}}}
+    # No hits table in tmp_path: the domain's own hit intervals are used
+    sequence_matches = get_mapped_sequence_matches(targets, "PF07728", str(tmp_path), go_mappings)
+    assert sequence_matches == {"target_name": [("Pfam", "PF07728", "IPR011704", 325, 451, "GO:0005524|GO:0016887")]}
+
+    from_mappings = gather_go_terms_for_target(
+        multi_logger, "target_name", "PF07728", "/missing/dir", "IPR011704", 325, 451,
+        sequence_matches=sequence_matches["target_name"],
+    )
+    from_file = gather_go_terms_for_target(
+        multi_logger, "target_name", "PF07728", go_terms_dir_mock, "IPR011704", 325, 451,
+    )
+    assert from_mappings == from_file == {"GO:0005524", "GO:0016887"}
+
 def test_gather_go_terms_for_target_empty_interpro_id(multi_logger, iprscan_df_Q9NU22_PF07728):
     """Test gathering GO terms when interpro_conv_id is empty string but Pfam ID matches"""
     with patch("os.path.exists", return_value=True), \
@@ -4601,6 +4662,23 @@ def test_load_go_ontology_exception_handling(logger, multi_logger):
         assert result_godag is None
         assert result_obsolete is None
 
+###T get_go_ontology
+
+def test_get_go_ontology_parses_once_per_process(tmp_path, logger, multi_logger):
+    """The GO DAG is loaded once while go-basic.obo is unchanged, and failed loads are retried"""
+    (tmp_path / "mappings").mkdir()
+    (tmp_path / "mappings" / "go-basic.obo").write_text("format-version: 1.2\n", encoding="utf-8")
+    mock_godag = MagicMock()
+
+    with patch("transfer_annotations.load_go_ontology", return_value=(None, None)) as mock_load:
+        assert get_go_ontology(str(tmp_path), logger, multi_logger) == (None, None)
+    with patch("transfer_annotations.load_go_ontology", return_value=(mock_godag, {"GO:0000001"})) as mock_load:
+        first = get_go_ontology(str(tmp_path), logger, multi_logger)
+        second = get_go_ontology(str(tmp_path), logger, multi_logger)
+
+    assert first == second == (mock_godag, {"GO:0000001"})
+    mock_load.assert_called_once_with(str(tmp_path), logger, multi_logger)
+
 ###T prepare_go_set
 
 def test_prepare_go_set_basic(logger):
@@ -5910,6 +5988,15 @@ def test_write_reports_none_target_data(tmp_path, logger, multi_logger):
         }
         assert target_report_data == expected_target_report
 
+def test_write_reports_chunk_label(tmp_path, logger, multi_logger):
+    """Test write_reports names the domain report of a chunk after its label"""
+    transfer_dict = {"domain": {"PF07728": {"sequence_id": {"sp|TEST|A": {"hit_intervals": {}}}}}}
+
+    write_reports(logger, multi_logger, transfer_dict, str(tmp_path), chunk_label="chunk2")
+
+    assert os.listdir(tmp_path / "PF07728") == ["PF07728_chunk2_report.json"]
+    assert os.path.isfile(tmp_path / "sp-TEST-A" / "PF07728_report.json")
+
 
 ###T map_and_filter_annot_pos
 
@@ -8277,6 +8364,8 @@ def test_main_success(logger, multi_logger, minimal_hmmalign_lines_fixture_Q9NU2
     """Test main function success path"""
     mock_args = Namespace(
         dom_align=hmmalign_result_mock,
+        hmmsearch_states=None,
+        go_source="iprscan",
         resource_dir=resource_dir_mock,
         domain_accession=domain_accession_mock,
         output_dir=output_dir_mock,
@@ -8316,13 +8405,15 @@ def test_main_success(logger, multi_logger, minimal_hmmalign_lines_fixture_Q9NU2
             os.path.join(resource_dir_mock, "PF07728", "annotations.json"),
             output_dir_mock,
             resource_dir_mock,
-            os.path.join(resource_dir_mock, "mappings/interpro_pfam_accession_mapping.tsv")
+            os.path.join(resource_dir_mock, "mappings/interpro_pfam_accession_mapping.tsv"),
+            go_mappings=None, resource_pack=None
         )
         mock_write.assert_called_once_with(
             logger,
             multi_logger,
             transfer_dict_populated_disulfid_post_gos_list_Q9NU22,
-            output_dir_mock
+            output_dir_mock,
+            ""
         )
         logger.info.assert_any_call("TRANSFER_ANNOTS --- MAIN --- Transfer Dict FILLED")
 
@@ -8330,6 +8421,8 @@ def test_main_cc_go_load_error(logger, multi_logger):
     """Test main function when loading CC GO terms fails."""
     mock_args = Namespace(
         dom_align=hmmalign_result_mock,
+        hmmsearch_states=None,
+        go_source="iprscan",
         resource_dir=resource_dir_mock,
         domain_accession=domain_accession_mock,
         output_dir=output_dir_mock,
@@ -8400,6 +8493,8 @@ def test_main_integration_binding_Q9NU22_PF07728(
         # Run main
         args = Namespace(
             dom_align=hmmalign_path,
+            hmmsearch_states=None,
+            go_source="iprscan",
             resource_dir=resource_dir,
             domain_accession=domain_accession_mock,
             output_dir=output_dir,
@@ -8468,6 +8563,8 @@ def test_main_integration_disulfid_Q9NU22_PF07728(
         # Run main
         args = Namespace(
             dom_align=hmmalign_path,
+            hmmsearch_states=None,
+            go_source="iprscan",
             resource_dir=resource_dir,
             domain_accession=domain_accession_mock,
             output_dir=output_dir,
@@ -8536,6 +8633,8 @@ def test_main_integration_all_types_H0YB80(
         # Run main
         args = Namespace(
             dom_align=hmmalign_path,
+            hmmsearch_states=None,
+            go_source="iprscan",
             resource_dir=resource_dir,
             domain_accession=domain_accession_mock,
             output_dir=output_dir,
@@ -8,6 +8,7 @@ import os
 # from importlib import reload
 # from argparse import Namespace
 # from unittest.mock import patch, ANY, call, mock_open, MagicMock
+from unittest.mock import MagicMock
 # from tempfile import TemporaryDirectory
 
 # Add the parent directory to the sys.path
@@ -18,6 +19,9 @@ from utils import (
     make_dirs_and_write_fasta,
     translate_sequence,
     seqrecord_yielder,
+    read_fasta_records,
+    translate_records,
+    translate_fasta,
     convert_lists_to_original_types,
     convert_sets_and_tuples_to_lists
 )
@@ -206,3 +210,65 @@ def test_convert_lists_to_original_types_real_data(transfer_dict_populated_disul
     assert isinstance(indices["matches"], list)
     assert isinstance(indices["misses"], list)
 
+
+###T translate_sequence, read_fasta_records and translate_fasta
+
+NUCLEOTIDE_RECORDS = [
+    ("seq1 first", "ATGAAATTTTAA"),
+    ("seq2", "ATGGCTTGGCCACATTAT"),
+    ("seq3 third sequence", "ATGTGGTGT"),
+]
+
+@pytest.fixture
+def nucleotide_fasta(tmp_path):
+    """Nucleotide FASTA with a wrapped sequence"""
+    fasta_path = tmp_path / "nucleotides.fasta"
+    with open(fasta_path, "w", encoding="utf-8") as f:
+        for header, sequence in NUCLEOTIDE_RECORDS:
+            f.write(f">{header}\n{sequence[:6]}\n{sequence[6:]}\n")
+    return str(fasta_path)
+
+def test_read_fasta_records_joins_wrapped_lines(nucleotide_fasta):
+    assert list(read_fasta_records(nucleotide_fasta)) == NUCLEOTIDE_RECORDS
+
+def test_translate_sequence_matches_translate_records(nucleotide_fasta):
+    records = list(seqrecord_yielder(nucleotide_fasta, is_nucleotide=True, logger=MagicMock()))
+    assert [str(record.seq) for record in records] == ["MKF*", "MAWPHY", "MWC"]
+    assert [record.id for record in records] == ["seq1", "seq2", "seq3"]
+    assert [sequence for _, sequence in translate_records(NUCLEOTIDE_RECORDS)] == ["MKF*", "MAWPHY", "MWC"]
+
+@pytest.mark.parametrize("threads,chunk_size", [(1, 5000), (1, 1), (2, 2)])
+def test_translate_fasta_keeps_order_and_headers(tmp_path, nucleotide_fasta, threads, chunk_size):
+    output_fasta = str(tmp_path / "translated.fasta")
+    count = translate_fasta(nucleotide_fasta, output_fasta, MagicMock(), threads, chunk_size)
+    assert count == 3
+    assert list(read_fasta_records(output_fasta)) == [
+        ("seq1 first", "MKF*"), ("seq2", "MAWPHY"), ("seq3 third sequence", "MWC")
+    ]
+    assert not os.path.exists(f"{output_fasta}.tmp")
+
+def test_translate_fasta_incomplete_codon_raises(tmp_path):
+    fasta_path = tmp_path / "broken.fasta"
+    fasta_path.write_text(">bad\nATGAA\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        translate_fasta(str(fasta_path), str(tmp_path / "out.fasta"), MagicMock())
+    assert not os.path.exists(tmp_path / "out.fasta")
+    assert not os.path.exists(tmp_path / "out.fasta.tmp")
+
+def test_translate_fasta_removes_partial_output(tmp_path, nucleotide_fasta):
+    """A failure after the first chunk is written leaves no temporary file"""
+    with open(nucleotide_fasta, "a", encoding="utf-8") as f:
+        f.write(">bad\nATGAA\n")
+    output_fasta = str(tmp_path / "translated.fasta")
+    with pytest.raises(ValueError):
+        translate_fasta(nucleotide_fasta, output_fasta, MagicMock(), chunk_size=1)
+    assert not os.path.exists(output_fasta)
+    assert not os.path.exists(f"{output_fasta}.tmp")
+
+def test_read_fasta_records_empty_and_crlf(tmp_path):
+    empty = tmp_path / "empty.fasta"
+    empty.write_text("", encoding="utf-8")
+    assert list(read_fasta_records(str(empty))) == []
+    crlf = tmp_path / "crlf.fasta"
+    crlf.write_bytes(b">a desc\r\nMK\r\nV\r\n>b\r\n\r\nWW\r\n")
+    assert list(read_fasta_records(str(crlf))) == [("a desc", "MKV"), ("b", "WW")]
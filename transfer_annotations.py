@@ -72,6 +72,13 @@ from goatools.base import download_go_basic_obo
 from goatools.obo_parser import GODag
 from goatools.semsim.termwise.wang import SsWang
 import pandas as pd
+from hmm_states import build_state_alignment_lines
+from iprscan_index import open_iprscan_index, load_sequence_matches
+from go_mappings import GoMappings, load_go_mappings, read_pfam_interpro_mapping
+from hits_table import open_hits_table
+from resource_manifest import ResourceManifest, load_resource_manifest
+from resource_pack import ResourcePack, open_resource_pack
+from resource_store import get_resource_store
 from utils import get_logger, get_multi_logger
 # from modules.decorators import measure_time_and_memory
 # from memory_profiler import profile
@@ -88,15 +95,24 @@ def parse_arguments():
     """
     parser = argparse.ArgumentParser(description=
     "Generates a temporary multifasta for running hmmalign using a hits per domain JSON.")
-    parser.add_argument("-iA", "--dom-align", required=True, type=str, help="Path to domain's hmmalign alignment")
+    parser.add_argument("-iA", "--dom-align", required=False, type=str, help="Path to domain's hmmalign alignment")
+    parser.add_argument("-iHs", "--hmmsearch-states", required=False, type=str, default=None,
+                        help="Path to hmmsearch_per_domain.json or the hmmsearch_hits table - transfer \
+                        through HMM match states of the hmmsearch alignments instead of an hmmalign alignment")
     parser.add_argument("-r", "--resource-dir", required=True, type=str, help="Resource dir path")
     parser.add_argument("-d", "--domain-accession", help="Domain accession for scoped logging", required=True, type=str)
     parser.add_argument("-o", "--output-dir", required=True, type=str, help="Output dir path")
+    parser.add_argument("-gS", "--go-source", required=False, type=str, default="iprscan", choices=["iprscan", "mappings"],
+                        help="Source of target GO terms: InterProScan outputs (default) or the Pfam hits of each \
+                        target through pfam2go/interpro2go in resource_dir/mappings, without InterProScan")
     parser.add_argument("-e", "--eco-codes", required=False, default=[], nargs="*", help="Space-separated ECO codes to filter annotations")
     parser.add_argument("-l", "--log", required=False, default="logs/transfer_annotations.log", type=str, help="Log path")
 
     args = parser.parse_args()
 
+    if not args.dom_align and not args.hmmsearch_states:
+        parser.error("One of --dom-align or --hmmsearch-states is required")
+
     # Clean eco codes - remove any quotes, brackets and commas
     if args.eco_codes:
         args.eco_codes = [code.strip('",[]') for code in args.eco_codes]
@@ -105,7 +121,8 @@ def parse_arguments():
 
 def get_pfam_id_from_hmmalign_result(hmmalign_result: str) -> str:
     """
-    Extracts the Pfam ID from the hmmalign result filename.
+    Extracts the Pfam ID from the hmmalign result filename,
+    PF*_hmmalign.sth or, for chunks of large domains, PF*_chunk<N>_hmmalign.sth.
 
     Args:
         hmmalign_result: Path to the hmmalign result file.
@@ -113,15 +130,26 @@ def get_pfam_id_from_hmmalign_result(hmmalign_result: str) -> str:
     Returns:
         str: Pfam ID extracted from the filename.
     """
-    return os.path.splitext(os.path.basename(hmmalign_result))[0].split('_')[-2]
+    filename = os.path.splitext(os.path.basename(hmmalign_result))[0]
+    pfam_id = re.match(r"PF\d+", filename)
+    return pfam_id.group(0) if pfam_id else filename.split('_')[-2]
+
+def get_chunk_label_from_hmmalign_result(hmmalign_result: str) -> str:
+    """
+    Extracts the chunk label ("chunk<N>") from a PF*_chunk<N>_hmmalign.sth filename,
+    written by run_hmmalign.py for large domains, or "" for a whole domain alignment.
+    """
+    chunk_label = re.search(r"_(chunk\d+)_hmmalign", os.path.basename(hmmalign_result))
+    return chunk_label.group(1) if chunk_label else ""
 
-def get_annotation_filepath(resource_dir: str, pfam_id: str) -> str:
+def get_annotation_filepath(resource_dir: str, pfam_id: str, manifest: Optional[ResourceManifest] = None) -> str:
     """
     Constructs and returns the filepaths for annotations JSON based on the Pfam ID.
 
     Args:
         resource_dir: Resource directory path
         pfam_id: Pfam domain accession
+        manifest: Optional resource manifest (see resource_manifest.py), files absent from it and the filesystem are returned as None
 
     Returns:
         str: Filepath for the annotations JSON file
@@ -129,16 +157,20 @@ def get_annotation_filepath(resource_dir: str, pfam_id: str) -> str:
     base_dir = os.path.join(resource_dir, pfam_id)
     annotations_filepath = os.path.join(base_dir, "annotations.json")
     conservations_filepath = os.path.join(base_dir, "conservations.json")
+    if manifest is not None:
+        annotations_filepath = annotations_filepath if manifest.has_file(pfam_id, "annotations.json") else None
+        conservations_filepath = conservations_filepath if manifest.has_file(pfam_id, "conservations.json") else None
     return annotations_filepath, conservations_filepath
 
 def read_files(hmmalign_result: str, annotations_filepath: str) -> tuple[list[str], dict]:
     """
     Reads and returns the content of the hmmalign result and annotations files,
-    respectively, as lists of lines and a loaded JSON object.
+    respectively, as lists of lines and a loaded JSON object, the latter parsed
+    once per process through the resource store (see resource_store.py).
 
     Args:
         hmmalign_result: Path to the hmmalign result file
-        annotations_filepath: Path to the annotations JSON file
+        annotations_filepath: Path to the annotations JSON file, None if known to be absent
 
     Returns:
         tuple: (hmmalign_lines, annotations)
@@ -146,9 +178,10 @@ def read_files(hmmalign_result: str, annotations_filepath: str) -> tuple[list[st
     with open(hmmalign_result, 'r', encoding="utf-8") as hmmaligned_file:
         hmmalign_lines = [line.rstrip('\n') for line in hmmaligned_file]
 
+    if annotations_filepath is None:
+        return hmmalign_lines, {"sequence_id": {}}
     try:
-        with open(annotations_filepath, 'r', encoding="utf-8") as annotations_file:
-            annotations = json.load(annotations_file)
+        annotations = get_resource_store().json_file(annotations_filepath)
     except (FileNotFoundError, IOError):
         annotations = {"sequence_id": {}}
 
@@ -367,8 +400,8 @@ def read_conservations_and_annotations(conservations_filepath: str, annotations_
     """Reads conservations and annotations JSON files.
 
     Args:
-        conservations_filepath: Path to conservations JSON
-        annotations_filepath: Path to annotations JSON
+        conservations_filepath: Path to conservations JSON, None if known to be absent
+        annotations_filepath: Path to annotations JSON, None if known to be absent
 
     Returns:
         tuple: (conservations, annotations) where:
@@ -376,26 +409,41 @@ def read_conservations_and_annotations(conservations_filepath: str, annotations_
             annotations: {"sequence_id": {"position": [{"type": str}]}}
 
     Note:
-        Returns empty structures for missing or invalid files
+        Returns empty structures for missing or invalid files. Files are parsed once
+        per process through the resource store, and the returned dicts are shared.
     """
-    try:
-        with open(conservations_filepath, 'r', encoding="utf-8") as conservations_file:
-            conservations = json.load(conservations_file)
-            if not conservations:
-                conservations = {"sequence_id/range": {}}
-    except (FileNotFoundError, IOError):
-        conservations = {"sequence_id/range": {}}
+    store = get_resource_store()
+    conservations = {"sequence_id/range": {}}
+    if conservations_filepath is not None:
+        try:
+            conservations = store.json_file(conservations_filepath) or conservations
+        except (FileNotFoundError, IOError):
+            pass
 
-    try:
-        with open(annotations_filepath, 'r', encoding="utf-8") as annotations_file:
-            annotations = json.load(annotations_file)
-            if not annotations:
-                annotations = {"sequence_id": {}}
-    except (FileNotFoundError, IOError):
-        annotations = {"sequence_id": {}}
+    annotations = {"sequence_id": {}}
+    if annotations_filepath is not None:
+        try:
+            annotations = store.json_file(annotations_filepath) or annotations
+        except (FileNotFoundError, IOError):
+            pass
 
     return conservations, annotations
 
+def read_packed_conservations_and_annotations(resource_pack: ResourcePack, pfam_id: str) -> tuple[dict, dict]:
+    """Reads a family's conservations and annotations from a resource pack (see resource_pack.py),
+    unpickled once per process through the resource store, with the same empty structures
+    as read_conservations_and_annotations for absent records."""
+    store = get_resource_store()
+    conservations = store.load(
+        resource_pack.pack_path, lambda: resource_pack.conservations(pfam_id),
+        kind=f"conservations/{pfam_id}", size=resource_pack.record_size(pfam_id, "conservations")
+    ) or {"sequence_id/range": {}}
+    annotations = store.load(
+        resource_pack.pack_path, lambda: resource_pack.annotations(pfam_id),
+        kind=f"annotations/{pfam_id}", size=resource_pack.record_size(pfam_id, "annotations")
+    ) or {"sequence_id": {}}
+    return conservations, annotations
+
 def parse_go_annotations(go_column: str) -> list:
     """Extracts GO terms from InterProScan TSV column.
 
@@ -452,9 +500,10 @@ def check_interval_overlap(
 def gather_go_terms_for_target(
     multi_logger: Callable, target_name: str, pfam_id: str,
     go_terms_dir: str, interpro_conv_id: str, hit_start: int,
-    hit_end: int) -> set:
+    hit_end: int, sequence_matches: Optional[list] = None) -> set:
     """
-    Gathers GO terms for a single target sequence from iprscan.tsv if
+    Gathers GO terms for a single target sequence from iprscan.tsv, or from its
+    rows of the InterProScan match index when given, if
     adequate (meet at least one of 3 conditions) lines are present.
     Note: GO terms are kept as a string with them separated by "|".
     The GO terms base dir is expected to be the same as the output dir,
@@ -471,6 +520,9 @@ def gather_go_terms_for_target(
         interpro_conv_id: InterPro ID that corresponds to the Pfam ID.
         hit_start: Start position of the hit.
         hit_end: End position of the hit.
+        sequence_matches: Optional rows of the target in the InterProScan match index,
+            (analysis, signature_accession, interpro_accession, start, stop, go_terms),
+            used instead of reading iprscan.tsv.
 
     Returns:
         set: GO terms found for the target sequence.
@@ -479,6 +531,12 @@ def gather_go_terms_for_target(
     go_term_filepath = os.path.join(go_terms_dir, sanitized_target_name, "iprscan.tsv")
     target_go_set = set()
 
+    if sequence_matches is not None:
+        return gather_go_terms_from_matches(
+            multi_logger, target_name, pfam_id, interpro_conv_id,
+            hit_start, hit_end, sequence_matches
+        )
+
     if not os.path.exists(go_term_filepath):
         multi_logger(
             "warning",
@@ -530,6 +588,42 @@ def gather_go_terms_for_target(
 
     return target_go_set
 
+def gather_go_terms_from_matches(
+    multi_logger: Callable, target_name: str, pfam_id: str,
+    interpro_conv_id: str, hit_start: int, hit_end: int,
+    sequence_matches: list) -> set:
+    """Same as gather_go_terms_for_target, over a target's rows of the InterProScan match index
+    (see iprscan_index.py), whose GO terms are already parsed.
+
+    Returns:
+        set: GO terms found for the target sequence.
+    """
+    target_go_set = set()
+    found_matching_accession = False
+    found_matching_interval = False
+
+    for _, signature_accession, interpro_accession, start, stop, go_terms in sequence_matches:
+        matches_accession = signature_accession == pfam_id or (
+            bool(interpro_conv_id) and interpro_accession == interpro_conv_id
+        )
+        matches_interval = check_interval_overlap(multi_logger, start, stop, hit_start, hit_end)
+
+        found_matching_accession = found_matching_accession or matches_accession
+        found_matching_interval = found_matching_interval or matches_interval
+
+        if (matches_accession or matches_interval) and go_terms:
+            target_go_set.update(go_terms.split("|"))
+
+    if not (found_matching_accession or found_matching_interval):
+        multi_logger(
+            "warning",
+            "TRANSFER_ANNOTS --- GO_TERMS_TARGET --- No usable InterProScan matches in the match index for %s-%s",
+            pfam_id, target_name.replace("|", "-")
+        )
+        return set()
+
+    return target_go_set
+
 def get_alignment_sequences(
     hmmalign_lines: list, target_id: str, conservation_id: str,
     logger: logging.Logger, multi_logger: Callable
@@ -733,6 +827,17 @@ def load_go_ontology(resource_dir: str, logger:logging.Logger, multi_logger: Cal
         logger.exception("Exception details for loading GO ontology")
         return None, None
 
+def get_go_ontology(resource_dir: str, logger: logging.Logger, multi_logger: Callable) -> tuple[Optional[GODag], Optional[set]]:
+    """load_go_ontology through the resource store, so the GO DAG is parsed once per process
+    instead of once per target. Failed loads aren't cached."""
+    obo_path = os.path.join(resource_dir, "mappings", "go-basic.obo")
+
+    def loader() -> Optional[tuple[GODag, set]]:
+        godag, goterms_obsolete = load_go_ontology(resource_dir, logger, multi_logger)
+        return None if godag is None else (godag, goterms_obsolete)
+
+    return get_resource_store().load(obo_path, loader, kind="go_ontology") or (None, None)
+
 def prepare_go_set(
     go_set: set,
     godag: GODag,
@@ -925,7 +1030,7 @@ def populate_go_data_for_annotations(
         target_go_set: Set of GO terms found for the target sequence
         resource_dir: Directory containing intermediary files - go-basic.obo will locate here
     """
-    godag, goterms_obsolete = load_go_ontology(resource_dir, logger, multi_logger)
+    godag, goterms_obsolete = get_go_ontology(resource_dir, logger, multi_logger)
 
     # We need target GO terms to be available
     if not target_go_set:
@@ -1022,6 +1127,34 @@ def populate_go_data_for_annotations(
                 if go_data_for_annotation:
                     anno_data.update(go_data_for_annotation)
 
+def get_mapped_sequence_matches(
+    targets: dict, pfam_id: str, output_dir: str, go_mappings: GoMappings) -> dict[str, list[tuple]]:
+    """Builds InterProScan match index rows for each target from its Pfam hits and GO mappings.
+    All hits of a target come from the hits table when present, otherwise only
+    the hit intervals of pfam_id in the transfer dictionary are used.
+
+    Args:
+        targets: transfer_dict[pfam_id]["sequence_id"]
+        pfam_id: Domain being processed
+        output_dir: Output directory, holding the hits table
+        go_mappings: Loaded GO mappings
+
+    Returns:
+        dict[str, list[tuple]]: {target_name: [(analysis, signature_accession, interpro_accession,
+        start, stop, go_terms)]}
+    """
+    hits_table = open_hits_table(output_dir)
+    sequence_matches = {}
+    for target_name, target_data in targets.items():
+        sequence_hits = hits_table.sequence_hits(target_name) if hits_table is not None else {}
+        if not sequence_hits:
+            sequence_hits = {pfam_id: [
+                {"ali_from": interval["hit_start"], "ali_to": interval["hit_end"]}
+                for interval in target_data["hit_intervals"].values()
+            ]}
+        sequence_matches[target_name] = go_mappings.sequence_matches(sequence_hits)
+    return sequence_matches
+
 def cleanup_improve_transfer_dict(
     logger: logging.Logger,
     multi_logger: Callable,
@@ -1032,13 +1165,16 @@ def cleanup_improve_transfer_dict(
     annotations_filepath: str,
     output_dir: str,
     resource_dir: str,
-    pfam_interpro_map_filepath: str
+    pfam_interpro_map_filepath: str,
+    go_mappings: Optional[GoMappings] = None,
+    resource_pack: Optional[ResourcePack] = None
 ) -> dict:
     """Main function for enhancing transfer dictionary with conservation and GO data.
 
     Coordinates data population from conservations.json and annotations.json.
     Uses helper functions for sequence extraction from alignment,
-    GO term retrieval from iprscan.tsv,
+    GO term retrieval from the InterProScan match index (or iprscan.tsv files without it),
+    or from the targets' Pfam hits through GO mapping files when go_mappings is given,
     and positional and GO term conservation scores calculation (latter 2 done by the populate_* functions).
 
     Args:
@@ -1051,6 +1187,9 @@ def cleanup_improve_transfer_dict(
         output_dir: Directory for output files
         resource_dir: Directory for resource intermediate files
         pfam_interpro_map_filepath: Path to interpro_pfam_accession_mapping.tsv
+        go_mappings: Optional pfam2go/interpro2go mappings (see go_mappings.py), replacing InterProScan GO terms
+        resource_pack: Optional resource pack (see resource_pack.py), read instead of the JSON and mapping
+            files when it holds the family
 
     Returns:
         dict: Enhanced transfer dictionary with format:
@@ -1066,7 +1205,11 @@ def cleanup_improve_transfer_dict(
     if "DOMAIN" in transfer_dict:
         transfer_dict[pfam_id] = transfer_dict.pop("DOMAIN")
 
-    conservations, annotations = read_conservations_and_annotations(conservations_filepath, annotations_filepath)
+    family_in_pack = resource_pack is not None and resource_pack.has_family(pfam_id)
+    if family_in_pack:
+        conservations, annotations = read_packed_conservations_and_annotations(resource_pack, pfam_id)
+    else:
+        conservations, annotations = read_conservations_and_annotations(conservations_filepath, annotations_filepath)
     has_valid_conservations = bool(conservations) and conservations != {"sequence_id/range": {}} and any("/" in key for key in conservations.keys())
     has_valid_annotations = bool(annotations) and annotations != {"sequence_id": {}} and any(isinstance(annotations.get(key, {}).get("0", {}), dict) for key in annotations)
     if not has_valid_conservations and not has_valid_annotations:
@@ -1074,18 +1217,38 @@ def cleanup_improve_transfer_dict(
         pfam_data = transfer_dict[pfam_id]
         return {"domain": {pfam_id: pfam_data}}
 
-    mapping = pd.read_csv(pfam_interpro_map_filepath, sep="\t", header=0)
-    matching_row = mapping.loc[mapping["Pfam_ID"] == pfam_id, "InterPro_ID"]
-
-    if matching_row.empty:
-        multi_logger("warning",
-                    "TRANSFER_ANNOTS --- CLEANUP_IMPROV_TD --- No matching InterPro ID found for Pfam ID %s - proceeding regardless",
-                    pfam_id)
-        interpro_conv_id = ""
-        logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TS --- Empty matching row: %s", matching_row)
+    if family_in_pack:
+        interpro_conv_id = resource_pack.interpro_id(pfam_id)
+        if not interpro_conv_id:
+            multi_logger("warning",
+                        "TRANSFER_ANNOTS --- CLEANUP_IMPROV_TD --- No matching InterPro ID found for Pfam ID %s - proceeding regardless",
+                        pfam_id)
+        logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TS --- InterPro ID from resource pack: %s", interpro_conv_id)
     else:
-        interpro_conv_id = matching_row.values[0]
-        logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TS --- Found matching row: %s", matching_row)
+        pfam_interpro = get_resource_store().load(
+            pfam_interpro_map_filepath, lambda: read_pfam_interpro_mapping(pfam_interpro_map_filepath), kind="pfam_interpro"
+        )
+        interpro_conv_id = pfam_interpro.get(pfam_id, "")
+
+        if not interpro_conv_id:
+            multi_logger("warning",
+                        "TRANSFER_ANNOTS --- CLEANUP_IMPROV_TD --- No matching InterPro ID found for Pfam ID %s - proceeding regardless",
+                        pfam_id)
+        logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TS --- InterPro ID from mapping: %s", interpro_conv_id)
+
+    # Matches of every target, loaded once from the InterProScan match index if the run has one
+    index_matches = None
+    if has_valid_annotations and go_mappings is not None:
+        index_matches = get_mapped_sequence_matches(transfer_dict[pfam_id]["sequence_id"], pfam_id, output_dir, go_mappings)
+        logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TD --- Mapped GO terms of Pfam hits for %d targets", len(index_matches))
+    elif has_valid_annotations:
+        index_connection = open_iprscan_index(output_dir)
+        if index_connection is not None:
+            try:
+                index_matches = load_sequence_matches(index_connection, transfer_dict[pfam_id]["sequence_id"])
+            finally:
+                index_connection.close()
+            logger.debug("TRANSFER_ANNOTS --- CLEANUP_IMPROV_TD --- Loaded indexed InterProScan matches of %d targets", len(index_matches))
 
     # For each target in the dictionary, gather GO terms, get aligned sequences and fill conservation and GO data
     for target_name in transfer_dict[pfam_id]["sequence_id"]:
@@ -1133,7 +1296,8 @@ def cleanup_improve_transfer_dict(
                 target_go_set = gather_go_terms_for_target(
                     multi_logger, target_name, pfam_id,
                     output_dir, interpro_conv_id, target_hit_start,
-                    target_hit_end
+                    target_hit_end,
+                    sequence_matches=None if index_matches is None else index_matches.get(target_name, [])
                     )
                 # Populate GO data for each annotation
                 populate_go_data_for_annotations(
@@ -1186,12 +1350,15 @@ def write_reports(
     multi_logger: Callable,
     transfer_dict: dict,
     output_dir: str,
+    chunk_label: str = "",
 ) -> None:
     """Writes transfer results to JSON files in two formats.
 
     Outputs transfer dictionary data as:
     1. Complete report: output_dir/pfam_id/pfam_id_report.json
        Contains all targets and their annotations for that domain.
+       For a chunk of a large domain, output_dir/pfam_id/pfam_id_<chunk_label>_report.json,
+       merged by merge_reports_in_sequences.merge_domain_chunk_reports.
     2. Per-target reports: output_dir/target_name/pfam_id_report.json
        Individual target-domain data.
 
@@ -1200,6 +1367,7 @@ def write_reports(
         multi_logger: Callable for logging to multiple loggers - use for warning+ level
         transfer_dict: Transfer results to be written
         output_dir: Base output directory
+        chunk_label: Chunk of the domain alignment, e.g. "chunk2", "" for a whole domain
 
     Note:
         Converts set/tuple data to lists for JSON serialization
@@ -1224,7 +1392,7 @@ def write_reports(
     # Write the entire transfer_dict to the pfam_id subdir
     pfam_dir = os.path.join(output_dir, pfam_id)
     os.makedirs(pfam_dir, exist_ok=True)
-    entire_report_path = os.path.join(pfam_dir, pfam_id + "_report.json")
+    entire_report_path = os.path.join(pfam_dir, f"{pfam_id}_{chunk_label}_report.json" if chunk_label else pfam_id + "_report.json")
 
     structured_report = {
         "domain_id": pfam_id,
@@ -2354,11 +2522,32 @@ def main():
     main_logger, _ = get_logger(args.log, scope="main")
     domain_logger, _ = get_logger(args.log, scope="domain", identifier=args.domain_accession)
     multi_logger = get_multi_logger([main_logger, domain_logger])
-    domain_logger.info("TRANSFER_ANNOTS --- MAIN --- Running transfer_annotations.py for %s", dom_align)
-
-    pfam_id = get_pfam_id_from_hmmalign_result(dom_align)
-    annotations_filepath, conservations_filepath = get_annotation_filepath(resource_dir, pfam_id)
-    hmmalign_lines, annotations = read_files(dom_align, annotations_filepath)
+    domain_logger.info("TRANSFER_ANNOTS --- MAIN --- Running transfer_annotations.py for %s", dom_align or args.hmmsearch_states)
+    manifest = load_resource_manifest(resource_dir, domain_logger)
+    resource_pack = open_resource_pack(resource_dir)
+
+    if args.hmmsearch_states:
+        # HMM STATES PATH - Seed and target residues related through match states, no hmmalign alignment
+        pfam_id = args.domain_accession
+        annotations_filepath, conservations_filepath = get_annotation_filepath(resource_dir, pfam_id, manifest)
+        hmmalign_lines = build_state_alignment_lines(
+            args.hmmsearch_states, pfam_id,
+            os.path.join(resource_dir, pfam_id, "domain.hmm"),
+            os.path.join(resource_dir, pfam_id, "alignment.seed")
+        )
+        if resource_pack is not None and resource_pack.has_family(pfam_id):
+            _, annotations = read_packed_conservations_and_annotations(resource_pack, pfam_id)
+        else:
+            _, annotations = read_conservations_and_annotations(conservations_filepath, annotations_filepath)
+        domain_logger.info("TRANSFER_ANNOTS --- MAIN --- Built %d alignment lines from hmmsearch HMM states", len(hmmalign_lines))
+    else:
+        pfam_id = get_pfam_id_from_hmmalign_result(dom_align)
+        annotations_filepath, conservations_filepath = get_annotation_filepath(resource_dir, pfam_id, manifest)
+        if resource_pack is not None and resource_pack.has_family(pfam_id):
+            hmmalign_lines, _ = read_files(dom_align, None)
+            _, annotations = read_packed_conservations_and_annotations(resource_pack, pfam_id)
+        else:
+            hmmalign_lines, annotations = read_files(dom_align, annotations_filepath)
 
     try:
         if annotations == {"sequence_id": {}}:
@@ -2379,12 +2568,23 @@ def main():
         multi_logger("error", "TRANSFER_ANNOTS --- MAIN --- ERROR transferring annotations for Pfam ID %s: %s\n%s", pfam_id, e, error_info)
         raise
 
+    go_mappings = None
+    if args.go_source == "mappings":
+        go_mappings = load_go_mappings(resource_dir)
+        if go_mappings is None:
+            multi_logger("error", "TRANSFER_ANNOTS --- MAIN --- GO source 'mappings' requires pfam2go or interpro2go in %s",
+                         os.path.join(resource_dir, "mappings"))
+            raise FileNotFoundError(os.path.join(resource_dir, "mappings", "pfam2go"))
+
     improved_transfer_dict = cleanup_improve_transfer_dict(
         domain_logger, multi_logger, transfer_dict,
         pfam_id, hmmalign_lines, conservations_filepath,
-        annotations_filepath, output_dir, resource_dir, pfam_interpro_map_filepath
+        annotations_filepath, output_dir, resource_dir, pfam_interpro_map_filepath,
+        go_mappings=go_mappings, resource_pack=resource_pack
         )
-    write_reports(domain_logger, multi_logger, improved_transfer_dict, output_dir)
+    chunk_label = get_chunk_label_from_hmmalign_result(dom_align) if dom_align else ""
+    write_reports(domain_logger, multi_logger, improved_transfer_dict, output_dir, chunk_label)
+    domain_logger.debug("TRANSFER_ANNOTS --- MAIN --- Resource store: %s", get_resource_store().stats())
 
 if __name__ == "__main__":
     main()
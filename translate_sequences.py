@@ -0,0 +1,69 @@
+"""
+translate_sequences.py
+
+Copyright 2025 Eduardo Horta Santos <GitHub: Eduardo-HortaS>
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+MA 02110-1301, USA.
+
+This script translates a nucleotide FASTA into a protein FASTA once, so that
+run_hmmsearch.py and seq_and_batch_prep.py can both take the translated file
+as regular protein input instead of translating the same sequences again.
+
+Sequences are translated in chunks with PyHMMER (the same translation used by
+run_hmmsearch.py and utils.translate_sequence), with chunks spread across cores.
+
+Required command-line arguments:
+- fasta: Input nucleotide FASTA file path
+- output-fasta: Translated protein FASTA file path
+
+Optional command-line arguments:
+- threads: Number of parallel workers (default: 1)
+- chunk-size: Sequences translated per chunk (default: 5000)
+- log: Log file path
+"""
+
+import sys
+import argparse
+from utils import get_logger, translate_fasta
+
+def parse_arguments():
+    """Parse command-line arguments for translating a nucleotide FASTA.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description=
+    "Translates a nucleotide FASTA into a protein FASTA, once for the whole pipeline.")
+    parser.add_argument("-iF", "--fasta", help="Path to input nucleotide FASTA file", required=True, type=str)
+    parser.add_argument("-o", "--output-fasta", help="Path to translated protein FASTA file", required=True, type=str)
+    parser.add_argument("-t", "--threads", help="Number of parallel workers", required=False, type=int, default=1)
+    parser.add_argument("-cs", "--chunk-size", help="Sequences translated per chunk", required=False, type=int, default=5000)
+    parser.add_argument("-l", "--log", help="Log path", required=False, type=str, default="logs/translate_sequences.log")
+    return parser.parse_args()
+
+def main():
+    """Main function, initializes this script"""
+    args = parse_arguments()
+    logger, _ = get_logger(args.log, scope="main")
+    logger.info("TRANSLATE_SEQUENCES --- MAIN --- Running with arguments: %s", args)
+    try:
+        translate_fasta(args.fasta, args.output_fasta, logger, args.threads, args.chunk_size)
+    except ValueError as e:
+        logger.error("TRANSLATE_SEQUENCES --- MAIN --- %s", e)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
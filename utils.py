@@ -24,6 +24,7 @@ This script contains all utility functions used by KRA.coce
 
 import logging
 import os
+import mmap
 import pyhmmer.easel
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -31,6 +32,7 @@ from typing import Iterator
 from datetime import datetime
 from Bio import SeqIO
 from collections import defaultdict
+from joblib import Parallel, delayed
 from typing import List, Callable, Literal, Any
 
 Scope = Literal["main", "domain", "sequence", "seq_batch"]
@@ -133,22 +135,117 @@ def translate_sequence(seq_record: SeqRecord, logger: logging.Logger) -> SeqReco
     # Create digital sequence using pyHMMER
     digital_seq = pyhmmer.easel.TextSequence(
         name=seq_record.id.encode(),
-        sequence=str(seq_record.seq).encode()
+        sequence=str(seq_record.seq)
     ).digitize(pyhmmer.easel.Alphabet.dna())
 
     # Translate using pyHMMER
-    translated = digital_seq.translate()
-    logger.debug("Translated %s to amino acids.", seq_record.id)
-    logger.debug("Original sequence: %s", seq_record.seq)
-    logger.debug("Translated sequence: %s", translated.sequence.decode())
+    translated = digital_seq.translate().textize()
+    if logger is not None:
+        logger.debug("Translated %s to amino acids (%d residues).", seq_record.id, len(translated.sequence))
 
     # Create new SeqRecord with translated sequence
     return SeqRecord(
-        Seq(translated.sequence.decode()),
+        Seq(translated.sequence),
         id=seq_record.id,
         description=seq_record.description
     )
 
+def read_fasta_records(fasta: str) -> Iterator[tuple[str, str]]:
+    """Yields (header, sequence) tuples from a FASTA file, without building SeqRecords.
+    The header excludes the leading '>' and the sequence is joined across wrapped lines.
+
+    The file is memory-mapped and split at record boundaries, so each record costs a few
+    bytes-level operations instead of per-line Python work.
+    """
+    if os.path.getsize(fasta) == 0:
+        return
+    with open(fasta, "rb") as fasta_file, mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = data.find(b">")
+        while start != -1:
+            end = data.find(b"\n>", start)
+            record = data[start + 1:end + 1 if end != -1 else len(data)]
+            header, _, body = record.partition(b"\n")
+            yield header.rstrip().decode("utf-8"), b"".join(body.split()).decode("utf-8")
+            start = end + 1 if end != -1 else -1
+
+def chunk_records(records: Iterator[Any], chunk_size: int) -> Iterator[list]:
+    """Groups an iterator into lists of up to chunk_size items."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def translate_records(records: List[tuple[str, str]]) -> List[tuple[str, str]]:
+    """Translates a chunk of (header, nucleotide sequence) tuples in a single pyHMMER call,
+    digitizing the whole chunk as a DigitalSequenceBlock.
+
+    Raises:
+        ValueError: If a sequence cannot be translated (e.g. length not multiple of 3)
+    """
+    alphabet = pyhmmer.easel.Alphabet.dna()
+    block = pyhmmer.easel.DigitalSequenceBlock(alphabet, (
+        pyhmmer.easel.TextSequence(name=header.split(maxsplit=1)[0].encode(), sequence=sequence).digitize(alphabet)
+        for header, sequence in records
+    ))
+    return [
+        (header, translated.textize().sequence)
+        for (header, _), translated in zip(records, block.translate())
+    ]
+
+def write_fasta_record(fasta_file, header: str, sequence: str, line_width: int = 60) -> None:
+    """Writes a single FASTA record, wrapping the sequence at line_width."""
+    lines = [f">{header}"]
+    lines.extend(sequence[start:start + line_width] for start in range(0, len(sequence), line_width))
+    lines.append("")
+    fasta_file.write("\n".join(lines))
+
+def translate_fasta(fasta: str, output_fasta: str, logger: logging.Logger,
+                    threads: int = 1, chunk_size: int = 5000) -> int:
+    """Translates a nucleotide FASTA into a protein FASTA in a single pass.
+
+    Records are read in chunks of chunk_size, each chunk is translated at once by
+    translate_records and chunks are spread over threads processes. Output keeps
+    the input order and headers, so every later stage can use it as protein input.
+
+    Args:
+        fasta: Path to the nucleotide FASTA
+        output_fasta: Path to the translated protein FASTA
+        logger: Logger instance for tracking execution
+        threads: Number of parallel workers (default: 1)
+        chunk_size: Number of sequences translated per call (default: 5000)
+
+    Returns:
+        int: Number of translated sequences
+    """
+    translated_count = 0
+    chunks = chunk_records(read_fasta_records(fasta), chunk_size)
+    tmp_output = f"{output_fasta}.tmp"
+    try:
+        with open(tmp_output, "w", encoding="utf-8") as out_file:
+            if threads > 1:
+                translated_chunks = Parallel(n_jobs=threads, return_as="generator")(
+                    delayed(translate_records)(chunk) for chunk in chunks
+                )
+            else:
+                translated_chunks = (translate_records(chunk) for chunk in chunks)
+            for translated_chunk in translated_chunks:
+                for header, protein in translated_chunk:
+                    write_fasta_record(out_file, header, protein)
+                translated_count += len(translated_chunk)
+                logger.debug("TRANSLATE --- Translated %d sequences so far", translated_count)
+        os.replace(tmp_output, output_fasta)
+    except BaseException:
+        # A partial translation must not be left behind
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
+    logger.info("TRANSLATE --- Translated %d sequences from %s into %s", translated_count, fasta, output_fasta)
+    return translated_count
+
 def seqrecord_yielder(fasta: str, is_nucleotide: bool = False, logger: logging.Logger = None) -> Iterator[SeqRecord]:
     """Yields SeqRecord objects from a FASTA file, translating if nucleotide."""
     for record in SeqIO.parse(fasta, "fasta"):